@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+툴팁/옵션 값 포맷터 마이크로 벤치마크 (resources.db의 모든 고유 아이템).
+Usage: python bench_tooltip_format.py [--repeat 200]
+
+이전 방식(툴팁마다 re.sub 세 번, mod마다 포맷 함수 재정의)과 src/tooltip_format.py를 같은 입력으로 돌려
+결과가 바이트 단위로 같은지 확인한 뒤 한 번 순회에 걸린 시간을 비교합니다.
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+from db_utils import iter_unique_records
+from tooltip_format import format_tooltip, parse_tooltip, format_mod_value_range
+
+
+def legacy_format_tooltip(desc):
+    desc = re.sub(r'\[([\d.-]+),\s*([\d.-]+),\s*([\d.-]+)\]%', r'(\1 ~ \2)%', desc)
+    desc = re.sub(r'\[([\d.-]+),\s*c,\s*([\d.-]*)\]%', r'\1%', desc)
+    return re.sub(r'\[([\d.-]+)\]', r'\1', desc)
+
+
+def legacy_format_mod_value_range(value, max_value, can_roll, mod_from_unique_type):
+    is_percentage = mod_from_unique_type in [1, 2]
+    def format_value_for_processing(val, is_percent_type, mod_type):
+        _prefix = ""
+        if mod_type == 0 and isinstance(val, (int, float)) and val > 0: _prefix = "+"
+        _suffix = "%" if is_percent_type else ""
+        num_str = ""
+        if isinstance(val, float):
+            num_to_format = val * 100 if is_percent_type else val
+            num_str = f"{num_to_format:.1f}".replace(".0", "")
+        else: num_str = str(int(val * 100)) if is_percent_type else str(val)
+        return f"{_prefix}{num_str}{_suffix}"
+    value_display = format_value_for_processing(value, is_percentage, mod_from_unique_type)
+    if can_roll and max_value is not None and value != max_value:
+        max_value_display = format_value_for_processing(max_value, is_percentage, mod_from_unique_type)
+        return f"({value_display} ~ {max_value_display.lstrip('+')})"
+    return value_display
+
+
+def _best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter(); func(); best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(repeat):
+    uniques = list(iter_unique_records())
+    descriptions = [entry.get('description', '') for item in uniques for entry in item.get("tooltipDescriptions") or ()]
+    mod_values = [(mod.get('value'), mod.get('maxValue'), mod.get('canRoll', False) if mod.get('maxValue') is not None else False,
+                   mod.get('type', 0))
+                  for item in uniques for mod in item.get("mods") or () if mod.get('value') is not None]
+    print(f"고유 아이템 {len(uniques)}개: 툴팁 {len(descriptions)}개, 값 있는 옵션 {len(mod_values)}개")
+
+    assert [legacy_format_tooltip(d) for d in descriptions] == [format_tooltip(d) for d in descriptions]
+    assert [format_tooltip(d) for d in descriptions] == [parse_tooltip(d)[0] for d in descriptions]
+    assert [legacy_format_mod_value_range(*v) for v in mod_values] == [format_mod_value_range(*v) for v in mod_values]
+    print("출력 동일 (툴팁, parse_tooltip 표시 문자열, 옵션 값)")
+
+    cases = [
+        ("툴팁: re.sub 3회", lambda: [legacy_format_tooltip(d) for d in descriptions]),
+        ("툴팁: format_tooltip", lambda: [format_tooltip(d) for d in descriptions]),
+        ("툴팁: parse_tooltip (구조화 포함)", lambda: [parse_tooltip(d) for d in descriptions]),
+        ("옵션 값: 함수 재정의", lambda: [legacy_format_mod_value_range(*v) for v in mod_values]),
+        ("옵션 값: format_mod_value_range", lambda: [format_mod_value_range(*v) for v in mod_values]),
+    ]
+    for label, func in cases:
+        print(f"{label:<36} {_best_of(func, repeat) * 1000:8.3f} ms / 전체 순회 (best of {repeat})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tooltip/value formatting over all uniques")
+    parser.add_argument("--repeat", type=int, default=200, help="반복 횟수 (가장 빠른 값을 보고)")
+    main(parser.parse_args().repeat)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+고유 아이템 수치 필터 마이크로 벤치마크 (resources.db의 모든 고유 아이템).
+Usage: python bench_unique_mod_filter.py [--repeat 200] [--db PATH]
+
+"기본 유형이 BASE_TYPES 중 하나이고 착용 레벨 MAX_LEVEL 이하이며 근접 치명타 확률 증가(property 4, type 1)의
+최고 굴림이 AT_LEAST 이상"인 아이템을 두 방식으로 찾아 결과가 같은지 확인한 뒤 시간을 비교합니다.
+    문자열: formatted_mods_list 문장에서 옵션 이름을 찾고 숫자를 정규식으로 뽑아 비교 (이전 방식)
+    열 배열: unique_mod_columns.UniqueModColumns.query (NumPy가 있으면 벡터 연산)
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(PROJECT_ROOT, "src"), os.path.join(PROJECT_ROOT, "scripts")):
+    if path not in sys.path: sys.path.insert(0, path)
+import db_utils
+import unique_mod_columns
+from unique_mod_columns import UniqueModColumns
+
+CRIT_PROPERTY, INCREASED = 4, 1
+CRIT_LINE_SUFFIX = "Crit Chance Increased"
+BASE_TYPES = (20, 21, 22) # 목걸이, 반지, 유물
+BASE_TYPE_NAMES = ("AMULET", "RING", "RELIC")
+MAX_LEVEL = 60
+AT_LEAST = 0.15
+NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def string_filter(processed):
+    matches = []
+    for position, item in enumerate(processed):
+        if item.get("item_type_display_base") not in BASE_TYPE_NAMES: continue
+        level = item.get("level_requirement")
+        if not isinstance(level, int) or level > MAX_LEVEL: continue
+        for line in item.get("formatted_mods_list") or ():
+            if not line.endswith(CRIT_LINE_SUFFIX): continue
+            numbers = [float(n) for n in NUMBER_PATTERN.findall(line)]
+            if numbers and max(numbers) / 100 >= AT_LEAST - 1e-9: matches.append(position); break
+    return matches
+
+
+def _best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter(); func(); best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(repeat, db_path=None):
+    if db_path: db_utils.DB_PATH = db_path
+    import process_game_data
+    processed = list(process_game_data.iter_processed_uniques(db_utils.iter_unique_records(),
+                                                               db_utils.load_item_type_records(), db_utils.load_affix_records()))
+    columns = UniqueModColumns.from_processed(processed)
+    backend = "NumPy" if unique_mod_columns.np is not None else "array (NumPy 없음)"
+    print(f"고유 아이템 {len(columns)}개, 수치 옵션 {columns.mod_count}개, 열 배열 백엔드: {backend}")
+    query = lambda: columns.query(CRIT_PROPERTY, mod_type=INCREASED, at_least=AT_LEAST, base_types=BASE_TYPES,
+                                  max_level=MAX_LEVEL, include_hidden=False)
+    expected = string_filter(processed)
+    assert query() == expected, (query(), expected)
+    print(f"결과 동일: {len(expected)}개 ({', '.join(processed[p]['name_display'] for p in expected)})")
+    for label, func in (("문자열 일치 + 정규식", lambda: string_filter(processed)), ("열 배열 query", query),
+                        ("열 배열 만들기 (from_processed)", lambda: UniqueModColumns.from_processed(processed))):
+        print(f"{label:<32} {_best_of(func, repeat) * 1000:8.3f} ms (best of {repeat})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark numeric unique filtering: strings vs columnar arrays")
+    parser.add_argument("--repeat", type=int, default=200, help="반복 횟수 (가장 빠른 값을 보고)")
+    parser.add_argument("--db", help="resources.db 경로 (기본: resources/resources.db)")
+    args = parser.parse_args()
+    main(args.repeat, args.db)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Build a resources bundle manifest (and binary deltas) for src/bundle_update.py
+Usage: python make_bundle_manifest.py --version 1.0.1 --source DIR --out DIR [--previous DIR ...]
+
+    --source    릴리스할 resources 파일들이 있는 폴더 (하위 폴더 포함, 숨김 파일 제외)
+    --out       manifest.json, files/<sha256>, deltas/<from>-<to>.delta 를 만들 폴더 (그대로 웹에 올림)
+    --previous  이전 릴리스의 resources 폴더 (여러 개 가능). 같은 이름의 파일에 대해 델타를 만듭니다.
+version.json에 "manifest": "<out을 올린 URL>/manifest.json" 항목을 추가하면 앱이 증분 업데이트를 사용합니다.
+"""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import logging
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+from bundle_update import (make_delta, sha256_file, validate_manifest, MANIFEST_FORMAT, LOCAL_MANIFEST_NAME,
+                           STAGING_DIR_NAME, JOURNAL_NAME)
+
+logger = logging.getLogger("make_bundle_manifest")
+
+# 델타가 전체 파일의 이 비율보다 크면 싣지 않음 (전체 파일을 받는 편이 나음)
+DELTA_MAX_RATIO = 0.5
+EXCLUDED_NAMES = {LOCAL_MANIFEST_NAME, JOURNAL_NAME, STAGING_DIR_NAME}
+
+
+def iter_bundle_files(source_dir):
+    """source_dir 아래 번들에 넣을 파일들의 '/' 구분 상대 경로 (정렬, 숨김/업데이트 내부 파일 제외)"""
+    names = []
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d not in EXCLUDED_NAMES]
+        for file_name in files:
+            if file_name.startswith(".") or file_name in EXCLUDED_NAMES or file_name.endswith(".tmp"): continue
+            names.append(os.path.relpath(os.path.join(root, file_name), source_dir).replace(os.sep, "/"))
+    return sorted(names)
+
+
+def build_manifest(version, source_dir, out_dir, previous_dirs=()):
+    """
+    source_dir의 파일들로 out_dir에 매니페스트/파일/델타를 만들고 매니페스트 dict를 반환합니다.
+    파일과 델타는 내용 해시 이름으로 저장하므로 여러 버전의 out_dir을 한 곳에 합쳐 올려도 충돌하지 않습니다.
+    """
+    os.makedirs(os.path.join(out_dir, "files"), exist_ok=True); os.makedirs(os.path.join(out_dir, "deltas"), exist_ok=True)
+    files = {}
+    for name in iter_bundle_files(source_dir):
+        path = os.path.join(source_dir, *name.split("/"))
+        sha256 = sha256_file(path); size = os.path.getsize(path)
+        shutil.copyfile(path, os.path.join(out_dir, "files", sha256))
+        entry = {"sha256": sha256, "size": size, "url": f"files/{sha256}", "deltas": []}
+        with open(path, 'rb') as f: target = f.read()
+        seen_bases = {sha256}
+        for previous_dir in previous_dirs:
+            base_path = os.path.join(previous_dir, *name.split("/"))
+            if not os.path.isfile(base_path): continue
+            with open(base_path, 'rb') as f: base = f.read()
+            base_sha256 = hashlib.sha256(base).hexdigest()
+            if base_sha256 in seen_bases: continue
+            seen_bases.add(base_sha256)
+            delta = make_delta(base, target)
+            if len(delta) > size * DELTA_MAX_RATIO:
+                logger.info(f"{name}: {base_sha256[:12]} 기준 델타가 너무 큼 ({len(delta)}/{size} bytes), 생략"); continue
+            delta_sha256 = hashlib.sha256(delta).hexdigest()
+            delta_name = f"{base_sha256}-{sha256}.delta"
+            with open(os.path.join(out_dir, "deltas", delta_name), 'wb') as f: f.write(delta)
+            entry["deltas"].append({"from": base_sha256, "sha256": delta_sha256, "size": len(delta),
+                                    "url": f"deltas/{delta_name}"})
+            logger.info(f"{name}: {base_sha256[:12]} 기준 델타 {len(delta)} bytes (전체 {size} bytes)")
+        files[name] = entry
+    manifest = validate_manifest({"format": MANIFEST_FORMAT, "version": version, "files": files})
+    with open(os.path.join(out_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a resources bundle manifest with binary deltas")
+    parser.add_argument("--version", required=True, help="번들 버전 (version.json의 version과 같게)")
+    parser.add_argument("--source", required=True, help="릴리스할 resources 폴더")
+    parser.add_argument("--out", required=True, help="출력 폴더")
+    parser.add_argument("--previous", action="append", default=[], help="이전 릴리스 resources 폴더 (여러 번 지정 가능)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    result = build_manifest(args.version, args.source, args.out, args.previous)
+    logger.info(f"▶ manifest.json 생성 완료: 파일 {len(result['files'])}개, "
+                f"델타 {sum(len(e['deltas']) for e in result['files'].values())}개")
@@ -3,7 +3,11 @@
 import json
 import os
 import sys
-import re
+import hashlib
+import sqlite3
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
@@ -15,11 +19,38 @@ if SRC_DIR not in sys.path:
 try:
     from db_utils import (get_uniques_from_db, load_item_type_map_from_db, 
                            load_raw_affixes_from_db, # 수정됨!
+                           iter_endpoint, get_endpoint, get_endpoint_hashes,
+                           UNIQUES_ENDPOINT, ITEM_TYPES_ENDPOINT, AFFIXES_ENDPOINT, SET_BONUSES_ENDPOINT, AILMENTS_ENDPOINT,
+                           iter_unique_records, iter_unique_record_sources, load_item_type_records, load_affix_records,
+                           UniqueRecord, ModRecord, # db_utils와 같은 모듈 객체여야 isinstance가 동작
                            FALLBACK_UNIQUES_DATA, FALLBACK_ITEM_TYPE_MAP, FALLBACK_AFFIX_LIST)
+    from uniques_snapshot import (SnapshotWriter, UniquesSnapshot, SnapshotError, file_sha256, snapshot_path_for,
+                                  SNAPSHOT_FORMAT_VERSION)
+    from uniques_ndjson import NdjsonWriter, NdjsonUniques, NdjsonError, NDJSON_FORMAT_VERSION
+    from processing_cache import ProcessingCache
+    from processing_stages import Stage, StageRegistry, run_stages, STATUS_RAN, STATUS_SKIPPED
+    from unique_mod_columns import UniqueModColumns
+    from json_stream import iter_json_array
+    from tooltip_format import format_tooltip, format_mod_value_range
 except ImportError as e:
     print(f"오류: src.db_utils 모듈 임포트 실패: {e}"); sys.exit(1)
 
 PROCESSED_UNIQUES_FILE = os.path.join(RESOURCES_DIR, 'processed_uniques.json')
+PROCESSED_UNIQUES_SNAPSHOT_FILE = os.path.join(RESOURCES_DIR, 'processed_uniques.bin') # 앱 빠른 시작용 이진 스냅샷 기준 경로 (실제 파일은 JSON 해시가 이름에 들어감)
+PROCESSED_UNIQUES_HASHES_FILE = os.path.join(RESOURCES_DIR, 'processed_uniques.hashes.json') # 증분 가공용 레코드별 입력 해시
+PROCESSED_UNIQUES_CACHE_FILE = os.path.join(RESOURCES_DIR, 'processed_uniques.cache.db') # 입력 해시 -> 가공 결과 캐시
+PROCESSED_UNIQUES_NDJSON_FILE = os.path.join(RESOURCES_DIR, 'processed_uniques.ndjson') # 선택 출력: JSON Lines + .idx 오프셋 인덱스
+PROCESSED_SET_BONUSES_FILE = os.path.join(RESOURCES_DIR, 'processed_set_bonuses.json')
+PROCESSED_AILMENTS_FILE = os.path.join(RESOURCES_DIR, 'processed_ailments.json')
+PROCESSED_UNIQUE_MODS_FILE = os.path.join(RESOURCES_DIR, 'processed_unique_mods.bin') # 수치 옵션 열 배열 (필터용)
+PROCESSING_STAGES_STATE_FILE = os.path.join(RESOURCES_DIR, 'processing_stages.json') # 가공 단계별 입력 지문/결과 파일 해시
+
+# 가공 결과(문장 형식 등)가 바뀌도록 이 파일을 고칠 때 올립니다. 모든 입력 해시가 달라져 전체를 다시 가공합니다.
+PROCESSOR_VERSION = 3
+PARALLEL_CHUNK_SIZE = 64 # 병렬 가공 시 작업 프로세스에 한 번에 넘기는 고유 아이템 수
+COMPACT_UNIQUE_KEYS = ("mods",) # processed_uniques.json에서 한 줄로 쓰는 수치 데이터 (indent=4로 쓰면 파일이 2.5배)
+JSON_READ_CHUNK_SIZE = 64 * 1024 # 가공 결과 JSON을 스트리밍으로 읽을 때의 조각 크기
+DAMAGE_TYPE_NAMES = ("Physical", "Fire", "Cold", "Lightning", "Necrotic", "Void", "Poison") # baseDamage.damage 배열 순서
 
 def find_affix_description(raw_affixes_list, property_id, special_tag=None, value_for_scaling=None):
     """
@@ -82,13 +113,480 @@ def find_affix_description(raw_affixes_list, property_id, special_tag=None, valu
     return best_match_description, best_match_name
 
 
-def process_and_save_uniques(raw_uniques_data, item_type_map, raw_affixes_list):
-    if not raw_uniques_data: print("가공할 원본 고유 아이템 데이터가 없습니다."); return False
-    print(f"{len(raw_uniques_data)}개의 고유 아이템 데이터 가공을 시작합니다...")
-    processed_items_list = []
+class AffixIndex:
+    """
+    find_affix_description의 결과를 미리 계산해 둔 조회 인덱스.
+    affix 목록을 한 번만 훑어 (property, specialTag)별 / property별 (설명, 이름)을 만들어 두므로
+    mod마다 전체 affix 목록을 두 번씩 스캔하지 않습니다. 순위 규칙(설명이 있는 첫 affix 우선,
+    idol이 아닌 더 짧은 이름 우선)은 find_affix_description과 완전히 같습니다.
+    """
+
+    def __init__(self, raw_affixes_list):
+        groups_by_tag = {}; groups_by_property = {}
+        for affix in raw_affixes_list: # 원래 순서를 유지한 채 그룹화 (순서가 동점 처리에 영향)
+            property_id = affix.get("property")
+            groups_by_property.setdefault(property_id, []).append(affix)
+            special_tag = affix.get("specialTag")
+            if special_tag is not None: groups_by_tag.setdefault((property_id, special_tag), []).append(affix)
+        self._by_tag = {key: self._resolve_tagged(group) for key, group in groups_by_tag.items()}
+        self._by_property = {key: self._resolve_property(group) for key, group in groups_by_property.items()}
+
+    @staticmethod
+    def _resolve_tagged(affixes):
+        """find_affix_description 1순위 단계. 이름이 없으면 None (호출 시 기본 이름 사용)"""
+        name = None
+        for affix in affixes:
+            if affix.get("description"):
+                return affix["description"], affix.get("affixDisplayName") or affix.get("affixName") or name
+            current_name = affix.get("affixDisplayName") or affix.get("affixName")
+            if current_name: name = current_name
+        return None, name
+
+    @staticmethod
+    def _resolve_property(affixes):
+        """find_affix_description 2순위 단계"""
+        candidate_name = None
+        for affix in affixes:
+            display_name = affix.get("affixDisplayName", "").strip()
+            name = affix.get("affixName", "").strip()
+            temp_chosen_name = display_name if display_name else name
+            if affix.get("description"): return affix["description"], temp_chosen_name
+            if not candidate_name or \
+               (temp_chosen_name and len(temp_chosen_name) < len(candidate_name) and "idol" not in temp_chosen_name.lower()):
+                candidate_name = temp_chosen_name
+        return None, candidate_name
+
+    def dependency(self, property_id, special_tag=None):
+        """describe()가 참조하는 미리 계산된 값. 이 값이 같으면 mod 문장도 같습니다. (증분 가공용)"""
+        tagged = self._by_tag.get((property_id, special_tag)) if special_tag is not None else None
+        return [tagged, self._by_property.get(property_id)]
+
+    def describe(self, property_id, special_tag=None, value_for_scaling=None):
+        """find_affix_description(raw_affixes_list, ...)와 같은 (설명, 이름)을 반환합니다."""
+        description, name = None, None
+        if special_tag is not None: description, name = self._by_tag.get((property_id, special_tag), (None, None))
+        if not description:
+            candidate_desc, candidate_name = self._by_property.get(property_id, (None, None))
+            if candidate_desc: description = candidate_desc
+            if candidate_name: name = candidate_name
+        if description and value_for_scaling is not None:
+            try: description = description.format(value_for_scaling)
+            except (IndexError, KeyError, TypeError): pass # 포맷팅 실패 시 원본 설명 사용
+        return description, name or f"Property ID {property_id}"
+
+
+def json_array_fragment(item, compact_keys=()):
+    """
+    json.dump(..., indent=4, ensure_ascii=False) 배열 안에 들어갈 원소 하나의 텍스트 (들여쓰기 포함)
+    compact_keys에 있는 키의 값은 한 줄 압축 JSON으로 씁니다. (파싱 결과는 같음)
+    """
+    if not any(key in item for key in compact_keys):
+        return json.dumps(item, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+    members = []
+    for key, value in item.items():
+        text = (json.dumps(value, ensure_ascii=False, separators=(",", ":")) if key in compact_keys
+                else json.dumps(value, indent=4, ensure_ascii=False).replace("\n", "\n        "))
+        members.append(f"        {json.dumps(key, ensure_ascii=False)}: {text}")
+    return "{\n" + ",\n".join(members) + "\n    }"
+
+
+def write_json_fragments(f, fragments):
+    """json_array_fragment()로 만든 원소 텍스트들을 JSON 배열로 f에 기록합니다. 기록한 원소 수를 반환합니다."""
+    count = 0
+    f.write("[")
+    for fragment in fragments:
+        f.write(",\n    " if count else "\n    ")
+        f.write(fragment)
+        count += 1
+    f.write("\n]" if count else "]")
+    return count
+
+
+def write_json_array_stream(f, items):
+    """
+    items를 하나씩 f에 기록합니다. json.dump(list(items), f, indent=4, ensure_ascii=False)와
+    바이트 단위로 같은 결과를 내지만 전체 리스트를 메모리에 만들지 않습니다.
+    Returns:
+        int: 기록한 원소 수
+    """
+    return write_json_fragments(f, map(json_array_fragment, items))
+
+
+def _encode_processed(item):
+    """가공된 아이템 하나의 저장 형태: (unique_id, name_display, JSON 파일 조각, 스냅샷용 압축 JSON)"""
+    return (item.get("unique_id"), item.get("name_display", ""), json_array_fragment(item, COMPACT_UNIQUE_KEYS),
+            json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+
+
+def process_and_save_uniques(raw_uniques_data, item_type_map, raw_affixes_list, workers=1, ndjson=None):
+    """
+    원본 고유 아이템(리스트 또는 iter_endpoint 등의 이터레이터)을 하나씩 가공하여
+    PROCESSED_UNIQUES_FILE에 바로 기록합니다. 가공 결과 전체를 메모리에 모으지 않습니다.
+    같은 레코드로 PROCESSED_UNIQUES_SNAPSHOT_FILE 이진 스냅샷도 함께 만듭니다.
+    workers가 2 이상이면 그 수의 프로세스로 나눠 가공합니다 (결과 파일은 같음).
+    ndjson: True면 PROCESSED_UNIQUES_NDJSON_FILE도 기록, None이면 그 파일이 이미 있을 때만 (_ndjson_enabled)
+    """
+    if raw_uniques_data is None: print("가공할 원본 고유 아이템 데이터가 없습니다."); return False
+    print("고유 아이템 데이터 가공을 시작합니다...")
+    saved = _save_processed_uniques(map(_encode_processed,
+                                        _iter_processed(raw_uniques_data, item_type_map, raw_affixes_list, workers)),
+                                    _ndjson_enabled(ndjson))
+    if saved: _remove_hashes_file() # 전체 가공 결과에는 레코드별 해시가 없음 -> 다음 증분 가공은 전체 가공
+    return saved
+
+
+def _ndjson_enabled(ndjson):
+    """ndjson 옵션이 None이면 이미 NDJSON을 만들어 둔 경우에만 계속 갱신 (오래된 NDJSON이 남지 않도록)"""
+    return os.path.exists(PROCESSED_UNIQUES_NDJSON_FILE) if ndjson is None else bool(ndjson)
+
+
+def _save_processed_uniques(encoded_items, ndjson=False):
+    """
+    _encode_processed() 형태의 가공 결과들을 PROCESSED_UNIQUES_FILE과 이진 스냅샷(ndjson=True면 NDJSON도)에 기록합니다.
+    성공 시 JSON 파일의 SHA-256 digest, 실패 시 None
+    """
+    writers = []
+    try:
+        if not os.path.exists(RESOURCES_DIR): os.makedirs(RESOURCES_DIR)
+        writers.append(SnapshotWriter(PROCESSED_UNIQUES_SNAPSHOT_FILE))
+        if ndjson: writers.append(NdjsonWriter(PROCESSED_UNIQUES_NDJSON_FILE))
+        def _tee_to_writers(entries):
+            for unique_id, name_display, fragment, compact in entries:
+                data = compact.encode('utf-8')
+                for writer in writers: writer.add_encoded(data, unique_id, name_display)
+                yield fragment
+        temp_path = PROCESSED_UNIQUES_FILE + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            count = write_json_fragments(f, _tee_to_writers(encoded_items))
+        if not count:
+            os.remove(temp_path)
+            for writer in writers: writer.abort()
+            print("가공할 원본 고유 아이템 데이터가 없습니다."); return None
+        os.replace(temp_path, PROCESSED_UNIQUES_FILE)
+        print(f"가공된 고유 아이템 데이터 {count}개를 '{PROCESSED_UNIQUES_FILE}'에 저장했습니다.")
+    except Exception as e:
+        for writer in writers: writer.abort()
+        print(f"고유 아이템 데이터 가공/저장 오류: {e}"); return None
+    output_sha256 = file_sha256(PROCESSED_UNIQUES_FILE)
+    for writer, label in zip(writers, ("이진 스냅샷", "NDJSON")):
+        try:
+            writer.finish(output_sha256)
+            print(f"{label}을 '{getattr(writer, 'final_path', None) or writer.path}'에 저장했습니다.")
+        except Exception as e: # 스냅샷/NDJSON은 선택 사항: 실패해도 앱은 JSON으로 폴백
+            writer.abort()
+            print(f"경고: {label} 저장 실패 ({e}). 앱은 JSON 파일을 사용합니다.")
+    return output_sha256
+
+
+def _remove_hashes_file():
+    try: os.remove(PROCESSED_UNIQUES_HASHES_FILE)
+    except FileNotFoundError: pass
+
+
+class UniqueInputHasher:
+    """
+    고유 아이템 하나의 가공 결과를 결정하는 모든 입력의 해시:
+    원본 레코드 텍스트의 SHA-256, 해당 baseType의 아이템 유형 항목, mod마다 AffixIndex.dependency() 값, PROCESSOR_VERSION.
+    아이템 유형/affix 부분은 키별로 한 번만 직렬화합니다.
+    레코드가 참조하는 조회 키(deps_of)를 가공 캐시에 두면 레코드를 파싱하지 않고 from_parts로 계산할 수 있습니다.
+    """
+
+    def __init__(self, item_type_map, affix_index):
+        self.item_type_map = item_type_map or {}; self.affix_index = affix_index
+        self._item_type_parts = {}; self._affix_parts = {}
+
+    def _item_type_part(self, base_type_key):
+        part = self._item_type_parts.get(base_type_key)
+        if part is None:
+            item_type = self.item_type_map.get(base_type_key)
+            if hasattr(item_type, "to_dict"): item_type = item_type.to_dict()
+            part = self._item_type_parts[base_type_key] = json.dumps(item_type, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return part
+
+    def _affix_part(self, property_id, special_tag):
+        key = (property_id, special_tag); part = self._affix_parts.get(key)
+        if part is None:
+            part = self._affix_parts[key] = json.dumps(self.affix_index.dependency(property_id, special_tag),
+                                                       ensure_ascii=False, default=str).encode('utf-8')
+        return part
+
+    @staticmethod
+    def source_sha256(item_data, source_text=None):
+        """레코드 원본 JSON 텍스트의 SHA-256 (텍스트가 없으면 키 정렬 직렬화)"""
+        if source_text is None:
+            raw = item_data.to_dict() if isinstance(item_data, UniqueRecord) else item_data
+            source_text = json.dumps(raw, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(source_text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def deps_of(item_data):
+        """가공 결과가 참조하는 조회 키: [baseType 키, [[property, specialTag], ...]] (JSON으로 저장 가능)"""
+        return [str(item_data.get('baseType', 'N/A')),
+                [[mod.get('property'), mod.get('specialTag')] for mod in item_data.get("mods") or ()
+                 if isinstance(mod, (dict, ModRecord))]]
+
+    def from_parts(self, source_sha256, deps):
+        base_type_key, mod_keys = deps
+        digest = hashlib.sha256(f"v{PROCESSOR_VERSION}\0{source_sha256}\0".encode('utf-8'))
+        digest.update(self._item_type_part(base_type_key)); digest.update(b"\0")
+        for property_id, special_tag in mod_keys: digest.update(self._affix_part(property_id, special_tag))
+        return digest.hexdigest()
+
+    def __call__(self, item_data, source_text=None):
+        """source_text: 레코드의 원본 JSON 텍스트 (있으면 레코드를 다시 직렬화하지 않고 그대로 해시)"""
+        return self.from_parts(self.source_sha256(item_data, source_text), self.deps_of(item_data))
+
+
+def _load_previous_hashes():
+    """
+    이전 증분 가공의 레코드별 입력 해시 목록. 해시 파일이 가리키는 JSON 파일이 지금 파일과 다르면
+    (직접 수정, 전체 가공 등) 재사용할 수 없으므로 None을 반환합니다.
+    """
+    try:
+        with open(PROCESSED_UNIQUES_HASHES_FILE, 'r', encoding='utf-8') as f: state = json.load(f)
+        if state.get("processor_version") != PROCESSOR_VERSION: return None
+        if state.get("output_sha256") != file_sha256(PROCESSED_UNIQUES_FILE).hex(): return None
+        hashes = state.get("hashes")
+        return hashes if isinstance(hashes, list) else None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _snapshot_is_current():
+    """현재 JSON 파일의 해시로 이름 붙은 이진 스냅샷이 있고 올바른지 (레코드 CRC32까지 전부 확인)"""
+    try:
+        with UniquesSnapshot.open_for_source(PROCESSED_UNIQUES_SNAPSHOT_FILE, file_sha256(PROCESSED_UNIQUES_FILE)) as snapshot:
+            snapshot.verify()
+        return True
+    except (SnapshotError, OSError):
+        return False
+
+def _current_snapshot_path():
+    """현재 JSON 파일에 해당하는 스냅샷 경로 (JSON이 없으면 기준 경로: 결과 파일 없음으로 처리됨)"""
+    try: return snapshot_path_for(PROCESSED_UNIQUES_SNAPSHOT_FILE, file_sha256(PROCESSED_UNIQUES_FILE))
+    except OSError: return PROCESSED_UNIQUES_SNAPSHOT_FILE
+
+
+def _ndjson_is_current():
+    """NDJSON과 인덱스가 현재 JSON 파일과 맞는지 (NDJSON 전체 해시까지 확인)"""
+    try:
+        ndjson = NdjsonUniques(PROCESSED_UNIQUES_NDJSON_FILE, file_sha256(PROCESSED_UNIQUES_FILE))
+        try: ndjson.verify()
+        finally: ndjson.close()
+        return True
+    except (NdjsonError, OSError):
+        return False
+
+
+def _open_processing_cache():
+    """가공 캐시를 엽니다. 열 수 없으면 경고 후 None (캐시 없이 전부 다시 가공)"""
+    try: return ProcessingCache(PROCESSED_UNIQUES_CACHE_FILE)
+    except (sqlite3.Error, OSError) as e:
+        print(f"경고: 가공 캐시를 열 수 없습니다 ({e}). 캐시 없이 가공합니다."); return None
 
+
+def reprocess_uniques_incremental(raw_uniques_data, item_type_map, raw_affixes_list, workers=1, full=False, ndjson=None):
+    """
+    입력 해시가 가공 캐시(PROCESSED_UNIQUES_CACHE_FILE)에 있는 고유 아이템은 저장된 결과를 그대로 쓰고,
+    나머지만 다시 가공합니다. 새로 가공한 결과는 캐시에 넣습니다.
+    raw_uniques_data는 레코드 또는 (원본 JSON 텍스트, 레코드) 쌍(iter_unique_record_sources)의 이터러블입니다.
+    쌍의 레코드가 None이면 캐시에 조회 키가 없을 때만 텍스트를 파싱합니다 (iter_unique_record_sources(parse=False)).
+    workers가 2 이상이면 다시 가공할 레코드들을 그 수의 프로세스로 나눠 가공합니다.
+    full=True면 캐시된 결과를 쓰지 않고 전부 다시 가공해 캐시를 새로 채웁니다.
+    ndjson: process_and_save_uniques와 같음 (NDJSON 출력 여부)
+    출력 파일은 process_and_save_uniques와 바이트 단위로 같습니다. 해시 목록까지 같으면 파일을 다시 쓰지 않습니다.
+    Returns:
+        dict: {"total", "reprocessed"(캐시 미스), "reused"(캐시 적중), "written"} 또는 실패 시 None
+    """
+    if raw_uniques_data is None: print("가공할 원본 고유 아이템 데이터가 없습니다."); return None
+    affix_index = raw_affixes_list if isinstance(raw_affixes_list, AffixIndex) else AffixIndex(raw_affixes_list)
+    cache = _open_processing_cache()
+    try:
+        stats = _reprocess_with_cache(cache, raw_uniques_data, item_type_map, affix_index, workers, full,
+                                      _ndjson_enabled(ndjson))
+        if cache is not None: cache.commit()
+    except sqlite3.Error as e: # 캐시 파일 문제: 버리고 실패 처리 (기존 가공 결과는 그대로, 다음 실행은 캐시 없이 시작)
+        print(f"경고: 가공 캐시 오류 ({e}). 캐시를 지웁니다.")
+        cache.close(); cache = None; _remove_cache_file(); return None
+    finally:
+        if cache is not None: cache.close()
+    return stats
+
+
+def _remove_cache_file():
+    for suffix in ("", "-journal"):
+        try: os.remove(PROCESSED_UNIQUES_CACHE_FILE + suffix)
+        except OSError: pass
+
+
+def _reprocess_with_cache(cache, raw_uniques_data, item_type_map, affix_index, workers, full, ndjson):
+    input_hash_of = UniqueInputHasher(item_type_map, affix_index)
+    sources = [] # [원본 텍스트 SHA-256, 원본 텍스트 또는 None, 레코드 또는 None]
+    for entry in raw_uniques_data:
+        source_text, item_data = entry if isinstance(entry, tuple) else (None, entry)
+        if item_data is None and source_text is None: continue
+        if item_data is not None and not isinstance(item_data, (dict, UniqueRecord)): continue
+        sources.append([input_hash_of.source_sha256(item_data, source_text), source_text, item_data])
+    known_deps = cache.get_deps(source[0] for source in sources) if cache is not None else {}
+
+    def _record_of(source):
+        if source[2] is None: # 캐시에 조회 키가 없거나 다시 가공해야 함 -> 이때만 파싱
+            raw = json.loads(source[1])
+            source[2] = UniqueRecord.from_raw(raw) if isinstance(raw, dict) else False
+        return source[2]
+
+    plan = []; hashes = []
+    for source in sources:
+        deps = known_deps.get(source[0])
+        if deps is None:
+            item_data = _record_of(source)
+            if item_data is False: continue # dict가 아닌 원본 항목
+            deps = known_deps[source[0]] = input_hash_of.deps_of(item_data)
+            if cache is not None: cache.put_deps(source[0], deps)
+        plan.append(source); hashes.append(input_hash_of.from_parts(source[0], deps))
+    if cache is not None: cache.mark_live(known_deps, hashes)
+
+    previous_hashes = None if full else _load_previous_hashes()
+    if hashes == previous_hashes and _snapshot_is_current() and (not ndjson or _ndjson_is_current()):
+        stats = {"total": len(plan), "reprocessed": 0, "reused": len(plan), "written": False}
+        print(f"고유 아이템 {stats['total']}개: 입력 변경 없음, 가공 결과 파일을 그대로 둡니다."); return stats
+
+    cached_outputs = cache.get_outputs(hashes) if cache is not None and not full else {}
+    misses = []; missing = set()
+    for position, input_hash in enumerate(hashes): # 같은 입력이 여러 번 나오면 한 번만 가공
+        if input_hash not in cached_outputs and input_hash not in missing: missing.add(input_hash); misses.append(position)
+    stats = {"total": len(plan), "reprocessed": len(misses), "reused": len(plan) - len(misses), "written": False}
+    print(f"고유 아이템 {stats['total']}개: 캐시 적중 {stats['reused']}개, 미스 {stats['reprocessed']}개 (다시 가공)")
+
+    def _merged():
+        # 다시 가공한 결과는 입력 순서대로 나오므로 처음 나오는 미스 자리에 차례로 끼워 넣음
+        reprocessed_items = _iter_processed((_record_of(plan[position]) for position in misses),
+                                            item_type_map, affix_index, workers)
+        for input_hash in hashes:
+            encoded = cached_outputs.get(input_hash)
+            if encoded is None:
+                encoded = cached_outputs[input_hash] = _encode_processed(next(reprocessed_items))
+                if cache is not None: cache.put_output(input_hash, *encoded)
+            yield encoded
+    output_sha256 = _save_processed_uniques(_merged(), ndjson)
+    if output_sha256 is None: _remove_hashes_file(); return None
+    temp_path = PROCESSED_UNIQUES_HASHES_FILE + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"processor_version": PROCESSOR_VERSION, "output_sha256": output_sha256.hex(), "hashes": hashes}, f)
+    os.replace(temp_path, PROCESSED_UNIQUES_HASHES_FILE)
+    stats["written"] = True
+    return stats
+
+
+_worker_state = {} # 병렬 가공 작업 프로세스의 조회 데이터 (_init_worker가 프로세스마다 한 번 설정)
+
+def _init_worker(item_type_map, affix_index):
+    _worker_state["item_type_map"] = item_type_map; _worker_state["affix_index"] = affix_index
+
+def _process_chunk(chunk):
+    return list(iter_processed_uniques(chunk, _worker_state["item_type_map"], _worker_state["affix_index"]))
+
+def _iter_chunks(raw_uniques_data, chunk_size):
+    chunk = []
+    for item_data in raw_uniques_data:
+        if not isinstance(item_data, (dict, UniqueRecord)): continue # iter_processed_uniques와 같은 필터
+        chunk.append(item_data)
+        if len(chunk) >= chunk_size: yield chunk; chunk = []
+    if chunk: yield chunk
+
+def iter_processed_uniques_parallel(raw_uniques_data, item_type_map, raw_affixes_list, workers,
+                                    chunk_size=PARALLEL_CHUNK_SIZE):
+    """
+    iter_processed_uniques의 다중 프로세스 버전. 결과 순서와 내용은 같습니다.
+    아이템 유형/AffixIndex는 작업 프로세스마다 초기화 때 한 번만 넘기고, 고유 아이템은 chunk_size개씩 나눠 보냅니다.
+    먼저 보낸 묶음부터 차례로 꺼내므로 출력 순서가 입력 순서와 같고, 미리 보내 두는 묶음은 workers * 2개로 제한합니다.
+    """
+    affix_index = raw_affixes_list if isinstance(raw_affixes_list, AffixIndex) else AffixIndex(raw_affixes_list)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(item_type_map, affix_index)) as executor:
+        pending = deque()
+        for chunk in _iter_chunks(raw_uniques_data, chunk_size):
+            pending.append(executor.submit(_process_chunk, chunk))
+            if len(pending) >= workers * 2: yield from pending.popleft().result()
+        while pending: yield from pending.popleft().result()
+
+def _iter_processed(raw_uniques_data, item_type_map, raw_affixes_list, workers=1):
+    if workers and workers > 1:
+        return iter_processed_uniques_parallel(raw_uniques_data, item_type_map, raw_affixes_list, workers)
+    return iter_processed_uniques(raw_uniques_data, item_type_map, raw_affixes_list)
+
+def format_mod_line(mod, affix_index):
+    """mod 하나의 표시 문장 (고유 아이템과 세트 보너스에서 공통으로 사용). hideInTooltip이면 None"""
+    if mod.get("hideInTooltip"): return None
+    prop_id = mod.get('property')
+    special_tag = mod.get('specialTag')
+    value = mod.get('value'); max_value = mod.get('maxValue'); 
+    can_roll = mod.get('canRoll', False) if max_value is not None else False
+    mod_from_unique_type = mod.get('type', 0)
+    mod_tags = mod.get('tags', 0) 
+
+    # affixes.json에서 설명 및 기본 이름 찾아오기
+    # 이 부분은 find_affix_description으로 대체되거나, 이 함수가 더 정교한 이름을 찾아야 함.
+    # 여기서는 우선 property ID에 대한 기본 이름을 가져오는 것으로 가정 (이전 db_utils.load_affix_data_map_from_db 결과)
+    # 이 부분은 실제 affixes.json 구조와 find_affix_description 함수에 맞춰야 합니다.
+    # 임시: affix_data_map은 property_id -> 이름 형태라고 가정.
+    # 실제로는 (property_id, special_tag)로 검색하거나, affix_id로 검색해야 할 수 있음.
+    
+    full_description, base_mod_name = affix_index.describe(prop_id, special_tag, value)
+
+    final_mod_name = base_mod_name # find_affix_description에서 찾은 이름
+    minion_keywords = ["minion", "companion", "totem", "pet", "summon", "골렘", "스켈레톤", "레이스", "비스트"]
+    is_minion_mod_by_tag = (mod_tags == 8192)
+    if is_minion_mod_by_tag and not any(kw in final_mod_name.lower() for kw in minion_keywords):
+         final_mod_name = f"Minion {final_mod_name}"
+    if str(prop_id) == "88": final_mod_name = "to All Minion Skills" if is_minion_mod_by_tag else "to All Skills"
+    
+    value_str_formatted = ""
+    if full_description: # affixes.json에 완전한 설명이 있다면 그것을 사용
+        # full_description 내에 값 플레이스홀더가 있고, value/maxValue로 포맷팅 필요
+        # 예시: "{0} to {1} Fire Damage" -> value, maxValue 사용
+        # 지금은 간단히 full_description을 그대로 사용. 포맷팅은 추후 정교화.
+        # 만약 full_description이 이미 값까지 포함된 형태라면 아래 값 포맷팅은 필요 없음.
+        # 여기서는 full_description이 순수 텍스트이고, 값은 따로 포맷팅 한다고 가정.
+        if value is not None: # 값이 있는 경우에만 값 포맷팅 추가
+            value_str_formatted = format_mod_value_range(value, max_value, can_roll, mod_from_unique_type)
+            final_mod_name = f"{value_str_formatted} {full_description}" # 설명이 있다면 값을 앞에 붙임
+        else: # 값이 없는 서술형 옵션
+            final_mod_name = full_description
+        return final_mod_name # 이미 완전한 문장
+
+    # full_description이 없는 일반적인 경우 (이름 + 값 포맷팅)
+    if value is not None:
+        value_str_formatted = format_mod_value_range(value, max_value, can_roll, mod_from_unique_type)
+    
+    type_description = ""
+    if value is not None and mod_from_unique_type !=0 : 
+        if mod_from_unique_type == 1: type_description = " Increased" if (value >= 0) else " Reduced"
+        elif mod_from_unique_type == 2: type_description = " More" if (value >= 0) else " Less"
+        if type_description.strip().lower() in final_mod_name.lower(): type_description = ""
+    
+    mod_line = ""
+    if str(prop_id) == "88" and value is not None: mod_line = f"{value_str_formatted} {final_mod_name}"
+    elif value is not None: mod_line = f"{value_str_formatted} {final_mod_name}{type_description}"
+    else: mod_line = final_mod_name
+    return mod_line
+
+def structured_mod(mod):
+    """mod 하나의 수치 데이터. min/max는 굴림 범위(굴림이 없으면 같은 값, 값이 없으면 None)이고 값은 원본 단위(25% -> 0.25)"""
+    value = mod.get('value'); max_value = mod.get('maxValue')
+    low = high = value
+    if value is not None and max_value is not None and mod.get('canRoll', False): low, high = sorted((value, max_value))
+    return {"property": mod.get('property'), "special_tag": mod.get('specialTag') or 0, "type": mod.get('type') or 0,
+            "tags": mod.get('tags') or 0, "min": low, "max": high, "hidden": bool(mod.get('hideInTooltip'))}
+
+def iter_processed_uniques(raw_uniques_data, item_type_map, raw_affixes_list):
+    """
+    원본 고유 아이템을 하나씩 가공하여 yield 합니다.
+    raw_affixes_list는 affix 목록 또는 미리 만든 AffixIndex입니다. (목록이면 여기서 한 번 인덱싱)
+    """
+    affix_index = raw_affixes_list if isinstance(raw_affixes_list, AffixIndex) else AffixIndex(raw_affixes_list)
     for item_data in raw_uniques_data:
-        if not isinstance(item_data, dict): continue
+        if not isinstance(item_data, (dict, UniqueRecord)): continue
         processed_item = {
             "unique_id": item_data.get("uniqueID"),
             "name_display": item_data.get('displayName') or item_data.get('name', 'N/A'),
@@ -113,124 +611,194 @@ def process_and_save_uniques(raw_uniques_data, item_type_map, raw_affixes_list):
         formatted_tooltips_list = []
         if item_data.get("tooltipDescriptions"):
             for desc_entry in item_data["tooltipDescriptions"]:
-                desc = desc_entry.get('description', '')
-                desc = re.sub(r'\[([\d.-]+),\s*([\d.-]+),\s*([\d.-]+)\]%', r'(\1 ~ \2)%', desc)
-                desc = re.sub(r'\[([\d.-]+),\s*c,\s*([\d.-]*)\]%', r'\1%', desc) 
-                desc = re.sub(r'\[([\d.-]+)\]', r'\1', desc) 
+                desc = format_tooltip(desc_entry.get('description', '')) # 범위 표기 -> 표시 문자열 (한 번에 치환)
                 formatted_tooltips_list.append({"description": desc, "altText": desc_entry.get('altText', '')})
         processed_item['formatted_tooltips_html_list'] = formatted_tooltips_list # HTML 변환은 UI에서
 
-        formatted_mods_list = []
+        formatted_mods_list = []; structured_mods = []
         if item_data.get("mods"):
             for mod in item_data["mods"]:
-                if mod.get("hideInTooltip"): continue
-                prop_id = mod.get('property')
-                special_tag = mod.get('specialTag')
-                value = mod.get('value'); max_value = mod.get('maxValue'); 
-                can_roll = mod.get('canRoll', False) if max_value is not None else False
-                mod_from_unique_type = mod.get('type', 0)
-                mod_tags = mod.get('tags', 0) 
-
-                # affixes.json에서 설명 및 기본 이름 찾아오기
-                # 이 부분은 find_affix_description으로 대체되거나, 이 함수가 더 정교한 이름을 찾아야 함.
-                # 여기서는 우선 property ID에 대한 기본 이름을 가져오는 것으로 가정 (이전 db_utils.load_affix_data_map_from_db 결과)
-                # 이 부분은 실제 affixes.json 구조와 find_affix_description 함수에 맞춰야 합니다.
-                # 임시: affix_data_map은 property_id -> 이름 형태라고 가정.
-                # 실제로는 (property_id, special_tag)로 검색하거나, affix_id로 검색해야 할 수 있음.
-                
-                full_description, base_mod_name = find_affix_description(raw_affixes_list, prop_id, special_tag, value)
-
-                final_mod_name = base_mod_name # find_affix_description에서 찾은 이름
-                minion_keywords = ["minion", "companion", "totem", "pet", "summon", "골렘", "스켈레톤", "레이스", "비스트"]
-                is_minion_mod_by_tag = (mod_tags == 8192)
-                if is_minion_mod_by_tag and not any(kw in final_mod_name.lower() for kw in minion_keywords):
-                     final_mod_name = f"Minion {final_mod_name}"
-                if str(prop_id) == "88": final_mod_name = "to All Minion Skills" if is_minion_mod_by_tag else "to All Skills"
-                
-                value_str_formatted = ""
-                if full_description: # affixes.json에 완전한 설명이 있다면 그것을 사용
-                    # full_description 내에 값 플레이스홀더가 있고, value/maxValue로 포맷팅 필요
-                    # 예시: "{0} to {1} Fire Damage" -> value, maxValue 사용
-                    # 지금은 간단히 full_description을 그대로 사용. 포맷팅은 추후 정교화.
-                    # 만약 full_description이 이미 값까지 포함된 형태라면 아래 값 포맷팅은 필요 없음.
-                    # 여기서는 full_description이 순수 텍스트이고, 값은 따로 포맷팅 한다고 가정.
-                    if value is not None: # 값이 있는 경우에만 값 포맷팅 추가
-                        # (아래 값 포맷팅 로직은 유지)
-                        is_percentage = mod_from_unique_type in [1, 2]
-                        def format_value_for_processing(val, is_percent_type, mod_type):
-                            _prefix = ""
-                            if mod_type == 0 and isinstance(val, (int, float)) and val > 0: _prefix = "+"
-                            _suffix = "%" if is_percent_type else ""
-                            num_str = ""
-                            if isinstance(val, float):
-                                num_to_format = val * 100 if is_percent_type else val
-                                num_str = f"{num_to_format:.1f}".replace(".0", "")
-                            else: num_str = str(int(val * 100)) if is_percent_type else str(val)
-                            return f"{_prefix}{num_str}{_suffix}"
-                        value_display = format_value_for_processing(value, is_percentage, mod_from_unique_type)
-                        if can_roll and max_value is not None and value != max_value:
-                            max_value_display = format_value_for_processing(max_value, is_percentage, mod_from_unique_type)
-                            value_str_formatted = f"({value_display} ~ {max_value_display.lstrip('+')})"
-                        else: value_str_formatted = value_display
-                        final_mod_name = f"{value_str_formatted} {full_description}" # 설명이 있다면 값을 앞에 붙임
-                    else: # 값이 없는 서술형 옵션
-                        final_mod_name = full_description
-                    formatted_mods_list.append(final_mod_name) # 이미 완전한 문장
-                    continue # 다음 mod로
-
-                # full_description이 없는 일반적인 경우 (이름 + 값 포맷팅)
-                if value is not None:
-                    # (이전 값 포맷팅 로직과 동일)
-                    is_percentage = mod_from_unique_type in [1, 2]
-                    def format_value_for_processing(val, is_percent_type, mod_type):
-                        _prefix = ""
-                        if mod_type == 0 and isinstance(val, (int, float)) and val > 0: _prefix = "+"
-                        _suffix = "%" if is_percent_type else ""
-                        num_str = ""
-                        if isinstance(val, float):
-                            num_to_format = val * 100 if is_percent_type else val
-                            num_str = f"{num_to_format:.1f}".replace(".0", "")
-                        else: num_str = str(int(val * 100)) if is_percent_type else str(val)
-                        return f"{_prefix}{num_str}{_suffix}"
-                    value_display = format_value_for_processing(value, is_percentage, mod_from_unique_type)
-                    if can_roll and max_value is not None and value != max_value:
-                        max_value_display = format_value_for_processing(max_value, is_percentage, mod_from_unique_type)
-                        value_str_formatted = f"({value_display} ~ {max_value_display.lstrip('+')})"
-                    else: value_str_formatted = value_display
-                
-                type_description = ""
-                if value is not None and mod_from_unique_type !=0 : 
-                    if mod_from_unique_type == 1: type_description = " Increased" if (value >= 0) else " Reduced"
-                    elif mod_from_unique_type == 2: type_description = " More" if (value >= 0) else " Less"
-                    if type_description.strip().lower() in final_mod_name.lower(): type_description = ""
-                
-                mod_line = ""
-                if str(prop_id) == "88" and value is not None: mod_line = f"{value_str_formatted} {final_mod_name}"
-                elif value is not None: mod_line = f"{value_str_formatted} {final_mod_name}{type_description}"
-                else: mod_line = final_mod_name
-                formatted_mods_list.append(mod_line)
+                structured_mods.append(structured_mod(mod))
+                mod_line = format_mod_line(mod, affix_index)
+                if mod_line is not None: formatted_mods_list.append(mod_line)
         processed_item['formatted_mods_list'] = formatted_mods_list
-        processed_items_list.append(processed_item)
+        # 수치 필터용 (표시 문장과 달리 숨김 옵션도 포함). unique_mod_columns가 이 값으로 열 배열을 만듦
+        processed_item['base_type_id'] = item_data.get('baseType')
+        processed_item['mods'] = structured_mods
+        yield processed_item
 
+# ####################################################################
+# # 세트 보너스 / 상태 이상 가공
+# ####################################################################
+def iter_processed_set_bonuses(raw_set_bonuses, raw_uniques_data, raw_affixes_list):
+    """
+    세트 보너스를 세트마다 하나씩 가공하여 yield 합니다. 보너스는 필요한 세트 아이템 수(setRequirement)별로 묶고,
+    세트에 속한 고유 아이템 이름(raw_uniques_data의 isSetItem/setID)을 함께 넣습니다.
+    """
+    affix_index = raw_affixes_list if isinstance(raw_affixes_list, AffixIndex) else AffixIndex(raw_affixes_list)
+    set_items = {}
+    for item_data in raw_uniques_data:
+        if isinstance(item_data, dict) and item_data.get("isSetItem"):
+            set_items.setdefault(item_data.get("setID"), []).append(item_data.get('displayName') or item_data.get('name', 'N/A'))
+    for set_data in raw_set_bonuses:
+        if not isinstance(set_data, dict): continue
+        bonuses = {}
+        def _bonus(requirement):
+            return bonuses.setdefault(requirement, {"set_requirement": requirement, "formatted_mods_list": [],
+                                                    "formatted_tooltips_list": []})
+        for mod in set_data.get("mods") or ():
+            if not isinstance(mod, dict): continue
+            mod_line = format_mod_line(mod, affix_index)
+            if mod_line is not None: _bonus(mod.get("setRequirement", 0))["formatted_mods_list"].append(mod_line)
+        for desc_entry in set_data.get("tooltipDescriptions") or ():
+            if not isinstance(desc_entry, dict): continue
+            _bonus(desc_entry.get("setRequirement", 0))["formatted_tooltips_list"].append(
+                {"description": format_tooltip(desc_entry.get('description', '')), "altText": desc_entry.get('altText', '')})
+        yield {"set_id": set_data.get("setID"), "item_names": set_items.get(set_data.get("setID"), []),
+               "bonuses": [bonuses[requirement] for requirement in sorted(bonuses)]}
+
+def iter_processed_ailments(raw_ailments):
+    """상태 이상(ailments)을 하나씩 가공하여 yield 합니다. 기본 피해는 0이 아닌 피해 유형만 {유형 이름: 값}으로"""
+    for ailment in raw_ailments:
+        if not isinstance(ailment, dict): continue
+        damage = (ailment.get("baseDamage") or {}).get("damage") or ()
+        yield {
+            "ailment_id": ailment.get("id"),
+            "name_display": ailment.get("displayName") or ailment.get("instanceName", 'N/A'),
+            "instance_name": ailment.get("instanceName", ''),
+            "description": format_tooltip(ailment.get("description", '')),
+            "deals_damage": bool(ailment.get("dealsDamage", False)),
+            "base_damage": {(DAMAGE_TYPE_NAMES[i] if i < len(DAMAGE_TYPE_NAMES) else str(i)): value
+                            for i, value in enumerate(damage) if value},
+        }
+
+def _save_processed_json(path, items, label):
+    """가공 결과를 processed_uniques.json과 같은 형식(indent=4)으로 임시 파일에 쓴 뒤 교체합니다. 기록한 수 또는 실패 시 None"""
+    temp_path = path + ".tmp"
     try:
         if not os.path.exists(RESOURCES_DIR): os.makedirs(RESOURCES_DIR)
-        with open(PROCESSED_UNIQUES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(processed_items_list, f, indent=4, ensure_ascii=False)
-        print(f"가공된 고유 아이템 데이터 {len(processed_items_list)}개를 '{PROCESSED_UNIQUES_FILE}'에 저장했습니다.")
-        return True
-    except Exception as e: print(f"고유 아이템 데이터 가공/저장 오류: {e}"); return False
+        with open(temp_path, 'w', encoding='utf-8') as f: count = write_json_array_stream(f, items)
+        os.replace(temp_path, path)
+    except Exception as e:
+        if os.path.exists(temp_path): os.remove(temp_path)
+        print(f"{label} 가공/저장 오류: {e}"); return None
+    print(f"가공된 {label} {count}개를 '{path}'에 저장했습니다.")
+    return count
+
+# ####################################################################
+# # 가공 단계 (processing_stages 실행기가 입력이 바뀐 단계만 실행)
+# ####################################################################
+def _run_uniques_stage(options):
+    # 원본 dict 대신 필요한 필드만 가진 __slots__ 레코드 사용 (get()/[] 접근은 dict와 동일)
+    item_type_map = load_item_type_records()
+    raw_affixes_list = load_affix_records()
+    if not item_type_map or not raw_affixes_list: print("고유 아이템 가공 필요 원본 데이터 로드 실패."); return None
+    # 고유 아이템 원본은 텍스트로만 읽고, 가공 캐시에 조회 키가 없거나 다시 가공할 레코드만 파싱
+    return reprocess_uniques_incremental(iter_unique_record_sources(parse=False), item_type_map, raw_affixes_list,
+                                         options.get("workers", 1), full=options.get("full", False),
+                                         ndjson=options.get("ndjson"))
 
-def main():
+def _uniques_outputs(options):
+    outputs = [PROCESSED_UNIQUES_FILE] # 이진 스냅샷은 선택 출력 (저장 실패해도 앱은 JSON/NDJSON으로 폴백)
+    if _ndjson_enabled(options.get("ndjson")): outputs += [PROCESSED_UNIQUES_NDJSON_FILE, PROCESSED_UNIQUES_NDJSON_FILE + ".idx"]
+    return outputs
+
+def _run_set_bonuses_stage(options):
+    raw_set_bonuses = get_endpoint(SET_BONUSES_ENDPOINT) # 공유 캐시 객체: 읽기만 함
+    if not isinstance(raw_set_bonuses, list): print(f"'{SET_BONUSES_ENDPOINT}' 원본 데이터가 없습니다."); return None
+    count = _save_processed_json(PROCESSED_SET_BONUSES_FILE, iter_processed_set_bonuses(
+        raw_set_bonuses, iter_endpoint(UNIQUES_ENDPOINT), load_affix_records()), "세트 보너스")
+    return None if count is None else {"total": count}
+
+def _run_ailments_stage(options):
+    raw_ailments = get_endpoint(AILMENTS_ENDPOINT) # 공유 캐시 객체: 읽기만 함
+    if not isinstance(raw_ailments, list): print(f"'{AILMENTS_ENDPOINT}' 원본 데이터가 없습니다."); return None
+    count = _save_processed_json(PROCESSED_AILMENTS_FILE, iter_processed_ailments(raw_ailments), "상태 이상")
+    return None if count is None else {"total": count}
+
+def _run_unique_mods_stage(options):
+    """
+    processed_uniques.json의 수치 옵션('mods')을 열 배열 파일로 (uniques 단계 결과만 입력으로 사용)
+    JSON은 아이템 하나씩 스트리밍으로 읽어 열에 바로 붙입니다. (가공 결과 전체를 메모리에 만들지 않음)
+    """
+    source_sha256 = file_sha256(PROCESSED_UNIQUES_FILE)
+    with open(PROCESSED_UNIQUES_FILE, 'r', encoding='utf-8') as f:
+        columns = UniqueModColumns.from_processed(iter_json_array(iter(lambda: f.read(JSON_READ_CHUNK_SIZE), "")))
+    columns.save(PROCESSED_UNIQUE_MODS_FILE, source_sha256)
+    print(f"고유 아이템 {len(columns)}개의 수치 옵션 {columns.mod_count}개를 '{PROCESSED_UNIQUE_MODS_FILE}'에 저장했습니다.")
+    return {"uniques": len(columns), "mods": columns.mod_count}
+
+# 새 가공 데이터셋은 여기에 등록합니다. endpoints가 바뀌지 않은 새로고침에서는 실행되지 않습니다.
+STAGES = StageRegistry()
+STAGES.register(Stage("uniques", (UNIQUES_ENDPOINT, ITEM_TYPES_ENDPOINT, AFFIXES_ENDPOINT), _uniques_outputs,
+                      _run_uniques_stage, version=f"{PROCESSOR_VERSION}.{SNAPSHOT_FORMAT_VERSION}.{NDJSON_FORMAT_VERSION}",
+                      description="고유 아이템 (processed_uniques.json/스냅샷)", # 스냅샷/NDJSON 형식이 바뀌어도 다시 기록
+                      optional_outputs=lambda options: [_current_snapshot_path()]))
+STAGES.register(Stage("setBonuses", (SET_BONUSES_ENDPOINT, UNIQUES_ENDPOINT, AFFIXES_ENDPOINT),
+                      lambda options: [PROCESSED_SET_BONUSES_FILE], _run_set_bonuses_stage,
+                      description="세트 보너스 (processed_set_bonuses.json)"))
+STAGES.register(Stage("ailments", (AILMENTS_ENDPOINT,), lambda options: [PROCESSED_AILMENTS_FILE], _run_ailments_stage,
+                      description="상태 이상 (processed_ailments.json)"))
+STAGES.register(Stage("uniqueMods", (), lambda options: [PROCESSED_UNIQUE_MODS_FILE], _run_unique_mods_stage,
+                      requires=("uniques",), description="고유 아이템 수치 옵션 열 배열 (processed_unique_mods.bin)"))
+
+STAGE_STATUS_LABELS = {"ran": "실행", "skipped": "입력 변경 없음 (건너뜀)", "failed": "실패", "blocked": "앞 단계 실패로 건너뜀"}
+
+def _print_stage_result(name, record):
+    print(f"가공 단계 '{name}': {STAGE_STATUS_LABELS.get(record['status'], record['status'])} ({record['seconds']:.3f}s)")
+
+def process_stages(stages=None, full=False, workers=1, ndjson=None, max_workers=None):
+    """
+    등록된 가공 단계(STAGES) 중 stages(없으면 전체)와 그 앞 단계들을 실행합니다.
+    입력 엔드포인트 내용 해시와 결과 파일이 마지막 실행 그대로인 단계는 건너뛰고, 나머지는 동시에 실행합니다.
+    full=True면 모든 단계를 다시 실행합니다 (고유 아이템은 가공 캐시도 쓰지 않음).
+    Returns:
+        dict: processing_stages.run_stages의 단계별 결과
+    """
+    if workers == 0: workers = os.cpu_count() or 1
+    return run_stages(STAGES, get_endpoint_hashes(), PROCESSING_STAGES_STATE_FILE, targets=stages,
+                      options={"full": full, "workers": workers, "ndjson": ndjson}, force=full, max_workers=max_workers,
+                      progress=_print_stage_result)
+
+def uniques_stats(results):
+    """process_stages 결과에서 고유 아이템 가공 통계 (실패했거나 실행 대상이 아니면 None)"""
+    record = results.get("uniques")
+    if record is None or record["status"] not in (STATUS_RAN, STATUS_SKIPPED) or record["result"] is None: return None
+    stats = record["result"]
+    if record["status"] == STATUS_SKIPPED: # 입력 엔드포인트가 그대로라 파일을 열어 보지도 않음
+        stats = {"total": stats["total"], "reprocessed": 0, "reused": stats["total"], "written": False}
+    return stats
+
+def main(full=False, workers=1, ndjson=None):
+    """
+    DB의 원본 데이터로 가공 데이터셋(processed_uniques.json/스냅샷, 세트 보너스, 상태 이상)을 만듭니다.
+    입력이 바뀐 단계만 실행하며(process_stages), 고유 아이템은 기본이 증분 가공(가공 캐시에 없는 입력만 가공)이고
+    full=True면 모든 단계와 고유 아이템 전체를 다시 가공합니다.
+    workers: 고유 아이템 가공 프로세스 수 (1이면 현재 프로세스에서 순서대로, 0이면 CPU 수)
+    ndjson: True면 processed_uniques.ndjson(+.idx)도 기록, None이면 이미 있을 때만 갱신
+    Returns:
+        dict: 고유 아이템 가공 통계 (캐시 적중/미스 수 포함, uniques_stats), 고유 아이템 가공 실패 시 None
+    """
     print("게임 데이터 가공을 시작합니다...")
-    print("DB에서 원본 데이터를 로드합니다...")
-    raw_uniques = get_uniques_from_db()
-    item_type_map = load_item_type_map_from_db()
-    raw_affixes_list = load_raw_affixes_from_db() # 수정됨!
-
-    if not raw_uniques or not item_type_map or not raw_affixes_list: # 수정됨!
-        print("데이터 가공 필요 원본 데이터 로드 실패. 작업 중단."); return
-    process_and_save_uniques(raw_uniques, item_type_map, raw_affixes_list) # 수정됨!
+    stats = uniques_stats(process_stages(full=full, workers=workers, ndjson=ndjson))
+    if stats is None: print("데이터 가공 필요 원본 데이터 로드 실패. 작업 중단."); return None
     print("모든 데이터 가공 작업이 완료되었습니다.")
+    return stats
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="resources.db의 원본 데이터로 processed_uniques.json을 만듭니다.")
+    parser.add_argument("--full", action="store_true", help="가공 캐시와 관계없이 모든 고유 아이템을 다시 가공")
+    parser.add_argument("--workers", type=int, default=1, help="가공 프로세스 수 (기본 1, 0이면 CPU 수)")
+    parser.add_argument("--ndjson", action="store_true", default=None,
+                        help="processed_uniques.ndjson(+.idx 오프셋 인덱스)도 기록 (한 번 만들면 이후 실행에서도 갱신)")
+    parser.add_argument("--stage", dest="stages", action="append", choices=STAGES.names(),
+                        help="이 단계(와 앞 단계)만 실행 (여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument("--list-stages", action="store_true", help="등록된 가공 단계와 입력 엔드포인트를 출력")
+    args = parser.parse_args()
+    if args.list_stages:
+        for stage in STAGES: print(f"{stage.name}: {stage.description} <- {', '.join(stage.endpoints)}")
+        sys.exit(0)
+    if args.stages:
+        results = process_stages(args.stages, full=args.full, workers=args.workers, ndjson=args.ndjson)
+        sys.exit(0 if all(record["status"] in (STATUS_RAN, STATUS_SKIPPED) for record in results.values()) else 1)
+    sys.exit(0 if main(full=args.full, workers=args.workers, ndjson=args.ndjson) is not None else 1)
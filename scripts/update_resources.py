@@ -1,17 +1,27 @@
 #!/usr/bin/env python3
 """
 Build and update resources.db from Maxroll data.json
-Usage: python update_resources.py
+Usage: python update_resources.py [--compress {zlib,lzma}] [--url URL] [--db PATH]
 """
 import os
 import json
+import gzip
+import zlib
+import lzma
+import hashlib
+import argparse
 import sqlite3
 import requests
+import urllib3
 import logging
 import sys
+import time
+from contextlib import contextmanager, ExitStack
+from urllib.request import pathname2url
 
 # ─── 설정 영역 ───────────────────────────────────────────
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
 DB_PATH = os.path.join(BASE_DIR, "resources", "resources.db")
 DATA_URL = "https://assets-ng.maxroll.gg/leplanner/game/data.json?1ee4237b"
 HEADERS = {
@@ -20,10 +30,146 @@ HEADERS = {
 }
 # ────────────────────────────────────────────────────────
 
-def create_db():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+from json_stream import iter_json_object, JsonStreamError
+
+# 앱(crawler.refresh_all)에서 같은 프로세스로 호출할 때 이 로거의 메시지를 로그 탭으로 전달합니다.
+logger = logging.getLogger("update_resources")
+
+
+class RefreshError(Exception):
+    """새로고침 실패 (네트워크, 손상된 데이터, DB 교체 실패 등). 기존 DB는 그대로 남습니다."""
+
+
+class RefreshCancelled(RefreshError):
+    """cancel 요청으로 새로고침이 중단됨"""
+
+
+def _check_cancel(cancel):
+    if cancel is not None and cancel.is_set(): raise RefreshCancelled("새로고침이 취소되었습니다.")
+
+# data.json은 DB 옆의 임시 파일로 내려받은 뒤(중단 시 이어받기) 카테고리 단위로 읽어 기록합니다.
+DOWNLOAD_SUFFIX = ".download"            # 내려받는 중인 원본 바이트 (gzip이면 압축된 그대로)
+DOWNLOAD_META_SUFFIX = ".download.json"  # 이어받기 판단용 URL/ETag/Last-Modified/Content-Encoding
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# 빌드는 DB_PATH 옆의 임시 파일에서 한 트랜잭션으로 수행한 뒤 원자적으로 교체합니다.
+SHADOW_SUFFIX = ".building"
+REPLACE_RETRIES = 5        # Windows에서 다른 프로세스가 DB를 열고 있으면 교체가 잠시 실패할 수 있음
+REPLACE_RETRY_DELAY_SEC = 0.2
+DB_READER_MODULES = ("src.db_utils", "db_utils") # 교체 직전에 읽기 연결을 닫을 db_utils 모듈 이름들
+
+# 저장 형식(정규화 테이블, 검색 색인 등)이 바뀔 때 올립니다. meta의 값과 다르면 해시가 같아도 모든 엔드포인트를 다시 기록
+SCHEMA_VERSION = 2
+
+# --compress 선택 시 endpoints.payload에 저장할 압축 형식 (db_utils.PAYLOAD_DECOMPRESSORS와 짝)
+# 기본값은 압축 안 함: 이전 버전 앱은 data 열만 읽으므로 압축 DB를 읽지 못합니다.
+PAYLOAD_COMPRESSORS = {
+    "zlib": lambda raw: zlib.compress(raw, 9),
+    "lzma": lambda raw: lzma.compress(raw, preset=9 | lzma.PRESET_EXTREME),
+}
+PAYLOAD_DECOMPRESSORS = {"zlib": zlib.decompress, "lzma": lzma.decompress} # 변경 이력 비교용 (이전 내용 읽기)
+
+# 자주 조회되는 카테고리는 endpoints의 JSON 블롭과 별도로 정규화된 테이블에도 저장합니다.
+# (db_utils 로더가 필요한 행/열만 조회할 수 있도록)
+TYPED_TABLES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uniques (
+    position          INTEGER PRIMARY KEY,
+    unique_id         INTEGER,
+    name              TEXT,
+    display_name      TEXT,
+    base_type         INTEGER,
+    sub_type          INTEGER,
+    level_requirement INTEGER,
+    data              TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_uniques_unique_id ON uniques (unique_id);
+CREATE INDEX IF NOT EXISTS idx_uniques_type ON uniques (base_type, sub_type);
+
+CREATE TABLE IF NOT EXISTS affixes (
+    position           INTEGER PRIMARY KEY,
+    affix_id           INTEGER,
+    property           INTEGER,
+    special_tag        INTEGER,
+    affix_name         TEXT,
+    affix_display_name TEXT,
+    description        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_affixes_affix_id ON affixes (affix_id);
+CREATE INDEX IF NOT EXISTS idx_affixes_property ON affixes (property, special_tag);
+
+CREATE TABLE IF NOT EXISTS item_base_types (
+    position     INTEGER PRIMARY KEY,
+    base_type_id INTEGER NOT NULL,
+    name         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_item_base_types_id ON item_base_types (base_type_id);
+
+CREATE TABLE IF NOT EXISTS item_sub_types (
+    base_position INTEGER NOT NULL,
+    base_type_id  INTEGER NOT NULL,
+    sub_type_id   INTEGER NOT NULL,
+    name          TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_item_sub_types_id ON item_sub_types (base_type_id, sub_type_id);
+
+CREATE TABLE IF NOT EXISTS classes (
+    position   INTEGER PRIMARY KEY,
+    class_id   INTEGER,
+    class_name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS masteries (
+    class_position   INTEGER NOT NULL,
+    position         INTEGER NOT NULL,
+    name             TEXT,
+    localization_key TEXT,
+    PRIMARY KEY (class_position, position)
+);
+"""
+
+# 전문 검색(FTS5) 색인: 고유 아이템/옵션/상태 이상의 이름·설명·툴팁·이야기 텍스트
+# kind/ref_id/title은 결과 표시용(색인 안 함), name/body/lore가 검색 대상 열입니다.
+SEARCH_INDEX_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    kind UNINDEXED,
+    ref_id UNINDEXED,
+    title UNINDEXED,
+    name,
+    body,
+    lore,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# 세대별 변경 이력: 바뀐 엔드포인트의 레코드 단위 구조 비교 결과 (db_utils.get_change_history로 조회)
+# change는 "added"/"removed"/"modified". record_key가 NULL인 행은 엔드포인트 전체 단위 변경
+# (처음 생긴 엔드포인트, 또는 RECORD_KEY_FIELDS에 없는 카테고리)
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS change_history (
+    generation     INTEGER NOT NULL,
+    endpoint       TEXT NOT NULL,
+    change         TEXT NOT NULL,
+    record_key,
+    changed_fields TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_change_history_generation ON change_history (generation, endpoint);
+
+CREATE TABLE IF NOT EXISTS generations (
+    generation INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    etag       TEXT
+);
+"""
+RECORD_KEY_FIELDS = {"uniques": "uniqueID", "affixes": "affixId", "itemTypes": "baseTypeID"}
+HISTORY_MAX_GENERATIONS = 100 # 이보다 오래된 세대의 이력은 삭제
+
+def create_db(db_path=None):
+    db_path = db_path or DB_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = sqlite3.connect(db_path)
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS endpoints (
@@ -32,64 +178,648 @@ def create_db():
             )
             """
         )
+        # 이전 버전 DB에는 hash 열이 없으므로 필요 시 추가 (db_utils 캐시 무효화용 내용 해시)
+        endpoint_columns = {row[1] for row in conn.execute("PRAGMA table_info(endpoints)")}
+        if "hash" not in endpoint_columns:
+            conn.execute("ALTER TABLE endpoints ADD COLUMN hash TEXT")
+        # 압축 저장용: codec이 NULL이면 data 열(JSON 텍스트), 아니면 payload 열(압축된 utf-8 JSON) 사용
+        if "codec" not in endpoint_columns:
+            conn.execute("ALTER TABLE endpoints ADD COLUMN codec TEXT")
+        if "payload" not in endpoint_columns:
+            conn.execute("ALTER TABLE endpoints ADD COLUMN payload BLOB")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', '0')")
+        conn.executescript(TYPED_TABLES_SCHEMA)
+        conn.executescript(HISTORY_SCHEMA)
+        try:
+            conn.executescript(SEARCH_INDEX_SCHEMA)
+        except sqlite3.OperationalError as e: # FTS5 없이 빌드된 SQLite: 검색 색인만 생략
+            logger.warning(f"FTS5 검색 색인 생성 불가: {e}")
         conn.commit()
         return conn
     except sqlite3.Error as e:
-        logging.critical(f"DB 생성/연결 실패: {e}")
-        sys.exit(1)
+        logger.critical(f"DB 생성/연결 실패: {e}")
+        raise RefreshError(f"DB 생성/연결 실패: {e}") from e
 
 
-def build_db():
-    logging.basicConfig(
-        level=logging.INFO,
-        format='[%(asctime)s] %(levelname)s: %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
+def _write_uniques(cursor, items_list):
+    cursor.execute("DELETE FROM uniques")
+    rows = []
+    for pos, item in enumerate(items_list):
+        if not isinstance(item, dict): continue
+        sub_types = item.get("subTypes") or []
+        rows.append((
+            pos, item.get("uniqueID"), item.get("name"), item.get("displayName"),
+            item.get("baseType"), sub_types[0] if sub_types else None,
+            item.get("levelRequirement"), json.dumps(item, ensure_ascii=False),
+        ))
+    cursor.executemany(
+        "INSERT INTO uniques (position, unique_id, name, display_name, base_type, sub_type, "
+        "level_requirement, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
     )
+
+
+def _write_affixes(cursor, items_list):
+    cursor.execute("DELETE FROM affixes")
+    rows = [
+        (pos, affix.get("affixId"), affix.get("property"), affix.get("specialTag"),
+         affix.get("affixName"), affix.get("affixDisplayName"), affix.get("description"))
+        for pos, affix in enumerate(items_list) if isinstance(affix, dict)
+    ]
+    cursor.executemany(
+        "INSERT INTO affixes (position, affix_id, property, special_tag, affix_name, "
+        "affix_display_name, description) VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+    )
+
+
+def _write_item_types(cursor, items_list):
+    cursor.execute("DELETE FROM item_base_types")
+    cursor.execute("DELETE FROM item_sub_types")
+    base_rows, sub_rows = [], []
+    for pos, base_type in enumerate(items_list):
+        if not isinstance(base_type, dict): continue
+        base_id = base_type.get("baseTypeID")
+        base_name = base_type.get("displayName") or base_type.get("BaseTypeName")
+        if base_id is None or not base_name: continue
+        base_rows.append((pos, base_id, base_name))
+        for sub_item in base_type.get("subItems") or []:
+            if not isinstance(sub_item, dict): continue
+            sub_id = sub_item.get("subTypeID")
+            sub_name = sub_item.get("name") or sub_item.get("displayName")
+            if sub_id is not None and sub_name:
+                sub_rows.append((pos, base_id, sub_id, sub_name))
+    cursor.executemany("INSERT INTO item_base_types (position, base_type_id, name) VALUES (?, ?, ?)", base_rows)
+    cursor.executemany(
+        "INSERT INTO item_sub_types (base_position, base_type_id, sub_type_id, name) VALUES (?, ?, ?, ?)", sub_rows
+    )
+
+
+def _write_classes(cursor, items_list):
+    cursor.execute("DELETE FROM classes")
+    cursor.execute("DELETE FROM masteries")
+    class_rows, mastery_rows = [], []
+    for pos, class_entry in enumerate(items_list):
+        if not isinstance(class_entry, dict) or not class_entry.get("className"): continue
+        class_rows.append((pos, class_entry.get("classID"), class_entry["className"]))
+        masteries = class_entry.get("masteries")
+        if not isinstance(masteries, list): continue
+        for m_pos, mastery in enumerate(masteries):
+            if isinstance(mastery, dict):
+                mastery_rows.append((pos, m_pos, mastery.get("name"), mastery.get("localizationKey")))
+    cursor.executemany("INSERT INTO classes (position, class_id, class_name) VALUES (?, ?, ?)", class_rows)
+    cursor.executemany(
+        "INSERT INTO masteries (class_position, position, name, localization_key) VALUES (?, ?, ?, ?)", mastery_rows
+    )
+
+
+def payload_hash(payload_text):
+    """endpoints.data에 저장되는 JSON 텍스트의 내용 해시"""
+    return hashlib.sha256(payload_text.encode("utf-8")).hexdigest()
+
+
+def bump_generation(cursor):
+    """DB 세대 번호를 1 증가시키고 새 값을 반환합니다. (db_utils 캐시가 변경 여부 판단에 사용)"""
+    cursor.execute("UPDATE meta SET value = CAST(CAST(value AS INTEGER) + 1 AS TEXT) WHERE key = 'generation'")
+    cursor.execute("SELECT value FROM meta WHERE key = 'generation'")
+    return int(cursor.fetchone()[0])
+
+
+_ABSENT = object() # 비교 시 "키 없음" 표식 (None 값과 구분)
+
+def diff_records(old_items, new_items, key_field):
+    """
+    key_field 값으로 짝지은 레코드 단위 구조 비교.
+    같은 키가 여러 번 나오면 나온 순서대로 짝짓고, 키가 없는 레코드는 비교하지 않습니다.
+    Returns:
+        list: (change, 키, 바뀐 최상위 필드 목록 또는 None). 새 목록 순서, 그 뒤에 삭제된 레코드.
+    """
+    def _group(items):
+        groups = {}
+        for item in items:
+            if isinstance(item, dict) and item.get(key_field) is not None:
+                groups.setdefault(item[key_field], []).append(item)
+        return groups
+    old_groups = _group(old_items); new_groups = _group(new_items)
+    changes = []
+    for record_key, new_group in new_groups.items():
+        old_group = old_groups.get(record_key, [])
+        for old, new in zip(old_group, new_group):
+            if old != new:
+                fields = sorted(k for k in old.keys() | new.keys() if old.get(k, _ABSENT) != new.get(k, _ABSENT))
+                changes.append(("modified", record_key, fields))
+        changes.extend(("added", record_key, None) for _ in new_group[len(old_group):])
+    for record_key, old_group in old_groups.items():
+        changes.extend(("removed", record_key, None) for _ in old_group[len(new_groups.get(record_key, [])):])
+    return changes
+
+
+def _read_endpoint_items(cursor, ep):
+    """현재 endpoints에 저장된 JSON (압축 저장 포함). 행이 없으면 None"""
+    cursor.execute("SELECT data, codec, payload FROM endpoints WHERE endpoint = ?", (ep,))
+    row = cursor.fetchone()
+    if row is None: return None
+    data, codec, payload = row
+    if codec: data = PAYLOAD_DECOMPRESSORS[codec](payload).decode("utf-8")
+    return json.loads(data)
+
+
+def _record_history(cursor, generation, key, ep, items_list):
+    """바뀐 엔드포인트의 이전 내용과 items_list를 비교해 change_history에 기록합니다. (REPLACE 전에 호출)"""
+    key_field = RECORD_KEY_FIELDS.get(key)
+    old_items = _read_endpoint_items(cursor, ep)
+    if old_items is None:
+        rows = [("added", None, None)]
+    elif key_field is None or not isinstance(old_items, list) or not isinstance(items_list, list):
+        rows = [("modified", None, None)]
+    else:
+        rows = [(change, record_key, json.dumps(fields, ensure_ascii=False) if fields else None)
+                for change, record_key, fields in diff_records(old_items, items_list, key_field)]
+    cursor.executemany(
+        "INSERT INTO change_history (generation, endpoint, change, record_key, changed_fields) VALUES (?, ?, ?, ?, ?)",
+        [(generation, ep, *row) for row in rows]
+    )
+
+
+def _finish_history(cursor, generation, etag):
+    """새 세대를 generations에 기록하고 오래된 이력을 정리한 뒤 {엔드포인트: {change: 개수}} 요약을 반환합니다."""
+    cursor.execute("INSERT OR REPLACE INTO generations (generation, created_at, etag) VALUES (?, ?, ?)",
+                   (generation, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), etag))
+    oldest_kept = generation - HISTORY_MAX_GENERATIONS + 1
+    cursor.execute("DELETE FROM change_history WHERE generation < ?", (oldest_kept,))
+    cursor.execute("DELETE FROM generations WHERE generation < ?", (oldest_kept,))
+    summary = {}
+    cursor.execute("SELECT endpoint, change, COUNT(*) FROM change_history WHERE generation = ? "
+                   "GROUP BY endpoint, change ORDER BY endpoint, change", (generation,))
+    for ep, change, count in cursor.fetchall():
+        summary.setdefault(ep, {})[change] = count
+    return summary
+
+
+def _join_text(*parts):
+    return "\n".join(part for part in parts if isinstance(part, str) and part)
+
+
+def _write_search_rows(cursor, kind, rows):
+    cursor.execute("DELETE FROM search_index WHERE kind = ?", (kind,))
+    cursor.executemany(
+        "INSERT INTO search_index (kind, ref_id, title, name, body, lore) VALUES (?, ?, ?, ?, ?, ?)",
+        [(kind, *row) for row in rows]
+    )
+
+
+def _index_uniques(cursor, items_list):
+    rows = []
+    for item in items_list:
+        if not isinstance(item, dict): continue
+        tooltips = [entry for entry in item.get("tooltipDescriptions") or [] if isinstance(entry, dict)]
+        body = _join_text(*(text for entry in tooltips for text in (entry.get("description"), entry.get("altText"))))
+        rows.append((item.get("uniqueID"), item.get("displayName") or item.get("name"),
+                     _join_text(item.get("name"), item.get("displayName")), body, item.get("loreText") or ""))
+    _write_search_rows(cursor, "uniques", rows)
+
+
+def _index_affixes(cursor, items_list):
+    rows = [
+        (affix.get("affixId"), affix.get("affixDisplayName") or affix.get("affixName"),
+         _join_text(affix.get("affixName"), affix.get("affixDisplayName")), affix.get("description") or "", "")
+        for affix in items_list if isinstance(affix, dict)
+    ]
+    _write_search_rows(cursor, "affixes", rows)
+
+
+def _index_ailments(cursor, items_list):
+    rows = [
+        (ailment.get("id"), ailment.get("displayName") or ailment.get("instanceName"),
+         _join_text(ailment.get("displayName"), ailment.get("instanceName")), ailment.get("description") or "", "")
+        for ailment in items_list if isinstance(ailment, dict)
+    ]
+    _write_search_rows(cursor, "ailments", rows)
+
+
+# 카테고리 키 -> 정규화 테이블 기록 함수
+TYPED_TABLE_WRITERS = {
+    "uniques": _write_uniques,
+    "affixes": _write_affixes,
+    "itemTypes": _write_item_types,
+    "classes": _write_classes,
+}
+
+# 카테고리 키 -> 검색 색인(search_index의 kind) 기록 함수
+SEARCH_INDEX_WRITERS = {
+    "uniques": _index_uniques,
+    "affixes": _index_affixes,
+    "ailments": _index_ailments,
+}
+
+
+def has_search_index(cursor):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+    return cursor.fetchone() is not None
+
+
+def get_meta(cursor, key):
+    cursor.execute("SELECT value FROM meta WHERE key = ?", (key,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def set_meta(cursor, key, value):
+    """값이 실제로 바뀔 때만 기록합니다. 기록했으면 True. (변경 없는 새로고침이 DB 파일을 건드리지 않도록)"""
+    if get_meta(cursor, key) == value: return False
+    cursor.execute("REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+    return True
+
+
+def _read_only_uri(path):
+    return f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+
+
+def read_meta(db_path):
+    """현재 DB의 meta 테이블을 읽기 전용으로 읽습니다. (DB가 없거나 이전 형식이면 빈 dict)"""
+    if not os.path.exists(db_path): return {}
+    try:
+        conn = sqlite3.connect(_read_only_uri(db_path), uri=True)
+        try: return dict(conn.execute("SELECT key, value FROM meta"))
+        finally: conn.close()
+    except sqlite3.Error:
+        return {}
+
+
+def _conditional_headers(meta, data_url, compress):
+    """이전 응답의 ETag/Last-Modified로 조건부 요청 헤더를 만듭니다. (같은 URL, 같은 저장 형식일 때만)"""
+    headers = dict(HEADERS)
+    if (meta.get("source_url") != data_url or meta.get("schema_version") != str(SCHEMA_VERSION)
+            or meta.get("codec") != (compress or "")):
+        return headers
+    if meta.get("etag"): headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"): headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def _remove_db_files(path):
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix): os.remove(path + suffix)
+
+
+def open_shadow_db(db_path):
+    """
+    현재 DB를 복사한 임시 DB를 열어 (연결, 경로)를 반환합니다.
+    대량 기록 동안은 WAL + synchronous=OFF를 사용합니다. (최종 파일은 commit_shadow_db에서 fsync)
+    """
+    shadow_path = db_path + SHADOW_SUFFIX
+    _remove_db_files(shadow_path) # 이전에 중단된 빌드의 잔여 파일
+    if os.path.exists(db_path):
+        source = sqlite3.connect(_read_only_uri(db_path), uri=True); target = sqlite3.connect(shadow_path)
+        try: source.backup(target)
+        finally: source.close(); target.close()
+    conn = create_db(shadow_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    return conn, shadow_path
+
+
+def _fsync_path(path):
+    fd = os.open(path, os.O_RDONLY)
+    try: os.fsync(fd)
+    finally: os.close(fd)
+
+
+@contextmanager
+def _db_readers_released():
+    """
+    이 프로세스에 로드된 db_utils의 읽기 연결을 모두 닫고, 블록이 끝날 때까지 새 연결을 막습니다.
+    (Windows는 열린 파일을 교체할 수 없음. 앱은 src.db_utils, 가공 스크립트는 db_utils로 따로 임포트)
+    """
+    with ExitStack() as stack:
+        for name in DB_READER_MODULES:
+            module = sys.modules.get(name)
+            if module is not None and hasattr(module, "readers_paused"): stack.enter_context(module.readers_paused())
+        yield
+
+
+def commit_shadow_db(conn, shadow_path, db_path, vacuum=False):
+    """임시 DB를 단일 파일(DELETE 저널)로 정리하고 fsync한 뒤 db_path 위로 원자적으로 교체합니다."""
+    if vacuum: conn.execute("VACUUM")
+    conn.execute("PRAGMA journal_mode = DELETE") # WAL 내용을 본 파일로 체크포인트하고 -wal/-shm 제거
+    conn.close()
+    _fsync_path(shadow_path)
+    with _db_readers_released():
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                os.replace(shadow_path, db_path); break
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1: raise
+                time.sleep(REPLACE_RETRY_DELAY_SEC * (2 ** attempt))
+    if os.name == "posix": _fsync_path(os.path.dirname(os.path.abspath(db_path))) # 이름 변경 자체를 디스크에 기록
+
+
+def discard_shadow_db(conn, shadow_path):
+    try: conn.close()
+    except sqlite3.Error: pass
+    _remove_db_files(shadow_path)
+
+
+def _read_download_meta(download_path):
+    try:
+        with open(download_path[:-len(DOWNLOAD_SUFFIX)] + DOWNLOAD_META_SUFFIX, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_download_meta(download_path, download_meta):
+    with open(download_path[:-len(DOWNLOAD_SUFFIX)] + DOWNLOAD_META_SUFFIX, 'w', encoding='utf-8') as f:
+        json.dump(download_meta, f)
+
+
+def remove_download(download_path):
+    for path in (download_path, download_path[:-len(DOWNLOAD_SUFFIX)] + DOWNLOAD_META_SUFFIX):
+        if os.path.exists(path): os.remove(path)
+
+
+def _resume_offset(download_path, download_meta, data_url):
+    """이전에 중단된 다운로드를 이어받을 수 있으면 이미 받은 바이트 수, 아니면 0"""
+    if not download_meta or download_meta.get("url") != data_url: return 0
+    if not (download_meta.get("etag") or download_meta.get("last_modified")): return 0 # If-Range 검증 불가
+    return os.path.getsize(download_path) if os.path.exists(download_path) else 0
+
+
+def _content_range_start(resp):
+    """206 응답의 Content-Range: bytes START-END/TOTAL -> (START, TOTAL 또는 None)"""
     try:
-        logging.info(f"Fetching JSON: {DATA_URL}")
-        resp = requests.get(DATA_URL, headers=HEADERS, timeout=10)
+        unit_range, _, total = resp.headers.get("Content-Range", "").partition("/")
+        start = int(unit_range.split()[1].split("-")[0])
+        return start, (int(total) if total.isdigit() else None)
+    except (IndexError, ValueError):
+        return None, None
+
+
+def download_data_json(data_url, headers, download_path, report=None, cancel=None):
+    """
+    data.json을 download_path에 청크 단위로 내려받습니다. (gzip 요청, 중단된 다운로드는 Range로 이어받기)
+    본문은 Content-Encoding 그대로 저장하므로 이어받기 오프셋이 서버 표현과 일치합니다.
+    cancel이 설정되면 RefreshCancelled를 일으키며, 받은 부분은 다음 실행의 이어받기용으로 남깁니다.
+    Returns:
+        None (304 Not Modified) 또는 {"path", "encoding", "etag", "last_modified"}
+    """
+    headers = dict(headers); headers["Accept-Encoding"] = "gzip"
+    download_meta = _read_download_meta(download_path)
+    offset = _resume_offset(download_path, download_meta, data_url)
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = download_meta.get("etag") or download_meta.get("last_modified")
+    with requests.get(data_url, headers=headers, timeout=10, stream=True) as resp:
+        if resp.status_code == 304: return None
+        if resp.status_code == 416: # 이미 받은 크기가 서버 파일 이상: 처음부터 다시
+            remove_download(download_path)
+            headers = {k: v for k, v in headers.items() if k not in ("Range", "If-Range")}
+            return download_data_json(data_url, headers, download_path, report, cancel)
         resp.raise_for_status()
-        data = resp.json()
-    except requests.RequestException as e:
-        logging.error(f"HTTP 요청 실패: {e}")
-        sys.exit(1)
+        total = None
+        if resp.status_code == 206 and _content_range_start(resp)[0] == offset:
+            _, total = _content_range_start(resp)
+            encoding = download_meta.get("encoding"); mode = 'ab'
+            logger.info(f"다운로드 이어받기: {offset} bytes 이후부터")
+        else: # 200: 서버 데이터가 바뀌었거나 Range 미지원 -> 처음부터
+            offset = 0; mode = 'wb'
+            encoding = resp.headers.get("Content-Encoding", "identity").lower()
+            if resp.headers.get("Content-Length", "").isdigit(): total = int(resp.headers["Content-Length"])
+            download_meta = {"url": data_url, "etag": resp.headers.get("ETag"),
+                             "last_modified": resp.headers.get("Last-Modified"), "encoding": encoding}
+            _write_download_meta(download_path, download_meta)
+        received = offset
+        with open(download_path, mode) as f:
+            try:
+                for chunk in resp.raw.stream(DOWNLOAD_CHUNK_SIZE, decode_content=False):
+                    f.write(chunk); received += len(chunk)
+                    if report: report("download", bytes=received, total=total)
+                    _check_cancel(cancel)
+            except urllib3.exceptions.HTTPError as e: # raw 스트림은 requests 예외로 감싸지지 않음
+                raise requests.ConnectionError(f"다운로드가 중간에 끊겼습니다 ({received} bytes): {e}") from e
+        if total is not None and received < total:
+            raise requests.ConnectionError(f"다운로드가 중간에 끊겼습니다 ({received}/{total} bytes)")
+    return {"path": download_path, "encoding": encoding,
+            "etag": download_meta.get("etag"), "last_modified": download_meta.get("last_modified")}
+
 
-    conn = create_db()
-    cursor = conn.cursor()
+def iter_download_text(download):
+    """내려받은 data.json을 문자열 조각으로 yield 합니다. (gzip이면 읽으면서 해제)"""
+    encoding = download["encoding"]
+    if encoding == "gzip": opener = gzip.open
+    elif encoding in ("identity", ""): opener = open
+    else: raise ValueError(f"지원하지 않는 Content-Encoding: {encoding}")
+    with opener(download["path"], 'rt', encoding='utf-8') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), ""):
+            yield chunk
 
-    # 데이터 구조에 따른 카테고리 처리
-    if isinstance(data.get("categories"), list) and isinstance(data.get("items"), dict):
-        categories = [cat.get("key") for cat in data["categories"] if isinstance(cat, dict) and "key" in cat]
-        get_items = lambda key: data["items"].get(key, [])
-    elif isinstance(data.get("items"), dict):
-        categories = list(data["items"].keys())
-        get_items = lambda key: data["items"].get(key, [])
+
+def iter_categories(chunks):
+    """
+    data.json 텍스트 조각에서 (카테고리 키, 아이템 리스트)를 기록할 순서대로 yield 합니다.
+    Maxroll 형식({"categories": [...], "items": {...}}, categories가 먼저)이면 items의 카테고리를
+    도착하는 대로 하나씩 넘기므로 메모리에는 카테고리 하나만 올라갑니다.
+    다른 배치(items가 먼저, items 없음)는 이전과 같은 결과를 내도록 필요한 만큼 모아 두었다가 넘깁니다.
+    """
+    category_keys = None # data["categories"]의 키 목록 (리스트일 때만)
+    pending = {}; emitted = set(); top_level_lists = {}; has_items = False
+    for path, value in iter_json_object(chunks, expand=("items",)):
+        if len(path) == 2: # ("items", 카테고리 키)
+            has_items = True
+            if category_keys is None: pending[path[1]] = value
+            elif path[1] in category_keys and path[1] not in emitted:
+                emitted.add(path[1]); yield path[1], value
+            continue
+        if path == ("categories",) and isinstance(value, list):
+            category_keys = [cat.get("key") for cat in value if isinstance(cat, dict) and "key" in cat]
+        if isinstance(value, list): top_level_lists[path[0]] = value
+    if has_items and category_keys is not None:
+        for key in category_keys:
+            if key not in emitted: emitted.add(key); yield key, pending.get(key, [])
+    elif has_items:
+        yield from pending.items()
     else:
         # fallback: 최상위 리스트 타입 키를 카테고리로
-        categories = [k for k, v in data.items() if isinstance(v, list)]
-        get_items = lambda key: data.get(key, [])
-        logging.warning(f"Fallback category list: {categories}")
-        if not categories:
-            logging.error("데이터 구조를 파악할 수 없어 종료합니다.")
-            sys.exit(1)
-
-    # 각 카테고리별 DB 저장
-    for key in categories:
-        items_list = get_items(key) or []
-        ep = f"maxroll/items/{key}"
-        try:
-            cursor.execute(
-                "REPLACE INTO endpoints (endpoint, data) VALUES (?, ?)",
-                (ep, json.dumps(items_list, ensure_ascii=False))
-            )
-            conn.commit()
-            logging.info(f"Saved {ep} ({len(items_list)} items)")
-        except sqlite3.Error as e:
-            logging.error(f"DB 저장 실패 {ep}: {e}")
-            conn.rollback()
+        logger.warning(f"Fallback category list: {list(top_level_lists)}")
+        yield from top_level_lists.items()
+
+
+def _store_category(cursor, key, items_list, compress, force_rewrite, search_index_enabled, generation):
+    """
+    카테고리 하나를 endpoints와 정규화 테이블/검색 색인에 기록합니다.
+    내용이 바뀌었으면 이전 내용과의 비교 결과를 generation(새 세대 번호)으로 change_history에 남깁니다.
+    Returns:
+        "changed", "unchanged" (내용 해시와 압축 형식이 같아 건너뜀) 또는 "failed"
+    """
+    ep = f"maxroll/items/{key}"
+    items_list = items_list or []
+    payload = json.dumps(items_list, ensure_ascii=False)
+    digest = payload_hash(payload)
+    cursor.execute("SELECT hash, codec FROM endpoints WHERE endpoint = ?", (ep,))
+    old_row = cursor.fetchone()
+    if not force_rewrite and old_row and old_row[0] == digest and old_row[1] == compress:
+        return "unchanged"
+    # 카테고리 하나가 실패해도 나머지는 반영되도록 세이브포인트로 감쌈
+    cursor.execute("SAVEPOINT category")
+    try:
+        if not old_row or old_row[0] != digest: # 저장 형식/압축만 바뀐 경우는 이력 없음
+            _record_history(cursor, generation, key, ep, items_list)
+        if compress: # data는 NOT NULL이므로 빈 문자열, 실제 내용은 payload에
+            stored = ("", compress, PAYLOAD_COMPRESSORS[compress](payload.encode("utf-8")))
+        else:
+            stored = (payload, None, None)
+        cursor.execute(
+            "REPLACE INTO endpoints (endpoint, data, codec, payload, hash) VALUES (?, ?, ?, ?, ?)",
+            (ep, *stored, digest)
+        )
+        writer = TYPED_TABLE_WRITERS.get(key)
+        if writer and isinstance(items_list, list):
+            writer(cursor, items_list)
+        search_writer = SEARCH_INDEX_WRITERS.get(key)
+        if search_index_enabled and search_writer and isinstance(items_list, list):
+            search_writer(cursor, items_list)
+        cursor.execute("RELEASE SAVEPOINT category")
+        logger.info(f"Saved {ep} ({len(items_list)} items)")
+        return "changed"
+    except (sqlite3.Error, ValueError, LookupError, lzma.LZMAError, zlib.error) as e: # 이전 내용 손상 포함
+        logger.error(f"DB 저장 실패 {ep}: {e}")
+        cursor.execute("ROLLBACK TO SAVEPOINT category"); cursor.execute("RELEASE SAVEPOINT category")
+        return "failed"
 
-    conn.close()
-    logging.info("▶ resources.db build complete.")
+
+def build_db(compress=None, data_url=None, db_path=None, progress=None, cancel=None):
+    """
+    data.json을 받아 resources.db를 갱신합니다.
+    서버가 304(변경 없음)를 돌려주면 DB를 쓰지 않고, 내용 해시가 같은 카테고리는 건너뜁니다.
+    data.json은 디스크로 스트리밍 다운로드한 뒤 카테고리 단위로 읽어 바로 기록하므로
+    전체 JSON 트리를 메모리에 올리지 않습니다.
+    변경 사항은 임시 DB에 한 트랜잭션으로 기록한 뒤 파일 교체로 반영하므로,
+    읽는 쪽은 항상 이전 또는 새 세대 중 하나의 완전한 DB만 봅니다.
+    Args:
+        compress: None(압축 안 함) 또는 PAYLOAD_COMPRESSORS의 키 ("zlib", "lzma")
+        data_url: 기본값 DATA_URL
+        db_path: 기본값 DB_PATH
+        progress: 진행 이벤트 dict를 받을 콜백 (선택)
+            {"stage": "download", "endpoint", "bytes", "total", "elapsed"}
+            {"stage": "store", "endpoint", "status", "categories_done", "elapsed"}
+            {"stage": "commit", "elapsed"} (DB 파일 교체 직전)
+            {"stage": "timing", "step": "fetch" 또는 "rebuild", "seconds", "elapsed"} (단계가 끝날 때)
+        cancel: is_set()을 가진 객체 (threading.Event 등, 선택). 청크/카테고리 사이마다 확인하며,
+            설정되면 기존 DB를 그대로 두고 RefreshCancelled를 일으킵니다.
+    Returns:
+        dict: {"not_modified": bool, "changed": [엔드포인트...], "unchanged": int,
+               "failed": [저장에 실패한 엔드포인트...] (있으면 다음 새로고침은 조건부 요청 없이 전체를 받음),
+               "generation": int 또는 None,
+               "diff": {엔드포인트: {"added"/"removed"/"modified": 개수}} (이번 세대의 change_history 요약)}
+    Raises:
+        RefreshError: 다운로드/처리/교체 실패 (기존 DB는 변경되지 않음)
+    """
+    data_url = data_url or DATA_URL
+    db_path = db_path or DB_PATH
+    if compress is not None and compress not in PAYLOAD_COMPRESSORS:
+        raise RefreshError(f"지원하지 않는 압축 형식: {compress}")
+    started = time.monotonic()
+    def report(stage, **fields):
+        if progress: progress({"stage": stage, **fields, "elapsed": time.monotonic() - started})
+    def report_download(stage, **fields):
+        report(stage, endpoint=data_url, **fields)
+
+    meta = read_meta(db_path)
+    download_path = db_path + DOWNLOAD_SUFFIX
+    try:
+        logger.info(f"Fetching JSON: {data_url}")
+        download = download_data_json(data_url, _conditional_headers(meta, data_url, compress), download_path,
+                                      report_download, cancel)
+    except (requests.RequestException, OSError) as e: # 받은 부분은 남겨 두었다가 다음 실행에서 이어받기
+        raise RefreshError(f"HTTP 요청 실패: {e}") from e
+    fetched = time.monotonic()
+    report("timing", step="fetch", seconds=fetched - started)
+    if download is None:
+        logger.info("서버 데이터 변경 없음 (304 Not Modified): DB 갱신 생략")
+        generation = meta.get("generation")
+        return {"not_modified": True, "changed": [], "unchanged": 0, "failed": [],
+                "generation": int(generation) if generation is not None else None, "diff": {}}
+
+    conn, shadow_path = open_shadow_db(db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        # 각 카테고리별 DB 저장 (내용 해시와 압축 형식이 같으면 건너뜀)
+        search_index_enabled = has_search_index(cursor)
+        force_rewrite = get_meta(cursor, "schema_version") != str(SCHEMA_VERSION)
+        if force_rewrite: logger.info(f"저장 형식 버전 {SCHEMA_VERSION}: 모든 엔드포인트를 다시 기록합니다.")
+        changed_endpoints = []; failed_endpoints = []; unchanged_count = 0; categories_done = 0
+        next_generation = int(get_meta(cursor, "generation")) + 1
+        for key, items_list in iter_categories(iter_download_text(download)):
+            _check_cancel(cancel)
+            status = _store_category(cursor, key, items_list, compress, force_rewrite, search_index_enabled,
+                                     next_generation)
+            ep = f"maxroll/items/{key}"; categories_done += 1
+            if status == "changed": changed_endpoints.append(ep)
+            elif status == "unchanged": unchanged_count += 1
+            else: failed_endpoints.append(ep)
+            report("store", endpoint=ep, status=status, categories_done=categories_done)
+        if not categories_done:
+            raise ValueError("데이터 구조를 파악할 수 없습니다.")
+
+        # 다음 새로고침의 조건부 요청용 검증자. 실패한 카테고리가 있으면 비워서 다음에 전체를 다시 받도록
+        # (검증자를 저장하면 서버가 304를 돌려주어 실패한 카테고리가 영영 다시 기록되지 않음)
+        if failed_endpoints: logger.warning(f"저장 실패 {len(failed_endpoints)}개: 다음 새로고침에서 data.json을 다시 받습니다.")
+        etag, last_modified = ("", "") if failed_endpoints else (download["etag"], download["last_modified"])
+        meta_changed = False
+        for key, value in (("source_url", data_url), ("etag", etag), ("last_modified", last_modified),
+                           ("schema_version", str(SCHEMA_VERSION)), ("codec", compress or "")):
+            meta_changed = set_meta(cursor, key, value) or meta_changed
+        generation = int(get_meta(cursor, "generation")); diff = {}
+        if changed_endpoints:
+            generation = bump_generation(cursor)
+            diff = _finish_history(cursor, generation, download["etag"])
+            logger.info(f"DB generation {generation}: {len(changed_endpoints)} endpoint(s) changed")
+            for ep in changed_endpoints:
+                counts = ", ".join(f"{change} {count}" for change, count in diff.get(ep, {}).items())
+                logger.info(f"  changed: {ep}" + (f" ({counts})" if counts else ""))
+        else:
+            logger.info("변경된 엔드포인트 없음 (generation 유지)")
+        conn.commit()
+    except (JsonStreamError, ValueError, OSError, EOFError) as e: # 받은 파일이 손상됨 (JSON 구조/디코딩/gzip 오류) -> 다시 받도록 삭제
+        discard_shadow_db(conn, shadow_path); remove_download(download_path)
+        raise RefreshError(f"data.json 처리 실패: {e}") from e
+    except sqlite3.Error as e: # 임시 DB 기록 실패 (디스크 가득 참, I/O 오류): 받은 파일은 멀쩡하므로 남겨 둠
+        discard_shadow_db(conn, shadow_path)
+        raise RefreshError(f"임시 DB 기록 실패: {e}") from e
+    except BaseException:
+        discard_shadow_db(conn, shadow_path); remove_download(download_path)
+        raise
+    remove_download(download_path)
+
+    if not changed_endpoints and not meta_changed and os.path.exists(db_path):
+        discard_shadow_db(conn, shadow_path) # 바뀐 것이 없으면 기존 파일을 그대로 둠
+    else:
+        report("commit")
+        try:
+            # 압축 시 VACUUM: 압축 전 텍스트가 차지하던 페이지를 반환해 파일 크기를 실제로 줄임
+            commit_shadow_db(conn, shadow_path, db_path, vacuum=bool(compress and changed_endpoints))
+        except (OSError, sqlite3.Error) as e: # VACUUM/저널 모드 전환도 디스크 가득 참, I/O 오류로 실패할 수 있음
+            discard_shadow_db(conn, shadow_path)
+            raise RefreshError(f"DB 파일 교체 실패: {e}") from e
+    logger.info(f"▶ resources.db build complete. (changed {len(changed_endpoints)}, unchanged {unchanged_count})")
+    report("timing", step="rebuild", seconds=time.monotonic() - fetched)
+    return {"not_modified": False, "changed": changed_endpoints, "unchanged": unchanged_count,
+            "failed": failed_endpoints, "generation": generation, "diff": diff}
 
 if __name__ == "__main__":
-    build_db()
+    parser = argparse.ArgumentParser(description="Build and update resources.db from Maxroll data.json")
+    parser.add_argument("--compress", choices=sorted(PAYLOAD_COMPRESSORS),
+                        help="엔드포인트 JSON을 압축 저장 (이 버전 이상의 앱에서만 읽을 수 있음)")
+    parser.add_argument("--url", default=DATA_URL, help="data.json URL")
+    parser.add_argument("--db", default=DB_PATH, help="resources.db 경로")
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s] %(levelname)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    try:
+        build_db(compress=args.compress, data_url=args.url, db_path=args.db)
+    except RefreshError as e:
+        logger.error(f"{e}. 종료합니다.")
+        sys.exit(1)
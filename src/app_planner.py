@@ -4,9 +4,10 @@ import sys
 import os
 import json 
 import re 
+import threading
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QLabel, QComboBox, QTextEdit, QSizePolicy, QSpacerItem,
-                             QSpinBox, QCheckBox, QTabWidget, QListWidget, QListWidgetItem)
+                             QSpinBox, QCheckBox, QTabWidget, QListWidget, QListWidgetItem, QLineEdit)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QObject, QUrl
 from PyQt5.QtWebEngineWidgets import QWebEngineView 
 from PyQt5.QtGui import QDesktopServices 
@@ -17,20 +18,45 @@ except ImportError as e:
     print(f"CRITICAL ERROR: src.guide 모듈을 찾을 수 없습니다: {e}")
     def generate_guide(*args, **kwargs): return "오류: src.guide 모듈 로드 실패."
 try:
-    from src.crawler import refresh_all
+    from src.crawler import refresh_all, ProgressLog, close_thread_connections
 except ImportError as e:
     print(f"CRITICAL ERROR: src.crawler 모듈을 찾을 수 없습니다: {e}")
     def refresh_all(*args, **kwargs): return {'success': False, 'output': "오류: src.crawler 모듈 로드 실패."}
+    def close_thread_connections(): pass
+    class ProgressLog:
+        def __call__(self, event): return None
 try:
     # 이제 process_unique_item_data는 사용 안함. 가공된 JSON을 직접 로드.
     from src.db_utils import (get_classes_from_db, 
-                               load_processed_uniques_from_json, # 새로 추가될 함수
+                               load_processed_uniques, # 스냅샷 우선, JSON 폴백
+                               CLASSES_ENDPOINT,
                                FALLBACK_CLASSES_DATA, FALLBACK_UNIQUES_DATA) # FALLBACK_UNIQUES_DATA는 이제 processed 데이터용
 except ImportError as e:
     print(f"CRITICAL ERROR: src.db_utils 모듈 또는 함수를 찾을 수 없습니다: {e}")
     FALLBACK_CLASSES_DATA_APP = {"클래스 선택...": [], "Mage": [], "Rogue": [], "Primalist": [], "Acolyte": [], "Sentinel": []}
     def get_classes_from_db(): print("경고: db_utils 사용 불가 - 클래스 폴백 사용."); return FALLBACK_CLASSES_DATA_APP.copy()
-    def load_processed_uniques_from_json(): print("경고: db_utils.load_processed_uniques_from_json 사용 불가"); return []
+    class _EmptyUniques(list):
+        def names(self): return []
+        def close(self): pass
+    def load_processed_uniques(): print("경고: db_utils.load_processed_uniques 사용 불가"); return _EmptyUniques()
+    CLASSES_ENDPOINT = "maxroll/items/classes"
+try:
+    from src.version_check import check_update_status
+except ImportError as e: # requests 미설치 등
+    print(f"CRITICAL ERROR: src.version_check 모듈을 찾을 수 없습니다: {e}")
+    def check_update_status(*args, **kwargs): return {'update_available': False, 'local': '', 'remote': '', 'url': '', 'manifest': '', 'source': 'error'}
+try:
+    from src.bundle_update import recover_interrupted_update, update_bundle, installed_bundle_version
+except ImportError as e:
+    print(f"CRITICAL ERROR: src.bundle_update 모듈을 찾을 수 없습니다: {e}")
+    def recover_interrupted_update(*args, **kwargs): return False
+    def update_bundle(*args, **kwargs): raise RuntimeError("src.bundle_update 모듈 로드 실패.")
+    def installed_bundle_version(*args, **kwargs): return None
+try:
+    from src.unique_search import UniqueSearchIndex
+except ImportError as e:
+    print(f"CRITICAL ERROR: src.unique_search 모듈을 찾을 수 없습니다: {e}")
+    UniqueSearchIndex = None
 
 
 BUILD_TYPES = ["타입 선택...", "스타터 (Starter)", "엔드게임 (Endgame)", "레벨링 (Leveling)"]
@@ -53,15 +79,48 @@ class GuideGenerationWorker(QObject):
         except Exception as e: self.error.emit(f"가이드 생성 스레드 오류: {e}")
 
 class RefreshWorker(QObject):
-    # ... (이전과 동일) ...
-    finished = pyqtSignal(dict); progress = pyqtSignal(str) 
-    def __init__(self): super().__init__()
+    # progress: 로그 탭용 문자열, event: build_db 진행 이벤트 dict 원본 (stage, endpoint, bytes, elapsed 등)
+    finished = pyqtSignal(dict); progress = pyqtSignal(str); event = pyqtSignal(dict)
+    def __init__(self):
+        super().__init__(); self._cancel_event = threading.Event(); self._progress_log = ProgressLog()
+    def cancel(self): self._cancel_event.set() # GUI 스레드에서 호출; 다음 청크/카테고리 경계에서 중단
+    def _on_progress(self, event):
+        if isinstance(event, dict):
+            self.event.emit(event); line = self._progress_log(event)
+            if line: self.progress.emit(line)
+        else: self.progress.emit(str(event))
     def run(self):
         try:
-            result_dict = refresh_all(); self.finished.emit(result_dict)
+            result_dict = refresh_all(progress=self._on_progress, cancel=self._cancel_event)
+            if result_dict.get('coalesced'): self.progress.emit("다른 새로고침/가공(CLI, serve-refresh 등)이 진행 중입니다 (coalesced).")
+            self.finished.emit(result_dict)
         except Exception as e:
             self.progress.emit(f"새로고침 스레드 오류: {e}")
             self.finished.emit({'success': False, 'output': f"새로고침 스레드 오류: {e}"})
+        finally: close_thread_connections() # 이 스레드의 DB 연결이 남아 다음 DB 교체를 막지 않도록
+
+class VersionCheckWorker(QObject):
+    # 디스크 캐시(TTL) 또는 조건부 GET으로 확인한 결과 dict (version_check.check_update_status 참고)
+    finished = pyqtSignal(dict)
+    def run(self):
+        try: status = check_update_status()
+        except Exception as e: status = {'update_available': False, 'local': '', 'remote': '', 'url': '', 'manifest': '', 'source': 'error', 'error': str(e)}
+        finally: close_thread_connections()
+        self.finished.emit(status)
+
+class BundleUpdateWorker(QObject):
+    # resources/ 증분 업데이트 (bundle_update.update_bundle): 바뀐 파일만 받아 교체
+    finished = pyqtSignal(dict); progress = pyqtSignal(str)
+    def __init__(self, manifest_url):
+        super().__init__(); self.manifest_url = manifest_url
+    def _on_progress(self, event):
+        self.progress.emit(f"[번들] {event.get('name')}: {event.get('action')} ({event.get('bytes', 0)} bytes)")
+    def run(self):
+        try:
+            stats = update_bundle(self.manifest_url, progress=self._on_progress); self.finished.emit({'success': True, 'result': stats})
+        except Exception as e: # BundleUpdateError: resources/는 그대로
+            self.finished.emit({'success': False, 'output': f"리소스 업데이트 실패: {e}"})
+        finally: close_thread_connections()
 
 class PlannerWindow(QMainWindow):
     def __init__(self):
@@ -70,13 +129,19 @@ class PlannerWindow(QMainWindow):
         self.main_layout = QHBoxLayout(self.central_widget) 
         self.guide_generation_thread = None; self.guide_worker = None
         self.refresh_thread = None; self.refresh_worker = None
+        self.version_check_thread = None; self.version_check_worker = None
+        self.bundle_thread = None; self.bundle_worker = None; self.bundle_manifest_url = ''
 
+        try: # 이전 실행의 리소스 업데이트가 파일 교체 도중 중단되었으면 데이터를 읽기 전에 마저 적용
+            if recover_interrupted_update(): self.log_message_initial("중단된 리소스 업데이트를 마저 적용했습니다.")
+        except Exception as e: self.log_message_initial(f"경고: 중단된 리소스 업데이트 복구 실패: {e}")
         self.log_message_initial("DB/JSON 데이터 로딩 시작...") 
         self.game_class_data = get_classes_from_db() # 이건 여전히 DB에서 직접
         # ####################################################################
-        # # 가공된 고유 아이템 데이터를 JSON 파일에서 로드
+        # # 가공된 고유 아이템 데이터를 스냅샷(또는 JSON 파일)에서 로드 - 레코드는 선택 시 디코딩
         # ####################################################################
-        self.all_processed_unique_items = load_processed_uniques_from_json() 
+        self.all_processed_unique_items = load_processed_uniques() 
+        self.unique_search_index = None # 도감 검색창에 처음 입력할 때 생성 (시작 시 레코드 디코딩 방지)
         # self.item_type_map, self.affix_data_map은 이제 app_planner에서 직접 사용 안 함
         # ####################################################################
         self.log_message_initial("DB/JSON 데이터 로딩 완료.")
@@ -108,8 +173,13 @@ class PlannerWindow(QMainWindow):
         self.guide_view = QWebEngineView(); guide_view_layout.addWidget(self.guide_view)
         self.right_tab_widget.addTab(self.guide_view_tab, "📖 생성된 가이드")
         self.item_compendium_tab = QWidget(); item_compendium_layout = QHBoxLayout(self.item_compendium_tab) 
+        unique_list_panel = QWidget(); unique_list_layout = QVBoxLayout(unique_list_panel); unique_list_layout.setContentsMargins(0, 0, 0, 0)
+        self.unique_search_edit = QLineEdit(); self.unique_search_edit.setPlaceholderText("🔍 이름, 유형, 옵션, 효과 검색...")
+        self.unique_search_edit.setClearButtonEnabled(True); self.unique_search_edit.textChanged.connect(self.filter_unique_item_list)
+        unique_list_layout.addWidget(self.unique_search_edit)
         self.unique_item_list_widget = QListWidget(); self.unique_item_list_widget.currentItemChanged.connect(self.display_unique_item_details)
-        item_compendium_layout.addWidget(self.unique_item_list_widget, 1) 
+        unique_list_layout.addWidget(self.unique_item_list_widget)
+        item_compendium_layout.addWidget(unique_list_panel, 1) 
         self.unique_item_detail_text = QTextEdit(); self.unique_item_detail_text.setReadOnly(True)
         self.unique_item_detail_text.setLineWrapMode(QTextEdit.NoWrap) 
         item_compendium_layout.addWidget(self.unique_item_detail_text, 2) 
@@ -118,6 +188,8 @@ class PlannerWindow(QMainWindow):
         control_layout.addWidget(self.refresh_button)
         self.version_banner_label = QLabel("(버전 정보)"); self.version_banner_label.setAlignment(Qt.AlignCenter)
         control_layout.addWidget(self.version_banner_label)
+        self.bundle_button = QPushButton("📦 리소스 업데이트"); self.bundle_button.clicked.connect(self.handle_bundle_update_async)
+        self.bundle_button.setVisible(False); control_layout.addWidget(self.bundle_button) # 버전 확인에서 새 번들이 보이면 표시
         self.perform_version_check() 
         self.class_label = QLabel("기본 클래스:"); control_layout.addWidget(self.class_label)
         self.class_combo = QComboBox()
@@ -152,29 +224,42 @@ class PlannerWindow(QMainWindow):
         if hasattr(self, 'log_edit') and self.log_edit: self.log_edit.append(str(message))
         else: print(f"LOG: {message}")
 
+    def _fill_unique_item_list(self, indices):
+        names = self.all_processed_unique_items.names()
+        self.unique_item_list_widget.clear()
+        for index in indices:
+            list_item = QListWidgetItem(names[index] or '이름 없음')
+            # QListWidgetItem에는 레코드 인덱스만 저장하고, 선택 시 레코드를 가져옴
+            list_item.setData(Qt.UserRole, index) 
+            self.unique_item_list_widget.addItem(list_item)
+
     def populate_processed_unique_item_list(self): # 이름 변경
         self.unique_item_list_widget.clear()
         if self.all_processed_unique_items: # 가공된 데이터 사용
-            # 이름으로 정렬 (이미 name_display로 가공됨)
-            sorted_items = sorted(self.all_processed_unique_items, key=lambda x: x.get('name_display', ''))
-            for item_data in sorted_items: # 이제 item_data는 가공된 딕셔너리
-                display_name = item_data.get('name_display', '이름 없음')
-                list_item = QListWidgetItem(display_name)
-                # QListWidgetItem에 저장하는 데이터도 이제 가공된 item_data 전체
-                list_item.setData(Qt.UserRole, item_data) 
-                self.unique_item_list_widget.addItem(list_item)
+            self.filter_unique_item_list(self.unique_search_edit.text()) # 검색어가 있으면 유지
             self.log_message(f"{len(self.all_processed_unique_items)}개의 가공된 고유 아이템 목록을 UI에 로드했습니다.")
         else:
             self.unique_item_list_widget.addItem("로드된 아이템 없음")
             self.log_message("경고: UI에 로드할 가공된 고유 아이템 데이터가 없습니다.")
             
+    def filter_unique_item_list(self, query):
+        """검색창 입력마다 호출: 일치하는 아이템만 점수 순으로 표시 (빈 입력이면 전체 목록)"""
+        if not self.all_processed_unique_items: return
+        if not query.strip() or UniqueSearchIndex is None:
+            # 이름으로 정렬 (스냅샷의 요약 정보만 사용하므로 레코드는 디코딩하지 않음)
+            names = self.all_processed_unique_items.names()
+            self._fill_unique_item_list(sorted(range(len(names)), key=lambda i: names[i])); return
+        if self.unique_search_index is None: self.unique_search_index = UniqueSearchIndex(self.all_processed_unique_items)
+        self._fill_unique_item_list(self.unique_search_index.search_positions(query))
+
     def display_unique_item_details(self, current_item_widget, previous_item_widget):
         if not current_item_widget:
             self.unique_item_detail_text.setHtml("<p style='padding:10px; color: #bdc3c7;'>아이템 목록에서 아이템을 선택하세요.</p>")
             return
         
-        # 이제 item_data는 process_game_data.py가 생성한 "가공된" 딕셔너리입니다.
-        processed_item_data = current_item_widget.data(Qt.UserRole) 
+        # UserRole에는 레코드 인덱스가 들어있고, 레코드는 process_game_data.py가 생성한 "가공된" 딕셔너리입니다.
+        item_index = current_item_widget.data(Qt.UserRole)
+        processed_item_data = self.all_processed_unique_items[item_index] if isinstance(item_index, int) else None
         if not processed_item_data:
             self.unique_item_detail_text.setHtml("<p style='padding:10px; color: #bdc3c7;'>선택된 아이템 정보를 불러올 수 없습니다.</p>")
             return
@@ -237,46 +322,87 @@ class PlannerWindow(QMainWindow):
 
     def handle_refresh_async(self): 
         # ... (이전과 동일) ...
-        if self.refresh_thread and self.refresh_thread.isRunning(): self.log_message("이미 데이터 새로고침 중"); return
-        self.log_message("데이터 새로고침을 시작합니다..."); self.refresh_button.setEnabled(False); self.right_tab_widget.setCurrentWidget(self.log_tab)
+        if self.bundle_thread and self.bundle_thread.isRunning(): self.log_message("리소스 업데이트 중에는 새로고침할 수 없습니다."); return
+        if self.refresh_thread and self.refresh_thread.isRunning(): # 진행 중에 다시 누르면 취소
+            self.log_message("데이터 새로고침 취소를 요청했습니다..."); self.refresh_worker.cancel(); self.refresh_button.setEnabled(False); return
+        self.log_message("데이터 새로고침을 시작합니다..."); self.refresh_button.setText("⏹ 새로고침 취소"); self.right_tab_widget.setCurrentWidget(self.log_tab)
         self.refresh_thread = QThread(); self.refresh_worker = RefreshWorker()
         self.refresh_worker.moveToThread(self.refresh_thread)
         self.refresh_worker.progress.connect(self.log_message); self.refresh_worker.finished.connect(self.on_refresh_finished)
         self.refresh_thread.started.connect(self.refresh_worker.run)
         self.refresh_worker.finished.connect(self.refresh_thread.quit)
         self.refresh_thread.finished.connect(self.refresh_worker.deleteLater); self.refresh_thread.finished.connect(self.refresh_thread.deleteLater)
-        self.refresh_thread.finished.connect(lambda: self.refresh_button.setEnabled(True)) 
+        self.refresh_thread.finished.connect(self._reset_refresh_button)
         self.refresh_thread.start()
 
+    def _reset_refresh_button(self):
+        self.refresh_button.setText("🔄 데이터 새로고침"); self.refresh_button.setEnabled(True)
+
     def on_refresh_finished(self, result_dict):
         self.log_message("데이터 새로고침 작업 완료.")
         if result_dict and isinstance(result_dict, dict): 
             if result_dict.get('output'): self.log_message("--- 새로고침 결과 ---"); self.log_message(result_dict['output'])
-            if result_dict.get('success'):
-                self.log_message("DB 업데이트 성공. UI 데이터 다시 로드...")
-                current_class_selection = self.class_combo.currentText()
-                self.game_class_data = get_classes_from_db(); self.class_combo.clear()
-                if self.game_class_data and len(self.game_class_data) > 1:
-                    for base_class in self.game_class_data.keys(): self.class_combo.addItem(base_class)
-                    if current_class_selection in self.game_class_data and current_class_selection not in ["클래스 선택...", "클래스 로드 실패"]:
-                        self.class_combo.setCurrentText(current_class_selection)
-                    else: self.class_combo.setCurrentIndex(0) 
-                else: self.class_combo.addItem("클래스 로드 실패")
-                self.update_masteries()
+            if result_dict.get('cancelled'): self.log_message("새로고침이 취소되어 기존 DB를 그대로 사용합니다.")
+            elif result_dict.get('coalesced'): self.log_message("진행 중인 다른 실행이 DB를 갱신하므로 이번 새로고침은 건너뛰었습니다.")
+            elif result_dict.get('success'):
+                self.log_message("DB 업데이트 성공. 바뀐 UI 데이터만 다시 로드...")
+                build_result = result_dict.get('result') or {}
+                if CLASSES_ENDPOINT in build_result.get('changed', []): self._reload_class_data() # 변경 이력 기준: 클래스가 바뀐 세대에만
+                else: self.log_message("클래스 데이터 변경 없음: 클래스 목록을 다시 불러오지 않습니다.")
                 
                 # ############################################################
                 # # 가공된 데이터 다시 로드
                 # ############################################################
-                self.all_processed_unique_items = load_processed_uniques_from_json()
-                self.populate_processed_unique_item_list() # 이름 변경된 함수 호출
-                if not self.all_processed_unique_items: self.log_message("경고: 새로고침 후 가공된 고유 아이템 데이터 로드 실패.")
-                # item_type_map, affix_data_map은 process_game_data.py가 실행될 때 사용되므로,
-                # app_planner에서는 새로고침 시 다시 로드할 필요가 없습니다.
-                # (process_game_data.py를 실행해야 이 맵들도 최신화됨)
+                # 새로고침 파이프라인이 processed_uniques를 다시 쓴 경우에만 (가공 결과가 그대로면 목록 유지)
+                reprocess_stats = result_dict.get('reprocess')
+                if reprocess_stats and reprocess_stats.get('written'): self._reload_processed_uniques()
+                else: self.log_message("가공된 고유 아이템 변경 없음: 목록을 다시 불러오지 않습니다.")
                 # ############################################################
             else: self.log_message("DB 업데이트 실패. 로그 확인.")
         else: self.log_message("새로고침 결과 비정상.")
 
+    def _reload_class_data(self):
+        current_class_selection = self.class_combo.currentText()
+        self.game_class_data = get_classes_from_db(); self.class_combo.clear()
+        if self.game_class_data and len(self.game_class_data) > 1:
+            for base_class in self.game_class_data.keys(): self.class_combo.addItem(base_class)
+            if current_class_selection in self.game_class_data and current_class_selection not in ["클래스 선택...", "클래스 로드 실패"]:
+                self.class_combo.setCurrentText(current_class_selection)
+            else: self.class_combo.setCurrentIndex(0) 
+        else: self.class_combo.addItem("클래스 로드 실패")
+        self.update_masteries()
+
+    def _reload_processed_uniques(self):
+        self.all_processed_unique_items.close() # 스냅샷 mmap 해제
+        self.all_processed_unique_items = load_processed_uniques()
+        self.unique_search_index = None # 새 데이터로 다시 색인
+        self.populate_processed_unique_item_list() # 이름 변경된 함수 호출
+        if not self.all_processed_unique_items: self.log_message("경고: 다시 불러온 가공된 고유 아이템 데이터가 비어 있습니다.")
+
+    def handle_bundle_update_async(self):
+        if not self.bundle_manifest_url or (self.bundle_thread and self.bundle_thread.isRunning()): return
+        if self.refresh_thread and self.refresh_thread.isRunning(): self.log_message("데이터 새로고침 중에는 리소스를 업데이트할 수 없습니다."); return
+        self.log_message("리소스 업데이트를 시작합니다 (바뀐 파일만 받습니다)..."); self.bundle_button.setEnabled(False); self.refresh_button.setEnabled(False)
+        self.right_tab_widget.setCurrentWidget(self.log_tab)
+        self.bundle_thread = QThread(); self.bundle_worker = BundleUpdateWorker(self.bundle_manifest_url)
+        self.bundle_worker.moveToThread(self.bundle_thread)
+        self.bundle_worker.progress.connect(self.log_message); self.bundle_worker.finished.connect(self.on_bundle_update_finished)
+        self.bundle_thread.started.connect(self.bundle_worker.run)
+        self.bundle_worker.finished.connect(self.bundle_thread.quit)
+        self.bundle_thread.finished.connect(self.bundle_worker.deleteLater); self.bundle_thread.finished.connect(self.bundle_thread.deleteLater)
+        self.bundle_thread.start()
+
+    def on_bundle_update_finished(self, result_dict):
+        self.refresh_button.setEnabled(True)
+        if not result_dict.get('success'):
+            self.log_message(result_dict.get('output') or "리소스 업데이트 실패."); self.bundle_button.setEnabled(True); return
+        stats = result_dict.get('result') or {}
+        self.log_message(f"리소스 {stats.get('version')} 적용 완료: 델타 {stats.get('delta', 0)}개, 전체 {stats.get('full', 0)}개, "
+                         f"유지 {stats.get('unchanged', 0)}개, 받은 크기 {stats.get('downloaded_bytes', 0)} bytes")
+        self.bundle_button.setVisible(False)
+        if stats.get('delta') or stats.get('full'): # 바뀐 파일이 있을 때만 다시 로드
+            self._reload_class_data(); self._reload_processed_uniques()
+
 
     def handle_generate_guide_async(self):
         # ... (이전과 동일) ...
@@ -334,10 +460,35 @@ class PlannerWindow(QMainWindow):
         self.guide_view.setHtml(f"<h2>가이드 생성 오류</h2><p>{error_message}</p>"); self.right_tab_widget.setCurrentWidget(self.guide_view_tab)
 
     def perform_version_check(self):
-        # ... (이전과 동일) ...
-        self.log_message("버전 체크를 수행합니다 (실제 기능 연결 필요)...")
-        self.log_message("버전 체크 기능은 아직 연결되지 않았습니다.")
-        self.version_banner_label.setText("(버전 체크 기능 연결 필요)")
+        # 시작 시 네트워크를 기다리지 않도록 스레드에서 확인; 결과는 on_version_check_finished로 전달
+        if self.version_check_thread and self.version_check_thread.isRunning(): return
+        self.version_banner_label.setText("(버전 확인 중...)")
+        self.version_check_thread = QThread(); self.version_check_worker = VersionCheckWorker()
+        self.version_check_worker.moveToThread(self.version_check_thread)
+        self.version_check_worker.finished.connect(self.on_version_check_finished)
+        self.version_check_thread.started.connect(self.version_check_worker.run)
+        self.version_check_worker.finished.connect(self.version_check_thread.quit)
+        self.version_check_thread.finished.connect(self.version_check_worker.deleteLater); self.version_check_thread.finished.connect(self.version_check_thread.deleteLater)
+        self.version_check_thread.start()
+
+    def on_version_check_finished(self, status):
+        local = status.get('local') or "?"; remote = status.get('remote')
+        self.bundle_manifest_url = status.get('manifest') or ''
+        if self.bundle_manifest_url and remote and installed_bundle_version() != remote: # 받은 적 없는 번들 버전
+            self.bundle_button.setText(f"📦 리소스 업데이트 (v{remote})"); self.bundle_button.setEnabled(True); self.bundle_button.setVisible(True)
+        source_label = {"cache": "캐시", "not_modified": "변경 없음", "network": "서버", "stale": "오프라인, 이전 결과"}.get(status.get('source'), status.get('source'))
+        if status.get('update_available'):
+            url = status.get('url')
+            text = f"🔔 새 버전 v{remote} 사용 가능 (현재 v{local})"
+            if url: self.version_banner_label.setOpenExternalLinks(True); text = f'<a href="{url}">{text}</a>'
+            self.version_banner_label.setText(text)
+            self.log_message(f"새 버전 v{remote}이 있습니다 (현재 v{local}, 확인: {source_label}).")
+        elif remote:
+            self.version_banner_label.setText(f"v{local} (최신 버전)")
+            self.log_message(f"최신 버전입니다: v{local} (확인: {source_label}).")
+        else:
+            self.version_banner_label.setText(f"v{local} (버전 확인 실패)")
+            self.log_message(f"원격 버전 확인 실패{': ' + status['error'] if status.get('error') else ''}.")
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
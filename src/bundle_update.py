@@ -0,0 +1,368 @@
+# D:\LEB\src\bundle_update.py
+
+"""
+resources/ 번들 증분 업데이트.
+
+릴리스마다 파일별 SHA-256/크기/다운로드 경로를 담은 매니페스트(manifest.json)를 함께 올리고
+(scripts/make_bundle_manifest.py), 클라이언트는 로컬 파일의 해시와 비교해 바뀐 파일만 받습니다.
+로컬 파일을 기준으로 한 바이너리 델타가 매니페스트에 있으면 전체 파일 대신 델타를 받아 적용합니다.
+
+적용 순서:
+    1. 바뀐 파일을 resources/.bundle-staging/ 에 완성하고 크기/SHA-256 검증
+    2. 적용 저널(.bundle-apply.json) 기록 -> 파일별 os.replace -> 로컬 매니페스트 갱신 -> 저널 삭제
+교체 도중 중단되면 다음 실행의 recover_interrupted_update()가 저널을 보고 나머지 교체를 마칩니다.
+(앱은 시작할 때 데이터를 읽기 전에 복구하고, version.json에 "manifest"가 있으면 버전 확인 결과로 업데이트 버튼을 켭니다)
+검증이 끝난 파일만 저널에 오르므로 복구는 항상 새 버전 쪽으로 진행합니다.
+
+매니페스트 형식:
+    {"format": 1, "version": "1.0.1",
+     "files": {"resources.db": {"sha256", "size", "url",
+                                "deltas": [{"from": 기준 파일 SHA-256, "sha256", "size", "url"}, ...]}, ...}}
+    url은 매니페스트 URL 기준 상대 경로도 허용합니다.
+
+델타 형식 (전체를 zlib 압축):
+    DELTA_MAGIC, 기준 파일 SHA-256(32바이트), 결과 크기(<Q), 이후 명령 반복
+    b"C" + <QI (기준 파일 오프셋, 길이): 기준 파일에서 복사 / b"D" + <I (길이) + 바이트: 새 내용 삽입
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import shutil
+import struct
+import hashlib
+import logging
+import posixpath
+from contextlib import contextmanager, ExitStack
+from urllib.parse import urljoin
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESOURCES_DIR = os.path.join(BASE_DIR, "resources")
+
+MANIFEST_FORMAT = 1
+LOCAL_MANIFEST_NAME = "bundle_manifest.json" # 마지막으로 적용한 매니페스트 (설치된 번들 버전 확인용)
+STAGING_DIR_NAME = ".bundle-staging"
+JOURNAL_NAME = ".bundle-apply.json"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+REQUEST_TIMEOUT_SEC = 10
+REPLACE_RETRIES = 5 # Windows에서 앱이 파일을 열고 있으면 교체가 잠시 실패할 수 있음
+REPLACE_RETRY_DELAY_SEC = 0.2
+DB_READER_MODULES = ("src.db_utils", "db_utils") # 교체 동안 읽기 연결을 닫아 둘 db_utils 모듈 이름들
+
+DELTA_MAGIC = b"LEBDELT1"
+DELTA_HEADER_STRUCT = struct.Struct("<8s32sQ")
+DELTA_COPY_STRUCT = struct.Struct("<QI")
+DELTA_DATA_STRUCT = struct.Struct("<I")
+DELTA_BLOCK_SIZE = 64 # 일치 탐색 단위. SQLite 페이지(4096)와 JSON 레코드 변경 모두 잡을 수 있는 크기
+
+
+class BundleUpdateError(Exception):
+    """매니페스트/다운로드/검증/적용 실패. resources/의 기존 파일은 그대로 남습니다."""
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ─── 델타 ────────────────────────────────────────────────
+def make_delta(base, target, block_size=DELTA_BLOCK_SIZE):
+    """
+    base(bytes)를 target(bytes)으로 바꾸는 델타를 만듭니다.
+    base를 block_size 단위로 색인한 뒤 target을 훑으며 일치 구간은 복사, 나머지는 삽입으로 기록합니다.
+    (일치하지 않는 구간만 바이트 단위로 훑으므로 비용은 대략 바뀐 양에 비례)
+    """
+    index = {}
+    for offset in range(0, len(base) - block_size + 1, block_size):
+        index.setdefault(base[offset:offset + block_size], offset)
+    out = bytearray(DELTA_HEADER_STRUCT.pack(DELTA_MAGIC, hashlib.sha256(base).digest(), len(target)))
+    last_copy = None # 연속된 복사 명령을 합치기 위한 (out 내 위치, 오프셋, 길이)
+    def _emit_data(data):
+        nonlocal last_copy
+        if data: out.extend(b"D" + DELTA_DATA_STRUCT.pack(len(data))); out.extend(data); last_copy = None
+    def _emit_copy(offset, length):
+        nonlocal last_copy
+        if last_copy and last_copy[1] + last_copy[2] == offset: # 직전 복사에 이어짐
+            last_copy = (last_copy[0], last_copy[1], last_copy[2] + length)
+            DELTA_COPY_STRUCT.pack_into(out, last_copy[0], last_copy[1], last_copy[2])
+        else:
+            last_copy = (len(out) + 1, offset, length)
+            out.extend(b"C" + DELTA_COPY_STRUCT.pack(offset, length))
+
+    literal_start = pos = 0; target_size = len(target); base_size = len(base)
+    while pos + block_size <= target_size:
+        offset = index.get(target[pos:pos + block_size])
+        if offset is None: pos += 1; continue
+        length = block_size
+        while pos > literal_start and offset > 0 and target[pos - 1] == base[offset - 1]: # 앞쪽으로 확장
+            pos -= 1; offset -= 1; length += 1
+        while (pos + length + block_size <= target_size and offset + length + block_size <= base_size and
+               target[pos + length:pos + length + block_size] == base[offset + length:offset + length + block_size]):
+            length += block_size
+        while pos + length < target_size and offset + length < base_size and target[pos + length] == base[offset + length]:
+            length += 1
+        _emit_data(target[literal_start:pos]); _emit_copy(offset, length)
+        pos += length; literal_start = pos
+    _emit_data(target[literal_start:])
+    return zlib.compress(bytes(out), 9)
+
+
+def apply_delta(base, delta):
+    """make_delta의 결과를 base(bytes)에 적용해 새 내용을 반환합니다. 기준 파일이 다르거나 델타가 손상되면 BundleUpdateError"""
+    try: raw = zlib.decompress(delta)
+    except zlib.error as e: raise BundleUpdateError(f"델타 압축 해제 실패: {e}") from e
+    if len(raw) < DELTA_HEADER_STRUCT.size: raise BundleUpdateError("델타 헤더가 잘렸습니다.")
+    magic, base_digest, target_size = DELTA_HEADER_STRUCT.unpack_from(raw)
+    if magic != DELTA_MAGIC: raise BundleUpdateError("델타 형식이 아닙니다.")
+    if hashlib.sha256(base).digest() != base_digest: raise BundleUpdateError("델타의 기준 파일이 로컬 파일과 다릅니다.")
+    result = bytearray(); pos = DELTA_HEADER_STRUCT.size
+    try:
+        while pos < len(raw):
+            op = raw[pos:pos + 1]; pos += 1
+            if op == b"C":
+                offset, length = DELTA_COPY_STRUCT.unpack_from(raw, pos); pos += DELTA_COPY_STRUCT.size
+                if offset + length > len(base): raise BundleUpdateError("델타 복사 범위가 기준 파일을 벗어납니다.")
+                result += base[offset:offset + length]
+            elif op == b"D":
+                (length,) = DELTA_DATA_STRUCT.unpack_from(raw, pos); pos += DELTA_DATA_STRUCT.size
+                if pos + length > len(raw): raise BundleUpdateError("델타 데이터가 잘렸습니다.")
+                result += raw[pos:pos + length]; pos += length
+            else: raise BundleUpdateError(f"알 수 없는 델타 명령: {op!r}")
+    except struct.error as e: raise BundleUpdateError(f"델타 명령이 잘렸습니다: {e}") from e
+    if len(result) != target_size: raise BundleUpdateError("델타 적용 결과 크기가 다릅니다.")
+    return bytes(result)
+
+
+# ─── 매니페스트 ──────────────────────────────────────────
+def _check_relative_name(name):
+    """매니페스트의 파일 이름이 resources/ 안의 상대 경로인지 확인 (../, 절대 경로, 내부 파일 거부)"""
+    normalized = posixpath.normpath(name) if isinstance(name, str) else ""
+    if (not normalized or normalized != name or normalized.startswith(("../", "/")) or normalized == ".." or
+            "\\" in name or ":" in name or posixpath.basename(name) in (LOCAL_MANIFEST_NAME, JOURNAL_NAME) or
+            normalized.split("/")[0] == STAGING_DIR_NAME):
+        raise BundleUpdateError(f"잘못된 매니페스트 파일 이름: {name!r}")
+    return normalized
+
+
+def validate_manifest(manifest):
+    """매니페스트 구조를 검사하고 그대로 반환합니다. (잘못되면 BundleUpdateError)"""
+    if not isinstance(manifest, dict) or manifest.get("format") != MANIFEST_FORMAT:
+        raise BundleUpdateError("지원하지 않는 매니페스트 형식입니다.")
+    files = manifest.get("files")
+    if not isinstance(files, dict): raise BundleUpdateError("매니페스트에 files가 없습니다.")
+    for name, entry in files.items():
+        _check_relative_name(name)
+        if not (isinstance(entry, dict) and isinstance(entry.get("sha256"), str) and isinstance(entry.get("size"), int)
+                and isinstance(entry.get("url"), str)):
+            raise BundleUpdateError(f"매니페스트 항목이 올바르지 않습니다: {name}")
+        for delta in entry.get("deltas") or []:
+            if not (isinstance(delta, dict) and all(isinstance(delta.get(k), str) for k in ("from", "sha256", "url"))
+                    and isinstance(delta.get("size"), int)):
+                raise BundleUpdateError(f"델타 항목이 올바르지 않습니다: {name}")
+    return manifest
+
+
+def fetch_manifest(manifest_url):
+    try:
+        resp = requests.get(manifest_url, timeout=REQUEST_TIMEOUT_SEC)
+        resp.raise_for_status()
+        manifest = json.loads(resp.content.decode('utf-8-sig'))
+    except (requests.RequestException, ValueError) as e:
+        raise BundleUpdateError(f"매니페스트 조회 실패: {e}") from e
+    return validate_manifest(manifest)
+
+
+def manifest_url_from_version_info(version_info, version_url):
+    """version.json의 "manifest" 항목 (version.json 기준 상대 경로 허용). 없으면 None (전체 zip만 제공하는 릴리스)"""
+    manifest = version_info.get("manifest") if isinstance(version_info, dict) else None
+    return urljoin(version_url, manifest) if manifest else None
+
+
+def installed_bundle_version(resources_dir=RESOURCES_DIR):
+    """마지막으로 적용한 번들 버전 (증분 업데이트를 한 번도 하지 않았으면 None)"""
+    try:
+        with open(os.path.join(resources_dir, LOCAL_MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def plan_update(manifest, resources_dir=RESOURCES_DIR):
+    """
+    파일마다 할 일을 정합니다.
+    Returns:
+        list[dict]: {"name", "entry", "action": "keep"/"delta"/"full", "delta": 사용할 델타 항목 또는 None}
+    """
+    plan = []
+    for name, entry in manifest["files"].items():
+        local_path = os.path.join(resources_dir, *name.split("/"))
+        local_sha256 = sha256_file(local_path) if os.path.isfile(local_path) else None
+        if local_sha256 == entry["sha256"]:
+            plan.append({"name": name, "entry": entry, "action": "keep", "delta": None}); continue
+        delta = next((d for d in entry.get("deltas") or [] if d["from"] == local_sha256), None) if local_sha256 else None
+        if delta is not None and delta["size"] >= entry["size"]: delta = None # 전체 파일이 더 작으면 전체로
+        plan.append({"name": name, "entry": entry, "action": "delta" if delta else "full", "delta": delta})
+    return plan
+
+
+# ─── 다운로드/적용 ───────────────────────────────────────
+def _download(url, expected_sha256, expected_size, dest_path):
+    """url을 dest_path로 받으며 크기/SHA-256을 검증합니다. 받은 바이트 수를 반환합니다."""
+    digest = hashlib.sha256(); received = 0
+    try:
+        with requests.get(url, timeout=REQUEST_TIMEOUT_SEC, stream=True) as resp:
+            resp.raise_for_status()
+            with open(dest_path, 'wb') as f:
+                for chunk in resp.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    received += len(chunk)
+                    if received > expected_size: raise BundleUpdateError(f"예상보다 큰 응답: {url}")
+                    digest.update(chunk); f.write(chunk)
+    except requests.RequestException as e:
+        raise BundleUpdateError(f"다운로드 실패 ({url}): {e}") from e
+    except OSError as e: # 임시 폴더 파일을 열거나 쓰지 못함 (디스크 부족, 권한 등)
+        raise BundleUpdateError(f"임시 파일 기록 실패 ({dest_path}): {e}") from e
+    if received != expected_size or digest.hexdigest() != expected_sha256:
+        raise BundleUpdateError(f"체크섬 불일치: {url}")
+    return received
+
+
+def _write_json_atomic(path, data):
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2); f.flush(); os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def _replace_with_retry(source, target):
+    for attempt in range(REPLACE_RETRIES):
+        try: os.replace(source, target); return
+        except PermissionError:
+            if attempt == REPLACE_RETRIES - 1: raise
+            time.sleep(REPLACE_RETRY_DELAY_SEC)
+
+
+@contextmanager
+def _db_readers_released():
+    """
+    이 프로세스에 로드된 db_utils의 읽기 연결을 모두 닫고, 블록이 끝날 때까지 새 연결을 막습니다.
+    (Windows는 열린 resources.db를 교체할 수 없음. update_resources.commit_shadow_db와 같은 방식)
+    """
+    with ExitStack() as stack:
+        for name in DB_READER_MODULES:
+            module = sys.modules.get(name)
+            if module is not None and hasattr(module, "readers_paused"): stack.enter_context(module.readers_paused())
+        yield
+
+
+def _commit_staged(resources_dir, manifest, staged_names):
+    """검증된 스테이징 파일을 저널과 함께 resources/로 옮깁니다. (recover_interrupted_update가 이어서 할 수 있는 순서)"""
+    staging_dir = os.path.join(resources_dir, STAGING_DIR_NAME)
+    _write_json_atomic(os.path.join(resources_dir, JOURNAL_NAME), {"manifest": manifest, "files": staged_names})
+    with _db_readers_released():
+        for name in staged_names:
+            staged_path = os.path.join(staging_dir, *name.split("/"))
+            if not os.path.exists(staged_path): continue # 이전 시도에서 이미 옮김
+            target_path = os.path.join(resources_dir, *name.split("/"))
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            _replace_with_retry(staged_path, target_path)
+    _write_json_atomic(os.path.join(resources_dir, LOCAL_MANIFEST_NAME), manifest)
+    os.remove(os.path.join(resources_dir, JOURNAL_NAME))
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def recover_interrupted_update(resources_dir=RESOURCES_DIR):
+    """
+    이전 업데이트가 교체 도중 중단되었으면 남은 교체를 마칩니다. (app_planner가 시작할 때 데이터를 읽기 전에 호출)
+    Returns:
+        bool: 복구를 수행했으면 True
+    """
+    journal_path = os.path.join(resources_dir, JOURNAL_NAME)
+    if not os.path.exists(journal_path):
+        shutil.rmtree(os.path.join(resources_dir, STAGING_DIR_NAME), ignore_errors=True) # 검증 전에 중단된 잔여물
+        return False
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f: journal = json.load(f)
+        manifest = validate_manifest(journal["manifest"]); names = [_check_relative_name(n) for n in journal["files"]]
+    except (OSError, ValueError, KeyError, TypeError, BundleUpdateError) as e: # 저널 기록 중 중단: 아직 아무것도 옮기지 않음
+        logger.warning(f"손상된 번들 적용 저널을 버립니다: {e}")
+        os.remove(journal_path); shutil.rmtree(os.path.join(resources_dir, STAGING_DIR_NAME), ignore_errors=True)
+        return False
+    logger.info(f"중단된 번들 업데이트({manifest.get('version')})를 마저 적용합니다.")
+    _commit_staged(resources_dir, manifest, names)
+    return True
+
+
+def update_bundle(manifest_url, resources_dir=RESOURCES_DIR, progress=None):
+    """
+    manifest_url의 번들 버전으로 resources/를 맞춥니다. 바뀐 파일만 (가능하면 델타로) 받습니다.
+    파일을 옮기는 동안에는 이 프로세스의 resources.db 읽기 연결을 닫고 새 읽기를 잠시 막습니다. (_db_readers_released)
+    Args:
+        progress: 파일마다 {"stage": "bundle", "name", "action", "bytes"}를 받을 콜백 (선택)
+    Returns:
+        dict: {"version", "unchanged", "delta", "full", "downloaded_bytes"}
+    Raises:
+        BundleUpdateError: 실패 시 (resources/의 기존 파일은 그대로)
+    """
+    recover_interrupted_update(resources_dir)
+    manifest = fetch_manifest(manifest_url)
+    plan = plan_update(manifest, resources_dir)
+    stats = {"version": manifest.get("version"), "unchanged": 0, "delta": 0, "full": 0, "downloaded_bytes": 0}
+    if all(step["action"] == "keep" for step in plan):
+        stats["unchanged"] = len(plan)
+        if installed_bundle_version(resources_dir) != manifest.get("version"):
+            _write_json_atomic(os.path.join(resources_dir, LOCAL_MANIFEST_NAME), manifest)
+        return stats
+
+    staging_dir = os.path.join(resources_dir, STAGING_DIR_NAME)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staged_names = []
+    try:
+        for step in plan:
+            name, entry, action = step["name"], step["entry"], step["action"]
+            if action == "keep": stats["unchanged"] += 1; continue
+            staged_path = os.path.join(staging_dir, *name.split("/"))
+            os.makedirs(os.path.dirname(staged_path), exist_ok=True)
+            received = 0
+            if action == "delta":
+                delta = step["delta"]
+                try:
+                    received = _download(urljoin(manifest_url, delta["url"]), delta["sha256"], delta["size"],
+                                         staged_path + ".delta")
+                    with open(staged_path + ".delta", 'rb') as f: delta_bytes = f.read()
+                    with open(os.path.join(resources_dir, *name.split("/")), 'rb') as f: base = f.read()
+                    content = apply_delta(base, delta_bytes)
+                    if hashlib.sha256(content).hexdigest() != entry["sha256"] or len(content) != entry["size"]:
+                        raise BundleUpdateError(f"델타 적용 결과 체크섬 불일치: {name}")
+                    with open(staged_path, 'wb') as f: f.write(content)
+                    os.remove(staged_path + ".delta")
+                except BundleUpdateError as e: # 델타가 안 되면 전체 파일로
+                    logger.warning(f"{name} 델타 적용 실패 ({e}). 전체 파일을 받습니다.")
+                    stats["downloaded_bytes"] += received; received = 0; action = "full"
+            if action == "full":
+                received = _download(urljoin(manifest_url, entry["url"]), entry["sha256"], entry["size"], staged_path)
+            stats[action] += 1; stats["downloaded_bytes"] += received
+            staged_names.append(name)
+            if progress: progress({"stage": "bundle", "name": name, "action": action, "bytes": received})
+        _commit_staged(resources_dir, manifest, staged_names)
+    finally:
+        if not os.path.exists(os.path.join(resources_dir, JOURNAL_NAME)): # 저널이 남았으면 복구용으로 보존
+            shutil.rmtree(staging_dir, ignore_errors=True)
+    logger.info(f"번들 {stats['version']} 적용 완료: 델타 {stats['delta']}개, 전체 {stats['full']}개, "
+                f"유지 {stats['unchanged']}개, 받은 크기 {stats['downloaded_bytes']} bytes")
+    return stats
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    if len(sys.argv) != 2: print("사용법: python bundle_update.py <manifest URL>"); sys.exit(2)
+    try: print(update_bundle(sys.argv[1]))
+    except BundleUpdateError as e: logger.error(str(e)); sys.exit(1)
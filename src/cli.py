@@ -0,0 +1,208 @@
+# D:\LEB\src\cli.py
+
+"""
+GUI 없이 새로고침/가공을 실행하는 명령줄 진입점 (PyQt를 import하지 않음).
+
+    python -m src.cli refresh [--no-reprocess [--db PATH]] [--compress zlib] [--url URL] [--workers N]
+    python -m src.cli process [--full] [--workers N] [--ndjson] [--stage NAME ...]
+    python -m src.cli serve-refresh [--interval 3600] [--jitter 300]
+
+refresh/process는 잠금 파일(resources/.refresh.lock, run_lock.RunLock)을 잡고 실행합니다.
+refresh의 잠금은 crawler.refresh_all이 잡으므로 앱의 새로고침과도 서로 배타적입니다.
+다른 실행이 잠금을 갖고 있으면 기다리지 않고 'coalesced'로 기록한 뒤 끝냅니다
+(진행 중인 실행이 같은 데이터를 갱신하므로 resources.db를 두고 경쟁하지 않음).
+실행마다 상태/단계별 시간/변경 요약을 JSON 한 줄로 --runs-log 파일(기본 resources/refresh_runs.jsonl)에 덧붙입니다.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import signal
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+
+from src.crawler import refresh_all, load_process_module, ProgressLog
+from src.run_lock import RunLock, LOCK_FILE_NAME
+
+logger = logging.getLogger("leb.cli")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESOURCES_DIR = os.path.join(BASE_DIR, "resources")
+LOCK_PATH = os.path.join(RESOURCES_DIR, LOCK_FILE_NAME)
+RUNS_LOG_PATH = os.path.join(RESOURCES_DIR, "refresh_runs.jsonl")
+DEFAULT_INTERVAL_SEC = 60 * 60
+DEFAULT_JITTER_SEC = 5 * 60
+
+EXIT_OK, EXIT_FAILED, EXIT_CANCELLED = 0, 1, 2
+
+
+def append_run_record(path, record):
+    """실행 기록 한 줄을 JSON lines 파일에 덧붙입니다 (한 번의 write라 다른 실행의 줄과 섞이지 않음)"""
+    if not path: return
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f: f.write(line)
+    except OSError as e:
+        logger.warning(f"실행 기록 저장 실패 ({path}): {e}")
+
+
+def _run_record(command, status, started, **fields):
+    return {"ts": datetime.now(timezone.utc).isoformat(timespec="seconds"), "command": command, "status": status,
+            "pid": os.getpid(), "seconds": round(time.monotonic() - started, 3), **fields}
+
+
+def _log_progress(progress_log):
+    def on_progress(event):
+        line = progress_log(event) if isinstance(event, dict) else None # 로그 문자열은 update_resources 로거가 이미 출력
+        if line: logger.info(line)
+    return on_progress
+
+
+def run_refresh(lock_path=None, runs_log=RUNS_LOG_PATH, cancel=None, reprocess=True, **build_options):
+    """
+    새로고침 한 번. 잠금은 refresh_all이 잡습니다 (lock_path가 없으면 갱신할 DB 폴더의 .refresh.lock).
+    기록한 실행 레코드 dict를 반환합니다.
+    """
+    started = time.monotonic()
+    result = refresh_all(progress=_log_progress(ProgressLog()), cancel=cancel, reprocess=reprocess, lock_path=lock_path,
+                         **build_options)
+    if result.get("coalesced"):
+        record = _run_record("refresh", "coalesced", started)
+        append_run_record(runs_log, record); return record
+    status = "ok" if result["success"] else ("cancelled" if result.get("cancelled") else "failed")
+    build_result = result.get("result") or {}
+    fields = {"timings": {step: round(seconds, 3) for step, seconds in (result.get("timings") or {}).items()},
+              "not_modified": build_result.get("not_modified"), "generation": build_result.get("generation"),
+              "changed": build_result.get("changed"), "unchanged": build_result.get("unchanged"),
+              "failed": build_result.get("failed"), "diff": build_result.get("diff"), "reprocess": result.get("reprocess")}
+    if status != "ok": fields["error"] = result.get("output")
+    record = _run_record("refresh", status, started, **fields)
+    append_run_record(runs_log, record); return record
+
+
+def run_process(lock_path=None, runs_log=RUNS_LOG_PATH, full=False, workers=1, ndjson=None, stages=None):
+    """
+    가공 단계 실행 한 번 (잠금 포함, process_game_data.process_stages). stages가 없으면 등록된 전체 단계.
+    기록한 실행 레코드 dict를 반환합니다. 'stages'는 단계별 상태(ran/skipped/failed/blocked)입니다.
+    """
+    started = time.monotonic(); lock = RunLock(lock_path or LOCK_PATH)
+    if not lock.acquire():
+        logger.info("다른 새로고침/가공이 진행 중입니다. 이번 가공은 건너뜁니다 (coalesced).")
+        record = _run_record("process", "coalesced", started)
+        append_run_record(runs_log, record); return record
+    statuses = {}; stats = None; error = None
+    try:
+        process_game_data = load_process_module()
+        results = process_game_data.process_stages(stages, full=full, workers=workers, ndjson=ndjson)
+        statuses = {name: result["status"] for name, result in results.items()}
+        stats = process_game_data.uniques_stats(results)
+        failed = [name for name, status in statuses.items() if status not in ("ran", "skipped")]
+        if failed: error = f"가공 단계 실패: {', '.join(failed)}"
+    except Exception as e:
+        logger.exception(f"가공 중 예상치 못한 오류 발생: {e}"); error = str(e)
+    finally:
+        lock.release()
+    fields = {"full": full, "workers": workers, "reprocess": stats, "stages": statuses}
+    if error: fields["error"] = error
+    record = _run_record("process", "failed" if error else "ok", started, **fields)
+    append_run_record(runs_log, record); return record
+
+
+def next_delay(interval, jitter, rng=random):
+    """다음 예약 실행까지의 대기 시간: interval + [0, jitter) 무작위 (여러 장비가 같은 시각에 몰리지 않도록)"""
+    return interval + (rng.uniform(0, jitter) if jitter > 0 else 0.0)
+
+
+def serve_refresh(interval=DEFAULT_INTERVAL_SEC, jitter=DEFAULT_JITTER_SEC, stop=None, run_immediately=True,
+                  max_runs=None, **refresh_options):
+    """
+    예약 새로고침 데몬. stop(threading.Event)이 설정될 때까지 interval(+jitter)마다 run_refresh를 실행합니다.
+    실행 도중 stop이 설정되면 그 새로고침도 취소합니다(기존 DB 유지). 실행한 횟수를 반환합니다.
+    """
+    stop = stop or threading.Event(); runs = 0
+    delay = 0.0 if run_immediately else next_delay(interval, jitter)
+    while not stop.wait(delay):
+        run_refresh(cancel=stop, **refresh_options); runs += 1
+        if max_runs is not None and runs >= max_runs: break
+        delay = next_delay(interval, jitter)
+        logger.info(f"다음 새로고침까지 {delay:.0f}초 대기합니다.")
+    return runs
+
+
+def _install_stop_handlers(stop):
+    def handle(signum, frame):
+        logger.info(f"종료 신호({signum})를 받았습니다. 진행 중인 작업을 취소하고 끝냅니다."); stop.set()
+    for sig_name in ("SIGINT", "SIGTERM", "SIGBREAK"):
+        if hasattr(signal, sig_name): signal.signal(getattr(signal, sig_name), handle)
+
+
+def _exit_code(record):
+    return {"ok": EXIT_OK, "coalesced": EXIT_OK, "cancelled": EXIT_CANCELLED}.get(record["status"], EXIT_FAILED)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="LEB 데이터 새로고침/가공 (GUI 없이)")
+    parser.add_argument("--lock", help="잠금 파일 경로 (기본 resources/.refresh.lock, refresh --db면 그 DB 폴더의 .refresh.lock)")
+    parser.add_argument("--runs-log", default=RUNS_LOG_PATH, help="실행 기록 JSON lines 파일 ('-'면 기록 안 함)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="DEBUG 로그 출력")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_refresh_options(command_parser):
+        command_parser.add_argument("--no-reprocess", action="store_true", help="processed_uniques 가공 단계 생략")
+        command_parser.add_argument("--compress", help="엔드포인트 JSON 압축 저장 방식 (update_resources --compress)")
+        command_parser.add_argument("--url", dest="data_url", help="data.json URL")
+        command_parser.add_argument("--db", dest="db_path", help="resources.db 경로 (--no-reprocess와 함께만)")
+        add_workers_option(command_parser)
+
+    def add_workers_option(command_parser):
+        command_parser.add_argument("--workers", type=int, default=1, help="고유 아이템 가공 프로세스 수 (0이면 CPU 수)")
+
+    add_refresh_options(commands.add_parser("refresh", help="data.json 받기 -> resources.db 갱신 -> 가공"))
+    process_parser = commands.add_parser("process", help="resources.db로 processed_uniques 가공")
+    process_parser.add_argument("--full", action="store_true", help="입력 해시와 관계없이 전체 다시 가공")
+    add_workers_option(process_parser)
+    process_parser.add_argument("--ndjson", action="store_true", default=None,
+                                help="processed_uniques.ndjson(+.idx)도 기록 (한 번 만들면 이후 가공에서도 갱신)")
+    process_parser.add_argument("--stage", dest="stages", action="append",
+                                help="이 가공 단계(와 앞 단계)만 실행 (uniques, setBonuses, ailments; 여러 번 지정 가능)")
+    serve_parser = commands.add_parser("serve-refresh", help="주기적으로 새로고침하는 데몬")
+    add_refresh_options(serve_parser)
+    serve_parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_SEC, help="새로고침 간격 (초)")
+    serve_parser.add_argument("--jitter", type=float, default=DEFAULT_JITTER_SEC, help="간격에 더할 무작위 지연 최대값 (초)")
+    serve_parser.add_argument("--no-initial-run", action="store_true", help="시작하자마자 실행하지 않고 첫 간격을 기다림")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser(); args = parser.parse_args(argv)
+    if args.command != "process" and args.db_path and not args.no_reprocess: # 가공은 항상 기본 resources/resources.db를 읽음
+        parser.error("--db는 --no-reprocess와 함께 사용하세요 (가공 단계는 기본 resources/resources.db를 읽습니다)")
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='[%(asctime)s] %(levelname)s (%(name)s): %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    runs_log = None if args.runs_log == "-" else args.runs_log
+    if args.command == "process":
+        return _exit_code(run_process(lock_path=args.lock, runs_log=runs_log, full=args.full, workers=args.workers,
+                                          ndjson=args.ndjson, stages=args.stages))
+    build_options = {key: value for key, value in (("compress", args.compress), ("data_url", args.data_url),
+                                                   ("db_path", args.db_path)) if value is not None}
+    refresh_options = dict(lock_path=args.lock, runs_log=runs_log, reprocess=not args.no_reprocess, workers=args.workers,
+                           **build_options)
+    stop = threading.Event(); _install_stop_handlers(stop)
+    if args.command == "refresh":
+        return _exit_code(run_refresh(cancel=stop, **refresh_options))
+    logger.info(f"예약 새로고침 시작: 간격 {args.interval:.0f}초 + 최대 {args.jitter:.0f}초 무작위 지연")
+    serve_refresh(interval=args.interval, jitter=args.jitter, stop=stop, run_immediately=not args.no_initial_run,
+                  **refresh_options)
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
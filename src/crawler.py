@@ -2,8 +2,14 @@
 
 import os
 import sys
-import subprocess
 import logging
+import time
+import importlib
+
+try:
+    from src.run_lock import RunLock, LOCK_FILE_NAME, lock_path_for
+except ImportError: # src/crawler.py를 직접 실행한 경우
+    from run_lock import RunLock, LOCK_FILE_NAME, lock_path_for
 
 if __name__ == '__main__':
     logging.basicConfig(
@@ -14,73 +20,232 @@ if __name__ == '__main__':
 logger = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(BASE_DIR, 'scripts')
+RESOURCES_DIR = os.path.join(BASE_DIR, 'resources')
 UPDATE_SCRIPT_NAME = 'update_resources.py'
-UPDATE_SCRIPT_PATH = os.path.join(BASE_DIR, 'scripts', UPDATE_SCRIPT_NAME)
+UPDATE_SCRIPT_PATH = os.path.join(SCRIPTS_DIR, UPDATE_SCRIPT_NAME)
+UPDATE_MODULE_NAME = 'update_resources'
+PROCESS_MODULE_NAME = 'process_game_data'
+DB_UTILS_MODULE_NAMES = ('src.db_utils', 'db_utils') # 앱은 src.db_utils, 가공 스크립트는 db_utils로 따로 임포트
+
+CHANGE_LABELS = {"added": "추가", "removed": "삭제", "modified": "변경"} # change_history의 change 값
+
+DOWNLOAD_LOG_STEP_PERCENT = 10 # 다운로드 진행은 이 비율마다 한 줄씩만 로그에 남김
+DOWNLOAD_LOG_STEP_BYTES = 1024 * 1024 # 전체 크기를 모를 때의 간격
+
+
+def _load_script_module(module_name):
+    """
+    scripts/의 스크립트를 모듈로 불러옵니다.
+    같은 프로세스에서 한 번만 import하므로 두 번째 새로고침부터는 인터프리터/라이브러리 시작 비용이 없습니다.
+    """
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    return importlib.import_module(module_name)
+
+def load_update_module():
+    return _load_script_module(UPDATE_MODULE_NAME)
+
+def load_process_module():
+    return _load_script_module(PROCESS_MODULE_NAME)
+
+def _processing_db_path():
+    """가공 단계(process_game_data)가 읽는 resources.db 경로 (가공 스크립트가 임포트한 db_utils의 DB_PATH)"""
+    load_process_module()
+    return sys.modules['db_utils'].DB_PATH
+
+def close_thread_connections():
+    """
+    현재 스레드가 연 resources.db 읽기 연결을 닫습니다. (로드된 db_utils 모듈마다)
+    작업 스레드(RefreshWorker 등)가 끝날 때 호출하세요. 스레드가 사라져도 연결은 남아 다음 DB 교체를 막습니다.
+    """
+    for name in DB_UTILS_MODULE_NAMES:
+        module = sys.modules.get(name)
+        if module is not None and hasattr(module, "close_thread_connection"): module.close_thread_connection()
+
+
+class _ProgressLogHandler(logging.Handler):
+    """update_resources 로거의 메시지를 progress 콜백으로 전달"""
+
+    def __init__(self, progress):
+        super().__init__(level=logging.INFO); self.progress = progress
+        self.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+
+    def emit(self, record):
+        try: self.progress(self.format(record))
+        except Exception: self.handleError(record)
+
 
-def refresh_all():
+class ProgressLog:
     """
-    scripts/update_resources.py 스크립트를 실행하여 resources.db를 업데이트합니다.
+    build_db 진행 이벤트(dict)를 로그 탭에 표시할 한 줄 문자열로 바꿉니다.
+    다운로드 이벤트는 청크마다 오므로 DOWNLOAD_LOG_STEP_* 간격을 넘을 때만 문자열을 돌려주고, 나머지는 None입니다.
+    """
+
+    def __init__(self):
+        self._last_download_step = None
+
+    def __call__(self, event):
+        stage = event.get("stage"); elapsed = event.get("elapsed", 0.0)
+        if stage == "download":
+            received = event.get("bytes", 0); total = event.get("total")
+            if total:
+                step = min(received * 100 // total, 100) // DOWNLOAD_LOG_STEP_PERCENT
+                detail = f"{received / 1048576:.1f}/{total / 1048576:.1f} MiB ({received * 100 // total}%)"
+            else:
+                step = received // DOWNLOAD_LOG_STEP_BYTES; detail = f"{received / 1048576:.1f} MiB"
+            if step == self._last_download_step: return None
+            self._last_download_step = step
+            return f"[{elapsed:6.2f}s] 다운로드 {detail}"
+        if stage == "store":
+            status = {"changed": "갱신", "unchanged": "변경 없음", "failed": "실패"}.get(event.get("status"), event.get("status"))
+            return f"[{elapsed:6.2f}s] 저장 {event.get('endpoint')}: {status} (카테고리 {event.get('categories_done')}개 처리)"
+        if stage == "commit":
+            return f"[{elapsed:6.2f}s] DB 파일 교체 중..."
+        if stage == "reprocess":
+            return (f"[{elapsed:6.2f}s] 고유 아이템 가공: {event.get('total')}개 중 {event.get('reprocessed')}개 다시 가공, "
+                    f"{event.get('reused')}개 재사용")
+        if stage == "timing":
+            return f"[{elapsed:6.2f}s] 단계 소요 시간 {event.get('step')}: {event.get('seconds', 0.0):.3f}s"
+        return f"[{elapsed:6.2f}s] {stage}"
+
+
+def _reprocess_uniques(report, workers=1):
+    """process_game_data의 증분 가공 (입력 해시가 바뀐 고유 아이템만). 통계 dict 또는 실패 시 None"""
+    process_game_data = load_process_module()
+    stats = process_game_data.main(workers=workers)
+    if stats is not None: report("reprocess", **stats)
+    return stats
+
+
+def refresh_all(progress=None, cancel=None, reprocess=True, workers=1, lock_path=None, **build_options):
+    """
+    새로고침 파이프라인: data.json 받기(fetch) -> resources.db 갱신(rebuild) -> processed_uniques 가공(reprocess).
+    모두 같은 프로세스에서 실행하며, 가공은 입력 해시가 바뀐 고유 아이템만 다시 합니다.
+    실행 내내 잠금(run_lock.RunLock)을 잡으므로 앱/CLI/serve-refresh가 동시에 실행되어도 하나만 DB를 갱신하고,
+    나머지는 기다리지 않고 'coalesced'로 끝납니다.
+    서버 데이터가 그대로여도(304) 가공 결과가 오래되었으면 가공 단계가 따라잡습니다.
+    Args:
+        progress: 진행 콜백 (선택). build_db의 진행 이벤트 dict, 가공/단계 시간 이벤트
+            ({"stage": "reprocess", ...}, {"stage": "timing", "step", "seconds"}), update_resources 로그 문자열을 받습니다.
+        cancel: is_set()을 가진 객체 (threading.Event 등, 선택). 설정되면 기존 DB를 그대로 두고 중단합니다.
+        reprocess: False면 가공 단계를 건너뜀. 가공은 기본 경로(resources/)의 DB와 파일을 사용하므로,
+            build_options의 db_path가 그 DB가 아니면 가공을 켠 채로는 실행하지 않고 실패를 반환합니다.
+        workers: 가공 프로세스 수 (process_game_data.main 참고)
+        lock_path: 잠금 파일 경로 (선택). 없으면 갱신할 DB 폴더의 .refresh.lock (기본 resources/.refresh.lock)
+        **build_options: build_db에 그대로 전달 (compress, data_url, db_path)
     Returns:
-        dict: 작업 성공 여부와 함께 표준 출력 또는 오류 메시지를 포함하는 딕셔너리.
+        dict: {'success', 'output', 'cancelled', 'coalesced'(다른 실행이 잠금을 갖고 있어 건너뜀),
+               'result'(build_db 반환값 또는 None), 'reprocess'(가공 통계 또는 None), 'timings'({단계: 초})}
     """
-    logger.info(f"'{UPDATE_SCRIPT_NAME}' 스크립트를 사용한 전체 데이터 새로고침을 시작합니다...")
-    
+    db_path = build_options.get("db_path")
+    lock = RunLock(lock_path or (lock_path_for(db_path) if db_path else os.path.join(RESOURCES_DIR, LOCK_FILE_NAME)))
+    if not lock.acquire():
+        output = "다른 새로고침/가공이 진행 중입니다. 이번 새로고침은 건너뜁니다 (coalesced)."
+        logger.info(output)
+        return {'success': False, 'output': output, 'cancelled': False, 'coalesced': True, 'result': None,
+                'reprocess': None, 'timings': {}}
+    try:
+        return _refresh_locked(progress, cancel, reprocess, workers, **build_options)
+    finally:
+        lock.release()
+
+
+def _refresh_locked(progress, cancel, reprocess, workers, **build_options):
+    """refresh_all의 본체 (잠금을 잡은 뒤 호출)"""
+    started = time.monotonic(); timings = {}
+    def report(event):
+        if event.get("stage") == "timing": timings[event["step"]] = event["seconds"]
+        if progress is not None: progress(event)
+    def report_stage(stage, **fields):
+        report({"stage": stage, **fields, "elapsed": time.monotonic() - started})
+    def failed(output, cancelled=False):
+        return {'success': False, 'output': output, 'cancelled': cancelled, 'coalesced': False, 'result': None,
+                'reprocess': None, 'timings': timings}
+
+    logger.info(f"'{UPDATE_SCRIPT_NAME}' 모듈을 사용한 전체 데이터 새로고침을 시작합니다...")
+
+    db_path = build_options.get("db_path")
+    if reprocess and db_path:
+        # 가공 단계는 db_utils.DB_PATH의 DB를 읽고 resources/에 기록하므로, 다른 DB를 갱신하면 엉뚱한 데이터를 가공하게 됨
+        try: processing_db = _processing_db_path()
+        except Exception as e: processing_db = None; logger.debug(f"가공 모듈 로드 실패: {e}")
+        if processing_db is None or os.path.abspath(db_path) != os.path.abspath(processing_db):
+            error_message = (f"오류: 가공 단계는 '{processing_db}'를 읽으므로 다른 DB({db_path})를 갱신할 때는 "
+                             f"가공을 끄세요 (reprocess=False, CLI는 --no-reprocess).")
+            logger.error(error_message)
+            return failed(error_message)
+
     if not os.path.isfile(UPDATE_SCRIPT_PATH):
         error_message = f"오류: 업데이트 스크립트를 찾을 수 없습니다 - {UPDATE_SCRIPT_PATH}"
         logger.error(error_message)
-        return {'success': False, 'output': error_message}
+        return failed(error_message)
 
     try:
-        process = subprocess.run(
-            [sys.executable, UPDATE_SCRIPT_PATH],
-            capture_output=True,
-            check=True, # 반환 코드가 0이 아니면 CalledProcessError 발생
-            cwd=os.path.join(BASE_DIR, 'scripts') 
-        )
-        
-        # 바이트 출력을 'utf-8'로 디코딩 (오류 발생 시 대체 문자로)
-        stdout_str = process.stdout.decode('utf-8', errors='replace').strip()
-        stderr_str = process.stderr.decode('utf-8', errors='replace').strip() # 성공 시에도 stderr 확인 가능
-
-        combined_output_parts = []
-        if stdout_str:
-            combined_output_parts.append(f"--- 표준 출력 (STDOUT) ---\n{stdout_str}")
-        if stderr_str: # 성공 시에도 stderr에 로그가 남을 수 있음 (특히 로깅 라이브러리 사용 시)
-            combined_output_parts.append(f"--- 표준 오류 (STDERR) ---\n{stderr_str}")
-        
-        final_output = "\n\n".join(combined_output_parts).strip()
-        
-        if not final_output:
-             final_output = f"'{UPDATE_SCRIPT_NAME}' 스크립트가 성공적으로 실행되었으나, 별도의 출력 메시지가 없습니다."
-
-        logger.info(f"'{UPDATE_SCRIPT_NAME}' 스크립트가 성공적으로 실행되었습니다.")
-        return {'success': True, 'output': final_output}
-
-    except subprocess.CalledProcessError as e:
-        stdout_str = e.stdout.decode('utf-8', errors='replace').strip() if e.stdout else "내용 없음"
-        stderr_str = e.stderr.decode('utf-8', errors='replace').strip() if e.stderr else "내용 없음"
-        
-        error_details = (
-            f"'{UPDATE_SCRIPT_NAME}' 스크립트 실행 중 오류가 발생했습니다 (종료 코드: {e.returncode}).\n"
-            f"--- 표준 출력 (STDOUT) ---\n{stdout_str}\n"
-            f"--- 표준 오류 (STDERR) ---\n{stderr_str}"
-        )
-        logger.error(error_details)
-        return {'success': False, 'output': error_details}
-    
-    except FileNotFoundError:
-        error_message = f"오류: 파이썬 실행 파일 또는 '{UPDATE_SCRIPT_NAME}' 스크립트 경로를 찾을 수 없습니다."
+        update_resources = load_update_module()
+    except Exception as e: # requests 미설치 등
+        error_message = f"오류: '{UPDATE_SCRIPT_NAME}' 모듈을 불러올 수 없습니다: {e}"
+        logger.exception(error_message)
+        return failed(error_message)
+
+    update_logger = update_resources.logger
+    log_handler = None; previous_level = update_logger.level
+    if progress is not None:
+        log_handler = _ProgressLogHandler(progress)
+        update_logger.addHandler(log_handler)
+        if update_logger.getEffectiveLevel() > logging.INFO: update_logger.setLevel(logging.INFO) # 앱은 루트 로거를 설정하지 않음
+    try:
+        result = update_resources.build_db(progress=report, cancel=cancel, **build_options)
+    except update_resources.RefreshCancelled as e:
+        logger.info(str(e))
+        return failed(str(e), cancelled=True)
+    except update_resources.RefreshError as e:
+        error_message = f"'{UPDATE_SCRIPT_NAME}' 새로고침 실패: {e}"
         logger.error(error_message)
-        return {'success': False, 'output': error_message}
-        
+        return failed(error_message)
     except Exception as e:
-        error_message = f"'{UPDATE_SCRIPT_NAME}' 스크립트 실행 중 예상치 못한 오류 발생: {e}"
+        error_message = f"'{UPDATE_SCRIPT_NAME}' 실행 중 예상치 못한 오류 발생: {e}"
         logger.exception(error_message)
-        return {'success': False, 'output': error_message}
+        return failed(error_message)
+    finally:
+        if log_handler is not None: update_logger.removeHandler(log_handler); update_logger.setLevel(previous_level)
+
+    if result["not_modified"]:
+        output = "서버 데이터 변경 없음 (304 Not Modified): DB를 갱신하지 않았습니다."
+    else:
+        output = (f"resources.db 갱신 완료: 변경 {len(result['changed'])}개, 유지 {result['unchanged']}개 "
+                  f"(generation {result['generation']})")
+        for ep, counts in result.get("diff", {}).items():
+            output += f"\n  {ep}: " + ", ".join(f"{CHANGE_LABELS.get(change, change)} {count}" for change, count in counts.items())
+        if result.get("failed"):
+            output += f"\n경고: 저장 실패 {', '.join(result['failed'])} (다음 새로고침에서 data.json을 다시 받습니다)"
+    reprocess_stats = None
+    if reprocess:
+        stage_started = time.monotonic()
+        try:
+            reprocess_stats = _reprocess_uniques(report_stage, workers)
+        except Exception as e:
+            logger.exception(f"고유 아이템 가공 중 예상치 못한 오류 발생: {e}")
+        report_stage("timing", step="reprocess", seconds=time.monotonic() - stage_started)
+        if reprocess_stats is None:
+            output += "\n경고: 고유 아이템 가공 실패. 이전 가공 결과를 그대로 사용합니다."
+        elif reprocess_stats["written"]:
+            output += f"\n고유 아이템 {reprocess_stats['total']}개 중 {reprocess_stats['reprocessed']}개를 다시 가공했습니다."
+        else:
+            output += "\n가공된 고유 아이템 변경 없음."
+    timings["total"] = time.monotonic() - started
+    output += "\n단계별 소요 시간: " + ", ".join(f"{step} {seconds:.3f}s" for step, seconds in timings.items())
+    logger.info(output)
+    return {'success': True, 'output': output, 'cancelled': False, 'coalesced': False, 'result': result,
+            'reprocess': reprocess_stats, 'timings': timings}
 
 if __name__ == '__main__':
-    print(f"'{UPDATE_SCRIPT_NAME}' 스크립트 단독 실행 테스트...")
-    result = refresh_all()
+    print(f"'{UPDATE_SCRIPT_NAME}' 모듈 단독 실행 테스트...")
+    progress_log = ProgressLog()
+    def print_progress(event):
+        line = progress_log(event) if isinstance(event, dict) else None # 로그 문자열은 루트 로거가 이미 출력
+        if line: print(line)
+    result = refresh_all(progress=print_progress)
     print("\n--- 실행 결과 ---")
     print(f"성공 여부: {result['success']}")
     print(f"출력 내용:\n{result['output']}")
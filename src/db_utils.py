@@ -3,108 +3,631 @@
 import sqlite3
 import json
 import os
+import re
+import time
+import codecs
+import inspect
+import functools
+import threading
+import zlib
+import lzma
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+try:
+    from src.json_stream import iter_json_array
+    from src.uniques_snapshot import UniquesSnapshot, ProcessedUniquesList, SnapshotError, file_sha256, snapshot_path_for
+    from src.uniques_ndjson import NdjsonUniques, NdjsonError, DEFAULT_PAGE_SIZE
+    from src.unique_mod_columns import UniqueModColumns, ModColumnsError
+    from src.records import UniqueRecord, ModRecord, AffixRecord, ItemTypeRecord
+except ImportError: # scripts/에서 src 디렉터리를 sys.path에 넣고 db_utils로 임포트한 경우
+    from json_stream import iter_json_array
+    from uniques_snapshot import UniquesSnapshot, ProcessedUniquesList, SnapshotError, file_sha256, snapshot_path_for
+    from uniques_ndjson import NdjsonUniques, NdjsonError, DEFAULT_PAGE_SIZE
+    from unique_mod_columns import UniqueModColumns, ModColumnsError
+    from records import UniqueRecord, ModRecord, AffixRecord, ItemTypeRecord
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, "resources", "resources.db")
 PROCESSED_UNIQUES_PATH = os.path.join(BASE_DIR, "resources", "processed_uniques.json") # 가공된 JSON 파일 경로
+PROCESSED_UNIQUES_SNAPSHOT_PATH = os.path.join(BASE_DIR, "resources", "processed_uniques.bin") # 이진 스냅샷 기준 경로 (실제 파일은 processed_uniques.<JSON 해시>.bin)
+PROCESSED_UNIQUES_NDJSON_PATH = os.path.join(BASE_DIR, "resources", "processed_uniques.ndjson") # JSON Lines + .idx (선택 출력)
+PROCESSED_UNIQUE_MODS_PATH = os.path.join(BASE_DIR, "resources", "processed_unique_mods.bin") # 수치 옵션 열 배열 (필터용)
 
 FALLBACK_CLASSES_DATA = {"클래스 선택...": [], "Mage": [], "Rogue": [], "Primalist": [], "Acolyte": [], "Sentinel": []}
 FALLBACK_UNIQUES_LIST = [] # 원본 및 가공된 데이터 모두 해당
 FALLBACK_ITEM_TYPE_MAP = {}
 FALLBACK_AFFIX_DATA_MAP = {}
+FALLBACK_AFFIX_LIST = []
+FALLBACK_UNIQUES_DATA = FALLBACK_UNIQUES_LIST # 이전 이름 호환용
 
 ITEM_TYPES_ENDPOINT = "maxroll/items/itemTypes"
 UNIQUES_ENDPOINT = "maxroll/items/uniques" # 원본 고유 아이템 엔드포인트
 AFFIXES_ENDPOINT = "maxroll/items/affixes"
+SET_BONUSES_ENDPOINT = "maxroll/items/setBonuses"
+AILMENTS_ENDPOINT = "maxroll/items/ailments"
+
+# 정규화 테이블(update_resources.TYPED_TABLES_SCHEMA)에서 행을 dict로 복원할 때 사용하는 원본 키 이름
+AFFIX_TABLE_KEYS = ("affixId", "property", "specialTag", "affixName", "affixDisplayName", "description")
+
+# ####################################################################
+# # 공유 읽기 전용 연결 계층
+# ####################################################################
+# 스레드마다 하나의 읽기 전용 연결을 열어 재사용합니다. (UI 스레드와 RefreshWorker가 동시에 읽기 가능)
+# DB 파일이 교체되거나 수정되면 (inode/mtime/크기 변화) 다음 호출에서 자동으로 다시 엽니다.
+# sqlite3 모듈은 연결마다 SQL 문자열 기준으로 prepared statement를 캐시하므로,
+# 로더들은 항상 같은 상수 SQL 문자열을 사용합니다.
+DB_BUSY_TIMEOUT_SEC = 5.0
+DB_STATEMENT_CACHE_SIZE = 64
+
+_thread_local = threading.local()
+_connections_lock = threading.Lock()
+_open_connections = set()
+_connections_epoch = 0 # close_all_connections() 호출 시 증가 -> 모든 스레드가 재연결
+# 읽기 관문: 공개 로더는 실행 중 _active_reads에 포함되고, 연결을 닫는 쪽(readers_paused)은
+# 진행 중인 읽기가 끝나기를 기다린 뒤 닫고, 블록이 끝날 때까지 새 읽기를 대기시킵니다.
+# (다른 스레드가 쿼리 중인 연결을 닫거나, 닫은 직후 교체 전 파일을 다시 여는 것을 막음)
+DB_CLOSE_WAIT_SEC = 5.0
+_readers_changed = threading.Condition(_connections_lock)
+_active_reads = 0
+_readers_paused = False
+
+def _db_signature(db_path):
+    st = os.stat(db_path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def _db_uri(db_path):
+    return f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro"
+
+def _discard_connection(conn):
+    with _connections_lock: _open_connections.discard(conn)
+    try: conn.close()
+    except sqlite3.Error: pass
+
+@contextmanager
+def _reading():
+    """공개 로더의 실행 구간 (스레드 안에서 중첩 가능, 가장 바깥 호출만 센다)"""
+    global _active_reads
+    depth = getattr(_thread_local, "read_depth", 0)
+    if depth == 0:
+        with _readers_changed:
+            while _readers_paused: _readers_changed.wait()
+            _active_reads += 1
+    _thread_local.read_depth = depth + 1
+    try: yield
+    finally:
+        _thread_local.read_depth = depth
+        if depth == 0:
+            with _readers_changed:
+                _active_reads -= 1; _readers_changed.notify_all()
+
+def _reads_db(func):
+    """DB를 읽는 공개 함수에 읽기 관문을 씌웁니다. (제너레이터는 소비가 끝날 때까지)"""
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            with _reading(): yield from func(*args, **kwargs)
+        return generator_wrapper
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _reading(): return func(*args, **kwargs)
+    return wrapper
+
+def get_connection():
+    """
+    현재 스레드 전용의 읽기 전용 DB 연결을 반환합니다.
+    DB 파일이 없으면 None을 반환합니다. 반환된 연결은 닫지 말고 재사용하세요.
+    모듈 밖에서 직접 쿼리할 때는 readers_paused()와 겹치지 않도록 짧게 사용하세요.
+    """
+    db_path = DB_PATH
+    try: signature = _db_signature(db_path)
+    except OSError: return None
+    state = getattr(_thread_local, "state", None)
+    if state and state["path"] == db_path and state["signature"] == signature and state["epoch"] == _connections_epoch:
+        return state["conn"]
+    if state: _discard_connection(state["conn"])
+    conn = sqlite3.connect(_db_uri(db_path), uri=True, timeout=DB_BUSY_TIMEOUT_SEC,
+                           check_same_thread=False, cached_statements=DB_STATEMENT_CACHE_SIZE)
+    conn.execute("PRAGMA query_only = ON")
+    with _connections_lock: _open_connections.add(conn)
+    _thread_local.state = {"path": db_path, "signature": signature, "epoch": _connections_epoch,
+                           "conn": conn, "tables": {}}
+    return conn
+
+def close_thread_connection():
+    """현재 스레드의 공유 연결을 닫습니다. (작업 스레드가 끝날 때 호출: 스레드가 사라져도 연결이 남지 않도록)"""
+    state = getattr(_thread_local, "state", None)
+    if state is None: return
+    _thread_local.state = None
+    _discard_connection(state["conn"])
+
+@contextmanager
+def readers_paused(timeout=DB_CLOSE_WAIT_SEC):
+    """
+    모든 스레드의 공유 연결을 닫고, 블록이 끝날 때까지 새 읽기를 대기시킵니다. (DB 파일 교체용)
+    진행 중인 읽기는 timeout초까지 기다리고, 그래도 끝나지 않으면 경고 후 닫습니다. (그 읽기는 sqlite3 오류로 끝남)
+    블록을 빠져나온 뒤 각 스레드는 다음 호출에서 새 파일로 다시 연결합니다.
+    """
+    global _connections_epoch, _readers_paused
+    own_reads = 1 if getattr(_thread_local, "read_depth", 0) else 0 # 호출한 스레드 자신의 읽기는 기다리지 않음
+    with _readers_changed:
+        while _readers_paused: _readers_changed.wait() # 다른 교체가 진행 중
+        _readers_paused = True
+        deadline = time.monotonic() + timeout
+        while _active_reads > own_reads:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"경고: DB 읽기 {_active_reads - own_reads}건이 {timeout:.0f}초 안에 끝나지 않아 연결을 강제로 닫습니다."); break
+            _readers_changed.wait(remaining)
+        connections = list(_open_connections); _open_connections.clear()
+        _connections_epoch += 1
+    try:
+        for conn in connections:
+            try: conn.close()
+            except sqlite3.Error: pass
+        yield
+    finally:
+        with _readers_changed:
+            _readers_paused = False; _readers_changed.notify_all()
+
+def close_all_connections():
+    """모든 스레드의 공유 연결을 닫습니다. (DB 파일 교체 전 또는 테스트 정리용)"""
+    with readers_paused(): pass
+
+def _has_rows(conn, table_name):
+    """정규화 테이블이 존재하고 비어있지 않은지 확인합니다. (이전 버전 DB는 endpoints 블롭만 가짐)"""
+    tables = _thread_local.state["tables"]
+    if table_name not in tables:
+        tables[table_name] = (_has_table(conn, table_name)
+                              and conn.execute(f"SELECT 1 FROM {table_name} LIMIT 1").fetchone() is not None)
+    return tables[table_name]
+
+# ####################################################################
+# # 엔드포인트 메모리 캐시 (LRU, 내용 해시/세대 번호로 무효화)
+# ####################################################################
+# 같은 엔드포인트/로더 결과를 한 프로세스 안에서 반복 요청하면 딕셔너리 조회만으로 반환합니다.
+# DB 파일이 바뀌면 (build_db 실행, 파일 교체) 각 항목이 의존하는 endpoints.hash를 한 번의 조회로 비교하여
+# 실제로 내용이 바뀐 항목만 버립니다. 내용이 같은 새로고침은 아무것도 무효화하지 않습니다.
+# 캐시된 객체는 여러 호출자가 공유하므로 읽기 전용으로 취급해야 합니다.
+ENDPOINT_CACHE_MAX_ENTRIES = 16
+CLASSES_ENDPOINT = "maxroll/items/classes"
+
+_cache_lock = threading.Lock()
+_cache_entries = OrderedDict() # 캐시 키 -> (((엔드포인트, 해시), ...), 값)
+_cache_validated = {"path": None, "signature": None}
+
+def _has_table(conn, table_name):
+    tables = _thread_local.state["tables"]
+    if ("exists", table_name) not in tables:
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)).fetchone()
+        tables[("exists", table_name)] = row is not None
+    return tables[("exists", table_name)]
+
+def _endpoint_columns(conn):
+    tables = _thread_local.state["tables"]
+    if "endpoints.columns" not in tables:
+        tables["endpoints.columns"] = frozenset(row[1] for row in conn.execute("PRAGMA table_info(endpoints)"))
+    return tables["endpoints.columns"]
 
+def _has_hash_column(conn):
+    return "hash" in _endpoint_columns(conn)
+
+def _has_codec_column(conn): # 압축 저장 지원 DB (codec/payload 열)
+    return "codec" in _endpoint_columns(conn)
+
+@_reads_db
+def get_db_generation():
+    """build_db가 내용이 바뀔 때마다 올리는 DB 세대 번호 (meta 테이블이 없는 이전 DB는 None)"""
+    conn = get_connection()
+    if conn is None or not _has_table(conn, "meta"): return None
+    row = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+    return int(row[0]) if row else None
+
+@_reads_db
+def get_endpoint_hashes(endpoints=None):
+    """
+    {엔드포인트: 내용 해시} (가공 단계의 입력 지문용). endpoints를 주면 그 엔드포인트만, 없는 엔드포인트는 None.
+    DB가 없거나 hash 열이 없는 이전 DB면 빈 dict (지문을 알 수 없음 -> 가공 단계는 항상 실행)
+    """
+    conn = get_connection()
+    if conn is None or not _has_hash_column(conn): return {}
+    hashes = dict(conn.execute("SELECT endpoint, hash FROM endpoints"))
+    return hashes if endpoints is None else {endpoint: hashes.get(endpoint) for endpoint in endpoints}
+
+def _endpoint_hash(conn, endpoint):
+    if not _has_hash_column(conn): return None
+    row = conn.execute("SELECT hash FROM endpoints WHERE endpoint = ?", (endpoint,)).fetchone()
+    return row[0] if row else None
+
+def _revalidate_cache(conn):
+    """현재 스레드 연결이 보는 DB 상태 기준으로 오래된 캐시 항목을 버립니다. (_cache_lock 보유 상태에서 호출)"""
+    state = _thread_local.state
+    if _cache_validated["path"] == state["path"] and _cache_validated["signature"] == state["signature"]: return
+    if _cache_validated["path"] != state["path"] or not _has_hash_column(conn): _cache_entries.clear()
+    elif _cache_entries:
+        # 세대 번호는 DB 파일마다 따로 증가하므로 (번들 교체 등) 항목별 내용 해시로 판단
+        current_hashes = dict(conn.execute("SELECT endpoint, hash FROM endpoints"))
+        for cache_key, (dependencies, _) in list(_cache_entries.items()):
+            if any(old_hash is None or current_hashes.get(ep) != old_hash for ep, old_hash in dependencies):
+                del _cache_entries[cache_key]
+    _cache_validated.update(path=state["path"], signature=state["signature"])
+
+def _cached_load(cache_key, endpoints, builder):
+    """
+    builder(conn)의 결과를 endpoints의 내용 해시에 묶어 캐시합니다.
+    DB가 없으면 None, builder가 None을 반환하면 캐시하지 않고 None을 반환합니다.
+    """
+    conn = get_connection()
+    if conn is None: return None
+    with _cache_lock:
+        _revalidate_cache(conn)
+        entry = _cache_entries.get(cache_key)
+        if entry is not None:
+            _cache_entries.move_to_end(cache_key)
+            return entry[1]
+    dependencies = tuple((ep, _endpoint_hash(conn, ep)) for ep in endpoints)
+    value = builder(conn)
+    if value is not None:
+        with _cache_lock:
+            _cache_entries[cache_key] = (dependencies, value)
+            _cache_entries.move_to_end(cache_key)
+            while len(_cache_entries) > ENDPOINT_CACHE_MAX_ENTRIES: _cache_entries.popitem(last=False)
+    return value
+
+def clear_endpoint_cache():
+    with _cache_lock:
+        _cache_entries.clear()
+        _cache_validated.update(path=None, signature=None)
+
+# ####################################################################
+# # 압축 저장된 엔드포인트 (update_resources --compress)
+# ####################################################################
+# codec 열이 NULL이면 data 열의 JSON 텍스트를, 아니면 payload 열의 압축된 utf-8 JSON을 사용합니다.
+# codec/payload 열이 없는 이전 DB는 항상 data 열을 사용합니다.
+PAYLOAD_DECOMPRESSORS = {
+    "zlib": zlib.decompressobj,
+    "lzma": lzma.LZMADecompressor,
+}
+
+def _decompressor(codec):
+    factory = PAYLOAD_DECOMPRESSORS.get(codec)
+    if factory is None: raise ValueError(f"지원하지 않는 엔드포인트 압축 형식: {codec}")
+    return factory()
+
+def _iter_decompressed(chunks, codec):
+    decompressor = _decompressor(codec)
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data: yield data
+    flush = getattr(decompressor, "flush", None) # zlib만 남은 버퍼를 가짐
+    if flush: yield flush()
+
+def _endpoint_row(conn, endpoint):
+    """(rowid, codec) 또는 None"""
+    if _has_codec_column(conn):
+        return conn.execute("SELECT rowid, codec FROM endpoints WHERE endpoint = ?", (endpoint,)).fetchone()
+    row = conn.execute("SELECT rowid FROM endpoints WHERE endpoint = ?", (endpoint,)).fetchone()
+    return (row[0], None) if row else None
+
+def _parse_endpoint(conn, endpoint):
+    if _has_codec_column(conn):
+        row = conn.execute("SELECT data, codec, payload FROM endpoints WHERE endpoint = ?", (endpoint,)).fetchone()
+        if row and row[1]:
+            return json.loads(b"".join(_iter_decompressed((row[2],), row[1])).decode("utf-8"))
+    else: row = conn.execute("SELECT data FROM endpoints WHERE endpoint = ?", (endpoint,)).fetchone()
+    return json.loads(row[0]) if row and row[0] else None
+
+@_reads_db
+def get_endpoint(endpoint):
+    """
+    endpoints 테이블의 JSON 데이터를 파싱하여 반환합니다. (예: "maxroll/items/affixes")
+    결과는 캐시되어 공유되므로 수정하지 마세요. 엔드포인트나 DB가 없으면 None.
+    """
+    return _cached_load(("endpoint", endpoint), (endpoint,), lambda conn: _parse_endpoint(conn, endpoint))
+
+# ####################################################################
+# # 스트리밍 엔드포인트 리더
+# ####################################################################
+ENDPOINT_READ_CHUNK_SIZE = 64 * 1024
+
+def _iter_endpoint_bytes(conn, column, rowid):
+    """endpoints의 data/payload 열을 SQLite blob 핸들로 조금씩 읽어 바이트 조각으로 yield 합니다."""
+    if not hasattr(conn, "blobopen"): # Python 3.11 미만: 증분 blob I/O 없음
+        value = conn.execute(f"SELECT {column} FROM endpoints WHERE rowid = ?", (rowid,)).fetchone()[0]
+        yield value.encode("utf-8") if isinstance(value, str) else value
+        return
+    with conn.blobopen("endpoints", column, rowid, readonly=True) as blob:
+        while True:
+            chunk = blob.read(ENDPOINT_READ_CHUNK_SIZE)
+            if not chunk: break
+            yield chunk
+
+def _iter_endpoint_text(conn, rowid, codec=None):
+    """엔드포인트 JSON 텍스트를 문자열 조각으로 yield 합니다. (압축된 경우 스트리밍으로 해제)"""
+    chunks = _iter_endpoint_bytes(conn, "payload" if codec else "data", rowid)
+    if codec: chunks = _iter_decompressed(chunks, codec)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in chunks: yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+@_reads_db
+def iter_endpoint(endpoint):
+    """
+    엔드포인트의 레코드를 하나씩 yield 합니다. (예: iter_endpoint("maxroll/items/affixes"))
+    전체 JSON을 한 번에 파싱하지 않으므로 메모리 사용량이 레코드 수에 비례해 늘지 않습니다.
+    호출한 스레드 안에서 끝까지 소비하세요. (스레드별 공유 연결을 사용)
+    """
+    conn = get_connection()
+    if conn is None: return
+    if endpoint == UNIQUES_ENDPOINT and _has_rows(conn, "uniques"):
+        for row in conn.execute("SELECT data FROM uniques ORDER BY position"):
+            yield json.loads(row[0])
+        return
+    row = _endpoint_row(conn, endpoint)
+    if row is None: return
+    yield from iter_json_array(_iter_endpoint_text(conn, row[0], row[1]))
+
+# ####################################################################
+
+def _classes_from_tables(cursor):
+    processed_data = {"클래스 선택...": []}
+    masteries_by_class = {}
+    cursor.execute("SELECT class_position, name FROM masteries "
+                   "WHERE name IS NOT NULL AND name != '' AND localization_key GLOB 'Mastery_*' "
+                   "ORDER BY class_position, position")
+    for class_pos, mastery_name in cursor.fetchall():
+        masteries_by_class.setdefault(class_pos, []).append(mastery_name)
+    cursor.execute("SELECT position, class_name FROM classes ORDER BY position")
+    for class_pos, class_name in cursor.fetchall():
+        processed_data[class_name] = masteries_by_class.get(class_pos, [])
+    return processed_data
+
+def _build_classes(conn):
+    if _has_rows(conn, "classes"):
+        processed_data = _classes_from_tables(conn.cursor())
+        if len(processed_data) > 1: return processed_data
+    processed_data = {"클래스 선택...": []}
+    classes_list_from_db = get_endpoint(CLASSES_ENDPOINT)
+    if classes_list_from_db:
+        for class_entry in classes_list_from_db:
+            if isinstance(class_entry, dict):
+                base_class_name = class_entry.get("className")
+                masteries_raw = class_entry.get("masteries", [])
+                mastery_names = []
+                if isinstance(masteries_raw, list):
+                    for mastery_detail in masteries_raw:
+                        if isinstance(mastery_detail, dict):
+                            mastery_name = mastery_detail.get("name")
+                            loc_key = mastery_detail.get("localizationKey", "")
+                            if mastery_name and loc_key.startswith("Mastery_"):
+                                mastery_names.append(mastery_name)
+                if base_class_name: processed_data[base_class_name] = mastery_names
+        if len(processed_data) > 1: return processed_data
+    return None
+
+@_reads_db
 def get_classes_from_db():
-    conn = None; processed_data = {"클래스 선택...": []} 
     try:
-        if not os.path.exists(DB_PATH): print(f"경고: DB 파일({DB_PATH}) 없음 (클래스). 폴백 사용."); return FALLBACK_CLASSES_DATA.copy()
-        conn = sqlite3.connect(DB_PATH); cursor = conn.cursor()
-        cursor.execute("SELECT data FROM endpoints WHERE endpoint = ?", ("maxroll/items/classes",))
-        row = cursor.fetchone()
-        if row and row[0]:
-            classes_list_from_db = json.loads(row[0]) 
-            for class_entry in classes_list_from_db:
-                if isinstance(class_entry, dict):
-                    base_class_name = class_entry.get("className")
-                    masteries_raw = class_entry.get("masteries", [])
-                    mastery_names = []
-                    if isinstance(masteries_raw, list):
-                        for mastery_detail in masteries_raw:
-                            if isinstance(mastery_detail, dict):
-                                mastery_name = mastery_detail.get("name")
-                                loc_key = mastery_detail.get("localizationKey", "")
-                                if mastery_name and loc_key.startswith("Mastery_"):
-                                    mastery_names.append(mastery_name)
-                    if base_class_name: processed_data[base_class_name] = mastery_names
-            if len(processed_data) > 1: return processed_data # 성공 시 print는 app_planner에서 하도록 제거
+        if get_connection() is None: print(f"경고: DB 파일({DB_PATH}) 없음 (클래스). 폴백 사용."); return FALLBACK_CLASSES_DATA.copy()
+        processed_data = _cached_load(("classes",), (CLASSES_ENDPOINT,), _build_classes)
+        if processed_data: return {name: list(masteries) for name, masteries in processed_data.items()} # 성공 시 print는 app_planner에서 하도록 제거
         print("경고: 클래스 DB 데이터 문제. 폴백 사용."); return FALLBACK_CLASSES_DATA.copy()
     except Exception as e: print(f"클래스 데이터 로드 오류: {e}. 폴백 사용."); return FALLBACK_CLASSES_DATA.copy()
-    finally:
-        if conn: conn.close()
 
+def _build_uniques(conn):
+    if _has_rows(conn, "uniques"):
+        return [json.loads(row[0]) for row in conn.execute("SELECT data FROM uniques ORDER BY position")]
+    uniques_list_from_db = get_endpoint(UNIQUES_ENDPOINT)
+    return uniques_list_from_db if isinstance(uniques_list_from_db, list) else None
+
+@_reads_db
 def get_uniques_from_db(): # 원본 고유 아이템 리스트 반환 (scripts/process_game_data.py 용)
-    conn = None
     try:
-        if not os.path.exists(DB_PATH): return FALLBACK_UNIQUES_LIST[:] 
-        conn = sqlite3.connect(DB_PATH); cursor = conn.cursor()
-        cursor.execute("SELECT data FROM endpoints WHERE endpoint = ?", (UNIQUES_ENDPOINT,))
-        row = cursor.fetchone()
-        if row and row[0]:
-            uniques_list_from_db = json.loads(row[0]) 
-            if isinstance(uniques_list_from_db, list): return uniques_list_from_db
+        if get_connection() is None: return FALLBACK_UNIQUES_LIST[:] 
+        uniques_list = _cached_load(("uniques",), (UNIQUES_ENDPOINT,), _build_uniques)
+        if uniques_list is not None: return list(uniques_list)
         print(f"경고: '{UNIQUES_ENDPOINT}' 원본 데이터 문제. 폴백 사용."); return FALLBACK_UNIQUES_LIST[:]
     except Exception as e: print(f"원본 고유 아이템 로드 오류: {e}. 폴백 사용."); return FALLBACK_UNIQUES_LIST[:]
-    finally:
-        if conn: conn.close()
 
+@_reads_db
+def get_unique_from_db(unique_id): # uniqueID 하나에 해당하는 원본 고유 아이템 (없으면 None)
+    try:
+        conn = get_connection()
+        if conn is None: return None
+        if _has_rows(conn, "uniques"):
+            row = conn.execute("SELECT data FROM uniques WHERE unique_id = ? ORDER BY position LIMIT 1", (unique_id,)).fetchone()
+            return json.loads(row[0]) if row else None
+        # 정규화 테이블이 없는 이전 DB: 전체 블롭에서 검색
+        for item in get_uniques_from_db():
+            if isinstance(item, dict) and item.get("uniqueID") == unique_id: return item
+        return None
+    except Exception as e: print(f"고유 아이템({unique_id}) 로드 오류: {e}"); return None
+
+def _build_item_type_map(conn):
+    item_type_map = {}
+    if _has_rows(conn, "item_base_types"):
+        for base_id, base_name in conn.execute("SELECT base_type_id, name FROM item_base_types ORDER BY position"):
+            item_type_map[str(base_id)] = {"name": base_name, "subtypes": {}}
+        for base_id, sub_id, sub_name in conn.execute(
+                "SELECT base_type_id, sub_type_id, name FROM item_sub_types ORDER BY base_position, rowid"):
+            item_type_map[str(base_id)]["subtypes"][str(sub_id)] = sub_name
+        return item_type_map
+    raw_item_types_list = get_endpoint(ITEM_TYPES_ENDPOINT)
+    if isinstance(raw_item_types_list, list):
+        for base_type_entry in raw_item_types_list:
+            if isinstance(base_type_entry, dict):
+                base_id = base_type_entry.get("baseTypeID")
+                base_name = base_type_entry.get("displayName") or base_type_entry.get("BaseTypeName") 
+                if base_id is not None and base_name:
+                    str_base_id = str(base_id)
+                    item_type_map[str_base_id] = {"name": base_name, "subtypes": {}}
+                    sub_items_raw = base_type_entry.get("subItems", [])
+                    if isinstance(sub_items_raw, list):
+                        for sub_item_entry in sub_items_raw:
+                            if isinstance(sub_item_entry, dict):
+                                sub_id = sub_item_entry.get("subTypeID")
+                                sub_name = sub_item_entry.get("name") or sub_item_entry.get("displayName")
+                                if sub_id is not None and sub_name:
+                                    item_type_map[str_base_id]["subtypes"][str(sub_id)] = sub_name
+    return item_type_map or None
+
+@_reads_db
 def load_item_type_map_from_db(): # 아이템 유형 이름 맵 반환 (scripts/process_game_data.py 용)
-    conn = None; item_type_map = {}
     try:
-        if not os.path.exists(DB_PATH): return FALLBACK_ITEM_TYPE_MAP.copy()
-        conn = sqlite3.connect(DB_PATH); cursor = conn.cursor()
-        cursor.execute("SELECT data FROM endpoints WHERE endpoint = ?", (ITEM_TYPES_ENDPOINT,))
-        row = cursor.fetchone()
-        if row and row[0]:
-            raw_item_types_list = json.loads(row[0])
-            if isinstance(raw_item_types_list, list):
-                for base_type_entry in raw_item_types_list:
-                    if isinstance(base_type_entry, dict):
-                        base_id = base_type_entry.get("baseTypeID")
-                        base_name = base_type_entry.get("displayName") or base_type_entry.get("BaseTypeName") 
-                        if base_id is not None and base_name:
-                            str_base_id = str(base_id)
-                            item_type_map[str_base_id] = {"name": base_name, "subtypes": {}}
-                            sub_items_raw = base_type_entry.get("subItems", [])
-                            if isinstance(sub_items_raw, list):
-                                for sub_item_entry in sub_items_raw:
-                                    if isinstance(sub_item_entry, dict):
-                                        sub_id = sub_item_entry.get("subTypeID")
-                                        sub_name = sub_item_entry.get("name") or sub_item_entry.get("displayName")
-                                        if sub_id is not None and sub_name:
-                                            item_type_map[str_base_id]["subtypes"][str(sub_id)] = sub_name
-                if item_type_map: return item_type_map
+        if get_connection() is None: return FALLBACK_ITEM_TYPE_MAP.copy()
+        item_type_map = _cached_load(("item_type_map",), (ITEM_TYPES_ENDPOINT,), _build_item_type_map)
+        if item_type_map: return dict(item_type_map)
         print(f"경고: '{ITEM_TYPES_ENDPOINT}' 데이터 문제. 폴백 사용."); return FALLBACK_ITEM_TYPE_MAP.copy()
     except Exception as e: print(f"아이템 유형 로드 오류: {e}. 폴백 사용."); return FALLBACK_ITEM_TYPE_MAP.copy()
-    finally:
-        if conn: conn.close()
 
+def _build_raw_affixes(conn):
+    if _has_rows(conn, "affixes"):
+        # process_game_data가 읽는 열만 조회 (tiers, canRollOn 등 큰 필드는 건너뜀)
+        rows = conn.execute("SELECT affix_id, property, special_tag, affix_name, affix_display_name, description "
+                            "FROM affixes ORDER BY position")
+        return [{k: v for k, v in zip(AFFIX_TABLE_KEYS, row) if v is not None} for row in rows]
+    # 이전 DB: 블롭을 스트리밍으로 읽으며 필요한 키만 남김
+    raw_affixes_list = [{k: affix[k] for k in AFFIX_TABLE_KEYS if k in affix}
+                        for affix in iter_endpoint(AFFIXES_ENDPOINT) if isinstance(affix, dict)]
+    return raw_affixes_list or None
+
+@_reads_db
 def load_raw_affixes_from_db(): # 원본 Affix 리스트 반환 (scripts/process_game_data.py 용)
-    conn = None
     try:
-        if not os.path.exists(DB_PATH): return FALLBACK_AFFIX_LIST[:]
-        conn = sqlite3.connect(DB_PATH); cursor = conn.cursor()
-        cursor.execute("SELECT data FROM endpoints WHERE endpoint = ?", (AFFIXES_ENDPOINT,))
-        row = cursor.fetchone()
-        if row and row[0]:
-            raw_affixes_list = json.loads(row[0])
-            if isinstance(raw_affixes_list, list): return raw_affixes_list
+        if get_connection() is None: return FALLBACK_AFFIX_LIST[:]
+        raw_affixes_list = _cached_load(("raw_affixes",), (AFFIXES_ENDPOINT,), _build_raw_affixes)
+        if raw_affixes_list is not None: return list(raw_affixes_list)
         print(f"경고: '{AFFIXES_ENDPOINT}' 원본 데이터 문제. 폴백 사용."); return FALLBACK_AFFIX_LIST[:]
     except Exception as e: print(f"원본 옵션(Affix) 데이터 로드 오류: {e}. 폴백 사용."); return FALLBACK_AFFIX_LIST[:]
-    finally:
-        if conn: conn.close()
+
+# ####################################################################
+# # 레코드 로더: 원본 dict 대신 records 모듈의 __slots__ 레코드 반환 (필요한 필드만 보관)
+# ####################################################################
+@_reads_db
+def iter_unique_records(): # 원본 고유 아이템을 UniqueRecord로 하나씩 반환 (전체를 메모리에 두지 않음)
+    for item in iter_endpoint(UNIQUES_ENDPOINT):
+        if isinstance(item, dict): yield UniqueRecord.from_raw(item)
+
+@_reads_db
+def iter_unique_record_sources(parse=True): # (원본 JSON 텍스트 또는 None, UniqueRecord) 쌍 (증분 가공의 입력 해시용)
+    conn = get_connection()
+    if conn is not None and _has_rows(conn, "uniques"): # 정규화 테이블: 레코드별 원본 텍스트를 그대로 해시할 수 있음
+        for (data,) in conn.execute("SELECT data FROM uniques ORDER BY position"):
+            if not parse: yield data, None; continue # 파싱은 호출자가 필요할 때 (가공 캐시 미스)
+            item = json.loads(data)
+            if isinstance(item, dict): yield data, UniqueRecord.from_raw(item)
+        return
+    for record in iter_unique_records(): yield None, record
+
+@_reads_db
+def load_unique_records(): # UniqueRecord 리스트 (공유 캐시 객체이므로 수정 금지)
+    try:
+        if get_connection() is None: return FALLBACK_UNIQUES_LIST[:]
+        records = _cached_load(("unique_records",), (UNIQUES_ENDPOINT,), lambda conn: list(iter_unique_records()) or None)
+        if records is not None: return list(records)
+        print(f"경고: '{UNIQUES_ENDPOINT}' 원본 데이터 문제. 폴백 사용."); return FALLBACK_UNIQUES_LIST[:]
+    except Exception as e: print(f"고유 아이템 레코드 로드 오류: {e}. 폴백 사용."); return FALLBACK_UNIQUES_LIST[:]
+
+@_reads_db
+def load_affix_records(): # AffixRecord 리스트 (find_affix_description 등에서 dict 대신 사용 가능)
+    try:
+        if get_connection() is None: return FALLBACK_AFFIX_LIST[:]
+        records = _cached_load(("affix_records",), (AFFIXES_ENDPOINT,),
+                               lambda conn: [AffixRecord.from_raw(affix) for affix in _build_raw_affixes(conn) or ()] or None)
+        if records is not None: return list(records)
+        print(f"경고: '{AFFIXES_ENDPOINT}' 원본 데이터 문제. 폴백 사용."); return FALLBACK_AFFIX_LIST[:]
+    except Exception as e: print(f"옵션(Affix) 레코드 로드 오류: {e}. 폴백 사용."); return FALLBACK_AFFIX_LIST[:]
+
+@_reads_db
+def load_item_type_records(): # {기본 유형 ID 문자열: ItemTypeRecord} (load_item_type_map_from_db와 같은 키)
+    try:
+        if get_connection() is None: return FALLBACK_ITEM_TYPE_MAP.copy()
+        def _build(conn):
+            item_type_map = _build_item_type_map(conn)
+            return {base_id: ItemTypeRecord.from_raw(info) for base_id, info in item_type_map.items()} if item_type_map else None
+        records = _cached_load(("item_type_records",), (ITEM_TYPES_ENDPOINT,), _build)
+        if records: return dict(records)
+        print(f"경고: '{ITEM_TYPES_ENDPOINT}' 데이터 문제. 폴백 사용."); return FALLBACK_ITEM_TYPE_MAP.copy()
+    except Exception as e: print(f"아이템 유형 레코드 로드 오류: {e}. 폴백 사용."); return FALLBACK_ITEM_TYPE_MAP.copy()
+
+# ####################################################################
+# # 세대별 변경 이력 (update_resources가 만든 change_history/generations 테이블)
+# ####################################################################
+@_reads_db
+def get_change_history(since_generation=None, endpoint=None):
+    """
+    DB 세대 사이의 레코드 단위 변경 목록을 반환합니다.
+    Args:
+        since_generation: 이 세대 이후(초과)의 변경. None이면 현재 세대의 변경만.
+            (앱이 마지막으로 읽은 세대를 넘기면 그 뒤의 변경분만 적용할 수 있음)
+        endpoint: 특정 엔드포인트만 (예: UNIQUES_ENDPOINT)
+    Returns:
+        list[dict]: {"generation", "endpoint", "change"("added"/"removed"/"modified"), "key", "fields"} 목록
+            (세대 순). key가 None이면 엔드포인트 전체 단위 변경. 이력이 없는 이전 DB이거나 오류 시 빈 리스트.
+    """
+    try:
+        conn = get_connection()
+        if conn is None or not _has_table(conn, "change_history"): return []
+        if since_generation is None:
+            since_generation = (get_db_generation() or 0) - 1
+        sql = "SELECT generation, endpoint, change, record_key, changed_fields FROM change_history WHERE generation > ?"
+        params = [since_generation]
+        if endpoint is not None: sql += " AND endpoint = ?"; params.append(endpoint)
+        rows = conn.execute(sql + " ORDER BY generation, rowid", params).fetchall()
+        return [{"generation": generation, "endpoint": ep, "change": change, "key": record_key,
+                 "fields": json.loads(fields) if fields else None}
+                for generation, ep, change, record_key, fields in rows]
+    except (sqlite3.Error, ValueError) as e: print(f"변경 이력 조회 오류: {e}"); return []
+
+@_reads_db
+def get_generations():
+    """기록된 세대 목록 [{"generation", "created_at", "etag"}, ...] (오래된 순, 이력이 없으면 빈 리스트)"""
+    try:
+        conn = get_connection()
+        if conn is None or not _has_table(conn, "generations"): return []
+        return [{"generation": generation, "created_at": created_at, "etag": etag}
+                for generation, created_at, etag in conn.execute(
+                    "SELECT generation, created_at, etag FROM generations ORDER BY generation")]
+    except sqlite3.Error as e: print(f"세대 목록 조회 오류: {e}"); return []
+
+# ####################################################################
+# # 전문 검색 (update_resources가 만든 FTS5 search_index 테이블)
+# ####################################################################
+SEARCH_KINDS = ("uniques", "affixes", "ailments")
+SEARCH_DEFAULT_LIMIT = 50
+SEARCH_COLUMN_WEIGHTS = (0.0, 0.0, 0.0, 10.0, 2.0, 1.0) # kind, ref_id, title, name, body, lore 순 (bm25 가중치)
+_SEARCH_TOKEN_PATTERN = re.compile(r"\w+")
+
+def _fts_query(query):
+    """사용자 입력을 FTS5 질의로 변환: 각 단어를 따옴표로 감싼 접두어 검색어로 만들어 AND 결합"""
+    return " ".join(f'"{token}"*' for token in _SEARCH_TOKEN_PATTERN.findall(query))
+
+@_reads_db
+def search(query, kinds=None, limit=SEARCH_DEFAULT_LIMIT):
+    """
+    resources.db의 전문 검색 색인에서 질의와 일치하는 항목을 관련도 순으로 반환합니다.
+    JSON을 파이썬으로 읽지 않고 SQLite 안에서 검색합니다.
+    Args:
+        query: 검색어 (단어마다 접두어 일치, 모든 단어가 일치해야 함)
+        kinds: SEARCH_KINDS 중 검색할 종류 (None이면 전체)
+        limit: 최대 결과 수
+    Returns:
+        list[dict]: {"kind", "id", "title", "score"} 목록. 색인이 없는 이전 DB이거나 오류 시 빈 리스트.
+    """
+    fts_query = _fts_query(query or "")
+    kinds = tuple(kinds) if kinds is not None else SEARCH_KINDS
+    if not fts_query or not kinds: return []
+    try:
+        conn = get_connection()
+        if conn is None or not _has_table(conn, "search_index"): return []
+        weights = ", ".join(str(w) for w in SEARCH_COLUMN_WEIGHTS)
+        rows = conn.execute(
+            f"SELECT kind, ref_id, title, bm25(search_index, {weights}) AS score FROM search_index "
+            f"WHERE search_index MATCH ? AND kind IN ({', '.join('?' * len(kinds))}) ORDER BY score LIMIT ?",
+            (fts_query, *kinds, limit)).fetchall()
+        return [{"kind": kind, "id": ref_id, "title": title, "score": score} for kind, ref_id, title, score in rows]
+    except sqlite3.Error as e: print(f"검색 오류 ({query!r}): {e}"); return []
 
 # ####################################################################
 # # 새로 추가: 가공된 고유 아이템 JSON 파일 로드 함수 (app_planner.py 용)
@@ -136,6 +659,72 @@ def load_processed_uniques_from_json():
         print(f"'{PROCESSED_UNIQUES_PATH}' 파일 로드 중 예기치 않은 오류: {e}. 빈 리스트를 반환합니다.")
         return FALLBACK_UNIQUES_LIST[:]
 
+def load_processed_uniques():
+    """
+    가공된 고유 아이템 목록을 로드합니다. (app_planner.py 용)
+    processed_uniques.json의 해시로 이름 붙은 이진 스냅샷이 있으면 mmap으로 열어 레코드를 필요할 때만 디코딩하고,
+    스냅샷이 없거나 오래되었거나 손상되었으면 NDJSON(있으면, 역시 지연 디코딩), 그다음 JSON 파일을 읽습니다.
+    반환값은 모든 경우 names()/unique_ids()/close()를 지원하는 시퀀스입니다.
+    """
+    if os.path.exists(PROCESSED_UNIQUES_PATH):
+        try: # 스냅샷 파일 이름에 JSON 해시가 들어 있음 (uniques_snapshot.snapshot_path_for)
+            snapshot = UniquesSnapshot.open_for_source(PROCESSED_UNIQUES_SNAPSHOT_PATH, file_sha256(PROCESSED_UNIQUES_PATH))
+            print(f"'{snapshot_path_for(PROCESSED_UNIQUES_SNAPSHOT_PATH, snapshot.source_sha256)}' 스냅샷에서 "
+                  f"{len(snapshot)}개의 가공된 고유 아이템 정보를 로드했습니다.")
+            return snapshot
+        except (SnapshotError, OSError) as e:
+            print(f"경고: 고유 아이템 스냅샷 사용 불가 ({e}).")
+    ndjson = open_processed_uniques_ndjson()
+    if ndjson is not None:
+        print(f"'{PROCESSED_UNIQUES_NDJSON_PATH}'에서 {len(ndjson)}개의 가공된 고유 아이템 정보를 로드했습니다.")
+        return ndjson
+    return ProcessedUniquesList(load_processed_uniques_from_json())
+
+def open_processed_uniques_ndjson(path=None):
+    """
+    processed_uniques.ndjson을 지연 리더(NdjsonUniques)로 엽니다. 인덱스만 읽고 레코드는 접근할 때 한 줄씩 디코딩합니다.
+    processed_uniques.json이 있으면 같은 가공 실행의 결과인지 확인합니다. 없거나 맞지 않으면 None
+    """
+    path = path or PROCESSED_UNIQUES_NDJSON_PATH
+    if not os.path.exists(path): return None
+    try:
+        expected_sha256 = file_sha256(PROCESSED_UNIQUES_PATH) if os.path.exists(PROCESSED_UNIQUES_PATH) else None
+        return NdjsonUniques(path, expected_sha256)
+    except (NdjsonError, OSError) as e:
+        print(f"경고: 고유 아이템 NDJSON 사용 불가 ({e})."); return None
+
+def get_processed_unique(unique_id): # unique_id 하나의 가공된 고유 아이템 (NDJSON에서 그 줄만 디코딩, 없으면 None)
+    ndjson = open_processed_uniques_ndjson()
+    if ndjson is None: return next((item for item in load_processed_uniques_from_json() if item.get('unique_id') == unique_id), None)
+    try: return ndjson.get_by_unique_id(unique_id)
+    finally: ndjson.close()
+
+def load_unique_mod_columns(processed_uniques=None):
+    """
+    고유 아이템 수치 옵션 열 배열(UniqueModColumns, query()로 필터). processed_unique_mods.bin이 processed_uniques.json과
+    맞으면 그 파일을 열고, 없거나 오래되었으면 processed_uniques(없으면 load_processed_uniques())에서 바로 만듭니다.
+    결과 위치는 load_processed_uniques()가 반환하는 시퀀스의 인덱스와 같습니다.
+    """
+    if os.path.exists(PROCESSED_UNIQUE_MODS_PATH):
+        try:
+            expected_sha256 = file_sha256(PROCESSED_UNIQUES_PATH) if os.path.exists(PROCESSED_UNIQUES_PATH) else None
+            return UniqueModColumns.load(PROCESSED_UNIQUE_MODS_PATH, expected_sha256)
+        except (ModColumnsError, OSError) as e:
+            print(f"경고: 수치 옵션 열 파일 사용 불가 ({e}). 가공된 고유 아이템에서 다시 만듭니다.")
+    if processed_uniques is not None: return UniqueModColumns.from_processed(processed_uniques)
+    processed_uniques = load_processed_uniques()
+    try: return UniqueModColumns.from_processed(processed_uniques)
+    finally: processed_uniques.close()
+
+def iter_processed_uniques_pages(page_size=DEFAULT_PAGE_SIZE): # 가공된 고유 아이템을 page_size개씩 (첫 페이지를 먼저 표시하는 용도)
+    ndjson = open_processed_uniques_ndjson()
+    if ndjson is None:
+        items = load_processed_uniques_from_json()
+        for start in range(0, len(items), page_size): yield items[start:start + page_size]
+        return
+    try: yield from ndjson.iter_pages(page_size)
+    finally: ndjson.close()
+
 # ####################################################################
 
 if __name__ == '__main__':
@@ -0,0 +1,124 @@
+# D:\LEB\src\json_stream.py
+
+"""
+큰 JSON 배열/객체를 한 번에 json.loads 하지 않고 원소(멤버) 단위로 읽어내는 증분 파서입니다.
+입력은 문자열 조각(chunk)의 iterable이며, 메모리에는 현재 원소와 읽기 버퍼만 유지됩니다.
+"""
+
+import json
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class JsonStreamError(ValueError):
+    """스트림이 기대한 JSON 구조가 아닐 때 발생합니다."""
+
+
+class ChunkReader:
+    """문자열 조각을 이어 붙이며 JSON 값을 하나씩 디코딩하는 버퍼"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, min_chars=1):
+        """아직 소비하지 않은 버퍼 뒤에 최소 min_chars 글자를 더 읽어 붙입니다. 더 읽을 것이 없으면 False."""
+        parts = [self.buf[self.pos:]]; added = 0
+        for chunk in self._chunks:
+            if chunk:
+                parts.append(chunk); added += len(chunk)
+                if added >= min_chars: break
+        self.buf = "".join(parts); self.pos = 0
+        if added == 0: self.eof = True
+        return added > 0
+
+    def peek(self):
+        """공백을 건너뛴 다음 문자를 반환합니다. (스트림 끝이면 빈 문자열)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE: self.pos += 1
+            if self.pos < len(self.buf): return self.buf[self.pos]
+            if not self._fill(): return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char: raise JsonStreamError(f"JSON 스트림 형식 오류: '{char}' 필요, '{found}' 발견")
+        self.pos += 1
+
+    def value(self):
+        """현재 위치의 JSON 값 하나를 디코딩합니다."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+                # 버퍼 끝에서 끝난 값(예: 숫자 "12" 뒤에 "3"이 올 수 있음)은 더 읽은 뒤 다시 확인
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof: raise
+            # 값이 클수록 버퍼를 두 배씩 늘려 재시도 횟수를 로그 수준으로 유지
+            self._fill(max(len(self.buf) - self.pos, 1))
+
+
+def iter_json_array(chunks):
+    """
+    최상위 JSON 배열의 원소를 하나씩 yield 합니다.
+    Args:
+        chunks: 배열 JSON 텍스트를 순서대로 나눈 문자열 조각들
+    """
+    reader = ChunkReader(chunks)
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        separator = reader.peek()
+        reader.pos += 1
+        if separator == "]": return
+        if separator != ",": raise JsonStreamError(f"JSON 배열 형식 오류: ',' 또는 ']' 필요, '{separator}' 발견")
+
+
+def _iter_object_members(reader, path, expand):
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        return
+    while True:
+        key = reader.value()
+        if not isinstance(key, str): raise JsonStreamError(f"JSON 객체 형식 오류: 키는 문자열이어야 합니다 ({key!r})")
+        reader.expect(":")
+        if key in expand and reader.peek() == "{":
+            yield from _iter_object_members(reader, path + (key,), expand[key])
+        else:
+            yield path + (key,), reader.value()
+        separator = reader.peek()
+        reader.pos += 1
+        if separator == "}": return
+        if separator != ",": raise JsonStreamError(f"JSON 객체 형식 오류: ',' 또는 '}}' 필요, '{separator}' 발견")
+
+
+def _expand_tree(expand):
+    """("items", "a.b") 형태의 키 경로 목록을 {"items": {}, "a": {"b": {}}} 트리로 변환"""
+    tree = {}
+    for dotted in expand:
+        node = tree
+        for part in dotted.split("."): node = node.setdefault(part, {})
+    return tree
+
+
+def iter_json_object(chunks, expand=()):
+    """
+    최상위 JSON 객체의 멤버를 (키 경로 튜플, 값)으로 하나씩 yield 합니다.
+    expand에 적은 키(점으로 구분한 경로 가능)의 값이 객체이면 통째로 디코딩하지 않고
+    그 멤버들을 (("items", "affixes"), 값)처럼 한 단계 더 들어가 yield 합니다.
+    Args:
+        chunks: 객체 JSON 텍스트를 순서대로 나눈 문자열 조각들
+        expand: 펼칠 멤버 키 경로들 (예: ("items",))
+    """
+    reader = ChunkReader(chunks)
+    yield from _iter_object_members(reader, (), _expand_tree(expand))
+    if reader.peek() != "": raise JsonStreamError("JSON 객체 뒤에 불필요한 데이터가 있습니다.")
@@ -0,0 +1,118 @@
+# D:\LEB\src\processing_cache.py
+
+"""
+고유 아이템 가공 캐시 (scripts/process_game_data.py의 증분 가공용, SQLite 파일 하나).
+
+두 가지를 내용 해시로 보관합니다.
+    sources: 원본 레코드 JSON 텍스트의 SHA-256 -> 가공 결과가 참조하는 조회 키 (baseType, mod별 (property, specialTag))
+             레코드를 파싱하지 않고도 입력 해시를 계산할 수 있게 합니다.
+    outputs: 입력 해시(원본 + 참조한 itemType/affix 조회 결과 + 가공기 버전) -> 가공 결과
+             (processed_uniques.json에 쓰는 들여쓰기 조각과 스냅샷용 압축 JSON을 그대로 보관)
+출력 파일과 독립적이라 전체 가공 뒤나 이전 내용으로 되돌린 레코드도 캐시에서 가져옵니다.
+최근 KEEP_RUNS번의 실행에서 쓰이지 않은 항목은 정리합니다.
+캐시는 최적화일 뿐이므로 파일이 깨졌으면 지우고 새로 만듭니다.
+"""
+
+import os
+import json
+import sqlite3
+
+SCHEMA_VERSION = 1
+KEEP_RUNS = 5 # 이 횟수의 실행 동안 쓰이지 않은 항목은 삭제 (되돌린 패치 정도는 캐시에 남도록)
+QUERY_BATCH_SIZE = 500 # SQLite 변수 개수 제한 아래로 IN (...) 조회를 나눔
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS sources (source_sha256 TEXT PRIMARY KEY, deps TEXT NOT NULL, last_run INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS outputs (input_hash TEXT PRIMARY KEY, unique_id TEXT, name_display TEXT,
+                                    fragment TEXT NOT NULL, compact TEXT NOT NULL, last_run INTEGER NOT NULL);
+"""
+
+
+class ProcessingCache:
+    """with 문으로 사용합니다. 정상 종료 시 한 트랜잭션으로 기록하고 오래된 항목을 정리합니다."""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            self._conn = self._open()
+        except sqlite3.DatabaseError: # 깨진 파일 -> 새로 만듦
+            self._remove_files(); self._conn = self._open()
+        self.run = int(self._meta("run") or 0) + 1
+        self._live_sources = (); self._live_outputs = ()
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=DELETE"); conn.executescript(SCHEMA)
+            if conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone() != (str(SCHEMA_VERSION),):
+                conn.executescript("DELETE FROM sources; DELETE FROM outputs;")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            conn.execute("BEGIN")
+        except sqlite3.DatabaseError:
+            conn.close(); raise
+        return conn
+
+    def _remove_files(self):
+        for suffix in ("", "-journal"):
+            try: os.remove(self.path + suffix)
+            except FileNotFoundError: pass
+
+    def _meta(self, key):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _select_many(self, query, keys):
+        keys = list(keys)
+        for start in range(0, len(keys), QUERY_BATCH_SIZE):
+            batch = keys[start:start + QUERY_BATCH_SIZE]
+            yield from self._conn.execute(query.format(",".join("?" * len(batch))), batch)
+
+    def get_deps(self, source_hashes):
+        """{원본 텍스트 SHA-256: 조회 키}. 캐시에 있는 것만 들어 있습니다."""
+        return {source_sha256: json.loads(deps) for source_sha256, deps in
+                self._select_many("SELECT source_sha256, deps FROM sources WHERE source_sha256 IN ({})", set(source_hashes))}
+
+    def put_deps(self, source_sha256, deps):
+        self._conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?)",
+                           (source_sha256, json.dumps(deps, ensure_ascii=False), self.run))
+
+    def get_outputs(self, input_hashes):
+        """{입력 해시: (unique_id, name_display, fragment, compact)}. 캐시에 있는 것만 들어 있습니다."""
+        return {row[0]: (json.loads(row[1]), row[2], row[3], row[4]) for row in
+                self._select_many("SELECT input_hash, unique_id, name_display, fragment, compact FROM outputs "
+                                  "WHERE input_hash IN ({})", set(input_hashes))}
+
+    def put_output(self, input_hash, unique_id, name_display, fragment, compact):
+        self._conn.execute("INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?)",
+                           (input_hash, json.dumps(unique_id), name_display, fragment, compact, self.run))
+
+    def mark_live(self, source_hashes, input_hashes):
+        """현재 데이터가 쓰는 항목들. commit() 때 last_run을 갱신해 정리 대상에서 뺍니다."""
+        self._live_sources = set(source_hashes); self._live_outputs = set(input_hashes)
+
+    def commit(self):
+        """현재 항목의 last_run을 갱신하고 KEEP_RUNS번 넘게 쓰이지 않은 항목을 지운 뒤 기록합니다."""
+        conn = self._conn
+        for table, column, keys in (("sources", "source_sha256", self._live_sources),
+                                    ("outputs", "input_hash", self._live_outputs)):
+            keys = list(keys)
+            for start in range(0, len(keys), QUERY_BATCH_SIZE):
+                batch = keys[start:start + QUERY_BATCH_SIZE]
+                conn.execute(f"UPDATE {table} SET last_run = ? WHERE {column} IN ({','.join('?' * len(batch))})",
+                             [self.run, *batch])
+            conn.execute(f"DELETE FROM {table} WHERE last_run <= ?", (self.run - KEEP_RUNS,))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('run', ?)", (str(self.run),))
+        conn.execute("COMMIT")
+        self._live_sources = (); self._live_outputs = ()
+
+    def close(self):
+        if self._conn.in_transaction: self._conn.execute("ROLLBACK")
+        self._conn.close()
+
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None: self.commit()
+        finally:
+            self.close()
@@ -0,0 +1,193 @@
+# D:\LEB\src\processing_stages.py
+
+"""
+가공 단계 레지스트리와 make 방식 실행기 (scripts/process_game_data.py의 가공 데이터셋들).
+
+단계(Stage)는 읽는 엔드포인트, 입력으로 쓰는 다른 단계(requires), 기록하는 결과 파일을 선언합니다.
+실행기는 단계마다 입력 지문(엔드포인트 내용 해시 + 앞 단계 결과 파일 해시 + 단계 버전)을 계산해
+상태 파일에 기록된 지문과 같고 결과 파일도 그대로면 건너뜁니다. 서로 의존하지 않는 단계는 스레드로 동시에 실행합니다.
+새 데이터셋을 추가해도 그 입력이 바뀌지 않은 새로고침에서는 지문 확인 비용만 듭니다.
+
+엔드포인트 해시가 없으면 (hash 열이 없는 이전 DB 등) 항상 실행합니다.
+"""
+
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    from src.uniques_snapshot import file_sha256
+except ImportError: # scripts/에서 src 디렉터리를 sys.path에 넣고 임포트한 경우
+    from uniques_snapshot import file_sha256
+
+STATE_FORMAT_VERSION = 1
+STATUS_RAN, STATUS_SKIPPED, STATUS_FAILED, STATUS_BLOCKED = "ran", "skipped", "failed", "blocked"
+
+
+class Stage:
+    """
+    가공 단계 하나.
+        name: 단계 이름 (레지스트리 안에서 고유)
+        endpoints: 읽는 resources.db 엔드포인트들
+        outputs: options dict를 받아 기록하는 파일 경로 목록을 반환하는 함수 (경로 상수를 실행 시점에 읽도록)
+        optional_outputs: 같은 형식이지만 없어도 실패가 아닌 파일들 (예: 이진 스냅샷). 있던 파일이 사라지면 다시 실행
+        run: options dict를 받아 가공하고 결과(통계 등 JSON 직렬화 가능한 값)를 반환하는 함수. 실패 시 None
+        requires: 결과 파일을 입력으로 쓰는 앞 단계 이름들
+        version: 가공 결과 형식이 바뀌면 올림 (지문이 바뀌어 다시 실행)
+    """
+
+    def __init__(self, name, endpoints, outputs, run, requires=(), version=1, description="", optional_outputs=None):
+        self.name = name; self.endpoints = tuple(endpoints); self.outputs = outputs; self.run = run
+        self.optional_outputs = optional_outputs or (lambda options: [])
+        self.requires = tuple(requires); self.version = version; self.description = description
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+class StageRegistry:
+    """등록 순서를 유지하는 단계 목록"""
+
+    def __init__(self):
+        self._stages = {}
+
+    def register(self, stage):
+        if stage.name in self._stages: raise ValueError(f"이미 등록된 가공 단계: {stage.name}")
+        self._stages[stage.name] = stage
+        return stage
+
+    def __contains__(self, name): return name in self._stages
+    def __iter__(self): return iter(self._stages.values())
+    def __len__(self): return len(self._stages)
+
+    def get(self, name):
+        stage = self._stages.get(name)
+        if stage is None: raise KeyError(f"알 수 없는 가공 단계: {name} (가능: {', '.join(self._stages)})")
+        return stage
+
+    def names(self):
+        return list(self._stages)
+
+    def resolve(self, targets=None):
+        """targets(없으면 전체)와 그 앞 단계들을 의존 순서대로 반환합니다. 순환 의존이면 ValueError"""
+        ordered = []; visiting = set(); done = set()
+        def visit(name, path):
+            if name in done: return
+            if name in visiting: raise ValueError(f"가공 단계 순환 의존: {' -> '.join(path + [name])}")
+            visiting.add(name); stage = self.get(name)
+            for required in stage.requires: visit(required, path + [name])
+            visiting.discard(name); done.add(name); ordered.append(stage)
+        for name in (self.names() if targets is None else targets): visit(name, [])
+        return ordered
+
+
+def _load_state(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f: state = json.load(f)
+        if state.get("format") == STATE_FORMAT_VERSION and isinstance(state.get("stages"), dict): return state["stages"]
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def _save_state(path, stages):
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"format": STATE_FORMAT_VERSION, "stages": stages}, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def _output_hashes(paths):
+    """{경로: SHA-256 hex} 또는 하나라도 없으면 None"""
+    try: return {path: file_sha256(path).hex() for path in paths}
+    except OSError: return None
+
+
+def _optional_output_hashes(paths):
+    """{경로: SHA-256 hex 또는 None(파일 없음)}"""
+    hashes = {}
+    for path in paths:
+        try: hashes[path] = file_sha256(path).hex()
+        except OSError: hashes[path] = None
+    return hashes
+
+
+def _fingerprint(stage, endpoint_hashes, upstream_outputs):
+    """단계 입력 지문. 엔드포인트 해시를 모르면 None (항상 실행)"""
+    hashes = {endpoint: endpoint_hashes.get(endpoint) for endpoint in stage.endpoints}
+    if any(value is None for value in hashes.values()): return None
+    payload = {"stage": stage.name, "version": stage.version, "endpoints": hashes,
+               "requires": {name: sorted(upstream_outputs[name].values()) for name in stage.requires}}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def run_stages(registry, endpoint_hashes, state_path, targets=None, options=None, force=False, max_workers=None,
+               progress=None):
+    """
+    targets(없으면 전체)와 앞 단계들 중 입력이 바뀐 단계만 실행합니다.
+    Args:
+        endpoint_hashes: {엔드포인트: 내용 해시} (db_utils.get_endpoint_hashes)
+        state_path: 단계별 지문/결과 파일 해시를 기록하는 JSON 파일
+        options: 각 단계의 run/outputs에 넘기는 dict
+        force: True면 지문과 관계없이 모두 실행
+        max_workers: 동시에 실행할 단계 수 (기본: 단계 수)
+        progress: 단계가 끝날 때마다 (이름, 결과 dict)로 호출되는 콜백 (선택)
+    Returns:
+        dict: {단계 이름: {"status": ran/skipped/failed/blocked, "seconds", "result"}} (의존 순서)
+        skipped의 result는 마지막으로 실행했을 때의 결과입니다.
+    """
+    options = dict(options or {}); stages = registry.resolve(targets)
+    previous_state = _load_state(state_path); new_state = dict(previous_state)
+    results = {}; upstream_outputs = {}; pending = {stage.name: stage for stage in stages}; running = {}
+
+    def _finish(stage, record, outputs=None, fingerprint=None):
+        results[stage.name] = record
+        if record["status"] in (STATUS_RAN, STATUS_SKIPPED):
+            upstream_outputs[stage.name] = outputs # 뒤 단계 지문에는 필수 결과 파일만
+            new_state[stage.name] = {"fingerprint": fingerprint, "outputs": outputs, "result": record["result"],
+                                     "optional_outputs": _optional_output_hashes(stage.optional_outputs(options))}
+        else:
+            new_state.pop(stage.name, None) # 실패한 단계는 다음 실행에서 다시
+        if progress is not None: progress(stage.name, record)
+
+    def _execute(stage):
+        started = time.monotonic()
+        try: result = stage.run(options)
+        except Exception as e:
+            print(f"가공 단계 '{stage.name}' 오류: {e}"); result = None
+        return result, time.monotonic() - started
+
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(stages), 1), thread_name_prefix="stage") as executor:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(required not in results for required in stage.requires): continue # 앞 단계가 아직 끝나지 않음
+                del pending[name]
+                if any(results[required]["status"] in (STATUS_FAILED, STATUS_BLOCKED) for required in stage.requires):
+                    _finish(stage, {"status": STATUS_BLOCKED, "seconds": 0.0, "result": None}); continue
+                fingerprint = _fingerprint(stage, endpoint_hashes, upstream_outputs)
+                previous = previous_state.get(name) or {}
+                if not force and fingerprint is not None and previous.get("fingerprint") == fingerprint:
+                    outputs = _output_hashes(stage.outputs(options))
+                    if (outputs is not None and outputs == previous.get("outputs") # 결과 파일도 마지막 실행 그대로
+                            and _optional_output_hashes(stage.optional_outputs(options)) == previous.get("optional_outputs", {})):
+                        _finish(stage, {"status": STATUS_SKIPPED, "seconds": 0.0, "result": previous.get("result")},
+                                outputs, fingerprint)
+                        continue
+                running[executor.submit(_execute, stage)] = (stage, fingerprint)
+            if not running: continue # 방금 건너뛴 단계 뒤의 단계들을 다시 확인
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, fingerprint = running.pop(future)
+                result, seconds = future.result()
+                outputs = _output_hashes(stage.outputs(options)) if result is not None else None
+                if outputs is None:
+                    _finish(stage, {"status": STATUS_FAILED, "seconds": seconds, "result": None})
+                else:
+                    _finish(stage, {"status": STATUS_RAN, "seconds": seconds, "result": result}, outputs, fingerprint)
+    try:
+        _save_state(state_path, {name: new_state[name] for name in sorted(new_state) if name in registry})
+    except OSError as e:
+        print(f"경고: 가공 단계 상태 저장 실패 ({e}). 다음 실행에서 모든 단계를 다시 확인합니다.")
+    return {stage.name: results[stage.name] for stage in stages}
@@ -0,0 +1,138 @@
+# D:\LEB\src\records.py
+
+"""
+게임 데이터용 __slots__ 레코드 타입.
+
+Maxroll 원본 dict(고유 아이템 25개, affix 34개 키 등) 중 앱/가공 스크립트가 실제로 읽는 필드만 보관합니다.
+반복되는 문자열은 sys.intern으로 공유하고, 정수 배열(subTypes)은 array로 압축합니다.
+기존 코드가 dict처럼 다룰 수 있도록 원본 키 이름으로 get()/[] 접근을 지원하며,
+원본에 키가 없었던 경우와 값이 None이었던 경우를 구분합니다. (dict.get과 같은 동작)
+"""
+
+import sys
+from array import array
+
+_MISSING = object() # 원본 dict에 키가 없었음을 나타내는 표식
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class _Record:
+    __slots__ = ()
+    FIELDS = () # (원본 키, 슬롯 이름) 목록
+    _SLOT_BY_KEY = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._SLOT_BY_KEY = dict(cls.FIELDS)
+
+    def _fill(self, raw):
+        for key, slot in self.FIELDS:
+            object.__setattr__(self, slot, _intern(raw.get(key, _MISSING)))
+
+    def get(self, key, default=None):
+        slot = self._SLOT_BY_KEY.get(key)
+        if slot is None: return default
+        value = getattr(self, slot)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING: raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self):
+        """원본 키 이름을 가진 dict로 되돌립니다. (없던 키는 제외)"""
+        result = {}
+        for key, slot in self.FIELDS:
+            value = getattr(self, slot)
+            if value is _MISSING: continue
+            if isinstance(value, array): value = value.tolist()
+            elif isinstance(value, tuple): value = [v.to_dict() for v in value]
+            result[key] = value
+        return result
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, s) == getattr(other, s) for _, s in self.FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class ModRecord(_Record):
+    """고유 아이템의 옵션(mod) 하나. value/maxValue는 int/float 구분이 표시 형식에 영향을 주므로 그대로 보관합니다."""
+    FIELDS = (("property", "property"), ("specialTag", "special_tag"), ("value", "value"),
+              ("maxValue", "max_value"), ("canRoll", "can_roll"), ("type", "type"), ("tags", "tags"),
+              ("hideInTooltip", "hide_in_tooltip"))
+    __slots__ = tuple(slot for _, slot in FIELDS)
+
+    @classmethod
+    def from_raw(cls, raw):
+        record = cls.__new__(cls); record._fill(raw)
+        return record
+
+
+class TooltipRecord(_Record):
+    FIELDS = (("description", "description"), ("altText", "alt_text"))
+    __slots__ = tuple(slot for _, slot in FIELDS)
+
+    @classmethod
+    def from_raw(cls, raw):
+        record = cls.__new__(cls); record._fill(raw)
+        return record
+
+
+class UniqueRecord(_Record):
+    FIELDS = (("uniqueID", "unique_id"), ("name", "name"), ("displayName", "display_name"),
+              ("levelRequirement", "level_requirement"), ("loreText", "lore_text"), ("baseType", "base_type"),
+              ("subTypes", "sub_types"), ("mods", "mods"), ("tooltipDescriptions", "tooltip_descriptions"))
+    __slots__ = tuple(slot for _, slot in FIELDS)
+
+    @classmethod
+    def from_raw(cls, raw):
+        record = cls.__new__(cls)
+        record.unique_id = raw.get("uniqueID", _MISSING)
+        record.name = _intern(raw.get("name", _MISSING))
+        record.display_name = _intern(raw.get("displayName", _MISSING))
+        record.level_requirement = raw.get("levelRequirement", _MISSING)
+        record.lore_text = raw.get("loreText", _MISSING)
+        record.base_type = raw.get("baseType", _MISSING)
+        sub_types = raw.get("subTypes", _MISSING)
+        record.sub_types = array("i", sub_types) if isinstance(sub_types, list) else sub_types
+        mods = raw.get("mods", _MISSING)
+        record.mods = tuple(ModRecord.from_raw(m) for m in mods if isinstance(m, dict)) if isinstance(mods, list) else mods
+        tooltips = raw.get("tooltipDescriptions", _MISSING)
+        record.tooltip_descriptions = (tuple(TooltipRecord.from_raw(t) for t in tooltips if isinstance(t, dict))
+                                       if isinstance(tooltips, list) else tooltips)
+        return record
+
+
+class AffixRecord(_Record):
+    FIELDS = (("affixId", "affix_id"), ("property", "property"), ("specialTag", "special_tag"),
+              ("affixName", "affix_name"), ("affixDisplayName", "affix_display_name"), ("description", "description"))
+    __slots__ = tuple(slot for _, slot in FIELDS)
+
+    @classmethod
+    def from_raw(cls, raw):
+        record = cls.__new__(cls); record._fill(raw)
+        return record
+
+
+class ItemTypeRecord(_Record):
+    """load_item_type_map_from_db의 {"name": ..., "subtypes": {...}} 항목에 대응"""
+    FIELDS = (("name", "name"), ("subtypes", "subtypes"))
+    __slots__ = tuple(slot for _, slot in FIELDS)
+
+    @classmethod
+    def from_raw(cls, raw):
+        record = cls.__new__(cls)
+        record.name = _intern(raw.get("name", _MISSING))
+        record.subtypes = {sys.intern(str(k)): _intern(v) for k, v in raw.get("subtypes", {}).items()}
+        return record
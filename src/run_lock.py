@@ -0,0 +1,58 @@
+# D:\LEB\src\run_lock.py
+
+"""
+새로고침/가공 실행 잠금. 앱(RefreshWorker), CLI refresh/process, serve-refresh가 모두 같은 잠금 파일을 잡으므로
+같은 장비에서 동시에 실행되어도 임시 DB와 resources.db 교체를 두고 경쟁하지 않습니다.
+"""
+
+import os
+
+LOCK_FILE_NAME = ".refresh.lock"
+
+
+def lock_path_for(db_path):
+    """DB 파일과 같은 폴더의 잠금 파일 경로 (기본 DB면 resources/.refresh.lock)"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), LOCK_FILE_NAME)
+
+
+class RunLock:
+    """
+    프로세스 간 배타 잠금 (POSIX fcntl.flock / Windows msvcrt.locking).
+    OS 잠금이라 프로세스가 죽으면 자동으로 풀리므로 오래된 잠금 파일을 정리할 필요가 없습니다.
+    같은 프로세스 안에서도 RunLock 객체끼리는 서로 배타적입니다 (파일을 따로 열기 때문).
+    """
+
+    def __init__(self, path):
+        self.path = path; self._file = None
+
+    def acquire(self):
+        """잠금을 잡으면 True, 다른 실행이 갖고 있으면 바로 False (기다리지 않음)"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        lock_file = open(self.path, "a+")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                lock_file.seek(0); msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close(); return False
+        lock_file.seek(0); lock_file.truncate(); lock_file.write(f"{os.getpid()}\n"); lock_file.flush() # 진단용
+        self._file = lock_file
+        return True
+
+    def release(self):
+        if self._file is None: return
+        try:
+            if os.name == "nt":
+                import msvcrt
+                self._file.seek(0); msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close(); self._file = None
+
+    def __enter__(self): return self.acquire()
+    def __exit__(self, *exc): self.release()
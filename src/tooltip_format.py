@@ -0,0 +1,98 @@
+# D:\LEB\src\tooltip_format.py
+
+"""
+고유 아이템 툴팁/옵션 값 표시 문자열 포맷터 (process_game_data에서 사용).
+
+툴팁 설명의 범위 표기는 컴파일된 정규식 하나로 한 번만 훑어 바꿉니다:
+    [min, max, step]%  ->  (min ~ max)%
+    [x, c, y]%         ->  x%            (y는 생략 가능)
+    [x]                ->  x
+그 밖의 대괄호 표기([10,16,1] 처럼 % 없는 범위 등)는 그대로 둡니다.
+예전의 re.sub 세 번과 같은 결과를 냅니다: 세 형식은 서로 겹칠 수 없고 바꾼 결과에 '['가 남지 않기 때문입니다.
+"""
+
+import re
+
+_NUMBER = r'[\d.-]+'
+TOOLTIP_RANGE_RE = re.compile(
+    rf'\[(?:(?P<min>{_NUMBER}),\s*(?P<max>{_NUMBER}),\s*(?P<step>{_NUMBER})\]%'
+    rf'|(?P<const>{_NUMBER}),\s*c,\s*(?P<const_end>[\d.-]*)\]%'
+    rf'|(?P<value>{_NUMBER})\])'
+)
+
+
+def _display(match):
+    group = match.group
+    if group('min') is not None: return f"({group('min')} ~ {group('max')})%"
+    if group('const') is not None: return f"{group('const')}%"
+    return group('value')
+
+
+def format_tooltip(description):
+    """툴팁 설명의 범위 표기를 표시용 문자열로 바꿉니다."""
+    if '[' not in description: return description
+    return TOOLTIP_RANGE_RE.sub(_display, description)
+
+
+def _number(text):
+    try: return float(text)
+    except ValueError: return None # '-', '.' 같은 패턴상 허용되는 비숫자
+
+
+def parse_tooltip(description):
+    """
+    format_tooltip과 같은 표시 문자열과 함께 바꾼 범위 표기들의 구조화 정보를 반환합니다.
+    Returns:
+        (display, ranges): ranges는 등장 순서의 dict 목록
+            {"kind": "range"|"constant"|"value", "min", "max", "step", "percent", "start", "end"}
+            min/max/step은 float(값 하나인 형식은 min == max, step None), start/end는 display 안의 위치
+    """
+    parts = []; ranges = []; position = 0; display_length = 0
+    for match in TOOLTIP_RANGE_RE.finditer(description):
+        prefix = description[position:match.start()]
+        parts.append(prefix); display_length += len(prefix)
+        text = _display(match); group = match.group
+        if group('min') is not None:
+            info = {"kind": "range", "min": _number(group('min')), "max": _number(group('max')),
+                    "step": _number(group('step')), "percent": True}
+        else:
+            kind, raw = ("constant", group('const')) if group('const') is not None else ("value", group('value'))
+            value = _number(raw)
+            info = {"kind": kind, "min": value, "max": value, "step": None, "percent": kind == "constant"}
+        info["start"] = display_length; info["end"] = display_length + len(text)
+        parts.append(text); display_length += len(text); ranges.append(info)
+        position = match.end()
+    if not ranges: return description, ranges
+    parts.append(description[position:])
+    return "".join(parts), ranges
+
+
+def _number_text(val, is_percentage):
+    """부호/단위 없는 숫자 부분 (float는 소수 첫째 자리까지, 끝의 '.0'은 뺌)"""
+    if isinstance(val, float):
+        text = f"{val * 100:.1f}" if is_percentage else f"{val:.1f}"
+        return text[:-2] if text[-2:] == ".0" else text
+    return str(int(val * 100)) if is_percentage else str(val)
+
+
+def format_mod_value(val, is_percent_type, mod_type):
+    """옵션 값 하나의 표시 문자열 (mod_type 0의 양수는 '+', 퍼센트 유형은 100배 후 '%')"""
+    text = _number_text(val, is_percent_type) + ("%" if is_percent_type else "")
+    return "+" + text if mod_type == 0 and isinstance(val, (int, float)) and val > 0 else text
+
+
+def format_mod_value_range(value, max_value, can_roll, mod_type):
+    """옵션 값(굴림 범위가 있으면 '(최소 ~ 최대)')의 표시 문자열. mod_type 1/2(Increased/More)는 퍼센트"""
+    # 가공 시 옵션마다 호출되는 경로라 format_mod_value를 두 번 부르지 않고 펼쳐 씀 (결과는 같음, 최대값에는 '+' 없음)
+    is_percentage = mod_type == 1 or mod_type == 2
+    if isinstance(value, float):
+        text = f"{value * 100:.1f}" if is_percentage else f"{value:.1f}"
+        if text[-2:] == ".0": text = text[:-2]
+    elif is_percentage: text = str(int(value * 100))
+    else: text = str(value)
+    if is_percentage: text += "%"
+    elif mod_type == 0 and isinstance(value, (int, float)) and value > 0: text = "+" + text
+    if can_roll and max_value is not None and value != max_value:
+        high = _number_text(max_value, is_percentage)
+        return f"({text} ~ {high}%)" if is_percentage else f"({text} ~ {high})"
+    return text
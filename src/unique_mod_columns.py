@@ -0,0 +1,194 @@
+# D:\LEB\src\unique_mod_columns.py
+
+"""
+가공된 고유 아이템의 수치 옵션(processed_uniques의 'mods')을 열 배열로 보관하는 필터용 저장소.
+
+    아이템 열  unique_id, base_type, level, mod_start(아이템별 옵션 시작 위치, 아이템 수 + 1개)
+    옵션 열    owner(아이템 위치), property, special_tag, type, tags, min, max, hidden
+
+"반지 중 레벨 60 이하, 치명타 확률 증가 X 이상"처럼 옵션 문장을 훑지 않고 열 비교로 답합니다.
+NumPy가 있으면 벡터 연산으로, 없으면 array 모듈 배열을 한 번 순회해 같은 결과를 냅니다. (NumPy는 선택 의존성)
+결과 위치는 processed_uniques 시퀀스의 인덱스와 같습니다.
+
+파일 형식 (processed_unique_mods.bin, 리틀 엔디언):
+    MAGIC, 헤더 길이(uint32), 헤더 JSON {"format", "source_sha256", "uniques", "mods", "crc32", "columns": [[이름, 타입코드], ...]},
+    이어서 columns 순서대로 각 열의 원시 바이트
+"""
+
+import os
+import sys
+import json
+import math
+import zlib
+import struct
+from array import array
+
+try:
+    import numpy as np
+except ImportError: # 선택 의존성: 없으면 순수 파이썬 경로
+    np = None
+
+MODS_MAGIC = b"LEBMODS\0"
+MODS_FORMAT_VERSION = 1
+PREFIX_STRUCT = struct.Struct("<8sI")
+MISSING_INT = -1 # unique_id/기본 유형/레벨이 없거나 숫자가 아닐 때
+
+UNIQUE_COLUMNS = (("unique_id", "q"), ("base_type", "q"), ("level", "q"), ("mod_start", "q"))
+MOD_COLUMNS = (("owner", "q"), ("property", "q"), ("special_tag", "q"), ("type", "q"), ("tags", "q"),
+               ("min", "d"), ("max", "d"), ("hidden", "b"))
+
+
+class ModColumnsError(Exception):
+    """열 파일이 없거나, 손상되었거나, processed_uniques.json과 맞지 않을 때 발생합니다."""
+
+
+def _int_or_missing(value):
+    return value if isinstance(value, int) and not isinstance(value, bool) else MISSING_INT
+
+
+def _float_or_nan(value):
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+
+
+class UniqueModColumns:
+    """processed_uniques의 수치 옵션 열 배열. from_processed()로 만들거나 load()로 엽니다."""
+
+    def __init__(self, columns):
+        self._columns = columns # 이름 -> array.array
+        self._arrays = None
+        if np is not None: # 복사 없이 같은 버퍼를 보는 ndarray (빈 열은 버퍼가 없을 수 있어 새로 만듦)
+            self._arrays = {name: np.frombuffer(column, dtype=column.typecode) if len(column) else np.empty(0, dtype=column.typecode)
+                            for name, column in columns.items()}
+
+    @classmethod
+    def from_processed(cls, processed_uniques):
+        """가공된 고유 아이템 시퀀스(리스트, UniquesSnapshot 등)에서 열을 만듭니다. 'mods'가 없는 이전 형식은 옵션 0개"""
+        columns = {name: array(typecode) for name, typecode in UNIQUE_COLUMNS + MOD_COLUMNS}
+        unique_id, base_type, level, mod_start = (columns[name] for name, _ in UNIQUE_COLUMNS)
+        owner, property_id, special_tag, mod_type, tags, low, high, hidden = (columns[name] for name, _ in MOD_COLUMNS)
+        for position, item in enumerate(processed_uniques):
+            unique_id.append(_int_or_missing(item.get("unique_id")))
+            base_type.append(_int_or_missing(item.get("base_type_id")))
+            level.append(_int_or_missing(item.get("level_requirement")))
+            mod_start.append(len(owner))
+            for mod in item.get("mods") or ():
+                owner.append(position)
+                property_id.append(_int_or_missing(mod.get("property"))); special_tag.append(_int_or_missing(mod.get("special_tag")))
+                mod_type.append(_int_or_missing(mod.get("type"))); tags.append(_int_or_missing(mod.get("tags")))
+                low.append(_float_or_nan(mod.get("min"))); high.append(_float_or_nan(mod.get("max")))
+                hidden.append(1 if mod.get("hidden") else 0)
+        mod_start.append(len(owner))
+        return cls(columns)
+
+    def __len__(self):
+        return len(self._columns["unique_id"])
+
+    @property
+    def mod_count(self):
+        return len(self._columns["owner"])
+
+    def column(self, name):
+        """열 하나 (NumPy가 있으면 ndarray, 없으면 array.array). 공유 객체이므로 수정 금지"""
+        return self._arrays[name] if self._arrays is not None else self._columns[name]
+
+    def mods_of(self, position):
+        """position번째 아이템의 옵션 위치 범위"""
+        mod_start = self._columns["mod_start"]
+        return range(mod_start[position], mod_start[position + 1])
+
+    def query(self, property_id, special_tag=None, mod_type=None, at_least=None, at_most=None, base_types=None,
+              max_level=None, min_level=None, include_hidden=True):
+        """
+        property_id 옵션이 있는 아이템 위치 목록 (오름차순). 조건은 모두 AND입니다.
+            special_tag / mod_type: 옵션의 specialTag / type (0 추가, 1 증가, 2 배수)가 같아야 함
+            at_least: 최고 굴림(max)이 이 값 이상 (원본 단위: 25% -> 0.25)
+            at_most: 최저 굴림(min)이 이 값 이하
+            base_types: 아이템 기본 유형 ID들 중 하나
+            max_level / min_level: 착용 레벨 범위 (레벨이 없는 아이템은 제외)
+            include_hidden: False면 툴팁에 표시하지 않는 옵션은 보지 않음
+        """
+        if self._arrays is not None: return self._query_numpy(property_id, special_tag, mod_type, at_least, at_most,
+                                                              base_types, max_level, min_level, include_hidden)
+        columns = self._columns; base_types = None if base_types is None else set(base_types)
+        base_type = columns["base_type"]; level = columns["level"]
+        matches = set()
+        for mod, mod_property in enumerate(columns["property"]):
+            if mod_property != property_id: continue
+            position = columns["owner"][mod]
+            if position in matches: continue
+            if special_tag is not None and columns["special_tag"][mod] != special_tag: continue
+            if mod_type is not None and columns["type"][mod] != mod_type: continue
+            if at_least is not None and not columns["max"][mod] >= at_least: continue # NaN은 비교가 모두 거짓
+            if at_most is not None and not columns["min"][mod] <= at_most: continue
+            if not include_hidden and columns["hidden"][mod]: continue
+            if base_types is not None and base_type[position] not in base_types: continue
+            if (max_level is not None or min_level is not None) and level[position] == MISSING_INT: continue
+            if max_level is not None and level[position] > max_level: continue
+            if min_level is not None and level[position] < min_level: continue
+            matches.add(position)
+        return sorted(matches)
+
+    def _query_numpy(self, property_id, special_tag, mod_type, at_least, at_most, base_types, max_level, min_level,
+                     include_hidden):
+        arrays = self._arrays
+        mask = arrays["property"] == property_id
+        if special_tag is not None: mask &= arrays["special_tag"] == special_tag
+        if mod_type is not None: mask &= arrays["type"] == mod_type
+        if at_least is not None: mask &= arrays["max"] >= at_least
+        if at_most is not None: mask &= arrays["min"] <= at_most
+        if not include_hidden: mask &= arrays["hidden"] == 0
+        positions = np.unique(arrays["owner"][mask])
+        keep = np.ones(len(positions), dtype=bool)
+        if base_types is not None: keep &= np.isin(arrays["base_type"][positions], np.fromiter(base_types, dtype=np.int64))
+        level = arrays["level"][positions]
+        if max_level is not None or min_level is not None: keep &= level != MISSING_INT
+        if max_level is not None: keep &= level <= max_level
+        if min_level is not None: keep &= level >= min_level
+        return positions[keep].tolist()
+
+    def save(self, path, source_sha256):
+        """열 파일을 임시 파일에 쓴 뒤 교체합니다. source_sha256: 같은 실행의 processed_uniques.json 해시"""
+        blobs = []
+        for name, _ in UNIQUE_COLUMNS + MOD_COLUMNS:
+            column = self._columns[name]
+            if sys.byteorder == "big": column = array(column.typecode, column); column.byteswap()
+            blobs.append(column.tobytes())
+        body = b"".join(blobs)
+        header = json.dumps({"format": MODS_FORMAT_VERSION, "uniques": len(self), "mods": self.mod_count,
+                             "source_sha256": source_sha256.hex() if isinstance(source_sha256, bytes) else source_sha256,
+                             "crc32": zlib.crc32(body),
+                             "columns": [[name, typecode] for name, typecode in UNIQUE_COLUMNS + MOD_COLUMNS]},
+                            separators=(",", ":")).encode("utf-8")
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(PREFIX_STRUCT.pack(MODS_MAGIC, len(header))); f.write(header); f.write(body)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, expected_source_sha256=None):
+        """save()로 만든 파일을 엽니다. 손상되었거나 expected_source_sha256과 다르면 ModColumnsError"""
+        try:
+            with open(path, 'rb') as f: data = f.read()
+            magic, header_length = PREFIX_STRUCT.unpack_from(data, 0)
+            if magic != MODS_MAGIC: raise ModColumnsError("열 파일 매직 값이 다릅니다.")
+            header = json.loads(data[PREFIX_STRUCT.size:PREFIX_STRUCT.size + header_length].decode("utf-8"))
+        except (OSError, ValueError, struct.error) as e:
+            raise ModColumnsError(f"열 파일을 읽을 수 없습니다: {e}") from e
+        if header.get("format") != MODS_FORMAT_VERSION: raise ModColumnsError(f"지원하지 않는 열 파일 형식: {header.get('format')}")
+        if expected_source_sha256 is not None:
+            expected = expected_source_sha256.hex() if isinstance(expected_source_sha256, bytes) else expected_source_sha256
+            if header.get("source_sha256") != expected: raise ModColumnsError("열 파일이 원본 JSON보다 오래되었습니다.")
+        body = memoryview(data)[PREFIX_STRUCT.size + header_length:]
+        if zlib.crc32(body) != header.get("crc32"): raise ModColumnsError("열 파일 CRC32 불일치")
+        mod_column_names = {name for name, _ in MOD_COLUMNS}
+        columns = {}; offset = 0
+        for name, typecode in header["columns"]:
+            count = header["mods"] if name in mod_column_names else header["uniques"] + (1 if name == "mod_start" else 0)
+            column = array(typecode); size = count * column.itemsize
+            if offset + size > len(body): raise ModColumnsError("열 파일 크기가 헤더와 맞지 않습니다.")
+            column.frombytes(body[offset:offset + size]); offset += size
+            if sys.byteorder == "big": column.byteswap()
+            columns[name] = column
+        if offset != len(body) or set(columns) != {name for name, _ in UNIQUE_COLUMNS + MOD_COLUMNS}:
+            raise ModColumnsError("열 파일 크기가 헤더와 맞지 않습니다.")
+        return cls(columns)
@@ -0,0 +1,115 @@
+# D:\LEB\src\unique_search.py
+
+"""
+가공된 고유 아이템 검색용 메모리 역색인 (app_planner의 아이템 도감 검색창용).
+
+이름, 세부 유형, 옵션 문장, 고유 효과, 이야기 텍스트를 토큰으로 나누어 필드별 가중치와 함께 색인합니다.
+질의의 각 토큰은 접두어로 취급되며(입력 중인 단어도 바로 일치), 완전히 같은 토큰은 더 높은 점수를 받습니다.
+모든 질의 토큰과 일치하는 아이템만 점수 순(동점이면 이름 순)으로 반환합니다.
+"""
+
+import re
+from bisect import bisect_left
+from collections import OrderedDict
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# 필드별 가중치: 이름 일치가 옵션/설명 일치보다 앞에 오도록
+FIELD_WEIGHTS = (
+    ("name_display", 8.0),
+    ("item_type_display_full", 4.0),
+    ("formatted_mods_list", 2.0),
+    ("formatted_tooltips_html_list", 1.5),
+    ("formatted_tooltips_list", 1.5), # 이전 형식 키
+    ("lore_text", 1.0),
+)
+PREFIX_MATCH_FACTOR = 0.5 # 접두어로만 일치한 토큰의 점수 비율
+QUERY_CACHE_MAX_ENTRIES = 64 # 키 입력마다 같은 접두어를 반복 조회하므로 최근 결과를 보관
+SHORT_PREFIX_LENGTH = 2 # 이 길이 이하의 접두어는 일치 어휘가 많으므로 색인 시 점수를 미리 합산
+
+
+def tokenize(text):
+    """대소문자를 무시한 단어 토큰 목록 (한글 포함)"""
+    return TOKEN_PATTERN.findall(text.casefold()) if isinstance(text, str) else []
+
+
+def _field_texts(value):
+    """필드 값(문자열, 문자열 리스트, 툴팁 dict 리스트)에서 색인할 문자열들을 꺼냅니다."""
+    if isinstance(value, str): yield value
+    elif isinstance(value, list):
+        for entry in value:
+            if isinstance(entry, str): yield entry
+            elif isinstance(entry, dict):
+                yield entry.get("description", ""); yield entry.get("altText", "")
+
+
+class UniqueSearchIndex:
+    """
+    processed_uniques 시퀀스(리스트 또는 UniquesSnapshot)에 대한 역색인.
+    결과의 위치(index)는 원본 시퀀스의 인덱스와 같습니다.
+    """
+
+    def __init__(self, processed_uniques):
+        postings = {} # 토큰 -> {아이템 위치: 가중치 합}
+        self._unique_ids = []; self._names = []
+        for position, item in enumerate(processed_uniques):
+            self._unique_ids.append(item.get("unique_id"))
+            self._names.append((item.get("name_display") or "").casefold())
+            for field, weight in FIELD_WEIGHTS:
+                for text in _field_texts(item.get(field)):
+                    for token in tokenize(text):
+                        doc_scores = postings.setdefault(token, {})
+                        doc_scores[position] = doc_scores.get(position, 0.0) + weight
+        self._postings = postings
+        self._vocabulary = sorted(postings) # 접두어 범위 검색용
+        self._short_prefix_scores = {}
+        for length in range(1, SHORT_PREFIX_LENGTH + 1):
+            for term in self._vocabulary:
+                if len(term) >= length: self._short_prefix_scores.setdefault(term[:length], None)
+        for prefix in self._short_prefix_scores: self._short_prefix_scores[prefix] = self._scan_prefix(prefix)
+        self._query_cache = OrderedDict()
+
+    def __len__(self):
+        return len(self._unique_ids)
+
+    def _token_scores(self, query_token):
+        """질의 토큰 하나와 일치하는 {아이템 위치: 점수}"""
+        scores = self._short_prefix_scores.get(query_token)
+        return scores if scores is not None else self._scan_prefix(query_token)
+
+    def _scan_prefix(self, query_token):
+        scores = dict(self._postings.get(query_token, {}))
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, query_token)
+        for i in range(start, len(vocabulary)):
+            term = vocabulary[i]
+            if not term.startswith(query_token): break
+            if term == query_token: continue
+            for position, weight in self._postings[term].items():
+                scores[position] = scores.get(position, 0.0) + weight * PREFIX_MATCH_FACTOR
+        return scores
+
+    def search_positions(self, query, limit=None):
+        """
+        질의와 일치하는 아이템 위치를 점수 순으로 반환합니다.
+        빈 질의는 빈 리스트를 반환합니다. (전체 목록 표시는 호출자가 결정)
+        """
+        query_tokens = tuple(dict.fromkeys(tokenize(query))) # 중복 제거, 순서 유지
+        if not query_tokens: return []
+        ranked = self._query_cache.get(query_tokens)
+        if ranked is None:
+            total = None
+            # 일치 항목이 적은 토큰부터 교집합을 구해 중간 결과를 작게 유지
+            for token_scores in sorted((self._token_scores(t) for t in query_tokens), key=len):
+                if total is None: total = token_scores
+                else: total = {p: s + token_scores[p] for p, s in total.items() if p in token_scores}
+                if not total: break
+            ranked = sorted(total, key=lambda p: (-total[p], self._names[p], p))
+            self._query_cache[query_tokens] = ranked
+            if len(self._query_cache) > QUERY_CACHE_MAX_ENTRIES: self._query_cache.popitem(last=False)
+        else: self._query_cache.move_to_end(query_tokens)
+        return ranked[:limit] if limit is not None else list(ranked)
+
+    def search(self, query, limit=None):
+        """질의와 일치하는 unique_id를 점수 순으로 반환합니다."""
+        return [self._unique_ids[p] for p in self.search_positions(query, limit)]
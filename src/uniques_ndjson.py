@@ -0,0 +1,164 @@
+# D:\LEB\src\uniques_ndjson.py
+
+"""
+가공된 고유 아이템의 JSON Lines(NDJSON) 출력과 오프셋 인덱스 (선택 출력, process_game_data --ndjson).
+
+    processed_uniques.ndjson       한 줄에 가공된 고유 아이템 하나 (압축 JSON, utf-8)
+    processed_uniques.ndjson.idx   작은 JSON 사이드카:
+        {"format": 2, "count", "ndjson_sha256", "source_sha256"(같은 실행의 processed_uniques.json),
+         "offsets": [줄 시작 오프셋..., 파일 끝], "crc32": [줄마다 CRC32...], "unique_ids": [...], "names": [...]}
+
+한 줄씩 이어 쓰므로 전체 목록을 메모리에 만들지 않고, 다른 도구는 줄 단위로 바로 스트리밍할 수 있습니다.
+NdjsonUniques는 인덱스만 읽고 열리며(이름 목록은 레코드 디코딩 없이, NDJSON 크기만 확인), 레코드는
+위치/unique_id/페이지 단위로 필요할 때 한 줄씩 CRC32를 확인하고 디코딩합니다. 전체 확인(ndjson_sha256)은 verify()입니다.
+"""
+
+import os
+import json
+import mmap
+import zlib
+import hashlib
+from collections.abc import Sequence
+
+NDJSON_FORMAT_VERSION = 2
+INDEX_SUFFIX = ".idx"
+DEFAULT_PAGE_SIZE = 50
+
+
+class NdjsonError(Exception):
+    """NDJSON 파일/인덱스가 없거나, 손상되었거나, 원본 JSON과 맞지 않을 때 발생합니다."""
+
+
+class NdjsonWriter:
+    """가공된 레코드를 한 줄씩 기록합니다. finish() 전까지는 임시 파일에만 기록합니다. (SnapshotWriter와 같은 사용법)"""
+
+    def __init__(self, path):
+        self.path = path; self.index_path = path + INDEX_SUFFIX
+        self._temp_path = path + ".tmp"
+        self._file = open(self._temp_path, 'wb')
+        self._digest = hashlib.sha256()
+        self._offsets = [0]; self._crcs = []; self._unique_ids = []; self._names = []
+
+    def add(self, record):
+        self.add_encoded(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                         record.get("unique_id"), record.get("name_display", ""))
+
+    def add_encoded(self, data, unique_id, name_display):
+        """압축 JSON으로 인코딩된 레코드 한 개 (줄바꿈 없음; json.dumps는 문자열 안의 줄바꿈을 이스케이프)"""
+        line = data + b"\n"
+        self._file.write(line); self._digest.update(line)
+        self._offsets.append(self._offsets[-1] + len(line)); self._crcs.append(zlib.crc32(line))
+        self._unique_ids.append(unique_id); self._names.append(name_display)
+
+    def finish(self, source_sha256):
+        """
+        NDJSON을 최종 경로로 옮긴 뒤 인덱스를 기록합니다. 인덱스의 크기(마지막 오프셋)가 NDJSON과 맞지 않으면 열리지 않고,
+        줄마다의 CRC32와 전체 해시로 내용을 확인합니다.
+        """
+        self._file.flush(); os.fsync(self._file.fileno()); self._file.close()
+        os.replace(self._temp_path, self.path)
+        index = {"format": NDJSON_FORMAT_VERSION, "count": len(self._unique_ids), "ndjson_sha256": self._digest.hexdigest(),
+                 "source_sha256": source_sha256.hex() if isinstance(source_sha256, bytes) else source_sha256,
+                 "offsets": self._offsets, "crc32": self._crcs, "unique_ids": self._unique_ids, "names": self._names}
+        temp_index_path = self.index_path + ".tmp"
+        with open(temp_index_path, 'w', encoding='utf-8') as f: json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_index_path, self.index_path)
+        return len(self._unique_ids)
+
+    def abort(self):
+        if not self._file.closed: self._file.close()
+        if os.path.exists(self._temp_path): os.remove(self._temp_path)
+
+
+class NdjsonUniques(Sequence):
+    """
+    NDJSON + 인덱스를 mmap으로 연 지연 리더. UniquesSnapshot과 같은 names()/unique_ids()/verify()/close()를 지원하고,
+    get_by_unique_id()와 page()/iter_pages()로 필요한 레코드만 디코딩합니다. 손상된 줄은 접근할 때 NdjsonError를 냅니다.
+    """
+
+    def __init__(self, path, expected_source_sha256=None):
+        self._file = None; self._mm = None
+        try:
+            with open(path + INDEX_SUFFIX, 'r', encoding='utf-8') as f: index = json.load(f)
+            self._file = open(path, 'rb')
+            size = os.fstat(self._file.fileno()).st_size
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        except (OSError, ValueError) as e:
+            self.close(); raise NdjsonError(f"NDJSON 파일을 열 수 없습니다: {e}") from e
+        try:
+            self._load_index(index, size, expected_source_sha256)
+        except (NdjsonError, KeyError, TypeError) as e:
+            self.close()
+            raise e if isinstance(e, NdjsonError) else NdjsonError(f"NDJSON 인덱스가 손상되었습니다: {e}") from e
+        self._decoded = {}; self._position_by_id = None
+
+    def _load_index(self, index, size, expected_source_sha256):
+        if index.get("format") != NDJSON_FORMAT_VERSION: raise NdjsonError(f"지원하지 않는 NDJSON 인덱스 형식: {index.get('format')}")
+        offsets = index["offsets"]; count = index["count"]
+        if (len(offsets) != count + 1 or len(index["crc32"]) != count or len(index["unique_ids"]) != count
+                or len(index["names"]) != count or offsets[0] != 0 or offsets[-1] != size):
+            raise NdjsonError("NDJSON 크기가 인덱스와 맞지 않습니다.") # 내용은 줄을 읽을 때 CRC32로 확인 (열 때 전체를 읽지 않음)
+        if expected_source_sha256 is not None:
+            expected = expected_source_sha256.hex() if isinstance(expected_source_sha256, bytes) else expected_source_sha256
+            if expected != index["source_sha256"]: raise NdjsonError("NDJSON이 원본 JSON보다 오래되었습니다.")
+        self._offsets = offsets; self._crcs = index["crc32"]; self._count = count
+        self._ndjson_sha256 = index["ndjson_sha256"]
+        self._unique_ids = index["unique_ids"]; self._names = index["names"]
+        self.source_sha256 = index["source_sha256"]
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0: index += self._count
+        if not 0 <= index < self._count: raise IndexError(index)
+        record = self._decoded.get(index)
+        if record is None:
+            try: record = json.loads(self._line(index).decode("utf-8"))
+            except ValueError as e: raise NdjsonError(f"NDJSON {index}번째 줄이 손상되었습니다: {e}") from e
+            self._decoded[index] = record
+        return record
+
+    def _line(self, index):
+        line = self._mm[self._offsets[index]:self._offsets[index + 1]]
+        if zlib.crc32(line) != self._crcs[index]: raise NdjsonError(f"NDJSON {index}번째 줄 CRC32 불일치")
+        return line
+
+    def verify(self):
+        """NDJSON 전체의 SHA-256을 인덱스와 비교합니다 (가공 단계의 최신 여부 확인용). 맞지 않으면 NdjsonError"""
+        if hashlib.sha256(self._mm if self._mm is not None else b"").hexdigest() != self._ndjson_sha256:
+            raise NdjsonError("NDJSON 내용이 인덱스와 맞지 않습니다.")
+
+    def names(self):
+        """레코드를 디코딩하지 않고 name_display 목록을 반환합니다."""
+        return list(self._names)
+
+    def unique_ids(self):
+        return list(self._unique_ids)
+
+    def position_of(self, unique_id):
+        """unique_id의 위치 (없으면 None). 같은 unique_id가 여러 번 있으면 첫 번째"""
+        if self._position_by_id is None:
+            self._position_by_id = {}
+            for position, value in enumerate(self._unique_ids): self._position_by_id.setdefault(value, position)
+        return self._position_by_id.get(unique_id)
+
+    def get_by_unique_id(self, unique_id, default=None):
+        position = self.position_of(unique_id)
+        return default if position is None else self[position]
+
+    def page(self, page_index, page_size=DEFAULT_PAGE_SIZE):
+        """page_index번째 페이지(0부터)의 레코드 목록. 범위를 벗어나면 빈 목록"""
+        start = page_index * page_size
+        return self[start:start + page_size] if page_index >= 0 else []
+
+    def iter_pages(self, page_size=DEFAULT_PAGE_SIZE):
+        """앞에서부터 page_size개씩 디코딩한 목록을 차례로 반환합니다. (첫 화면을 먼저 채우고 나머지는 나중에)"""
+        for start in range(0, self._count, page_size):
+            yield self[start:start + page_size]
+
+    def close(self):
+        if self._mm is not None: self._mm.close(); self._mm = None
+        if self._file is not None and not self._file.closed: self._file.close()
@@ -0,0 +1,242 @@
+# D:\LEB\src\uniques_snapshot.py
+
+"""
+processed_uniques.json의 이진 스냅샷 (앱 시작 시 빠른 로드용).
+
+파일 구조 (리틀 엔디언):
+    헤더     HEADER_STRUCT (매직, 포맷 버전, 레코드 수, 요약/인덱스 위치, 원본 JSON의 SHA-256, 메타데이터 CRC32)
+    레코드   가공된 고유 아이템 하나당 압축 JSON(utf-8) 한 덩어리
+    요약     [[unique_id, name_display], ...] JSON 배열 (목록 UI를 레코드 디코딩 없이 채우기 위함)
+    인덱스   레코드마다 INDEX_ENTRY_STRUCT (오프셋, 길이, 레코드 CRC32)
+
+열 때는 크기와 메타데이터 CRC32(헤더의 CRC 앞부분 + 요약 + 인덱스)만 확인하고, 레코드는 처음 디코딩할 때
+인덱스의 CRC32로 확인합니다 (열 때 파일 전체를 읽지 않음). 전체 확인은 verify()입니다.
+원본 JSON의 해시가 다르면 스냅샷은 오래된 것으로 보고 db_utils가 JSON 파일로 폴백합니다.
+
+파일 이름에는 원본 JSON 해시가 들어갑니다 (snapshot_path_for). 새로 가공하면 항상 새 이름으로 기록하므로
+앱이 mmap으로 열고 있는 이전 스냅샷을 교체하지 않습니다. (Windows는 매핑된 파일을 교체/삭제할 수 없음)
+이전 스냅샷은 remove_stale_snapshots가 지우고, 아직 열려 있으면 다음 가공 때 다시 시도합니다.
+"""
+
+import os
+import json
+import mmap
+import zlib
+import struct
+import hashlib
+from collections.abc import Sequence
+
+SNAPSHOT_MAGIC = b"LEBUNIQ\0"
+SNAPSHOT_FORMAT_VERSION = 2
+HEADER_STRUCT = struct.Struct("<8sHHIQQ32sI") # 마지막 필드가 메타데이터 CRC32
+INDEX_ENTRY_STRUCT = struct.Struct("<QII")
+HASH_CHUNK_SIZE = 64 * 1024
+SNAPSHOT_NAME_HASH_CHARS = 16 # 파일 이름에 넣는 원본 JSON SHA-256 hex 길이
+
+
+class SnapshotError(Exception):
+    """스냅샷이 없거나, 손상되었거나, 원본 JSON과 맞지 않을 때 발생합니다."""
+
+
+def file_sha256(path):
+    """파일 내용의 SHA-256 (32바이트 digest)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def snapshot_path_for(path, source_sha256):
+    """원본 JSON 해시를 이름에 넣은 스냅샷 경로 (processed_uniques.bin -> processed_uniques.<해시 앞 16자리>.bin)"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{source_sha256.hex()[:SNAPSHOT_NAME_HASH_CHARS]}{ext}"
+
+
+def _is_snapshot_name(path, name):
+    root, ext = os.path.splitext(os.path.basename(path))
+    if name == root + ext: return True # 해시 없는 이전 형식 이름
+    if not (name.startswith(root + ".") and name.endswith(ext)): return False
+    digest = name[len(root) + 1:len(name) - len(ext)]
+    return len(digest) == SNAPSHOT_NAME_HASH_CHARS and all(c in "0123456789abcdef" for c in digest)
+
+
+def remove_stale_snapshots(path, keep=None):
+    """path 기준의 스냅샷 파일들 중 keep 외의 것을 지웁니다. 아직 열려 있어 지울 수 없는 파일은 건너뜁니다. 지운 개수 반환"""
+    directory = os.path.dirname(os.path.abspath(path)); removed = 0
+    try: names = os.listdir(directory)
+    except OSError: return 0
+    for name in names:
+        stale_path = os.path.join(directory, name)
+        if not _is_snapshot_name(path, name) or (keep is not None and os.path.abspath(stale_path) == os.path.abspath(keep)):
+            continue
+        try: os.remove(stale_path); removed += 1
+        except OSError: pass # Windows: 앱이 아직 mmap으로 열고 있음 -> 다음 가공 때
+    return removed
+
+
+def encode_record(record):
+    """스냅샷에 저장하는 레코드 한 개의 바이트 (압축 JSON)"""
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class SnapshotWriter:
+    """
+    가공된 레코드를 하나씩 받아 스냅샷 파일을 만듭니다. finish() 전까지는 임시 파일에만 기록합니다.
+    path는 기준 경로이고, 실제 파일은 finish() 때 snapshot_path_for(path, 원본 해시)로 정해집니다. (final_path)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.final_path = None
+        self._temp_path = path + ".tmp"
+        self._file = open(self._temp_path, 'wb')
+        self._file.write(b"\0" * HEADER_STRUCT.size)
+        self._offset = HEADER_STRUCT.size
+        self._entries = []
+        self._summary = []
+
+    def _write(self, data):
+        self._file.write(data)
+        self._offset += len(data)
+
+    def add(self, record):
+        self.add_encoded(encode_record(record), record.get("unique_id"), record.get("name_display", ""))
+
+    def add_encoded(self, data, unique_id, name_display):
+        """encode_record()로 이미 인코딩한 레코드를 추가합니다. (가공 캐시에서 꺼낸 결과용)"""
+        self._entries.append((self._offset, len(data), zlib.crc32(data)))
+        self._summary.append([unique_id, name_display])
+        self._write(data)
+
+    def finish(self, source_sha256):
+        """
+        요약/인덱스/헤더를 기록하고 임시 파일을 원본 해시가 들어간 경로로 옮긴 뒤 이전 스냅샷을 지웁니다.
+        같은 원본의 올바른 스냅샷이 이미 있으면 (앱이 열고 있을 수 있으므로) 교체하지 않고 그대로 씁니다.
+        """
+        summary_offset = self._offset
+        summary = json.dumps(self._summary, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._write(summary)
+        index_offset = self._offset
+        index = b"".join(INDEX_ENTRY_STRUCT.pack(*entry) for entry in self._entries)
+        self._write(index)
+        header = HEADER_STRUCT.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, 0, len(self._entries),
+                                    summary_offset, index_offset, source_sha256, 0)[:-4]
+        self._file.seek(0)
+        self._file.write(header + struct.pack("<I", zlib.crc32(index, zlib.crc32(summary, zlib.crc32(header)))))
+        self._file.flush(); os.fsync(self._file.fileno()); self._file.close()
+        self.final_path = snapshot_path_for(self.path, source_sha256)
+        try:
+            with UniquesSnapshot(self.final_path, source_sha256) as existing: existing.verify() # 같은 원본이면 내용도 같음
+            os.remove(self._temp_path)
+        except SnapshotError:
+            os.replace(self._temp_path, self.final_path)
+        remove_stale_snapshots(self.path, keep=self.final_path)
+        return len(self._entries)
+
+    def abort(self):
+        if not self._file.closed: self._file.close()
+        if os.path.exists(self._temp_path): os.remove(self._temp_path)
+
+
+class UniquesSnapshot(Sequence):
+    """
+    mmap으로 연 스냅샷. 레코드는 인덱스로 접근할 때 처음 한 번만 (CRC32를 확인하고) 디코딩됩니다.
+    손상된 레코드는 그 레코드에 접근할 때 SnapshotError를 냅니다. 목록 UI는 names()/unique_ids()만으로 채울 수 있습니다.
+    open_for_source()는 원본 JSON 해시로 파일 이름을 찾아 엽니다.
+    """
+
+    @classmethod
+    def open_for_source(cls, path, source_sha256):
+        """기준 경로 path와 원본 JSON 해시에 해당하는 스냅샷을 엽니다. 없거나 맞지 않으면 SnapshotError"""
+        return cls(snapshot_path_for(path, source_sha256), source_sha256)
+
+    def __init__(self, path, expected_source_sha256=None):
+        try:
+            self._file = open(path, 'rb')
+        except OSError as e:
+            raise SnapshotError(f"스냅샷 파일을 열 수 없습니다: {e}") from e
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._load_header(expected_source_sha256)
+        except (ValueError, OSError, struct.error) as e:
+            self.close()
+            raise SnapshotError(f"스냅샷 파일이 손상되었습니다: {e}") from e
+        except SnapshotError:
+            self.close()
+            raise
+        self._decoded = {}
+
+    def _load_header(self, expected_source_sha256):
+        mm = self._mm
+        (magic, version, _flags, count, summary_offset, index_offset, source_sha256,
+         crc) = HEADER_STRUCT.unpack_from(mm, 0)
+        if magic != SNAPSHOT_MAGIC: raise SnapshotError("스냅샷 매직 값이 다릅니다.")
+        if version != SNAPSHOT_FORMAT_VERSION: raise SnapshotError(f"지원하지 않는 스냅샷 버전: {version}")
+        if (index_offset + count * INDEX_ENTRY_STRUCT.size != len(mm) or summary_offset > index_offset
+                or summary_offset < HEADER_STRUCT.size):
+            raise SnapshotError("스냅샷 크기가 헤더와 맞지 않습니다.")
+        with memoryview(mm) as view: # 레코드 영역은 읽지 않음
+            if zlib.crc32(view[summary_offset:], zlib.crc32(view[:HEADER_STRUCT.size - 4])) != crc:
+                raise SnapshotError("스냅샷 CRC32 불일치")
+        if expected_source_sha256 is not None and expected_source_sha256 != source_sha256:
+            raise SnapshotError("스냅샷이 원본 JSON보다 오래되었습니다.")
+        self._count = count
+        self._summary_offset = summary_offset; self._index_offset = index_offset
+        self._summary = json.loads(mm[summary_offset:index_offset].decode("utf-8"))
+        self.source_sha256 = source_sha256
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0: index += self._count
+        if not 0 <= index < self._count: raise IndexError(index)
+        record = self._decoded.get(index)
+        if record is None:
+            try: record = json.loads(self._record_bytes(index).decode("utf-8"))
+            except ValueError as e: raise SnapshotError(f"스냅샷 레코드 {index}가 손상되었습니다: {e}") from e
+            self._decoded[index] = record
+        return record
+
+    def _record_bytes(self, index):
+        offset, length, crc = INDEX_ENTRY_STRUCT.unpack_from(self._mm, self._index_offset + index * INDEX_ENTRY_STRUCT.size)
+        if offset < HEADER_STRUCT.size or offset + length > self._summary_offset:
+            raise SnapshotError(f"스냅샷 레코드 {index}의 위치가 잘못되었습니다.")
+        data = self._mm[offset:offset + length]
+        if zlib.crc32(data) != crc: raise SnapshotError(f"스냅샷 레코드 {index} CRC32 불일치")
+        return data
+
+    def verify(self):
+        """모든 레코드의 CRC32를 확인합니다 (디코딩하지 않음). 손상되었으면 SnapshotError"""
+        for index in range(self._count): self._record_bytes(index)
+
+    def names(self):
+        """레코드를 디코딩하지 않고 name_display 목록을 반환합니다."""
+        return [name for _, name in self._summary]
+
+    def unique_ids(self):
+        return [unique_id for unique_id, _ in self._summary]
+
+    def close(self):
+        mm = getattr(self, "_mm", None)
+        if mm is not None: mm.close(); self._mm = None
+        if not self._file.closed: self._file.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+
+class ProcessedUniquesList(list):
+    """JSON 폴백용: UniquesSnapshot과 같은 names()/close() 인터페이스를 가진 리스트"""
+
+    def names(self):
+        return [item.get('name_display', '') for item in self]
+
+    def unique_ids(self):
+        return [item.get('unique_id') for item in self]
+
+    def close(self):
+        pass
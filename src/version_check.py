@@ -1,7 +1,14 @@
 #!/usr/bin/env python3
 # src/version_check.py
 
-import json, logging, os, requests
+import json, logging, os, time, requests
+
+try:
+    from src.bundle_update import manifest_url_from_version_info
+except ImportError: # src 디렉터리에서 직접 실행한 경우
+    from bundle_update import manifest_url_from_version_info
+
+logger = logging.getLogger(__name__)
 
 # 로컬 경로 (UTF-8 BOM 대응)
 LOCAL_VERSION_PATH = os.path.join(os.path.dirname(__file__), '..', 'version.json')
@@ -11,12 +18,11 @@ REMOTE_VERSION_URL = (
     "ShovelMaker/LEB/"
     "master/version.json"
 )
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] %(levelname)s: %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+# 원격 version.json 디스크 캐시: TTL 안에는 요청하지 않고, 지나면 ETag/Last-Modified로 조건부 GET
+# (숨김 파일이라 make_bundle_manifest의 번들에는 포함되지 않음)
+VERSION_CACHE_PATH = os.path.join(os.path.dirname(__file__), '..', 'resources', '.version_check_cache.json')
+VERSION_CACHE_TTL_SEC = 6 * 60 * 60
+REQUEST_TIMEOUT_SEC = 5
 
 def get_local_version() -> str:
     try:
@@ -24,23 +30,88 @@ def get_local_version() -> str:
             data = json.load(f)
         return data.get('version', '')
     except Exception as e:
-        logging.error(f"로컬 버전 읽기 실패: {e}")
+        logger.error(f"로컬 버전 읽기 실패: {e}")
         return ''
 
-def get_remote_version() -> str:
+def _load_cache(cache_path, url) -> dict:
+    """캐시 항목 {url, checked_at, etag, last_modified, data}. 없거나 다른 URL이거나 깨졌으면 빈 dict"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('url') != url or not isinstance(cache.get('data'), dict):
+        return {}
+    return cache
+
+def _save_cache(cache_path, cache):
+    tmp_path = cache_path + '.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError as e: # 캐시는 최적화일 뿐: 저장 실패해도 결과는 그대로 사용
+        logger.warning(f"버전 캐시 저장 실패: {e}")
+
+def fetch_remote_version_info(url=REMOTE_VERSION_URL, cache_path=VERSION_CACHE_PATH, ttl=VERSION_CACHE_TTL_SEC,
+                              force=False) -> (dict, str):
+    """
+    원격 version.json을 디스크 캐시와 함께 가져옵니다.
+    Returns:
+        (data, source): data는 version.json dict(실패하고 캐시도 없으면 빈 dict),
+        source는 'cache'(TTL 안, 요청 없음) / 'not_modified'(304) / 'network' / 'stale'(요청 실패, 오래된 캐시) / 'error'
+    """
+    cache = _load_cache(cache_path, url); now = time.time()
+    if cache and not force and 0 <= now - cache.get('checked_at', 0) < ttl:
+        return cache['data'], 'cache'
+    headers = {}
+    if cache.get('etag'): headers['If-None-Match'] = cache['etag']
+    if cache.get('last_modified'): headers['If-Modified-Since'] = cache['last_modified']
     try:
-        r = requests.get(REMOTE_VERSION_URL, timeout=5)
+        r = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT_SEC)
+        if r.status_code == 304 and cache:
+            cache['checked_at'] = now; _save_cache(cache_path, cache)
+            return cache['data'], 'not_modified'
         r.raise_for_status()
         text = r.content.decode('utf-8-sig')
         data = json.loads(text)
-        return data.get('version', '')
+        if not isinstance(data, dict): raise ValueError("version.json이 객체가 아닙니다")
     except Exception as e:
-        logging.error(f"원격 버전 조회 실패: {e}")
-        return ''
+        logger.error(f"원격 버전 조회 실패: {e}")
+        return (cache['data'], 'stale') if cache else ({}, 'error')
+    _save_cache(cache_path, {'url': url, 'checked_at': now, 'etag': r.headers.get('ETag'),
+                             'last_modified': r.headers.get('Last-Modified'), 'data': data})
+    return data, 'network'
+
+def get_remote_version_info(**kwargs) -> dict:
+    """원격 version.json 전체 (version, url, 증분 업데이트용 manifest 등). 실패 시 빈 dict"""
+    return fetch_remote_version_info(**kwargs)[0]
 
-def check_for_update() -> (bool, str, str):
+def get_remote_version(**kwargs) -> str:
+    return get_remote_version_info(**kwargs).get('version', '')
+
+def check_update_status(**kwargs) -> dict:
+    """
+    업데이트 확인 결과 dict: {'update_available', 'local', 'remote', 'url', 'manifest', 'source'}
+    (url은 원격 version.json의 다운로드 주소, manifest는 resources/ 증분 업데이트 매니페스트의 절대 URL 또는 '',
+     source는 fetch_remote_version_info 참고)
+    """
     local = get_local_version()
-    remote = get_remote_version()
-    if not local or not remote:
-        return False, local, remote
-    return (remote != local), local, remote
+    data, source = fetch_remote_version_info(**kwargs)
+    remote = data.get('version', '')
+    manifest = manifest_url_from_version_info(data, kwargs.get('url', REMOTE_VERSION_URL)) or ''
+    return {'update_available': bool(local and remote and remote != local), 'local': local, 'remote': remote,
+            'url': data.get('url', ''), 'manifest': manifest, 'source': source}
+
+def check_for_update(**kwargs) -> (bool, str, str):
+    status = check_update_status(**kwargs)
+    return status['update_available'], status['local'], status['remote']
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s] %(levelname)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    print(check_update_status())
@@ -0,0 +1,417 @@
+# D:\LEB\tests\test_build_db.py
+
+import os
+import sys
+import gzip
+import json
+import sqlite3
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(BASE_DIR, 'scripts')
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import update_resources
+
+SRC_DIR = os.path.join(BASE_DIR, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+SAMPLE_DATA = {
+    "categories": [{"key": "classes"}, {"key": "affixes"}, {"key": "uniques"}],
+    "items": {
+        "classes": [{"className": "Mage", "classID": 1, "masteries": [{"name": "Mage"}, {"name": "Sorcerer"}]}],
+        "affixes": [{"affixId": 1, "affixName": "Added Armor", "property": 10}],
+        "uniques": [{"uniqueID": 3, "name": "Crown", "displayName": "Fractured Crown", "subTypes": [2]}],
+    },
+}
+
+
+class _DataServer:
+    """ETag/If-None-Match, gzip, Range/If-Range를 지원하는 data.json 대역 서버"""
+
+    def __init__(self):
+        self.body = b""; self.etag = None; self.requests = []
+        self.use_gzip = False
+        self.drop_after = None # 설정 시 이 바이트 수만 보내고 연결을 끊음 (중단된 전송 재현)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                if server.etag and self.headers.get("If-None-Match") == server.etag:
+                    self.send_response(304); self.send_header("ETag", server.etag)
+                    self.send_header("Content-Length", "0"); self.end_headers(); return
+                body = server.body
+                gzipped = server.use_gzip and "gzip" in self.headers.get("Accept-Encoding", "")
+                if gzipped: body = gzip.compress(body, mtime=0)
+                start = 0
+                range_header = self.headers.get("Range")
+                if range_header and self.headers.get("If-Range") == server.etag:
+                    start = int(range_header.split("=")[1].split("-")[0])
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+                else: self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body) - start))
+                if gzipped: self.send_header("Content-Encoding", "gzip")
+                if server.etag: self.send_header("ETag", server.etag)
+                self.end_headers()
+                if server.drop_after is not None:
+                    self.wfile.write(body[start:start + server.drop_after]); self.close_connection = True; return
+                self.wfile.write(body[start:])
+
+            def log_message(self, *args): pass
+
+        self.httpd = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/data.json"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def publish(self, data, etag):
+        self.body = json.dumps(data).encode("utf-8"); self.etag = etag
+
+
+@pytest.fixture
+def server():
+    data_server = _DataServer()
+    yield data_server
+    data_server.httpd.shutdown(); data_server.httpd.server_close()
+
+
+def _signature(path):
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def test_first_build_writes_all_endpoints(server, tmp_path):
+    db_path = str(tmp_path / "resources.db")
+    server.publish(SAMPLE_DATA, '"v1"')
+    result = update_resources.build_db(data_url=server.url, db_path=db_path)
+    assert result["not_modified"] is False
+    assert result["changed"] == ["maxroll/items/classes", "maxroll/items/affixes", "maxroll/items/uniques"]
+    assert result["generation"] == 1
+    conn = sqlite3.connect(db_path)
+    assert dict(conn.execute("SELECT key, value FROM meta"))["etag"] == '"v1"'
+    assert conn.execute("SELECT COUNT(*) FROM uniques").fetchone()[0] == 1
+    conn.close()
+
+
+def test_not_modified_refresh_is_one_request_and_no_writes(server, tmp_path):
+    db_path = str(tmp_path / "resources.db")
+    server.publish(SAMPLE_DATA, '"v1"')
+    update_resources.build_db(data_url=server.url, db_path=db_path)
+    before = _signature(db_path)
+    server.requests.clear()
+    result = update_resources.build_db(data_url=server.url, db_path=db_path)
+    assert result == {"not_modified": True, "changed": [], "unchanged": 0, "failed": [], "generation": 1, "diff": {}}
+    assert len(server.requests) == 1 and server.requests[0].get("If-None-Match") == '"v1"'
+    assert _signature(db_path) == before
+
+
+def test_only_changed_categories_are_rewritten(server, tmp_path):
+    db_path = str(tmp_path / "resources.db")
+    server.publish(SAMPLE_DATA, '"v1"')
+    update_resources.build_db(data_url=server.url, db_path=db_path)
+    changed_data = json.loads(json.dumps(SAMPLE_DATA))
+    changed_data["items"]["affixes"][0]["affixName"] = "Armor"
+    server.publish(changed_data, '"v2"')
+    result = update_resources.build_db(data_url=server.url, db_path=db_path)
+    assert result["changed"] == ["maxroll/items/affixes"] and result["unchanged"] == 2
+    assert result["generation"] == 2
+    # ETag가 바뀌었지만 내용이 같으면 generation 유지
+    server.publish(changed_data, '"v3"')
+    result = update_resources.build_db(data_url=server.url, db_path=db_path)
+    assert result["changed"] == [] and result["unchanged"] == 3 and result["generation"] == 2
+
+
+def test_codec_change_or_other_url_forces_full_request(server, tmp_path):
+    db_path = str(tmp_path / "resources.db")
+    server.publish(SAMPLE_DATA, '"v1"')
+    update_resources.build_db(data_url=server.url, db_path=db_path)
+    server.requests.clear()
+    result = update_resources.build_db(data_url=server.url + "?other", db_path=db_path)
+    assert "If-None-Match" not in server.requests[0] and result["changed"] == []
+    server.requests.clear()
+    result = update_resources.build_db(compress="zlib", data_url=server.url + "?other", db_path=db_path)
+    assert "If-None-Match" not in server.requests[0]
+    assert len(result["changed"]) == 3 # 압축 형식이 바뀐 행은 다시 기록
+    result = update_resources.build_db(compress="zlib", data_url=server.url + "?other", db_path=db_path)
+    assert result["not_modified"]
+
+
+def test_failed_build_leaves_previous_db_untouched(server, tmp_path, monkeypatch):
+    db_path = str(tmp_path / "resources.db")
+    server.publish(SAMPLE_DATA, '"v1"')
+    update_resources.build_db(data_url=server.url, db_path=db_path)
+    before = _signature(db_path)
+    changed_data = json.loads(json.dumps(SAMPLE_DATA))
+    changed_data["items"]["affixes"][0]["affixName"] = "Armor"; changed_data["items"]["uniques"][0]["name"] = "Crown2"
+    server.publish(changed_data, '"v2"')
+
+    def crash(cursor, items_list): raise RuntimeError("중단")
+    monkeypatch.setitem(update_resources.TYPED_TABLE_WRITERS, "uniques", crash)
+    with pytest.raises(RuntimeError):
+        update_resources.build_db(data_url=server.url, db_path=db_path)
+    assert _signature(db_path) == before # affixes 변경도 반영되지 않음 (중간 상태 없음)
+    assert os.listdir(tmp_path) == ["resources.db"]
+
+
+def test_commit_releases_open_reader_connections(server, tmp_path, monkeypatch):
+    from src import db_utils
+    db_path = str(tmp_path / "resources.db")
+    server.publish(SAMPLE_DATA, '"v1"')
+    update_resources.build_db(data_url=server.url, db_path=db_path)
+    monkeypatch.setattr(db_utils, "DB_PATH", db_path); db_utils.close_all_connections()
+    readers = []
+    thread = threading.Thread(target=lambda: readers.append(db_utils.get_connection())) # 끝난 스레드의 연결이 남아 있음
+    thread.start(); thread.join()
+    assert db_utils.get_db_generation() == 1 and readers[0] in db_utils._open_connections
+
+    real_replace = os.replace; waiting = []; pending = []
+    def windows_replace(source, target): # Windows처럼 열린 핸들이 있으면 교체 실패
+        if target == db_path:
+            if db_utils._open_connections: raise PermissionError("파일이 사용 중")
+            reader = threading.Thread(target=lambda: waiting.append(db_utils.get_db_generation()))
+            reader.start(); reader.join(0.2); pending.append(reader)
+            waiting.append(reader.is_alive()) # 교체가 끝날 때까지 새 읽기는 대기 (이전 파일을 다시 열지 않음)
+        real_replace(source, target)
+    monkeypatch.setattr(update_resources.os, "replace", windows_replace)
+    changed_data = json.loads(json.dumps(SAMPLE_DATA)); changed_data["items"]["affixes"][0]["affixName"] = "Armor"
+    server.publish(changed_data, '"v2"')
+    assert update_resources.build_db(data_url=server.url, db_path=db_path)["generation"] == 2
+    pending[0].join(5)
+    assert waiting == [True, 2] and db_utils.get_db_generation() == 2
+    with pytest.raises(sqlite3.ProgrammingError):
+        readers[0].execute("SELECT 1")
+
+
+def test_malformed_data_json_is_discarded(server, tmp_path):
+    db_path = str(tmp_path / "resources.db")
+    server.body = b'{"categories": [{"key": "affixes"}], "items": {"affixes": [1, 2} }'; server.etag = '"bad"' # 배열 안의 '}'
+    with pytest.raises(update_resources.RefreshError, match="data.json 처리 실패"):
+        update_resources.build_db(data_url=server.url, db_path=db_path)
+    assert os.listdir(tmp_path) == [] # 손상된 다운로드는 다음에 다시 받도록 삭제
+
+
+@pytest.mark.parametrize("step", ["bump_generation", "commit_shadow_db"])
+def test_sqlite_error_is_wrapped_and_shadow_removed(server, tmp_path, monkeypatch, step):
+    db_path = str(tmp_path / "resources.db")
+    server.publish(SAMPLE_DATA, '"v1"')
+    update_resources.build_db(data_url=server.url, db_path=db_path)
+    real = getattr(update_resources, step)
+    def disk_full(conn, *args, **kwargs): # VACUUM/journal_mode 전환이나 메타 기록이 디스크 가득 참으로 실패
+        raise sqlite3.OperationalError("database or disk is full")
+    monkeypatch.setattr(update_resources, step, disk_full)
+    changed_data = json.loads(json.dumps(SAMPLE_DATA)); changed_data["items"]["affixes"][0]["affixName"] = "Armor"
+    server.publish(changed_data, '"v2"')
+    with pytest.raises(update_resources.RefreshError):
+        update_resources.build_db(data_url=server.url, db_path=db_path)
+    assert [name for name in os.listdir(tmp_path) if name.startswith("resources.db") and
+            not name.startswith("resources.db.download")] == ["resources.db"] # 임시 DB와 -wal/-shm 없음
+    assert update_resources.read_meta(db_path)["etag"] == '"v1"' # 기존 DB 그대로
+    monkeypatch.setattr(update_resources, step, real)
+    assert update_resources.build_db(data_url=server.url, db_path=db_path)["generation"] == 2
+
+
+def test_failed_category_is_rolled_back_alone(server, tmp_path, monkeypatch):
+    db_path = str(tmp_path / "resources.db")
+    server.publish(SAMPLE_DATA, '"v1"')
+
+    def broken(cursor, items_list):
+        cursor.execute("DELETE FROM affixes"); raise sqlite3.OperationalError("디스크 오류")
+    writer = update_resources.TYPED_TABLE_WRITERS["affixes"]
+    monkeypatch.setitem(update_resources.TYPED_TABLE_WRITERS, "affixes", broken)
+    result = update_resources.build_db(data_url=server.url, db_path=db_path)
+    assert result["changed"] == ["maxroll/items/classes", "maxroll/items/uniques"]
+    assert result["failed"] == ["maxroll/items/affixes"]
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM endpoints WHERE endpoint = 'maxroll/items/affixes'").fetchone()[0] == 0
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete" # 교체된 파일은 -wal 없이 단독으로 읽힘
+    assert dict(conn.execute("SELECT key, value FROM meta"))["etag"] == "" # 실패가 있으면 검증자를 저장하지 않음
+    conn.close()
+    assert sorted(os.listdir(tmp_path)) == ["resources.db"]
+
+    # 서버 데이터는 그대로지만 304가 아니라 전체를 다시 받아 실패한 카테고리만 기록
+    monkeypatch.setitem(update_resources.TYPED_TABLE_WRITERS, "affixes", writer); server.requests.clear()
+    result = update_resources.build_db(data_url=server.url, db_path=db_path)
+    assert "If-None-Match" not in server.requests[0]
+    assert (result["changed"], result["failed"], result["unchanged"]) == (["maxroll/items/affixes"], [], 2)
+    assert update_resources.read_meta(db_path)["etag"] == '"v1"'
+
+
+def test_gzip_download_resumes_after_interruption(server, tmp_path):
+    db_path = str(tmp_path / "resources.db")
+    big_data = json.loads(json.dumps(SAMPLE_DATA))
+    big_data["items"]["uniques"] = [{"uniqueID": i, "name": f"Unique {i}", "loreText": os.urandom(64).hex()}
+                                    for i in range(200)]
+    server.publish(big_data, '"v1"'); server.use_gzip = True; server.drop_after = 5000
+    with pytest.raises(update_resources.RefreshError):
+        update_resources.build_db(data_url=server.url, db_path=db_path)
+    assert os.path.getsize(db_path + update_resources.DOWNLOAD_SUFFIX) == 5000 # 받은 부분은 보존
+    assert not os.path.exists(db_path)
+
+    server.drop_after = None; server.requests.clear(); events = []
+    result = update_resources.build_db(data_url=server.url, db_path=db_path, progress=events.append)
+    assert server.requests[0]["Range"] == "bytes=5000-"
+    assert len(result["changed"]) == 3
+    downloads = [e for e in events if e["stage"] == "download"]
+    assert downloads[0]["bytes"] > 5000 and downloads[-1]["bytes"] == downloads[-1]["total"]
+    assert [e["categories_done"] for e in events if e["stage"] == "store"] == [1, 2, 3]
+    assert all(e["elapsed"] >= 0 for e in events)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM uniques").fetchone()[0] == 200
+    conn.close()
+    assert sorted(os.listdir(tmp_path)) == ["resources.db"] # 다운로드 임시 파일 정리
+
+
+def test_changed_etag_restarts_partial_download(server, tmp_path):
+    db_path = str(tmp_path / "resources.db")
+    server.publish(SAMPLE_DATA, '"v1"'); server.drop_after = 10
+    with pytest.raises(update_resources.RefreshError):
+        update_resources.build_db(data_url=server.url, db_path=db_path)
+    server.publish(SAMPLE_DATA, '"v2"'); server.drop_after = None
+    result = update_resources.build_db(data_url=server.url, db_path=db_path)
+    assert len(result["changed"]) == 3 # If-Range 불일치 -> 200 전체 본문으로 다시 받음
+
+
+def test_cancel_keeps_existing_db_and_partial_download(server, tmp_path):
+    db_path = str(tmp_path / "resources.db")
+    server.publish(SAMPLE_DATA, '"v1"')
+    update_resources.build_db(data_url=server.url, db_path=db_path)
+    before = _signature(db_path)
+    changed_data = json.loads(json.dumps(SAMPLE_DATA))
+    changed_data["items"]["affixes"][0]["affixName"] = "Armor"
+    server.publish(changed_data, '"v2"')
+
+    cancel = threading.Event()
+    def cancel_on(stage):
+        def progress(event):
+            if event["stage"] == stage: cancel.set()
+        return progress
+    with pytest.raises(update_resources.RefreshCancelled):
+        update_resources.build_db(data_url=server.url, db_path=db_path, progress=cancel_on("download"), cancel=cancel)
+    assert os.path.exists(db_path + update_resources.DOWNLOAD_SUFFIX) # 다음 실행에서 이어받기
+
+    cancel.clear()
+    with pytest.raises(update_resources.RefreshCancelled):
+        update_resources.build_db(data_url=server.url, db_path=db_path, progress=cancel_on("store"), cancel=cancel)
+    assert _signature(db_path) == before
+    assert sorted(os.listdir(tmp_path)) == ["resources.db"]
+
+
+def test_refresh_all_runs_in_process_with_live_progress(server, tmp_path):
+    import crawler
+    db_path = str(tmp_path / "resources.db")
+    server.publish(SAMPLE_DATA, '"v1"')
+    events = []
+    result = crawler.refresh_all(progress=events.append, reprocess=False, data_url=server.url, db_path=db_path)
+    assert result["success"] and not result["cancelled"]
+    assert result["result"]["changed"] == ["maxroll/items/classes", "maxroll/items/affixes", "maxroll/items/uniques"]
+    stages = [e["stage"] for e in events if isinstance(e, dict)]
+    assert stages[0] == "download" and stages.count("store") == 3 and "commit" in stages
+    assert set(result["timings"]) == {"fetch", "rebuild", "total"}
+    assert any(isinstance(e, str) and "Saved maxroll/items/uniques" in e for e in events) # 로그도 전달됨
+    assert not update_resources.logger.handlers # 핸들러는 호출 후 제거
+
+    progress_log = crawler.ProgressLog()
+    lines = [progress_log(e) for e in events if isinstance(e, dict)]
+    assert any("저장 maxroll/items/uniques: 갱신 (카테고리 3개 처리)" in line for line in lines if line)
+
+    cancel = threading.Event(); cancel.set()
+    server.publish(SAMPLE_DATA, '"v2"')
+    result = crawler.refresh_all(cancel=cancel, reprocess=False, data_url=server.url, db_path=db_path)
+    assert result["cancelled"] and not result["success"]
+
+    server.httpd.shutdown(); server.httpd.server_close()
+    result = crawler.refresh_all(reprocess=False, data_url=server.url, db_path=db_path)
+    assert not result["success"] and "HTTP 요청 실패" in result["output"]
+
+
+def test_refresh_pipeline_reprocesses_only_changed_uniques(server, tmp_path, monkeypatch):
+    import crawler
+    process_game_data = crawler.load_process_module()
+    db_path = str(tmp_path / "resources.db")
+    monkeypatch.setattr(sys.modules["db_utils"], "DB_PATH", db_path) # process_game_data가 읽는 DB
+    for name in ("PROCESSED_UNIQUES_FILE", "PROCESSED_UNIQUES_SNAPSHOT_FILE", "PROCESSED_UNIQUES_HASHES_FILE",
+                 "PROCESSED_UNIQUES_CACHE_FILE", "PROCESSED_UNIQUES_NDJSON_FILE", "PROCESSED_SET_BONUSES_FILE",
+                 "PROCESSED_AILMENTS_FILE", "PROCESSED_UNIQUE_MODS_FILE", "PROCESSING_STAGES_STATE_FILE"):
+        monkeypatch.setattr(process_game_data, name, str(tmp_path / os.path.basename(getattr(process_game_data, name))))
+    data = json.loads(json.dumps(SAMPLE_DATA))
+    data["categories"].append({"key": "itemTypes"})
+    data["items"]["itemTypes"] = [{"baseTypeID": 0, "displayName": "Helmet", "subItems": [{"subTypeID": 2, "name": "Iron Helm"}]}]
+    data["items"]["uniques"].append({"uniqueID": 4, "name": "Ring", "baseType": 5, "mods": [{"property": 10, "value": 2}]})
+    server.publish(data, '"v1"')
+
+    events = []
+    result = crawler.refresh_all(progress=events.append, data_url=server.url, db_path=db_path)
+    assert result["success"] and result["reprocess"] == {"total": 2, "reprocessed": 2, "reused": 0, "written": True}
+    assert list(result["timings"]) == ["fetch", "rebuild", "reprocess", "total"]
+    assert [e["step"] for e in events if isinstance(e, dict) and e["stage"] == "timing"] == ["fetch", "rebuild", "reprocess"]
+
+    # 서버 데이터 그대로(304): 가공 결과도 그대로
+    result = crawler.refresh_all(data_url=server.url, db_path=db_path)
+    assert result["result"]["not_modified"] and not result["reprocess"]["written"]
+
+    data["items"]["affixes"][0]["affixName"] = "Armor" # property 10을 쓰는 Ring만 영향
+    server.publish(data, '"v2"')
+    result = crawler.refresh_all(data_url=server.url, db_path=db_path)
+    assert result["reprocess"] == {"total": 2, "reprocessed": 1, "reused": 1, "written": True}
+    with open(process_game_data.PROCESSED_UNIQUES_FILE, encoding='utf-8') as f: processed = json.load(f)
+    assert processed[1]["formatted_mods_list"] == ["+2 Armor"]
+
+
+def test_refresh_records_keyed_change_history(server, tmp_path, monkeypatch):
+    from src import db_utils
+    db_path = str(tmp_path / "resources.db")
+    server.publish(SAMPLE_DATA, '"v1"')
+    update_resources.build_db(data_url=server.url, db_path=db_path)
+    changed_data = json.loads(json.dumps(SAMPLE_DATA))
+    changed_data["items"]["uniques"][0]["displayName"] = "Broken Crown"
+    changed_data["items"]["uniques"].append({"uniqueID": 4, "name": "Ring"})
+    changed_data["items"]["affixes"] = []
+    changed_data["items"]["classes"][0]["masteries"].append({"name": "Runemaster"})
+    server.publish(changed_data, '"v2"')
+    result = update_resources.build_db(data_url=server.url, db_path=db_path, compress="zlib")
+    assert result["generation"] == 2
+    assert result["diff"] == {"maxroll/items/affixes": {"removed": 1}, "maxroll/items/classes": {"modified": 1},
+                              "maxroll/items/uniques": {"added": 1, "modified": 1}}
+
+    monkeypatch.setattr(db_utils, "DB_PATH", db_path); db_utils.close_all_connections()
+    changes = db_utils.get_change_history()
+    assert [(c["endpoint"], c["change"], c["key"], c["fields"]) for c in changes if c["endpoint"].endswith("uniques")] == [
+        ("maxroll/items/uniques", "modified", 3, ["displayName"]), ("maxroll/items/uniques", "added", 4, None)]
+    assert {"generation": 2, "endpoint": "maxroll/items/classes", "change": "modified", "key": None, "fields": None} in changes
+    first_generation = db_utils.get_change_history(since_generation=0, endpoint="maxroll/items/affixes")
+    assert [(c["generation"], c["change"], c["key"]) for c in first_generation] == [(1, "added", None), (2, "removed", 1)]
+    assert [g["etag"] for g in db_utils.get_generations()] == ['"v1"', '"v2"']
+
+    # 이전 내용이 압축 저장되어 있어도 레코드 단위로 비교
+    changed_data["items"]["uniques"][1]["name"] = "Band"
+    server.publish(changed_data, '"v3"')
+    result = update_resources.build_db(data_url=server.url, db_path=db_path, compress="zlib")
+    assert result["diff"] == {"maxroll/items/uniques": {"modified": 1}}
+    db_utils.close_all_connections()
+
+
+@pytest.mark.parametrize("old, new, expected", [
+    ([{"id": 1, "a": 1}], [{"id": 1, "a": 1}], []),
+    ([{"id": 1, "a": 1, "b": 2}], [{"id": 1, "a": 2, "c": None}], [("modified", 1, ["a", "b", "c"])]),
+    ([{"id": 1}, {"id": 1, "x": 1}], [{"id": 1}], [("removed", 1, None)]), # 같은 키는 순서대로 짝지음
+    ([{"id": 2}, {"no_key": 1}], [{"id": 3}, {"id": 2}, 5], [("added", 3, None)]),
+])
+def test_diff_records(old, new, expected):
+    assert update_resources.diff_records(old, new, "id") == expected
+
+
+@pytest.mark.parametrize("data, expected", [
+    ({"items": {"b": [1], "a": [2]}, "categories": [{"key": "a"}, {"key": "c"}]}, [("a", [2]), ("c", [])]),
+    ({"items": {"b": [1], "a": None}}, [("b", [1]), ("a", None)]),
+    ({"x": [1], "y": {"z": 1}, "w": []}, [("x", [1]), ("w", [])]),
+])
+def test_iter_categories_matches_previous_layout_rules(data, expected):
+    assert list(update_resources.iter_categories([json.dumps(data)])) == expected
@@ -0,0 +1,183 @@
+# D:\LEB\tests\test_bundle_update.py
+
+import os
+import sys
+import json
+import random
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(BASE_DIR, 'scripts')
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import make_bundle_manifest
+from src import bundle_update
+from src.bundle_update import BundleUpdateError
+
+
+def _random_bytes(seed, size):
+    return random.Random(seed).randbytes(size)
+
+
+def _write_tree(root, files):
+    for name, content in files.items():
+        path = os.path.join(root, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f: f.write(content)
+
+
+def _read_tree(root, names):
+    result = {}
+    for name in names:
+        with open(os.path.join(root, *name.split("/")), 'rb') as f: result[name] = f.read()
+    return result
+
+
+# v1 -> v2: DB 페이지 몇 개 변경, JSON 중간 삽입, 파일 추가, 변경 없는 파일
+DB_V1 = _random_bytes(1, 64 * 4096)
+DB_V2 = bytearray(DB_V1); DB_V2[4096 * 3:4096 * 3 + 100] = _random_bytes(2, 100); DB_V2 = bytes(DB_V2) + _random_bytes(3, 4096)
+JSON_V1 = json.dumps([{"affixId": i, "affixName": f"Affix {i}"} for i in range(2000)]).encode()
+JSON_V2 = JSON_V1[:20000] + b'{"affixId": -1, "affixName": "New"}, ' + JSON_V1[20000:]
+V1_FILES = {"resources.db": DB_V1, "affixes.json": JSON_V1, "static/ailments.json": b"[1, 2, 3]"}
+V2_FILES = {"resources.db": DB_V2, "affixes.json": JSON_V2, "static/ailments.json": b"[1, 2, 3]", "new.json": b"{}"}
+
+
+@pytest.fixture
+def bundle_server(tmp_path):
+    """v1/v2 릴리스 폴더로 만든 번들을 올린 로컬 HTTP 서버. (매니페스트 URL, 서버 루트, 요청 경로 목록)"""
+    _write_tree(str(tmp_path / "v1"), V1_FILES); _write_tree(str(tmp_path / "v2"), V2_FILES)
+    web_root = tmp_path / "web"
+    make_bundle_manifest.build_manifest("2.0.0", str(tmp_path / "v2"), str(web_root / "2.0.0"), [str(tmp_path / "v1")])
+    requested = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            requested.append(self.path); super().do_GET()
+        def log_message(self, *args): pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=str(web_root)))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/2.0.0/manifest.json", web_root / "2.0.0", requested
+    httpd.shutdown(); httpd.server_close()
+
+
+@pytest.fixture
+def resources_v1(tmp_path):
+    resources_dir = str(tmp_path / "resources")
+    _write_tree(resources_dir, {**V1_FILES, "processed_uniques.json": b"[]"}) # 번들에 없는 로컬 파일은 건드리지 않음
+    return resources_dir
+
+
+def test_delta_upgrade_moves_only_changed_bytes(bundle_server, resources_v1):
+    manifest_url, _, requested = bundle_server
+    stats = bundle_update.update_bundle(manifest_url, resources_v1)
+    assert _read_tree(resources_v1, V2_FILES) == V2_FILES
+    assert _read_tree(resources_v1, ["processed_uniques.json"]) == {"processed_uniques.json": b"[]"}
+    assert stats["delta"] == 2 and stats["full"] == 1 and stats["unchanged"] == 1
+    assert stats["downloaded_bytes"] < 16 * 1024 < len(DB_V2) # 수 KB만 이동
+    assert len([path for path in requested if path.startswith("/2.0.0/files/")]) == 1 # 새 파일만 전체로
+    assert bundle_update.installed_bundle_version(resources_v1) == "2.0.0"
+    assert sorted(os.listdir(resources_v1)) == ["affixes.json", "bundle_manifest.json", "new.json",
+                                                "processed_uniques.json", "resources.db", "static"]
+
+    requested.clear()
+    assert bundle_update.update_bundle(manifest_url, resources_v1)["downloaded_bytes"] == 0
+    assert requested == ["/2.0.0/manifest.json"]
+
+
+def test_bad_delta_falls_back_to_full_file(bundle_server, resources_v1):
+    manifest_url, web_root, _ = bundle_server
+    with open(resources_v1 + "/affixes.json", 'ab') as f: f.write(b" ") # 로컬 수정: 델타 기준과 다름 -> 전체
+    for delta_name in os.listdir(web_root / "deltas"):
+        if "-" in delta_name: (web_root / "deltas" / delta_name).write_bytes(b"corrupt") # 체크섬 불일치 -> 전체
+    stats = bundle_update.update_bundle(manifest_url, resources_v1)
+    assert _read_tree(resources_v1, V2_FILES) == V2_FILES
+    assert stats["delta"] == 0 and stats["full"] == 3
+
+
+def test_checksum_failure_leaves_resources_untouched(bundle_server, resources_v1):
+    manifest_url, web_root, _ = bundle_server
+    manifest = json.loads((web_root / "manifest.json").read_text())
+    (web_root / manifest["files"]["new.json"]["url"]).write_bytes(b"[]")
+    with pytest.raises(BundleUpdateError):
+        bundle_update.update_bundle(manifest_url, resources_v1)
+    assert _read_tree(resources_v1, V1_FILES) == V1_FILES
+    assert bundle_update.installed_bundle_version(resources_v1) is None
+    assert not os.path.exists(os.path.join(resources_v1, bundle_update.STAGING_DIR_NAME))
+
+
+def test_staging_write_error_is_a_bundle_update_error(bundle_server, resources_v1, monkeypatch):
+    manifest_url, _, _ = bundle_server
+    def full_disk_open(path, mode='r', *args, **kwargs):
+        if mode == 'wb' and bundle_update.STAGING_DIR_NAME in str(path): raise OSError(28, "No space left on device")
+        return open(path, mode, *args, **kwargs)
+    monkeypatch.setattr(bundle_update, "open", full_disk_open, raising=False)
+    with pytest.raises(BundleUpdateError, match="임시 파일 기록 실패"):
+        bundle_update.update_bundle(manifest_url, resources_v1)
+    assert _read_tree(resources_v1, V1_FILES) == V1_FILES
+    assert not os.path.exists(os.path.join(resources_v1, bundle_update.STAGING_DIR_NAME))
+
+
+def test_interrupted_apply_is_completed_by_recovery(bundle_server, resources_v1, monkeypatch):
+    manifest_url, _, _ = bundle_server
+    real_replace = bundle_update._replace_with_retry; calls = []
+    def crash_after_first(source, target):
+        if calls: raise KeyboardInterrupt # 교체 도중 프로세스 중단
+        calls.append(target); real_replace(source, target)
+    monkeypatch.setattr(bundle_update, "_replace_with_retry", crash_after_first)
+    with pytest.raises(KeyboardInterrupt):
+        bundle_update.update_bundle(manifest_url, resources_v1)
+    assert os.path.exists(os.path.join(resources_v1, bundle_update.JOURNAL_NAME))
+
+    monkeypatch.setattr(bundle_update, "_replace_with_retry", real_replace)
+    assert bundle_update.recover_interrupted_update(resources_v1) is True
+    assert _read_tree(resources_v1, V2_FILES) == V2_FILES
+    assert bundle_update.installed_bundle_version(resources_v1) == "2.0.0"
+    assert not os.path.exists(os.path.join(resources_v1, bundle_update.JOURNAL_NAME))
+    assert bundle_update.recover_interrupted_update(resources_v1) is False
+
+
+def test_apply_releases_open_reader_connections(bundle_server, resources_v1, tmp_path, monkeypatch):
+    import sqlite3
+    from src import db_utils
+    reader_db = str(tmp_path / "reader.db"); sqlite3.connect(reader_db).close()
+    monkeypatch.setattr(db_utils, "DB_PATH", reader_db); db_utils.close_all_connections()
+    thread = threading.Thread(target=db_utils.get_connection); thread.start(); thread.join() # 끝난 스레드의 연결이 남아 있음
+    assert db_utils._open_connections
+    real_replace = bundle_update._replace_with_retry; states = []
+    def windows_replace(source, target): # Windows처럼 열린 핸들이 있으면 교체 실패
+        if db_utils._open_connections: raise PermissionError("파일이 사용 중")
+        states.append(db_utils._readers_paused); real_replace(source, target)
+    monkeypatch.setattr(bundle_update, "_replace_with_retry", windows_replace)
+    bundle_update.update_bundle(bundle_server[0], resources_v1)
+    assert _read_tree(resources_v1, V2_FILES) == V2_FILES
+    assert states == [True] * 3 and not db_utils._readers_paused # 옮기는 동안만 새 읽기를 막음
+
+
+@pytest.mark.parametrize("base, target", [
+    (b"", b""), (b"", b"new"), (b"abc" * 100, b""),
+    (DB_V1, DB_V2), (JSON_V1, JSON_V2), (JSON_V2, JSON_V1),
+    (_random_bytes(4, 1000), _random_bytes(5, 1000)),
+])
+def test_delta_round_trip(base, target):
+    delta = bundle_update.make_delta(base, target)
+    assert bundle_update.apply_delta(base, delta) == target
+
+
+def test_delta_rejects_wrong_base_and_corruption():
+    delta = bundle_update.make_delta(JSON_V1, JSON_V2)
+    assert len(delta) < 200
+    with pytest.raises(BundleUpdateError): bundle_update.apply_delta(JSON_V2, delta)
+    with pytest.raises(BundleUpdateError): bundle_update.apply_delta(JSON_V1, delta[:-4])
+
+
+@pytest.mark.parametrize("name", ["../evil", "/etc/passwd", "a/../../b", "C:/x", "a\\b", "bundle_manifest.json",
+                                  ".bundle-staging/x", "./a"])
+def test_manifest_rejects_unsafe_names(name):
+    manifest = {"format": 1, "version": "1", "files": {name: {"sha256": "0" * 64, "size": 0, "url": "f"}}}
+    with pytest.raises(BundleUpdateError):
+        bundle_update.validate_manifest(manifest)
@@ -0,0 +1,127 @@
+# D:\LEB\tests\test_cli.py
+
+import os
+import sys
+import json
+import random
+import threading
+import subprocess
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+
+from src import cli, crawler
+from src.run_lock import RunLock, lock_path_for
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_DATA = {
+    "categories": [{"key": "classes"}, {"key": "uniques"}],
+    "items": {
+        "classes": [{"className": "Mage", "classID": 1, "masteries": [{"name": "Mage"}, {"name": "Sorcerer"}]}],
+        "uniques": [{"uniqueID": 3, "name": "Crown", "displayName": "Fractured Crown", "subTypes": [2]}],
+    },
+}
+
+
+@pytest.fixture
+def data_url():
+    body = json.dumps(SAMPLE_DATA).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.headers.get("If-None-Match") == '"d1"': self.send_response(304); self.end_headers(); return
+            self.send_response(200); self.send_header("ETag", '"d1"'); self.send_header("Content-Length", str(len(body)))
+            self.end_headers(); self.wfile.write(body)
+        def log_message(self, *args): pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/data.json"
+    httpd.shutdown(); httpd.server_close()
+
+
+def _read_runs(path):
+    with open(path, encoding="utf-8") as f: return [json.loads(line) for line in f]
+
+
+def test_refresh_writes_json_lines_and_second_run_is_not_modified(data_url, tmp_path):
+    runs_log = str(tmp_path / "runs.jsonl"); db_path = str(tmp_path / "resources.db")
+    options = dict(lock_path=str(tmp_path / ".lock"), runs_log=runs_log, reprocess=False, data_url=data_url, db_path=db_path)
+    first = cli.run_refresh(**options)
+    assert first["status"] == "ok" and first["not_modified"] is False and first["generation"] == 1
+    assert sorted(first["changed"]) == ["maxroll/items/classes", "maxroll/items/uniques"]
+    assert set(first["timings"]) >= {"fetch", "rebuild", "total"}
+    second = cli.run_refresh(**options)
+    assert second["status"] == "ok" and second["not_modified"] is True
+    assert _read_runs(runs_log) == [first, second]
+
+
+def test_db_option_requires_no_reprocess(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(cli, "refresh_all", lambda **kwargs: pytest.fail("가공이 다른 DB를 읽으므로 실행하지 않아야 함"))
+    with pytest.raises(SystemExit) as exc_info:
+        cli.main(["--runs-log", "-", "refresh", "--db", str(tmp_path / "other.db")])
+    assert exc_info.value.code == 2 and "--no-reprocess" in capsys.readouterr().err
+    result = crawler.refresh_all(db_path=str(tmp_path / "other.db"), data_url="http://127.0.0.1:9/unused")
+    assert not result["success"] and "--no-reprocess" in result["output"]
+    assert not os.path.exists(tmp_path / "other.db") # 받기 전에 거부
+
+
+def test_concurrent_runs_coalesce_on_lock(tmp_path, monkeypatch):
+    lock_path = str(tmp_path / ".lock"); runs_log = str(tmp_path / "runs.jsonl")
+    monkeypatch.setattr(crawler, "_refresh_locked", lambda *args, **kwargs: pytest.fail("잠금 중에는 새로고침하지 않아야 함"))
+    monkeypatch.setattr(cli, "load_process_module", lambda: pytest.fail("잠금 중에는 가공하지 않아야 함"))
+    with cli.RunLock(lock_path) as acquired:
+        assert acquired
+        assert cli.run_refresh(lock_path=lock_path, runs_log=runs_log)["status"] == "coalesced"
+        assert cli.run_process(lock_path=lock_path, runs_log=runs_log)["status"] == "coalesced"
+    assert [run["command"] for run in _read_runs(runs_log)] == ["refresh", "process"]
+    with cli.RunLock(lock_path) as acquired: assert acquired # 풀린 뒤에는 다시 잡을 수 있음
+
+
+def test_refresh_all_takes_the_lock_next_to_the_db(tmp_path, monkeypatch):
+    # 앱(RefreshWorker)처럼 refresh_all을 직접 부르는 실행도 CLI와 같은 잠금으로 합쳐짐
+    db_path = str(tmp_path / "resources.db"); calls = []
+    def fake_refresh(*args, **kwargs):
+        with RunLock(lock_path_for(db_path)) as acquired: calls.append(acquired) # 실행 중에는 잠금이 잡혀 있음
+        return {"success": True, "coalesced": False}
+    monkeypatch.setattr(crawler, "_refresh_locked", fake_refresh)
+    with RunLock(lock_path_for(db_path)) as acquired:
+        assert acquired
+        result = crawler.refresh_all(reprocess=False, db_path=db_path)
+        assert result["coalesced"] and not result["success"] and not result["cancelled"] and calls == []
+    assert crawler.refresh_all(reprocess=False, db_path=db_path)["success"] and calls == [False]
+    with RunLock(lock_path_for(db_path)) as acquired: assert acquired # 끝나면 풀림
+
+
+def test_lock_is_released_when_holder_process_dies(tmp_path):
+    lock_path = str(tmp_path / ".lock")
+    code = f"import sys; from src.cli import RunLock; lock = RunLock({lock_path!r}); sys.exit(0 if lock.acquire() else 1)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR).returncode == 0 # 해제하지 않고 종료
+    with cli.RunLock(lock_path) as acquired: assert acquired
+
+
+def test_failed_refresh_is_recorded(tmp_path, monkeypatch):
+    monkeypatch.setattr(cli, "refresh_all", lambda **kwargs: {"success": False, "cancelled": False, "output": "boom",
+                                                              "result": None, "reprocess": None, "timings": {}})
+    record = cli.run_refresh(lock_path=str(tmp_path / ".lock"), runs_log=str(tmp_path / "runs.jsonl"))
+    assert record["status"] == "failed" and record["error"] == "boom" and cli._exit_code(record) == cli.EXIT_FAILED
+
+
+def test_serve_refresh_repeats_with_jitter_and_stops(tmp_path, monkeypatch):
+    calls = []; stop = threading.Event()
+    def fake_run_refresh(cancel=None, **kwargs):
+        calls.append(kwargs)
+        if len(calls) == 3: stop.set()
+        return {"status": "ok"}
+    monkeypatch.setattr(cli, "run_refresh", fake_run_refresh)
+    assert cli.serve_refresh(interval=0, jitter=0.01, stop=stop, lock_path="x") == 3
+    assert all(call == {"lock_path": "x"} for call in calls)
+    delays = [cli.next_delay(10, 5, random.Random(seed)) for seed in range(20)]
+    assert all(10 <= delay < 15 for delay in delays) and len(set(delays)) > 1
+    assert cli.next_delay(10, 0) == 10
+
+
+def test_cli_does_not_import_pyqt():
+    code = "import sys, src.cli; sys.exit(1 if any(name.startswith('PyQt') for name in sys.modules) else 0)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR).returncode == 0
+    result = subprocess.run([sys.executable, "-m", "src.cli", "--help"], cwd=BASE_DIR, capture_output=True, text=True)
+    assert result.returncode == 0 and "serve-refresh" in result.stdout
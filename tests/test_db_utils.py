@@ -0,0 +1,304 @@
+# D:\LEB\tests\test_db_utils.py
+
+import os
+import sys
+import json
+import sqlite3
+import threading
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(BASE_DIR, 'scripts')
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import update_resources
+from src import db_utils
+
+# 테스트용 최소 Maxroll 데이터 (카테고리 키 -> 아이템 리스트)
+SAMPLE_ITEMS = {
+    "classes": [
+        {"className": "Mage", "classID": 1, "masteries": [
+            {"name": "Mage", "localizationKey": "Class_Mage"},
+            {"name": "Sorcerer", "localizationKey": "Mastery_Sorcerer"},
+            {"name": "Spellblade", "localizationKey": "Mastery_Spellblade"},
+        ]},
+        {"className": "Rogue", "classID": 2, "masteries": []},
+    ],
+    "uniques": [
+        {"uniqueID": 7, "name": "Calamity", "displayName": "", "baseType": 0, "subTypes": [1],
+         "levelRequirement": 10, "loreText": "Burn.", "mods": [], "tooltipDescriptions": []},
+        {"uniqueID": 3, "name": "Crown", "displayName": "Fractured Crown", "baseType": 0, "subTypes": [2],
+         "levelRequirement": 0, "loreText": "", "mods": [], "tooltipDescriptions": []},
+    ],
+    "affixes": [
+        {"affixId": 31, "affixName": "Added Armor", "affixDisplayName": "Armor", "property": 10, "specialTag": 0, "tiers": [1, 2]},
+        {"affixId": 40, "affixName": "Idol Armor", "affixDisplayName": "", "property": 10, "tiers": []},
+    ],
+    "itemTypes": [
+        {"baseTypeID": 0, "BaseTypeName": "Helmets", "displayName": "Helmet", "subItems": [
+            {"subTypeID": 1, "name": "Leather Helmet"}, {"subTypeID": 2, "displayName": "Celestial Helm"},
+        ]},
+        {"baseTypeID": 1, "BaseTypeName": "Body Armour", "displayName": "", "subItems": []},
+    ],
+    "ailments": [
+        {"id": 1, "displayName": "Ignite", "instanceName": "Ignite", "description": "Deals fire damage over time"},
+        {"id": 2, "displayName": "Frostbite", "instanceName": "Frostbite", "description": ""},
+    ],
+}
+
+
+def _write_db(db_path, items, typed=True):
+    """
+    endpoints 블롭(및 선택적으로 정규화 테이블)을 가진 테스트 DB를 만듭니다.
+    typed=False는 hash 열/meta 테이블도 없는 이전 형식 DB를 흉내냅니다.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE endpoints (endpoint TEXT PRIMARY KEY, data TEXT NOT NULL)")
+    if typed:
+        conn.execute("ALTER TABLE endpoints ADD COLUMN hash TEXT")
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("INSERT INTO meta (key, value) VALUES ('generation', '1')")
+        conn.executescript(update_resources.TYPED_TABLES_SCHEMA)
+        conn.executescript(update_resources.SEARCH_INDEX_SCHEMA)
+    for key, items_list in items.items():
+        payload = json.dumps(items_list, ensure_ascii=False)
+        if typed:
+            conn.execute("INSERT INTO endpoints (endpoint, data, hash) VALUES (?, ?, ?)",
+                         (f"maxroll/items/{key}", payload, update_resources.payload_hash(payload)))
+        else:
+            conn.execute("INSERT INTO endpoints (endpoint, data) VALUES (?, ?)", (f"maxroll/items/{key}", payload))
+        if typed and key in update_resources.TYPED_TABLE_WRITERS:
+            update_resources.TYPED_TABLE_WRITERS[key](conn.cursor(), items_list)
+        if typed and key in update_resources.SEARCH_INDEX_WRITERS:
+            update_resources.SEARCH_INDEX_WRITERS[key](conn.cursor(), items_list)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture(autouse=True)
+def close_shared_connections():
+    db_utils.clear_endpoint_cache()
+    yield
+    db_utils.close_all_connections()
+    db_utils.clear_endpoint_cache()
+
+
+@pytest.fixture
+def typed_db(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "typed.db")
+    _write_db(db_path, SAMPLE_ITEMS, typed=True)
+    monkeypatch.setattr(db_utils, "DB_PATH", db_path)
+    return db_path
+
+
+@pytest.fixture
+def blob_only_db(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "blob.db")
+    _write_db(db_path, SAMPLE_ITEMS, typed=False)
+    monkeypatch.setattr(db_utils, "DB_PATH", db_path)
+    return db_path
+
+
+def _load_all():
+    return (db_utils.get_classes_from_db(), db_utils.get_uniques_from_db(),
+            db_utils.load_item_type_map_from_db(), db_utils.load_raw_affixes_from_db())
+
+
+def test_typed_tables_match_blob_loaders(tmp_path, monkeypatch):
+    """정규화 테이블 경로와 기존 JSON 블롭 경로가 같은 결과를 내야 합니다."""
+    typed_path = str(tmp_path / "typed.db"); blob_path = str(tmp_path / "blob.db")
+    _write_db(typed_path, SAMPLE_ITEMS, typed=True)
+    _write_db(blob_path, SAMPLE_ITEMS, typed=False)
+
+    monkeypatch.setattr(db_utils, "DB_PATH", blob_path)
+    classes_b, uniques_b, types_b, affixes_b = _load_all()
+    monkeypatch.setattr(db_utils, "DB_PATH", typed_path)
+    classes_t, uniques_t, types_t, affixes_t = _load_all()
+
+    assert classes_t == classes_b == {"클래스 선택...": [], "Mage": ["Sorcerer", "Spellblade"], "Rogue": []}
+    assert uniques_t == uniques_b
+    assert types_t == types_b
+    assert types_t["0"]["subtypes"] == {"1": "Leather Helmet", "2": "Celestial Helm"}
+    assert types_t["1"]["name"] == "Body Armour"  # displayName이 비면 BaseTypeName 사용
+    # 정규화 테이블은 가공에 필요한 키만 돌려줌
+    for typed_affix, raw_affix in zip(affixes_t, affixes_b):
+        assert "tiers" not in typed_affix
+        for key in db_utils.AFFIX_TABLE_KEYS:
+            assert typed_affix.get(key) == raw_affix.get(key)
+
+
+def test_get_unique_from_db_uses_index(typed_db):
+    assert db_utils.get_unique_from_db(3)["displayName"] == "Fractured Crown"
+    assert db_utils.get_unique_from_db(999) is None
+    conn = sqlite3.connect(typed_db)
+    plan = " ".join(str(r) for r in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT data FROM uniques WHERE unique_id = ?", (3,)))
+    conn.close()
+    assert "idx_uniques_unique_id" in plan
+
+
+def test_get_unique_from_db_blob_fallback(blob_only_db):
+    assert db_utils.get_unique_from_db(7)["name"] == "Calamity"
+
+
+def test_connection_is_reused_per_thread(typed_db):
+    conn = db_utils.get_connection()
+    assert db_utils.get_connection() is conn
+    db_utils.get_classes_from_db(); db_utils.load_raw_affixes_from_db()
+    assert db_utils.get_connection() is conn
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(db_utils.get_connection()))
+    worker.start(); worker.join()
+    assert other[0] is not None and other[0] is not conn
+
+
+def test_worker_thread_connection_is_closed_on_exit(typed_db):
+    def worker():
+        db_utils.get_classes_from_db()
+        try: opened.append(db_utils.get_connection())
+        finally: db_utils.close_thread_connection()
+    opened = []
+    thread = threading.Thread(target=worker); thread.start(); thread.join()
+    assert opened[0] not in db_utils._open_connections
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute("SELECT 1")
+    db_utils.close_thread_connection() # 연결이 없는 스레드에서는 아무 일도 없음
+
+
+def test_connection_is_read_only(typed_db):
+    with pytest.raises(sqlite3.OperationalError):
+        db_utils.get_connection().execute("DELETE FROM uniques")
+
+
+def test_connection_reopens_after_db_replaced(typed_db, tmp_path):
+    first = db_utils.get_connection()
+    assert len(db_utils.get_uniques_from_db()) == 2
+    replacement = str(tmp_path / "replacement.db")
+    _write_db(replacement, {"uniques": SAMPLE_ITEMS["uniques"][:1]})
+    os.replace(replacement, typed_db)
+    assert db_utils.get_connection() is not first
+    assert len(db_utils.get_uniques_from_db()) == 1
+
+
+def test_missing_db_returns_none(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_utils, "DB_PATH", str(tmp_path / "missing.db"))
+    assert db_utils.get_connection() is None
+    assert db_utils.get_uniques_from_db() == []
+
+
+def _rewrite_endpoint(db_path, key, items_list, bump=True):
+    """build_db처럼 엔드포인트 하나를 다시 쓰고 (선택적으로) 세대 번호를 올립니다."""
+    payload = json.dumps(items_list, ensure_ascii=False)
+    conn = sqlite3.connect(db_path)
+    conn.execute("REPLACE INTO endpoints (endpoint, data, hash) VALUES (?, ?, ?)",
+                 (f"maxroll/items/{key}", payload, update_resources.payload_hash(payload)))
+    if bump:
+        update_resources.bump_generation(conn.cursor())
+    conn.commit(); conn.close()
+
+
+def test_get_endpoint_is_memoized(typed_db):
+    first = db_utils.get_endpoint("maxroll/items/affixes")
+    assert first[0]["affixId"] == 31 and "tiers" in first[0]
+    assert db_utils.get_endpoint("maxroll/items/affixes") is first
+    assert db_utils.get_endpoint("maxroll/items/nope") is None
+
+
+def test_unchanged_refresh_keeps_cache(typed_db):
+    affixes = db_utils.get_endpoint("maxroll/items/affixes")
+    os.utime(typed_db, ns=(0, 0))  # 파일은 바뀌었지만 내용/세대는 그대로
+    _rewrite_endpoint(typed_db, "affixes", SAMPLE_ITEMS["affixes"], bump=False)
+    assert db_utils.get_endpoint("maxroll/items/affixes") is affixes
+
+
+def test_changed_endpoint_invalidates_only_its_entries(typed_db):
+    affixes = db_utils.get_endpoint("maxroll/items/affixes")
+    item_types = db_utils.get_endpoint("maxroll/items/itemTypes")
+    _rewrite_endpoint(typed_db, "affixes", SAMPLE_ITEMS["affixes"][:1])
+    assert db_utils.get_db_generation() == 2
+    new_affixes = db_utils.get_endpoint("maxroll/items/affixes")
+    assert new_affixes is not affixes and len(new_affixes) == 1
+    assert db_utils.get_endpoint("maxroll/items/itemTypes") is item_types
+
+
+def test_get_endpoint_hashes(typed_db, blob_only_db, monkeypatch):
+    assert db_utils.get_endpoint_hashes() == {} # hash 열이 없는 DB -> 지문을 알 수 없음
+    db_utils.close_all_connections(); monkeypatch.setattr(db_utils, "DB_PATH", typed_db)
+    hashes = db_utils.get_endpoint_hashes(["maxroll/items/affixes", "maxroll/items/missing"])
+    assert hashes["maxroll/items/affixes"] and hashes["maxroll/items/missing"] is None
+    _rewrite_endpoint(typed_db, "affixes", SAMPLE_ITEMS["affixes"][:1])
+    assert db_utils.get_endpoint_hashes()["maxroll/items/affixes"] != hashes["maxroll/items/affixes"]
+
+
+def test_cache_is_size_capped(typed_db, monkeypatch):
+    monkeypatch.setattr(db_utils, "ENDPOINT_CACHE_MAX_ENTRIES", 2)
+    classes = db_utils.get_endpoint("maxroll/items/classes")
+    db_utils.get_endpoint("maxroll/items/uniques")
+    db_utils.get_endpoint("maxroll/items/classes")  # 최근 사용으로 갱신
+    db_utils.get_endpoint("maxroll/items/affixes")  # uniques가 밀려남
+    assert db_utils.get_endpoint("maxroll/items/classes") is classes
+    assert len(db_utils._cache_entries) == 2
+
+
+def test_loaders_return_copies(typed_db):
+    uniques = db_utils.get_uniques_from_db(); uniques.clear()
+    assert len(db_utils.get_uniques_from_db()) == 2
+
+
+def test_iter_endpoint_streams_records(typed_db, monkeypatch):
+    monkeypatch.setattr(db_utils, "ENDPOINT_READ_CHUNK_SIZE", 16)
+    affixes = db_utils.iter_endpoint("maxroll/items/affixes")
+    assert next(affixes)["affixId"] == 31
+    assert [a["affixId"] for a in affixes] == [40]
+    assert [u["uniqueID"] for u in db_utils.iter_endpoint("maxroll/items/uniques")] == [7, 3]
+    assert list(db_utils.iter_endpoint("maxroll/items/nope")) == []
+
+
+def test_iter_endpoint_blob_db(blob_only_db, monkeypatch):
+    monkeypatch.setattr(db_utils, "ENDPOINT_READ_CHUNK_SIZE", 5)
+    assert list(db_utils.iter_endpoint("maxroll/items/itemTypes")) == SAMPLE_ITEMS["itemTypes"]
+    assert list(db_utils.iter_endpoint("maxroll/items/uniques")) == SAMPLE_ITEMS["uniques"]
+
+
+@pytest.mark.parametrize("db_fixture", ["typed_db", "blob_only_db"])
+def test_record_loaders_match_dict_loaders(request, db_fixture):
+    request.getfixturevalue(db_fixture)
+    records = db_utils.load_unique_records()
+    assert [r.to_dict() for r in records] == SAMPLE_ITEMS["uniques"]
+    assert [r.to_dict() for r in db_utils.load_affix_records()] == db_utils.load_raw_affixes_from_db()
+    item_types = db_utils.load_item_type_records()
+    assert {k: v.to_dict() for k, v in item_types.items()} == db_utils.load_item_type_map_from_db()
+    assert [r["uniqueID"] for r in db_utils.iter_unique_records()] == [7, 3]
+
+
+def test_search_uses_fts_index(typed_db):
+    assert [(r["kind"], r["id"]) for r in db_utils.search("crown")] == [("uniques", 3)]
+    assert [r["title"] for r in db_utils.search("arm")] == ["Armor", "Idol Armor"] # 접두어 일치
+    assert [r["id"] for r in db_utils.search("fire damage", kinds=["ailments"])] == [1]
+    assert db_utils.search("burn", kinds=["affixes"]) == []
+    assert [r["id"] for r in db_utils.search("burn")] == [7] # 이야기(lore) 텍스트
+    assert db_utils.search('"') == [] and db_utils.search("ignite", kinds=[]) == []
+
+
+def test_search_without_index_returns_empty(blob_only_db):
+    assert db_utils.search("crown") == []
+
+
+@pytest.mark.parametrize("codec", sorted(update_resources.PAYLOAD_COMPRESSORS))
+def test_compressed_payloads_load_transparently(tmp_path, monkeypatch, codec):
+    db_path = str(tmp_path / f"{codec}.db")
+    _write_db(db_path, SAMPLE_ITEMS, typed=False) # 정규화 테이블 없이 엔드포인트 블롭만 사용하도록
+    conn = sqlite3.connect(db_path)
+    conn.execute("ALTER TABLE endpoints ADD COLUMN codec TEXT"); conn.execute("ALTER TABLE endpoints ADD COLUMN payload BLOB")
+    for endpoint, data in conn.execute("SELECT endpoint, data FROM endpoints").fetchall():
+        compressed = update_resources.PAYLOAD_COMPRESSORS[codec](data.encode("utf-8"))
+        conn.execute("UPDATE endpoints SET data = '', codec = ?, payload = ? WHERE endpoint = ?", (codec, compressed, endpoint))
+    conn.commit(); conn.close()
+    monkeypatch.setattr(db_utils, "DB_PATH", db_path)
+    monkeypatch.setattr(db_utils, "ENDPOINT_READ_CHUNK_SIZE", 7) # 압축 스트림을 여러 조각으로 나눠 읽기
+    assert db_utils.get_endpoint("maxroll/items/affixes") == SAMPLE_ITEMS["affixes"]
+    assert list(db_utils.iter_endpoint("maxroll/items/uniques")) == SAMPLE_ITEMS["uniques"]
+    assert db_utils.get_classes_from_db()["Mage"] == ["Sorcerer", "Spellblade"]
+    assert db_utils.load_item_type_map_from_db()["0"]["subtypes"]["2"] == "Celestial Helm"
@@ -0,0 +1,53 @@
+# D:\LEB\tests\test_json_stream.py
+
+import json
+import pytest
+
+from src.json_stream import iter_json_array, iter_json_object, JsonStreamError
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 100000])
+def test_iter_json_array_matches_json_loads(chunk_size):
+    data = [{"name": "Calamity", "mods": [{"value": 0.25, "maxValue": 1.5}], "lore": "불꽃 [1,2]"},
+            12345, -0.5, "문자열, 쉼표", [], {}, None, True, [1, [2, [3]]]]
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    assert list(iter_json_array(_chunks(text, chunk_size))) == data
+
+
+def test_number_split_across_chunks_is_not_truncated():
+    assert list(iter_json_array(["[12", "34", "5, 6", "7]"])) == [12345, 67]
+
+
+def test_empty_array_and_generator_input():
+    assert list(iter_json_array(iter(["  [ ", " ]  "]))) == []
+
+
+def test_invalid_input_raises():
+    with pytest.raises(JsonStreamError):
+        list(iter_json_array(['{"a": 1}']))
+    with pytest.raises(JsonStreamError):
+        list(iter_json_array(["[1 2]"]))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(["[1, {"]))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 100000])
+def test_iter_json_object_expands_selected_members(chunk_size):
+    data = {"categories": [{"key": "a"}], "items": {"a": [1, 2], "b": {"nested": True}, "c": []}, "version": "1.0"}
+    text = json.dumps(data, indent=2)
+    assert list(iter_json_object(_chunks(text, chunk_size), expand=("items",))) == [
+        (("categories",), [{"key": "a"}]), (("items", "a"), [1, 2]), (("items", "b"), {"nested": True}),
+        (("items", "c"), []), (("version",), "1.0")]
+    assert list(iter_json_object(_chunks(text, chunk_size), expand=("items.b",)))[2] == (("items", "b", "nested"), True)
+    assert list(iter_json_object(_chunks(text, chunk_size)))[1] == (("items",), data["items"])
+
+
+def test_iter_json_object_rejects_bad_input():
+    assert list(iter_json_object(["{ }"])) == []
+    with pytest.raises(JsonStreamError): list(iter_json_object(['{"a": 1 "b": 2}']))
+    with pytest.raises(JsonStreamError): list(iter_json_object(['{"a": 1} x']))
+    with pytest.raises(JsonStreamError): list(iter_json_object(['[1]']))
@@ -0,0 +1,253 @@
+# D:\LEB\tests\test_process_game_data.py
+
+import io
+import os
+import sys
+import json
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(BASE_DIR, 'scripts')
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import process_game_data
+
+
+@pytest.mark.parametrize("items", [[], [{"a": 1}], [{"a": [1, {"b": "줄\n바꿈"}]}, {"c": None}, 3]])
+def test_write_json_array_stream_matches_json_dump(items):
+    expected = io.StringIO(); json.dump(items, expected, indent=4, ensure_ascii=False)
+    streamed = io.StringIO()
+    count = process_game_data.write_json_array_stream(streamed, iter(items))
+    assert count == len(items)
+    assert streamed.getvalue() == expected.getvalue()
+
+
+def test_compact_keys_are_written_on_one_line():
+    items = [{"name": "줄\n바꿈", "tips": [{"a": 1}], "mods": [{"min": 0.25, "max": None, "hidden": True}]},
+             {"name": "no mods"}, {"mods": []}]
+    streamed = io.StringIO()
+    process_game_data.write_json_fragments(streamed, (process_game_data.json_array_fragment(item, ("mods",)) for item in items))
+    assert json.loads(streamed.getvalue()) == items
+    lines = streamed.getvalue().splitlines()
+    assert '        "mods": [{"min":0.25,"max":null,"hidden":true}]' in lines and '        "mods": []' in lines
+    assert process_game_data.json_array_fragment(items[1], ("mods",)) == process_game_data.json_array_fragment(items[1])
+
+
+AFFIX_FIXTURE = [
+    {"affixId": 1, "property": 10, "specialTag": 0, "affixName": "Added Armor Long", "affixDisplayName": ""},
+    {"affixId": 2, "property": 10, "specialTag": 0, "affixName": "Armor", "affixDisplayName": "Idol Armr"},
+    {"affixId": 3, "property": 10, "affixName": "Idol Arm"}, # 더 짧지만 idol -> 제외
+    {"affixId": 4, "property": 10, "specialTag": 2, "affixName": "Tag2", "description": "+{0} Armor"},
+    {"affixId": 5, "property": 10, "specialTag": 2, "affixName": "Tag2 later", "description": "ignored"},
+    {"affixId": 6, "property": 20, "affixName": "   ", "affixDisplayName": ""},
+    {"affixId": 7, "property": 20, "affixName": "Ward", "description": "Grants {0} Ward {1}"},
+    {"affixId": 8, "property": 30, "specialTag": 1, "affixName": "", "description": "No name {x}"},
+]
+
+
+@pytest.mark.parametrize("property_id", [10, 20, 30, 99, None])
+@pytest.mark.parametrize("special_tag", [None, 0, 1, 2, 5])
+@pytest.mark.parametrize("value", [None, 3, 0.5])
+def test_affix_index_matches_linear_scan(property_id, special_tag, value):
+    index = process_game_data.AffixIndex(AFFIX_FIXTURE)
+    expected = process_game_data.find_affix_description(AFFIX_FIXTURE, property_id, special_tag, value)
+    assert index.describe(property_id, special_tag, value) == expected
+
+
+ITEM_TYPE_FIXTURE = {"1": {"name": "Helmet", "subtypes": {"2": "Iron Helm"}}, "5": {"name": "Ring", "subtypes": {}}}
+UNIQUE_FIXTURE = [
+    {"uniqueID": 1, "name": "Crown", "baseType": 1, "subTypes": [2], "mods": [{"property": 10, "specialTag": 2, "value": 3}]},
+    {"uniqueID": 2, "name": "Band", "baseType": 5, "subTypes": [], "mods": [{"property": 20, "value": 0.5, "type": 1}]},
+    {"uniqueID": 3, "name": "Circlet", "baseType": 1, "subTypes": [9], "loreText": "옛 왕관",
+     "tooltipDescriptions": [{"description": "[5,10,1]% 확률"}]},
+]
+
+
+@pytest.fixture
+def processed_paths(tmp_path, monkeypatch):
+    for name, file_name in (("RESOURCES_DIR", ""), ("PROCESSED_UNIQUES_FILE", "processed_uniques.json"),
+                            ("PROCESSED_UNIQUES_SNAPSHOT_FILE", "processed_uniques.bin"),
+                            ("PROCESSED_UNIQUES_HASHES_FILE", "processed_uniques.hashes.json"),
+                            ("PROCESSED_UNIQUES_CACHE_FILE", "processed_uniques.cache.db"),
+                            ("PROCESSED_UNIQUES_NDJSON_FILE", "processed_uniques.ndjson"),
+                            ("PROCESSED_SET_BONUSES_FILE", "processed_set_bonuses.json"),
+                            ("PROCESSED_AILMENTS_FILE", "processed_ailments.json"),
+                            ("PROCESSED_UNIQUE_MODS_FILE", "processed_unique_mods.bin"),
+                            ("PROCESSING_STAGES_STATE_FILE", "processing_stages.json")):
+        monkeypatch.setattr(process_game_data, name, str(tmp_path / file_name) if file_name else str(tmp_path))
+    return tmp_path
+
+
+def _full_output(uniques, affixes, tmp_path):
+    assert process_game_data.process_and_save_uniques(uniques, ITEM_TYPE_FIXTURE, affixes)
+    with open(process_game_data.PROCESSED_UNIQUES_FILE, 'rb') as f: return f.read()
+
+
+def test_incremental_reprocessing_only_touches_changed_uniques(processed_paths):
+    affixes = json.loads(json.dumps(AFFIX_FIXTURE)); uniques = json.loads(json.dumps(UNIQUE_FIXTURE))
+    output_path = process_game_data.PROCESSED_UNIQUES_FILE
+    def incremental():
+        return process_game_data.reprocess_uniques_incremental(uniques, ITEM_TYPE_FIXTURE, affixes)
+    def output_bytes():
+        with open(output_path, 'rb') as f: return f.read()
+
+    assert incremental() == {"total": 3, "reprocessed": 3, "reused": 0, "written": True}
+    first = output_bytes()
+    assert incremental() == {"total": 3, "reprocessed": 0, "reused": 3, "written": False}
+
+    affixes[6]["description"] = "Grants {0} Ward"  # property 20 -> Band만 영향
+    assert incremental() == {"total": 3, "reprocessed": 1, "reused": 2, "written": True}
+    affixes[4]["description"] = "still ignored"  # 같은 태그의 앞선 affix가 이미 설명을 가짐 -> 결과 불변
+    uniques[2]["loreText"] = "새 이야기"
+    uniques.insert(0, {"uniqueID": 4, "name": "New", "baseType": 5})
+    assert incremental() == {"total": 4, "reprocessed": 2, "reused": 2, "written": True}
+    incremental_bytes = output_bytes()
+    assert incremental_bytes != first
+    assert _full_output(uniques, affixes, processed_paths) == incremental_bytes # 전체 가공과 바이트 단위로 동일
+
+    # 전체 가공은 해시 파일을 지우므로 다음 증분 가공은 파일을 다시 쓰지만, 결과는 모두 가공 캐시에서 가져옴
+    assert not os.path.exists(process_game_data.PROCESSED_UNIQUES_HASHES_FILE)
+    assert incremental() == {"total": 4, "reprocessed": 0, "reused": 4, "written": True}
+    assert output_bytes() == incremental_bytes
+
+
+def test_input_hash_ignores_unrelated_data_and_tracks_dependencies():
+    index = process_game_data.AffixIndex(AFFIX_FIXTURE)
+    hasher = process_game_data.UniqueInputHasher(ITEM_TYPE_FIXTURE, index)
+    crown = UNIQUE_FIXTURE[0]
+    assert hasher(crown) == hasher(json.loads(json.dumps(crown)))
+    renamed_types = {**ITEM_TYPE_FIXTURE, "1": {"name": "Hat", "subtypes": {"2": "Iron Helm"}}}
+    assert process_game_data.UniqueInputHasher(renamed_types, index)(crown) != hasher(crown)
+    unrelated_types = {**ITEM_TYPE_FIXTURE, "5": {"name": "Amulet", "subtypes": {}}}
+    assert process_game_data.UniqueInputHasher(unrelated_types, index)(crown) == hasher(crown)
+
+
+def test_parallel_processing_matches_serial_order_and_output(processed_paths, monkeypatch):
+    monkeypatch.setattr(process_game_data, "PARALLEL_CHUNK_SIZE", 2) # 여러 묶음 + 미리 보내는 창 제한까지 거치도록
+    uniques = [dict(unique, uniqueID=n, name=f"{unique['name']} {n}") for n in range(11) for unique in UNIQUE_FIXTURE]
+    serial = list(process_game_data.iter_processed_uniques(uniques + [None, 3], ITEM_TYPE_FIXTURE, AFFIX_FIXTURE))
+    parallel = list(process_game_data.iter_processed_uniques_parallel(uniques + [None, 3], ITEM_TYPE_FIXTURE, AFFIX_FIXTURE,
+                                                                      workers=2, chunk_size=2))
+    assert parallel == serial and len(serial) == len(uniques)
+
+    serial_bytes = _full_output(uniques, AFFIX_FIXTURE, processed_paths)
+    assert process_game_data.process_and_save_uniques(uniques, ITEM_TYPE_FIXTURE, AFFIX_FIXTURE, workers=3)
+    with open(process_game_data.PROCESSED_UNIQUES_FILE, 'rb') as f: assert f.read() == serial_bytes
+
+    # 증분 가공: 다시 가공할 레코드만 병렬로 보내고 재사용 결과 사이에 순서대로 끼워 넣음
+    stats = process_game_data.reprocess_uniques_incremental(uniques, ITEM_TYPE_FIXTURE, AFFIX_FIXTURE, workers=2)
+    assert stats["reprocessed"] == len(uniques)
+    uniques[5]["loreText"] = "바뀜"; uniques[20]["loreText"] = "바뀜"
+    stats = process_game_data.reprocess_uniques_incremental(uniques, ITEM_TYPE_FIXTURE, AFFIX_FIXTURE, workers=2)
+    assert (stats["reprocessed"], stats["written"]) == (2, True)
+    with open(process_game_data.PROCESSED_UNIQUES_FILE, 'rb') as f: incremental_bytes = f.read()
+    assert _full_output(uniques, AFFIX_FIXTURE, processed_paths) == incremental_bytes
+
+
+def test_processing_cache_serves_reverted_records_and_survives_corruption(processed_paths):
+    affixes = json.loads(json.dumps(AFFIX_FIXTURE)); uniques = json.loads(json.dumps(UNIQUE_FIXTURE))
+    sources = lambda: [(json.dumps(unique, ensure_ascii=False), None) for unique in uniques] # 텍스트만 (파싱은 미스일 때만)
+    def incremental(**kwargs):
+        return process_game_data.reprocess_uniques_incremental(sources(), ITEM_TYPE_FIXTURE, affixes, **kwargs)
+    def output_bytes():
+        with open(process_game_data.PROCESSED_UNIQUES_FILE, 'rb') as f: return f.read()
+
+    assert incremental()["reprocessed"] == 3
+    original = output_bytes()
+    uniques[1]["name"] = "Patched Band"
+    assert incremental() == {"total": 3, "reprocessed": 1, "reused": 2, "written": True}
+    uniques[1]["name"] = "Band" # 패치 되돌림: 이전 결과가 캐시에 남아 있음
+    assert incremental() == {"total": 3, "reprocessed": 0, "reused": 3, "written": True}
+    assert output_bytes() == original
+    assert incremental(full=True) == {"total": 3, "reprocessed": 3, "reused": 0, "written": True}
+    assert output_bytes() == original
+
+    with open(process_game_data.PROCESSED_UNIQUES_CACHE_FILE, 'wb') as f: f.write(b"not a database" * 100)
+    os.remove(process_game_data.PROCESSED_UNIQUES_HASHES_FILE)
+    assert incremental()["reprocessed"] == 3 # 깨진 캐시는 새로 만들고 전부 가공
+    assert output_bytes() == original and incremental()["reused"] == 3
+
+
+def test_ndjson_output_matches_json_and_stays_current(processed_paths):
+    uniques = json.loads(json.dumps(UNIQUE_FIXTURE)); ndjson_path = process_game_data.PROCESSED_UNIQUES_NDJSON_FILE
+    def incremental(**kwargs):
+        return process_game_data.reprocess_uniques_incremental(uniques, ITEM_TYPE_FIXTURE, AFFIX_FIXTURE, **kwargs)
+    def ndjson_records():
+        with open(ndjson_path, 'r', encoding='utf-8') as f: return [json.loads(line) for line in f]
+    def json_records():
+        with open(process_game_data.PROCESSED_UNIQUES_FILE, 'r', encoding='utf-8') as f: return json.load(f)
+
+    incremental()
+    assert not os.path.exists(ndjson_path) # 기본은 NDJSON을 만들지 않음
+    assert incremental(ndjson=True)["written"] # JSON은 그대로지만 NDJSON이 없으므로 다시 기록
+    assert ndjson_records() == json_records()
+    assert incremental()["written"] is False # 이미 있으면 계속 갱신 대상이고, 지금은 최신
+    uniques[0]["name"] = "Patched Crown"
+    assert incremental()["reprocessed"] == 1
+    assert ndjson_records() == json_records() and ndjson_records()[0]["name_display"] == "Patched Crown"
+    os.remove(ndjson_path + ".idx") # 인덱스가 없으면 최신이 아님 -> 다시 기록
+    assert incremental()["written"] and os.path.exists(ndjson_path + ".idx")
+
+
+def test_set_bonuses_and_ailments_processing():
+    uniques = [dict(UNIQUE_FIXTURE[0], isSetItem=True, setID=7), dict(UNIQUE_FIXTURE[1], isSetItem=True, setID=7),
+               dict(UNIQUE_FIXTURE[2], setID=7)]
+    set_bonuses = [{"setID": 7, "mods": [{"property": 20, "value": 0.5, "type": 1, "setRequirement": 3},
+                                         {"property": 10, "value": 1, "setRequirement": 2, "hideInTooltip": True}],
+                    "tooltipDescriptions": [{"description": "+[10,20,1]% Damned", "setRequirement": 2}]}, "bad"]
+    processed = list(process_game_data.iter_processed_set_bonuses(set_bonuses, uniques, AFFIX_FIXTURE))
+    assert processed == [{"set_id": 7, "item_names": ["Crown", "Band"], "bonuses": [
+        {"set_requirement": 2, "formatted_mods_list": [],
+         "formatted_tooltips_list": [{"description": "+(10 ~ 20)% Damned", "altText": ""}]},
+        {"set_requirement": 3, "formatted_mods_list": [process_game_data.format_mod_line(set_bonuses[0]["mods"][0],
+                                                                                         process_game_data.AffixIndex(AFFIX_FIXTURE))],
+         "formatted_tooltips_list": []}]}]
+    ailments = [{"id": 1, "displayName": "", "instanceName": "Ignite", "description": "Deals [5] fire", "dealsDamage": True,
+                 "baseDamage": {"damage": [0, 40, 0, 0, 0, 0, 0, 3]}}, None]
+    assert list(process_game_data.iter_processed_ailments(ailments)) == [
+        {"ailment_id": 1, "name_display": "Ignite", "instance_name": "Ignite", "description": "Deals 5 fire",
+         "deals_damage": True, "base_damage": {"Fire": 40, "7": 3}}]
+
+
+def test_registered_stages_and_uniques_stats():
+    assert process_game_data.STAGES.names() == ["uniques", "setBonuses", "ailments", "uniqueMods"]
+    assert [stage.name for stage in process_game_data.STAGES.resolve(["ailments"])] == ["ailments"]
+    assert process_game_data.uniques_stats({"uniques": {"status": "skipped", "result": {"total": 5}}}) == {
+        "total": 5, "reprocessed": 0, "reused": 5, "written": False}
+    assert process_game_data.uniques_stats({"uniques": {"status": "failed", "result": None}}) is None
+
+
+def test_snapshot_failure_does_not_fail_the_uniques_stage(processed_paths, monkeypatch):
+    from src.processing_stages import run_stages
+    def fail_snapshot(self, source_sha256): raise OSError("디스크 가득 참")
+    monkeypatch.setattr(process_game_data.SnapshotWriter, "finish", fail_snapshot)
+    monkeypatch.setattr(process_game_data.STAGES.get("uniques"), "run", lambda options: bool(
+        process_game_data.process_and_save_uniques(UNIQUE_FIXTURE, ITEM_TYPE_FIXTURE, AFFIX_FIXTURE)) and {"written": True})
+    results = run_stages(process_game_data.STAGES, {}, process_game_data.PROCESSING_STAGES_STATE_FILE, targets=["uniqueMods"])
+    assert {name: result["status"] for name, result in results.items()} == {"uniques": "ran", "uniqueMods": "ran"}
+    assert not [name for name in os.listdir(processed_paths) if name.endswith(".bin") and name.startswith("processed_uniques")]
+
+
+def test_structured_mods_keep_numeric_roll_ranges():
+    mods = [{"property": 4, "type": 1, "value": 0.24, "maxValue": 0.12, "canRoll": True, "tags": 2},
+            {"property": 10, "specialTag": 2, "value": 3, "maxValue": 9}, # 굴림 불가 -> 고정값
+            {"property": 20, "hideInTooltip": True}]
+    assert [process_game_data.structured_mod(mod) for mod in mods] == [
+        {"property": 4, "special_tag": 0, "type": 1, "tags": 2, "min": 0.12, "max": 0.24, "hidden": False},
+        {"property": 10, "special_tag": 2, "type": 0, "tags": 0, "min": 3, "max": 3, "hidden": False},
+        {"property": 20, "special_tag": 0, "type": 0, "tags": 0, "min": None, "max": None, "hidden": True}]
+    processed = list(process_game_data.iter_processed_uniques(UNIQUE_FIXTURE, ITEM_TYPE_FIXTURE, AFFIX_FIXTURE))
+    assert [(item["base_type_id"], len(item["mods"])) for item in processed] == [(1, 1), (5, 1), (1, 0)]
+
+
+def test_unique_mods_stage_follows_uniques_output(processed_paths, monkeypatch):
+    from src.unique_mod_columns import UniqueModColumns
+    from src.uniques_snapshot import file_sha256
+    assert process_game_data.process_and_save_uniques(UNIQUE_FIXTURE, ITEM_TYPE_FIXTURE, AFFIX_FIXTURE)
+    monkeypatch.setattr(process_game_data.json, "load", None) # 결과 JSON 전체를 한 번에 읽지 않음
+    monkeypatch.setattr(process_game_data, "JSON_READ_CHUNK_SIZE", 7)
+    assert process_game_data._run_unique_mods_stage({}) == {"uniques": 3, "mods": 2}
+    columns = UniqueModColumns.load(process_game_data.PROCESSED_UNIQUE_MODS_FILE,
+                                    file_sha256(process_game_data.PROCESSED_UNIQUES_FILE))
+    assert columns.query(20, mod_type=1, at_least=0.5) == [1] and columns.query(10, base_types=[5]) == []
@@ -0,0 +1,111 @@
+# D:\LEB\tests\test_processing_stages.py
+
+import json
+import threading
+import pytest
+
+from src.processing_stages import Stage, StageRegistry, run_stages
+
+
+def _file_stage(tmp_path, name, endpoints, calls, requires=(), run=None):
+    """입력을 받아 파일 하나를 쓰는 단계 (앞 단계가 있으면 그 결과 파일 내용을 이어 붙임)"""
+    path = tmp_path / f"{name}.json"
+    def default_run(options):
+        calls.append(name)
+        upstream = [json.loads((tmp_path / f"{required}.json").read_text()) for required in requires]
+        path.write_text(json.dumps({"name": name, "upstream": upstream, "value": options.get("value")}))
+        return {"name": name}
+    return Stage(name, endpoints, lambda options: [str(path)], run or default_run, requires=requires)
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    calls = []; registry = StageRegistry()
+    registry.register(_file_stage(tmp_path, "a", ("ep/a",), calls))
+    registry.register(_file_stage(tmp_path, "b", ("ep/b",), calls))
+    registry.register(_file_stage(tmp_path, "c", ("ep/c",), calls, requires=("a",)))
+    state_path = str(tmp_path / "stages.json")
+    def run(hashes, **kwargs):
+        calls.clear()
+        results = run_stages(registry, hashes, state_path, **kwargs)
+        return {name: result["status"] for name, result in results.items()}, sorted(calls)
+    return registry, run, tmp_path
+
+
+def test_registry_resolves_dependencies_and_rejects_cycles():
+    registry = StageRegistry(); noop = lambda options: []
+    for name, requires in (("c", ("b",)), ("b", ("a",)), ("a", ())):
+        registry.register(Stage(name, (), noop, noop, requires=requires))
+    assert [stage.name for stage in registry.resolve(["c"])] == ["a", "b", "c"]
+    assert [stage.name for stage in registry.resolve(["a"])] == ["a"]
+    with pytest.raises(ValueError):
+        registry.register(Stage("a", (), noop, noop))
+    registry.register(Stage("x", (), noop, noop, requires=("y",))); registry.register(Stage("y", (), noop, noop, requires=("x",)))
+    with pytest.raises(ValueError):
+        registry.resolve(["x"])
+    with pytest.raises(KeyError):
+        registry.resolve(["missing"])
+
+
+def test_only_stages_with_changed_inputs_run(pipeline):
+    _, run, tmp_path = pipeline
+    hashes = {"ep/a": "1", "ep/b": "1", "ep/c": "1"}
+    assert run(hashes) == ({"a": "ran", "b": "ran", "c": "ran"}, ["a", "b", "c"])
+    assert run(hashes) == ({"a": "skipped", "b": "skipped", "c": "skipped"}, [])
+    assert run({**hashes, "ep/b": "2"}) == ({"a": "skipped", "b": "ran", "c": "skipped"}, ["b"])
+    # a의 입력이 바뀌어도 결과 파일이 같으면 c는 그대로 (make와 달리 내용 해시로 비교)
+    assert run({**hashes, "ep/a": "2", "ep/b": "2"}) == ({"a": "ran", "b": "skipped", "c": "skipped"}, ["a"])
+    assert run({**hashes, "ep/a": "3", "ep/b": "2"}, options={"value": 1}) == (
+        {"a": "ran", "b": "skipped", "c": "ran"}, ["a", "c"])
+    (tmp_path / "b.json").write_text("edited") # 결과 파일이 바뀌거나 없으면 다시 실행
+    assert run({**hashes, "ep/a": "3", "ep/b": "2"}, options={"value": 1})[1] == ["b"]
+    assert run({}, options={"value": 1})[1] == ["a", "b", "c"] # 엔드포인트 해시를 모르면 항상 실행
+    assert run({**hashes, "ep/a": "3", "ep/b": "2"}, options={"value": 1}, targets=["c"], force=True)[1] == ["a", "c"]
+
+
+def test_failed_stage_blocks_dependents_and_reruns_next_time(pipeline):
+    registry, run, tmp_path = pipeline
+    hashes = {"ep/a": "1", "ep/b": "1", "ep/c": "1", "ep/d": "1"}
+    attempts = []
+    def flaky(options):
+        attempts.append(1)
+        if len(attempts) == 1: raise RuntimeError("boom")
+        (tmp_path / "d.json").write_text('"ok"'); return {"ok": True}
+    registry.register(_file_stage(tmp_path, "d", ("ep/d",), [], run=flaky))
+    registry.register(_file_stage(tmp_path, "e", ("ep/d",), [], requires=("d",)))
+    statuses, _ = run(hashes)
+    assert statuses == {"a": "ran", "b": "ran", "c": "ran", "d": "failed", "e": "blocked"}
+    statuses, _ = run(hashes)
+    assert statuses == {"a": "skipped", "b": "skipped", "c": "skipped", "d": "ran", "e": "ran"} and len(attempts) == 2
+
+
+def test_missing_optional_output_is_not_a_failure(tmp_path):
+    main_path = tmp_path / "main.json"; extra_path = tmp_path / "extra.bin"; calls = []; write_extra = []
+    def run(options):
+        calls.append(1); main_path.write_text('"main"')
+        if write_extra: extra_path.write_text("extra")
+        return {}
+    registry = StageRegistry()
+    registry.register(Stage("main", ("ep",), lambda options: [str(main_path)], run,
+                            optional_outputs=lambda options: [str(extra_path)]))
+    registry.register(_file_stage(tmp_path, "after", ("ep",), [], requires=("main",)))
+    state_path = str(tmp_path / "stages.json")
+    def statuses(force=False):
+        results = run_stages(registry, {"ep": "1"}, state_path, force=force)
+        return {name: result["status"] for name, result in results.items()}
+    assert statuses() == {"main": "ran", "after": "ran"} # 선택 출력이 없어도 성공, 뒤 단계도 실행
+    assert statuses() == {"main": "skipped", "after": "skipped"} and len(calls) == 1
+    write_extra.append(1); statuses(force=True); extra_path.unlink() # 있던 선택 출력이 사라지면 다시 만듦
+    assert statuses() == {"main": "ran", "after": "skipped"} and extra_path.exists() and len(calls) == 3
+
+
+def test_independent_stages_run_concurrently(tmp_path):
+    barrier = threading.Barrier(2, timeout=5); registry = StageRegistry()
+    for name in ("left", "right"):
+        path = tmp_path / f"{name}.txt"
+        def run(options, path=path):
+            barrier.wait() # 두 단계가 동시에 실행 중이어야 통과
+            path.write_text("done"); return {}
+        registry.register(Stage(name, ("ep",), lambda options, path=path: [str(path)], run))
+    results = run_stages(registry, {"ep": "1"}, str(tmp_path / "stages.json"))
+    assert [result["status"] for result in results.values()] == ["ran", "ran"]
@@ -0,0 +1,49 @@
+# D:\LEB\tests\test_records.py
+
+import pytest
+from array import array
+
+from src.records import UniqueRecord, ModRecord, AffixRecord, ItemTypeRecord
+
+RAW_UNIQUE = {
+    "uniqueID": 7, "name": "Calamity", "displayName": "", "baseType": 0, "subTypes": [1, 4],
+    "levelRequirement": 10, "loreText": "Burn.", "rarity": 7, "legendaryType": 0,
+    "mods": [{"property": 10, "specialTag": 0, "value": 0.5, "maxValue": 0.8, "canRoll": True, "type": 1, "tags": 0},
+             {"property": 88, "value": 2, "hideInTooltip": None}],
+    "tooltipDescriptions": [{"description": "[5]% chance", "altText": ""}],
+}
+
+
+def test_unique_record_behaves_like_source_dict():
+    record = UniqueRecord.from_raw(RAW_UNIQUE)
+    assert record.get("displayName") == "" and record.get("uniqueID") == 7
+    assert record.get("rarity", "default") == "default" # 보관하지 않는 필드
+    assert isinstance(record.sub_types, array) and str(record.get("subTypes", [])[0]) == "1"
+    assert record["mods"][0].get("maxValue") == 0.8
+    assert isinstance(record["mods"][1].get("value"), int) # int/float 구분 유지
+    assert record["tooltipDescriptions"][0].get("altText", "x") == ""
+    with pytest.raises(KeyError): record["rarity"]
+
+
+def test_missing_key_differs_from_none_value():
+    mod = ModRecord.from_raw(RAW_UNIQUE["mods"][1])
+    assert mod.get("hideInTooltip", "default") is None # 값이 None인 키는 dict.get처럼 None
+    assert mod.get("specialTag", "default") == "default" # 없던 키는 기본값
+    assert "hideInTooltip" in mod and "specialTag" not in mod
+    assert AffixRecord.from_raw({"affixName": "A"}).get("affixDisplayName", "").strip() == ""
+
+
+def test_to_dict_round_trips_kept_fields():
+    record = UniqueRecord.from_raw(RAW_UNIQUE)
+    expected = {k: v for k, v in RAW_UNIQUE.items() if k not in ("rarity", "legendaryType")}
+    assert record.to_dict() == expected
+    assert record == UniqueRecord.from_raw(dict(RAW_UNIQUE))
+
+
+def test_records_use_slots_and_intern_strings():
+    a = AffixRecord.from_raw({"affixName": "".join(["Added ", "Armor"])})
+    b = AffixRecord.from_raw({"affixName": "".join(["Added ", "Arm", "or"])})
+    assert a.affix_name is b.affix_name
+    assert not hasattr(a, "__dict__")
+    item_type = ItemTypeRecord.from_raw({"name": "Helmet", "subtypes": {"1": "Leather Helmet"}})
+    assert item_type["subtypes"]["1"] == "Leather Helmet" and item_type.get("name") == "Helmet"
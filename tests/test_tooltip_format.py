@@ -0,0 +1,75 @@
+# D:\LEB\tests\test_tooltip_format.py
+
+import re
+import random
+import pytest
+
+from src.tooltip_format import format_tooltip, parse_tooltip, format_mod_value, format_mod_value_range
+
+
+def _legacy_format_tooltip(desc):
+    """예전 process_game_data의 re.sub 세 번 (기준 동작)"""
+    desc = re.sub(r'\[([\d.-]+),\s*([\d.-]+),\s*([\d.-]+)\]%', r'(\1 ~ \2)%', desc)
+    desc = re.sub(r'\[([\d.-]+),\s*c,\s*([\d.-]*)\]%', r'\1%', desc)
+    return re.sub(r'\[([\d.-]+)\]', r'\1', desc)
+
+
+@pytest.mark.parametrize("description, expected", [
+    ("+[10,20,1]% Fire Damage", "+(10 ~ 20)% Fire Damage"),
+    ("[100, 200, 2]% more", "(100 ~ 200)% more"),
+    ("[5, c, 9]% chance and [3,c,]% more", "5% chance and 3% more"),
+    ("Gain [3] stacks", "Gain 3 stacks"),
+    ("[10,16,1] no percent, [1,c] no percent", "[10,16,1] no percent, [1,c] no percent"),
+    ("no brackets", "no brackets"),
+    ("[-5,-1,0]% less [0.5]", "(-5 ~ -1)% less 0.5"),
+])
+def test_format_tooltip(description, expected):
+    assert format_tooltip(description) == expected == _legacy_format_tooltip(description)
+
+
+def test_format_tooltip_matches_legacy_on_random_input():
+    rng = random.Random(20)
+    alphabet = ["[", "]", "%", ",", ", ", "c", "1", "25", ".", "-", " ", "x", "[1,2,3]%", "[4, c, 5]%", "[6]"]
+    for _ in range(5000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 14)))
+        assert format_tooltip(text) == _legacy_format_tooltip(text), text
+
+
+def test_parse_tooltip_returns_display_and_ranges():
+    display, ranges = parse_tooltip("+[10,20,1]% Fire, [5, c, 9]% chance, [3] stacks")
+    assert display == "+(10 ~ 20)% Fire, 5% chance, 3 stacks"
+    assert [(r["kind"], r["min"], r["max"], r["step"], r["percent"]) for r in ranges] == [
+        ("range", 10.0, 20.0, 1.0, True), ("constant", 5.0, 5.0, None, True), ("value", 3.0, 3.0, None, False)]
+    assert [display[r["start"]:r["end"]] for r in ranges] == ["(10 ~ 20)%", "5%", "3"]
+    assert parse_tooltip("plain") == ("plain", [])
+    assert parse_tooltip("[-]")[1][0]["min"] is None
+
+
+@pytest.mark.parametrize("args, expected", [
+    ((5, 0.0, False, 0), "+5"),
+    ((0.25, None, False, 1), "25%"),
+    ((0.1, 0.2, True, 1), "(10% ~ 20%)"),
+    ((3, 7, True, 0), "(+3 ~ 7)"),
+    ((3, 3, True, 0), "+3"),
+    ((-0.5, None, False, 2), "-50%"),
+    ((2.0, None, False, 0), "+2"),
+    ((1, None, False, 2), "100%"),
+    ((0.5, 2, True, 2), "(50% ~ 200%)"), # 최소 float, 최대 int
+    ((1.25, 2.0, True, 0), "(+1.2 ~ 2)"),
+    ((-1.5, -0.5, True, 3), "(-1.5 ~ -0.5)"),
+])
+def test_format_mod_value_range(args, expected):
+    assert format_mod_value_range(*args) == expected
+
+
+def test_format_mod_value_range_matches_format_mod_value():
+    for value, max_value, mod_type in ((0.25, 0.5, 1), (3, 7, 0), (1.0, 1.5, 0), (-2, 4, 0), (0.1, 1, 2), (7, 9.5, 4)):
+        is_percent = mod_type in (1, 2)
+        expected = f"({format_mod_value(value, is_percent, mod_type)} ~ {format_mod_value(max_value, is_percent, mod_type).lstrip('+')})"
+        assert format_mod_value_range(value, max_value, True, mod_type) == expected
+        assert format_mod_value_range(value, max_value, False, mod_type) == format_mod_value(value, is_percent, mod_type)
+
+
+def test_format_mod_value():
+    assert format_mod_value(0, False, 0) == "0"
+    assert format_mod_value(10.04, False, 3) == "10" # 소수 첫째 자리 반올림 후 ".0" 제거
@@ -0,0 +1,119 @@
+# D:\LEB\tests\test_unique_mod_columns.py
+
+import os
+import json
+import math
+import itertools
+import pytest
+
+from src import db_utils
+from src import unique_mod_columns
+from src.unique_mod_columns import UniqueModColumns, ModColumnsError
+from src.uniques_snapshot import file_sha256
+
+
+def _mod(property_id, low, high, mod_type=0, special_tag=0, hidden=False):
+    return {"property": property_id, "special_tag": special_tag, "type": mod_type, "tags": 0, "min": low, "max": high,
+            "hidden": hidden}
+
+SAMPLE_PROCESSED = [
+    {"unique_id": 1, "name_display": "Ring A", "base_type_id": 21, "level_requirement": 20,
+     "mods": [_mod(4, 0.12, 0.24, mod_type=1), _mod(10, 5, 5)]},
+    {"unique_id": 2, "name_display": "Ring B", "base_type_id": 21, "level_requirement": 70,
+     "mods": [_mod(4, 0.3, 0.4, mod_type=1)]},
+    {"unique_id": 3, "name_display": "Amulet", "base_type_id": 20, "level_requirement": 45,
+     "mods": [_mod(4, 0.05, 0.1, mod_type=1), _mod(4, 0.2, 0.2, mod_type=0, hidden=True), _mod(10, None, None)]},
+    {"unique_id": 4, "name_display": "Old format", "level_requirement": "?"}, # 'mods'/base_type_id 없는 이전 형식
+    {"unique_id": 5, "name_display": "Relic", "base_type_id": 22, "level_requirement": 10,
+     "mods": [_mod(10, -3, 2, special_tag=1)]},
+]
+
+
+def _brute_force(items, property_id, special_tag=None, mod_type=None, at_least=None, at_most=None, base_types=None,
+                 max_level=None, min_level=None, include_hidden=True):
+    matches = []
+    for position, item in enumerate(items):
+        level = item.get("level_requirement")
+        if base_types is not None and item.get("base_type_id") not in base_types: continue
+        if (max_level is not None or min_level is not None) and not isinstance(level, int): continue
+        if max_level is not None and level > max_level: continue
+        if min_level is not None and level < min_level: continue
+        for mod in item.get("mods") or ():
+            if mod["property"] != property_id: continue
+            if special_tag is not None and mod["special_tag"] != special_tag: continue
+            if mod_type is not None and mod["type"] != mod_type: continue
+            if at_least is not None and (mod["max"] is None or mod["max"] < at_least): continue
+            if at_most is not None and (mod["min"] is None or mod["min"] > at_most): continue
+            if not include_hidden and mod["hidden"]: continue
+            matches.append(position); break
+    return matches
+
+
+QUERIES = [dict(zip(("property_id", "mod_type", "at_least", "base_types", "max_level", "include_hidden"), values))
+           for values in itertools.product((4, 10, 99), (None, 0, 1), (None, 0.15), (None, (21,), (20, 22)), (None, 60),
+                                           (True, False))]
+QUERIES += [{"property_id": 10, "special_tag": 1, "at_most": 0}, {"property_id": 10, "at_most": 4.5, "min_level": 15}]
+
+
+@pytest.fixture(params=["array", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        if os.environ.get("LEB_REQUIRE_NUMPY"): assert unique_mod_columns.np is not None, "CI의 NumPy 경로인데 numpy가 없습니다"
+        else: pytest.importorskip("numpy")
+    else: monkeypatch.setattr(unique_mod_columns, "np", None)
+    return request.param
+
+
+def test_columns_layout(backend):
+    columns = UniqueModColumns.from_processed(SAMPLE_PROCESSED)
+    assert (len(columns), columns.mod_count) == (5, 7)
+    assert list(columns.mods_of(2)) == [3, 4, 5] and list(columns.mods_of(3)) == []
+    assert list(columns.column("level")) == [20, 70, 45, unique_mod_columns.MISSING_INT, 10]
+    assert math.isnan(columns.column("max")[5]) and list(columns.column("hidden")) == [0, 0, 0, 0, 1, 0, 0]
+
+
+def test_query_matches_brute_force(backend):
+    columns = UniqueModColumns.from_processed(SAMPLE_PROCESSED)
+    for kwargs in QUERIES:
+        assert columns.query(**kwargs) == _brute_force(SAMPLE_PROCESSED, **kwargs), kwargs
+
+
+def test_empty_columns(tmp_path, backend):
+    for items in ([], [{"unique_id": 1, "mods": []}]):
+        columns = UniqueModColumns.from_processed(items)
+        assert (len(columns), columns.mod_count) == (len(items), 0) and columns.query(4, base_types=(21,), max_level=60) == []
+        columns.save(str(tmp_path / "empty.bin"), b"\0" * 32)
+        assert UniqueModColumns.load(str(tmp_path / "empty.bin")).query(4) == []
+
+
+def test_save_load_roundtrip_and_rejection(tmp_path, backend):
+    path = str(tmp_path / "mods.bin"); columns = UniqueModColumns.from_processed(SAMPLE_PROCESSED)
+    columns.save(path, b"\1" * 32)
+    loaded = UniqueModColumns.load(path, b"\1" * 32)
+    for name, _ in unique_mod_columns.UNIQUE_COLUMNS + unique_mod_columns.MOD_COLUMNS:
+        assert list(loaded.column(name)) == pytest.approx(list(columns.column(name)), nan_ok=True)
+    assert loaded.query(4, at_least=0.15, max_level=60) == [0, 2]
+    with pytest.raises(ModColumnsError):
+        UniqueModColumns.load(path, b"\2" * 32) # 원본 JSON이 바뀜
+    data = bytearray(open(path, 'rb').read()); data[-1] ^= 0x01
+    with open(path, 'wb') as f: f.write(bytes(data))
+    with pytest.raises(ModColumnsError):
+        UniqueModColumns.load(path)
+    with pytest.raises(ModColumnsError):
+        UniqueModColumns.load(str(tmp_path / "missing.bin"))
+
+
+def test_db_utils_load_unique_mod_columns(tmp_path, monkeypatch, backend):
+    json_path = tmp_path / "processed_uniques.json"; mods_path = str(tmp_path / "processed_unique_mods.bin")
+    json_path.write_text(json.dumps(SAMPLE_PROCESSED), encoding="utf-8")
+    monkeypatch.setattr(db_utils, "PROCESSED_UNIQUES_PATH", str(json_path))
+    monkeypatch.setattr(db_utils, "PROCESSED_UNIQUES_SNAPSHOT_PATH", str(tmp_path / "processed_uniques.bin"))
+    monkeypatch.setattr(db_utils, "PROCESSED_UNIQUES_NDJSON_PATH", str(tmp_path / "processed_uniques.ndjson"))
+    monkeypatch.setattr(db_utils, "PROCESSED_UNIQUE_MODS_PATH", mods_path)
+    assert db_utils.load_unique_mod_columns().query(10) == [0, 2, 4] # 열 파일이 없으면 JSON에서 바로 만듦
+
+    UniqueModColumns.from_processed(SAMPLE_PROCESSED[:1]).save(mods_path, file_sha256(str(json_path)))
+    assert len(db_utils.load_unique_mod_columns()) == 1 # 최신 열 파일을 그대로 사용
+    json_path.write_text(json.dumps(SAMPLE_PROCESSED[:2]), encoding="utf-8") # 열 파일이 오래됨 -> 다시 만듦
+    assert len(db_utils.load_unique_mod_columns()) == 2
+    assert len(db_utils.load_unique_mod_columns(SAMPLE_PROCESSED)) == 5
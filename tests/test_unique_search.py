@@ -0,0 +1,49 @@
+# D:\LEB\tests\test_unique_search.py
+
+import pytest
+
+from src.unique_search import UniqueSearchIndex, tokenize
+
+PROCESSED = [
+    {"unique_id": 10, "name_display": "Fractured Crown", "item_type_display_full": "Celestial Helm (Helmet)",
+     "lore_text": "Few goals have cost more lives.", "formatted_mods_list": ["(15% ~ 30%) Added Mana Increased"],
+     "formatted_tooltips_html_list": [{"description": "You have no ward", "altText": ""}]},
+    {"unique_id": 11, "name_display": "Calamity", "item_type_display_full": "Leather Helmet (Helmet)",
+     "lore_text": "Set the world ablaze.", "formatted_mods_list": ["(5% ~ 10%) Increased Cast Speed"],
+     "formatted_tooltips_html_list": [{"description": "Chance to Ignite with Fire Skills", "altText": "crown fire"}]},
+    {"unique_id": 12, "name_display": "Crowned Ward", "item_type_display_full": "Shield", "lore_text": "",
+     "formatted_mods_list": [], "formatted_tooltips_list": [{"description": "화염 저항", "altText": ""}]},
+]
+
+
+@pytest.fixture
+def index():
+    return UniqueSearchIndex(PROCESSED)
+
+
+def test_tokenize_is_case_insensitive_and_keeps_korean():
+    assert tokenize("Fire-Skills 화염 저항!") == ["fire", "skills", "화염", "저항"]
+    assert tokenize(None) == []
+
+
+def test_name_match_ranks_above_text_match(index):
+    # 10: 이름에 "crown" 완전 일치, 12: 이름에 접두어 일치, 11: altText에만 일치
+    assert index.search("crown") == [10, 12, 11]
+
+
+def test_prefix_query_matches_partial_words(index):
+    assert index.search("cal") == [11]
+    assert index.search("Hel") == [11, 10] # 동점이면 이름 순
+    assert index.search("화") == [12] # 이전 형식 툴팁 키도 색인
+
+
+def test_all_tokens_must_match(index):
+    assert index.search("ward crown") == [12, 10]
+    assert index.search("cast ignite") == [11]
+    assert index.search("cast crownless") == []
+
+
+def test_empty_query_and_limit(index):
+    assert index.search("   ") == []
+    assert index.search_positions("helmet", limit=1) == [1] # "helmet"이 두 번 나오는 Calamity 우선
+    assert index.search("helmet") == index.search("HELMET  helmet") # 캐시/중복 토큰도 같은 결과
@@ -0,0 +1,89 @@
+# D:\LEB\tests\test_uniques_ndjson.py
+
+import json
+import pytest
+
+from src import db_utils, uniques_ndjson
+from src.uniques_snapshot import ProcessedUniquesList, file_sha256
+from src.uniques_ndjson import NdjsonWriter, NdjsonUniques, NdjsonError
+
+SAMPLE_PROCESSED = [
+    {"unique_id": uid, "name_display": f"Unique {uid}", "level_requirement": uid, "lore_text": "줄\n바꿈",
+     "formatted_mods_list": [f"+{uid} Armor"]}
+    for uid in range(7)
+]
+
+
+@pytest.fixture
+def ndjson_files(tmp_path, monkeypatch):
+    json_path = tmp_path / "processed_uniques.json"
+    ndjson_path = tmp_path / "processed_uniques.ndjson"
+    json_path.write_text(json.dumps(SAMPLE_PROCESSED, indent=4, ensure_ascii=False), encoding="utf-8")
+    writer = NdjsonWriter(str(ndjson_path))
+    for record in SAMPLE_PROCESSED:
+        writer.add(record)
+    assert writer.finish(file_sha256(str(json_path))) == len(SAMPLE_PROCESSED)
+    monkeypatch.setattr(db_utils, "PROCESSED_UNIQUES_PATH", str(json_path))
+    monkeypatch.setattr(db_utils, "PROCESSED_UNIQUES_SNAPSHOT_PATH", str(tmp_path / "processed_uniques.bin"))
+    monkeypatch.setattr(db_utils, "PROCESSED_UNIQUES_NDJSON_PATH", str(ndjson_path))
+    return json_path, ndjson_path
+
+
+def test_ndjson_is_one_record_per_line(ndjson_files):
+    _, ndjson_path = ndjson_files
+    lines = ndjson_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == SAMPLE_PROCESSED # 문자열 안의 줄바꿈은 이스케이프됨
+
+
+def test_ndjson_reader_random_access_and_pages(ndjson_files):
+    json_path, ndjson_path = ndjson_files
+    items = NdjsonUniques(str(ndjson_path), file_sha256(str(json_path)))
+    try:
+        assert len(items) == 7 and items.names()[:2] == ["Unique 0", "Unique 1"]
+        assert items._decoded == {} # 이름 목록만으로는 레코드를 디코딩하지 않음
+        assert items.get_by_unique_id(5) == SAMPLE_PROCESSED[5] and list(items._decoded) == [5]
+        assert items.get_by_unique_id(99) is None
+        assert items.page(1, page_size=3) == SAMPLE_PROCESSED[3:6]
+        assert items.page(3, page_size=3) == [] and items.page(-1) == []
+        assert [len(page) for page in items.iter_pages(page_size=3)] == [3, 3, 1]
+        assert list(items) == SAMPLE_PROCESSED and items[-1] is items[6]
+    finally:
+        items.close()
+
+
+def test_ndjson_reader_rejects_stale_or_corrupt_files(ndjson_files, monkeypatch):
+    json_path, ndjson_path = ndjson_files
+    with pytest.raises(NdjsonError):
+        NdjsonUniques(str(ndjson_path), b"\0" * 32)
+    data = bytearray(ndjson_path.read_bytes()); data[3] ^= 0x01
+    ndjson_path.write_bytes(bytes(data))
+    with monkeypatch.context() as patch: # 크기가 맞으면 열리고, 손상된 줄은 읽을 때 확인
+        patch.setattr(uniques_ndjson.hashlib, "sha256", lambda *args: pytest.fail("열 때 NDJSON 전체를 해시하지 않아야 함"))
+        items = NdjsonUniques(str(ndjson_path))
+    try:
+        assert items[1] == SAMPLE_PROCESSED[1]
+        with pytest.raises(NdjsonError, match="CRC32"): items[0]
+        with pytest.raises(NdjsonError): items.verify()
+    finally:
+        items.close()
+    ndjson_path.write_bytes(bytes(data[:-1])) # 잘린 파일은 열 때 거부
+    with pytest.raises(NdjsonError):
+        NdjsonUniques(str(ndjson_path))
+    (ndjson_path.parent / (ndjson_path.name + ".idx")).write_text("{", encoding="utf-8")
+    with pytest.raises(NdjsonError):
+        NdjsonUniques(str(ndjson_path))
+    assert db_utils.open_processed_uniques_ndjson() is None
+    assert isinstance(db_utils.load_processed_uniques(), ProcessedUniquesList) # JSON으로 폴백
+
+
+def test_db_utils_lazy_ndjson_readers(ndjson_files):
+    items = db_utils.load_processed_uniques() # 스냅샷이 없으면 NDJSON
+    try:
+        assert isinstance(items, NdjsonUniques) and items.unique_ids() == list(range(7))
+    finally:
+        items.close()
+    assert db_utils.get_processed_unique(2) == SAMPLE_PROCESSED[2]
+    assert list(db_utils.iter_processed_uniques_pages(page_size=4)) == [SAMPLE_PROCESSED[:4], SAMPLE_PROCESSED[4:]]
+    json_path, _ = ndjson_files
+    json_path.write_text(json.dumps(SAMPLE_PROCESSED[:1]), encoding="utf-8") # NDJSON이 오래됨 -> JSON 사용
+    assert db_utils.get_processed_unique(0) == SAMPLE_PROCESSED[0] and db_utils.get_processed_unique(2) is None
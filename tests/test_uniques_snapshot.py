@@ -0,0 +1,137 @@
+# D:\LEB\tests\test_uniques_snapshot.py
+
+import os
+import json
+import pytest
+
+from src import db_utils, uniques_snapshot
+from src.uniques_snapshot import (SnapshotWriter, UniquesSnapshot, SnapshotError, ProcessedUniquesList,
+                                  file_sha256, snapshot_path_for, HEADER_STRUCT)
+
+SAMPLE_PROCESSED = [
+    {"unique_id": 0, "name_display": "Calamity", "level_requirement": 0, "lore_text": "불꽃",
+     "formatted_mods_list": ["(5% ~ 10%) Increased Cast Speed"]},
+    {"unique_id": 1, "name_display": "Fractured Crown", "level_requirement": 20, "lore_text": "",
+     "formatted_mods_list": []},
+]
+
+
+@pytest.fixture
+def processed_files(tmp_path, monkeypatch):
+    json_path = tmp_path / "processed_uniques.json"
+    base_path = tmp_path / "processed_uniques.bin"
+    json_path.write_text(json.dumps(SAMPLE_PROCESSED, indent=4, ensure_ascii=False), encoding="utf-8")
+    writer = SnapshotWriter(str(base_path))
+    for record in SAMPLE_PROCESSED:
+        writer.add(record)
+    assert writer.finish(file_sha256(str(json_path))) == 2
+    assert writer.final_path == snapshot_path_for(str(base_path), file_sha256(str(json_path)))
+    monkeypatch.setattr(db_utils, "PROCESSED_UNIQUES_PATH", str(json_path))
+    monkeypatch.setattr(db_utils, "PROCESSED_UNIQUES_SNAPSHOT_PATH", str(base_path))
+    monkeypatch.setattr(db_utils, "PROCESSED_UNIQUES_NDJSON_PATH", str(tmp_path / "processed_uniques.ndjson"))
+    return json_path, tmp_path / os.path.basename(writer.final_path)
+
+
+def test_snapshot_roundtrip_and_lazy_decode(processed_files):
+    json_path, snapshot_path = processed_files
+    snapshot = UniquesSnapshot(str(snapshot_path), file_sha256(str(json_path)))
+    try:
+        assert len(snapshot) == 2
+        assert snapshot.names() == ["Calamity", "Fractured Crown"]
+        assert snapshot.unique_ids() == [0, 1]
+        assert snapshot._decoded == {}  # 이름 목록만으로는 레코드를 디코딩하지 않음
+        assert snapshot[1] == SAMPLE_PROCESSED[1]
+        assert list(snapshot._decoded) == [1]
+        assert list(snapshot) == SAMPLE_PROCESSED
+        assert snapshot[-1] is snapshot[1]
+    finally:
+        snapshot.close()
+
+
+def test_loader_prefers_fresh_snapshot(processed_files):
+    items = db_utils.load_processed_uniques()
+    try:
+        assert isinstance(items, UniquesSnapshot)
+        assert list(items) == SAMPLE_PROCESSED
+    finally:
+        items.close()
+
+
+def test_loader_falls_back_when_snapshot_is_stale(processed_files):
+    json_path, _ = processed_files
+    changed = SAMPLE_PROCESSED[:1]
+    json_path.write_text(json.dumps(changed, indent=4, ensure_ascii=False), encoding="utf-8")
+    items = db_utils.load_processed_uniques()
+    assert isinstance(items, ProcessedUniquesList)
+    assert list(items) == changed and items.names() == ["Calamity"]
+
+
+def test_loader_falls_back_when_snapshot_is_corrupt_or_missing(processed_files):
+    _, snapshot_path = processed_files
+    data = bytearray(snapshot_path.read_bytes()); data[-1] ^= 0xFF
+    snapshot_path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError):
+        UniquesSnapshot(str(snapshot_path))
+    assert isinstance(db_utils.load_processed_uniques(), ProcessedUniquesList)
+    snapshot_path.unlink()
+    assert list(db_utils.load_processed_uniques()) == SAMPLE_PROCESSED
+
+
+def test_corrupt_record_is_detected_when_read_and_rewritten_by_writer(processed_files, monkeypatch):
+    json_path, snapshot_path = processed_files
+    data = bytearray(snapshot_path.read_bytes()); data[HEADER_STRUCT.size + 2] ^= 0x01 # 첫 레코드 내용
+    snapshot_path.write_bytes(bytes(data))
+    with monkeypatch.context() as patch: # 열 때는 헤더/요약/인덱스만 확인
+        patch.setattr(uniques_snapshot.zlib, "crc32", _crc32_without_records(len(data)))
+        snapshot = UniquesSnapshot(str(snapshot_path), file_sha256(str(json_path)))
+    try:
+        assert snapshot.names() == ["Calamity", "Fractured Crown"] and snapshot[1] == SAMPLE_PROCESSED[1]
+        with pytest.raises(SnapshotError, match="CRC32"): snapshot[0]
+        with pytest.raises(SnapshotError): snapshot.verify()
+    finally:
+        snapshot.close()
+    writer = SnapshotWriter(db_utils.PROCESSED_UNIQUES_SNAPSHOT_PATH) # 같은 원본이라도 손상된 스냅샷은 교체
+    for record in SAMPLE_PROCESSED: writer.add(record)
+    writer.finish(file_sha256(str(json_path)))
+    with UniquesSnapshot(str(snapshot_path), file_sha256(str(json_path))) as snapshot: assert list(snapshot) == SAMPLE_PROCESSED
+
+
+def _crc32_without_records(file_size):
+    real_crc32 = uniques_snapshot.zlib.crc32
+    def crc32(data, *args):
+        assert len(data) < file_size - HEADER_STRUCT.size, "열 때 레코드 영역을 읽지 않아야 함"
+        return real_crc32(data, *args)
+    return crc32
+
+
+def test_new_snapshot_never_replaces_an_open_one(processed_files, monkeypatch):
+    json_path, snapshot_path = processed_files
+    opened = db_utils.load_processed_uniques() # 앱이 mmap으로 열어 둔 스냅샷
+    real_replace, real_remove = os.replace, os.remove
+    def windows_replace(source, target): # Windows처럼 열린(매핑된) 파일은 교체/삭제 불가
+        if os.path.exists(target) and os.path.samefile(target, snapshot_path): raise PermissionError("매핑된 파일")
+        real_replace(source, target)
+    def windows_remove(path):
+        if os.path.exists(path) and os.path.samefile(path, snapshot_path) and opened._mm is not None: raise PermissionError("매핑된 파일")
+        real_remove(path)
+    monkeypatch.setattr(os, "replace", windows_replace); monkeypatch.setattr(os, "remove", windows_remove)
+    try:
+        # 같은 원본으로 다시 기록: 열린 파일을 그대로 사용
+        writer = SnapshotWriter(db_utils.PROCESSED_UNIQUES_SNAPSHOT_PATH)
+        for record in SAMPLE_PROCESSED: writer.add(record)
+        writer.finish(file_sha256(str(json_path)))
+        assert writer.final_path == str(snapshot_path) and not os.path.exists(writer.final_path + ".tmp")
+        # 원본이 바뀜: 새 이름으로 기록하고 열린 이전 파일은 남겨 둠
+        json_path.write_text(json.dumps(SAMPLE_PROCESSED[:1]), encoding="utf-8")
+        writer = SnapshotWriter(db_utils.PROCESSED_UNIQUES_SNAPSHOT_PATH)
+        writer.add(SAMPLE_PROCESSED[0]); writer.finish(file_sha256(str(json_path)))
+        assert writer.final_path != str(snapshot_path) and snapshot_path.exists()
+        assert opened[1] == SAMPLE_PROCESSED[1]
+        reloaded = db_utils.load_processed_uniques()
+        assert isinstance(reloaded, UniquesSnapshot) and list(reloaded) == SAMPLE_PROCESSED[:1]
+    finally:
+        opened.close()
+    writer = SnapshotWriter(db_utils.PROCESSED_UNIQUES_SNAPSHOT_PATH) # 다음 가공에서 닫힌 이전 파일 정리
+    writer.add(SAMPLE_PROCESSED[0]); writer.finish(file_sha256(str(json_path)))
+    reloaded.close()
+    assert sorted(os.listdir(json_path.parent)) == sorted(["processed_uniques.json", os.path.basename(writer.final_path)])
@@ -0,0 +1,97 @@
+# D:\LEB\tests\test_version_check.py
+
+import os
+import json
+import logging
+import threading
+import importlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+
+from src import version_check
+
+ETAG = '"v1"'
+
+
+@pytest.fixture
+def version_server():
+    """ETag 조건부 GET을 지원하는 version.json 서버. (URL, 상태 dict: body/fail, 요청 목록 [(경로, If-None-Match)])"""
+    state = {"body": '\ufeff{"version": "9.9.9", "url": "https://example.invalid/leb.zip"}', "fail": False}
+    requested = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requested.append((self.path, self.headers.get("If-None-Match")))
+            if state["fail"]: self.send_response(500); self.end_headers(); return
+            if self.headers.get("If-None-Match") == ETAG: self.send_response(304); self.end_headers(); return
+            body = state["body"].encode("utf-8")
+            self.send_response(200); self.send_header("ETag", ETAG); self.send_header("Content-Length", str(len(body)))
+            self.end_headers(); self.wfile.write(body)
+        def log_message(self, *args): pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/version.json", state, requested
+    httpd.shutdown(); httpd.server_close()
+
+
+def test_ttl_cache_makes_no_request_and_expiry_uses_conditional_get(version_server, tmp_path):
+    url, _, requested = version_server
+    cache_path = str(tmp_path / "cache.json")
+    data, source = version_check.fetch_remote_version_info(url=url, cache_path=cache_path, ttl=3600)
+    assert (data["version"], source) == ("9.9.9", "network")
+    assert requested == [("/version.json", None)]
+
+    for _ in range(3): # TTL 안의 재실행: 요청 0회
+        assert version_check.fetch_remote_version_info(url=url, cache_path=cache_path, ttl=3600) == (data, "cache")
+    assert len(requested) == 1
+
+    assert version_check.fetch_remote_version_info(url=url, cache_path=cache_path, ttl=0) == (data, "not_modified")
+    assert requested[-1] == ("/version.json", ETAG)
+    # 304도 확인 시각을 갱신하므로 다시 TTL 동안 요청 없음
+    assert version_check.fetch_remote_version_info(url=url, cache_path=cache_path, ttl=3600)[1] == "cache"
+    assert len(requested) == 2
+
+
+def test_failure_falls_back_to_stale_cache(version_server, tmp_path):
+    url, state, _ = version_server
+    cache_path = str(tmp_path / "cache.json")
+    assert version_check.fetch_remote_version_info(url=url, cache_path=cache_path, ttl=0)[1] == "network"
+    state["fail"] = True
+    data, source = version_check.fetch_remote_version_info(url=url, cache_path=cache_path, ttl=0)
+    assert (data["version"], source) == ("9.9.9", "stale")
+    os.remove(cache_path)
+    assert version_check.fetch_remote_version_info(url=url, cache_path=cache_path, ttl=0) == ({}, "error")
+
+
+def test_cache_for_other_url_or_corrupt_file_is_ignored(version_server, tmp_path):
+    url, _, requested = version_server
+    cache_path = tmp_path / "cache.json"
+    cache_path.write_text(json.dumps({"url": "http://other/version.json", "checked_at": 9e18, "data": {"version": "0"}}))
+    assert version_check.fetch_remote_version_info(url=url, cache_path=str(cache_path))[1] == "network"
+    cache_path.write_text("{broken")
+    assert version_check.fetch_remote_version_info(url=url, cache_path=str(cache_path))[1] == "network"
+    assert len(requested) == 2
+
+
+def test_check_update_status(version_server, tmp_path, monkeypatch):
+    url, _, _ = version_server
+    monkeypatch.setattr(version_check, "get_local_version", lambda: "1.0.0")
+    status = version_check.check_update_status(url=url, cache_path=str(tmp_path / "cache.json"))
+    assert status == {"update_available": True, "local": "1.0.0", "remote": "9.9.9",
+                      "url": "https://example.invalid/leb.zip", "manifest": "", "source": "network"}
+    assert version_check.check_for_update(url=url, cache_path=str(tmp_path / "cache.json")) == (True, "1.0.0", "9.9.9")
+
+
+def test_check_update_status_resolves_bundle_manifest(version_server, tmp_path, monkeypatch):
+    url, state, _ = version_server
+    state["body"] = '{"version": "9.9.9", "manifest": "bundles/9.9.9/manifest.json"}'
+    monkeypatch.setattr(version_check, "get_local_version", lambda: "1.0.0")
+    status = version_check.check_update_status(url=url, cache_path=str(tmp_path / "cache.json"))
+    assert status["manifest"] == url.rsplit("/", 1)[0] + "/bundles/9.9.9/manifest.json" # version.json 기준 상대 경로
+
+
+def test_import_does_not_configure_root_logger():
+    root = logging.getLogger(); handlers = list(root.handlers); level = root.level
+    importlib.reload(version_check)
+    assert root.handlers == handlers and root.level == level